@@ -5,6 +5,7 @@ Charge search_config.json et expose des accesseurs typés.
 
 import json
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
@@ -26,6 +27,28 @@ _REQUIRED_FIELDS = [
 # Sous-champs obligatoires de mots_cles
 _REQUIRED_MOTS_CLES = ["prioritaires", "secondaires", "budget"]
 
+# Signaux faibles de projet (partagés par ScraperCore et la sélection de passages IA)
+SIGNAUX_FAIBLES: Dict[str, List[str]] = {
+    "budgetaires": [
+        "budget primitif", "plan pluriannuel d'investissement", "ppi",
+        "programmation budgétaire", "autorisation de programme",
+        "crédit de paiement", "ligne budgétaire énergie",
+        "section d'investissement", "dotation", "enveloppe budgétaire",
+    ],
+    "reflexion": [
+        "étude de faisabilité", "diagnostic énergétique", "audit énergétique",
+        "bilan carbone", "transition énergétique", "plan climat", "pcaet",
+        "rénovation thermique", "sobriété énergétique", "décarbonation",
+        "bilan thermique", "dpe", "performance énergétique",
+    ],
+    "consultation": [
+        "appel à manifestation d'intérêt", "ami énergie", "concertation",
+        "marché de maîtrise d'œuvre", "mission d'étude", "prestataire énergie",
+        "appel d'offres", "dce", "cahier des charges", "consultation entreprise",
+        "marché public travaux",
+    ],
+}
+
 _DEFAULT_CONFIG: Dict[str, Any] = {
     "nom_campagne": "Chaufferies Biomasse AURA",
     "description": "Détection projets chaufferie en phase amont",
@@ -151,6 +174,43 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     return config
 
 
+def resolve_config(
+    config: Optional[Dict[str, Any]] = None,
+    config_path: Optional[str] = None,
+    overrides: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Construit un instantané de configuration pour un run, sans toucher au disque.
+
+    Le fichier search_config.json ne sert que de valeur par défaut : une config
+    fournie en mémoire le remplace, puis les overrides sont appliqués par-dessus
+    (fusion d'un niveau pour les sous-dictionnaires, ex. parametres_scraping).
+
+    Args:
+        config: Configuration complète en mémoire. Si None, lit le fichier.
+        config_path: Chemin alternatif vers le fichier JSON (si config est None).
+        overrides: Valeurs propres au run (ex. {"mode_recherche": "pdf"}).
+
+    Returns:
+        Copie indépendante et validée de la configuration.
+
+    Raises:
+        FileNotFoundError: Fichier introuvable (si config est None).
+        ValueError: Champ obligatoire manquant.
+    """
+    base = config if config is not None else load_config(config_path)
+    snapshot = json.loads(json.dumps(base))  # deep copy
+
+    for key, value in (overrides or {}).items():
+        if isinstance(value, dict) and isinstance(snapshot.get(key), dict):
+            snapshot[key] = {**snapshot[key], **json.loads(json.dumps(value))}
+        else:
+            snapshot[key] = json.loads(json.dumps(value))
+
+    _validate(snapshot)
+    return snapshot
+
+
 def get_mots_cles(config_path: Optional[str] = None) -> Dict[str, List[str]]:
     """
     Retourne les mots-clés de la campagne.
@@ -161,6 +221,32 @@ def get_mots_cles(config_path: Optional[str] = None) -> Dict[str, List[str]]:
     return load_config(config_path)["mots_cles"]
 
 
+
+# Mots-clés du fichier pour les appels sans instantané de run, relus
+# seulement quand search_config.json change : (mtime, mots_cles)
+_courants: Dict[str, Any] = {"mtime": None, "mots_cles": None}
+_courants_lock = threading.Lock()
+
+
+def get_mots_cles_courants() -> Dict[str, List[str]]:
+    """
+    Mots-clés de search_config.json, mis en cache tant que le fichier ne
+    change pas. Fichier absent ou invalide : mots-clés de la campagne par
+    défaut (jamais d'exception, pour les appels répétés à chaque document).
+    """
+    try:
+        mtime = _CONFIG_PATH.stat().st_mtime_ns
+    except OSError:
+        return _DEFAULT_CONFIG["mots_cles"]
+    with _courants_lock:
+        if _courants["mtime"] != mtime:
+            try:
+                _courants["mots_cles"] = get_mots_cles()
+            except (OSError, ValueError):
+                _courants["mots_cles"] = _DEFAULT_CONFIG["mots_cles"]
+            _courants["mtime"] = mtime
+        return _courants["mots_cles"]
+
 def get_prompt_ia(config_path: Optional[str] = None) -> str:
     """
     Retourne le prompt système pour Ollama/Mistral.
@@ -0,0 +1,462 @@
+"""
+Empreinte CMS des sites de mairie et collecte par leurs points d'accès structurés.
+
+La plupart des sites communaux tournent sur une poignée de plateformes. Une fois
+la plateforme reconnue sur la réponse de la page d'accueil (balise generator,
+en-têtes, chemins caractéristiques), un adaptateur interroge ses points d'accès
+structurés : une requête JSON ou un flux remplace des dizaines de pages HTML.
+
+- WordPress : API REST (/wp-json/wp/v2/posts, types personnalisés, pages,
+  media?mime_type=application/pdf) filtrée par date côté serveur, plus les
+  documents liés dans le contenu des articles — collecte exhaustive sur la
+  fenêtre quand les types de contenu ont pu être listés ;
+- Drupal : JSON:API (/jsonapi/node/article) si activée, sinon /rss.xml
+  (articles seulement : collecte non exhaustive) ;
+- SPIP : flux spip.php?page=backend (articles et documents joints) ;
+- Joomla : flux com_content (?format=feed&type=rss) de l'accueil et des catégories ;
+- CampagneWeb, Stratis : plateformes propriétaires sans API publique connue —
+  seuls les flux annoncés par la page d'accueil sont lus.
+
+Un adaptateur renvoie None quand ses points d'accès ne répondent pas :
+ScraperCore reprend alors l'exploration générique. De nouveaux adaptateurs
+s'ajoutent avec enregistrer().
+
+Utilisé par scraper_core (ScraperCore.scraper_site, étape 1).
+"""
+
+import logging
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+log = logging.getLogger("crawler.cms")
+
+# Pages de résultats lues au plus par point d'accès paginé (100 éléments par page)
+MAX_PAGES_API = 5
+
+# Types de contenu WordPress personnalisés interrogés au plus
+MAX_TYPES_WP = 5
+
+# Types WordPress déjà lus (posts, pages, media) ou techniques
+_WP_TYPES_EXCLUS = {
+    "post", "page", "attachment", "nav_menu_item", "wp_block", "wp_template",
+    "wp_template_part", "wp_navigation", "wp_global_styles", "wp_font_family", "wp_font_face",
+}
+
+_DOCUMENT = re.compile(r"\.(?:pdf|docx?)$", re.I)
+
+# Mots des rubriques dont Joomla expose le flux
+_RUBRIQUES = re.compile(r"deliber|conseil|actualit|actus|news|bulletin|projet|environnement|energie", re.I)
+
+# (cms, source, motif, poids) ; source : generateur (meta generator), entetes, html
+_SIGNATURES = [
+    ("wordpress", "generateur", re.compile(r"wordpress", re.I), 3),
+    ("wordpress", "entetes", re.compile(r"api\.w\.org", re.I), 3),
+    ("wordpress", "html", re.compile(r"/wp-content/"), 2),
+    ("wordpress", "html", re.compile(r"/wp-includes/"), 1),
+    ("spip", "generateur", re.compile(r"\bspip\b", re.I), 3),
+    ("spip", "entetes", re.compile(r"composed-by:\s*spip", re.I), 3),
+    ("spip", "html", re.compile(r"spip\.php\?"), 2),
+    ("spip", "html", re.compile(r"/squelettes(?:-dist)?/|local/cache-(?:css|js|vignettes)"), 1),
+    ("joomla", "generateur", re.compile(r"joomla", re.I), 3),
+    ("joomla", "html", re.compile(r"option=com_(?:content|contact|k2)"), 2),
+    ("joomla", "html", re.compile(r"/media/(?:jui|system)/|/components/com_"), 1),
+    ("drupal", "generateur", re.compile(r"drupal", re.I), 3),
+    ("drupal", "entetes", re.compile(r"x-generator:\s*drupal|x-drupal-(?:dynamic-)?cache", re.I), 3),
+    ("drupal", "html", re.compile(r"/sites/default/files/"), 2),
+    ("drupal", "html", re.compile(r"drupal-settings-json|Drupal\.settings"), 2),
+    ("campagneweb", "html", re.compile(r"campagne-?web", re.I), 3),
+    ("stratis", "html", re.compile(r"stratis\.fr|\bstratis\b", re.I), 3),
+]
+
+SCORE_MIN = 2
+
+
+class Empreinte:
+    """CMS reconnu (None si aucun) et indices relevés."""
+
+    def __init__(self, cms: Optional[str] = None, indices: Optional[List[str]] = None, score: int = 0):
+        self.cms = cms
+        self.indices = indices or []
+        self.score = score
+
+    def __bool__(self) -> bool:
+        return self.cms is not None
+
+
+def detecter_cms(html: str, headers, soup: Optional[BeautifulSoup] = None) -> Empreinte:
+    """
+    Empreinte CMS d'après la réponse de la page d'accueil.
+
+    Args:
+        html: Corps HTML.
+        headers: En-têtes de la réponse (mapping).
+        soup: Page déjà analysée (évite un second parsing pour la balise generator).
+    """
+    soup = soup if soup is not None else BeautifulSoup(html, "html.parser")
+    meta = soup.find("meta", attrs={"name": re.compile(r"^generator$", re.I)})
+    sources = {
+        "generateur": meta.get("content", "") if meta else "",
+        "entetes": "\n".join(f"{k}: {v}" for k, v in dict(headers or {}).items()),
+        "html": html,
+    }
+    scores: Dict[str, int] = {}
+    indices: Dict[str, List[str]] = {}
+    for cms, source, motif, poids in _SIGNATURES:
+        m = motif.search(sources[source])
+        if m:
+            scores[cms] = scores.get(cms, 0) + poids
+            indices.setdefault(cms, []).append(f"{source}:{m.group(0).strip()[:30]}")
+    if not scores:
+        return Empreinte()
+    cms = max(scores, key=scores.get)
+    if scores[cms] < SCORE_MIN:
+        return Empreinte()
+    return Empreinte(cms, indices[cms], scores[cms])
+
+
+# ── Collecte ───────────────────────────────────────────────────────────────────
+
+class Collecte:
+    """
+    Résultat d'un adaptateur.
+
+    entrees : [{titre, url, date_publication, texte, source_type}] (même forme
+    que les entrées RSS de ScraperCore.detecter_flux_rss) ;
+    documents : [{url, titre, date_publication}] (PDF à télécharger) ;
+    exhaustive : tout le contenu de la fenêtre est couvert (l'exploration HTML
+    générique devient inutile).
+    """
+
+    def __init__(self, cms: str, exhaustive: bool = False):
+        self.cms = cms
+        self.exhaustive = exhaustive
+        self.entrees: List[Dict] = []
+        self.documents: List[Dict] = []
+        self.requetes = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.entrees or self.documents)
+
+
+def _texte_html(html: str) -> str:
+    return BeautifulSoup(html or "", "html.parser").get_text(" ", strip=True)
+
+
+def _date(valeur: str) -> Optional[datetime]:
+    """Date ISO 8601 ou RFC 822, en datetime naïf."""
+    if not valeur:
+        return None
+    valeur = valeur.strip()
+    try:
+        return datetime.fromisoformat(valeur.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(valeur).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_json(session, url: str, params: Dict, timeout: float, collecte: Collecte):
+    """(données, en-têtes) d'un GET JSON, None si le point d'accès ne répond pas en JSON."""
+    collecte.requetes += 1
+    r = session.get(url, params=params, timeout=timeout)
+    if r.status_code != 200 or "json" not in r.headers.get("Content-Type", ""):
+        return None
+    try:
+        return r.json(), r.headers
+    except ValueError:
+        return None
+
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+def lire_flux(session, url: str, timeout: float, collecte: Collecte,
+              source_type: str = "rss") -> Optional[Tuple[List[Dict], List[Dict]]]:
+    """
+    Entrées et documents joints (enclosures PDF) d'un flux RSS 2.0 ou Atom ;
+    None si l'URL ne renvoie pas de flux.
+    """
+    collecte.requetes += 1
+    r = session.get(url, timeout=timeout)
+    if r.status_code != 200 or not re.search(rb"<(?:rss|feed|rdf:RDF)\b", r.content[:2048]):
+        return None
+    try:
+        racine = ET.fromstring(r.content)
+    except ET.ParseError:
+        return None
+    entrees, documents = [], []
+    for item in racine.iter():
+        if item.tag not in ("item", f"{_ATOM}entry", "{http://purl.org/rss/1.0/}item"):
+            continue
+        champ = {}
+        for enfant in item:
+            nom = enfant.tag.split("}")[-1]
+            if nom == "link" and enfant.get("href"):
+                champ.setdefault("link", enfant.get("href"))
+            elif nom == "enclosure":
+                if "pdf" in (enfant.get("type") or "") or (enfant.get("url") or "").lower().endswith(".pdf"):
+                    documents.append({"url": urljoin(url, enfant.get("url")), "titre": None})
+            elif enfant.text:
+                champ.setdefault(nom, enfant.text.strip())
+        date_pub = _date(champ.get("pubDate") or champ.get("published") or champ.get("updated")
+                         or champ.get("date") or "")
+        titre = champ.get("title", "")
+        for doc in documents:
+            if doc["titre"] is None:
+                doc.update(titre=titre, date_publication=date_pub)
+        entrees.append({
+            "titre": titre,
+            "url": urljoin(url, champ.get("link", url)),
+            "date_publication": date_pub,
+            "texte": _texte_html(champ.get("encoded") or champ.get("content")
+                                 or champ.get("description") or champ.get("summary") or ""),
+            "source_type": source_type,
+        })
+    return entrees, documents
+
+
+def _lire_flux_dans(collecte: Collecte, session, urls: List[str], timeout: float) -> bool:
+    """Ajoute à la collecte les flux qui répondent ; True si au moins un a répondu."""
+    vus = {e["url"] for e in collecte.entrees}
+    trouve = False
+    for url in dict.fromkeys(urls):
+        flux = lire_flux(session, url, timeout, collecte)
+        if flux is None:
+            continue
+        trouve = True
+        entrees, documents = flux
+        for entree in entrees:
+            if entree["url"] not in vus:
+                vus.add(entree["url"])
+                collecte.entrees.append(entree)
+        collecte.documents.extend(documents)
+    return trouve
+
+
+def _flux_annonces(base_url: str, soup: BeautifulSoup) -> List[str]:
+    return [
+        urljoin(base_url, lien["href"])
+        for lien in soup.find_all("link", rel="alternate", href=True)
+        if re.search(r"rss|atom", lien.get("type", ""), re.I)
+    ]
+
+
+# ── Adaptateurs ────────────────────────────────────────────────────────────────
+
+def _wp_liste(session, modele: str, route: str, params: Dict, timeout: float,
+              collecte: Collecte) -> Optional[List[Dict]]:
+    """Éléments d'une route REST WordPress, page après page (X-WP-TotalPages)."""
+    elements: List[Dict] = []
+    for page in range(1, MAX_PAGES_API + 1):
+        url = modele.format(route)
+        reponse = _get_json(session, url, {**params, "per_page": 100, "page": page}, timeout, collecte)
+        if reponse is None:
+            return elements if page > 1 else None
+        donnees, entetes = reponse
+        if not isinstance(donnees, list):
+            return elements if page > 1 else None
+        elements.extend(donnees)
+        total = int(entetes.get("X-WP-TotalPages", "1") or 1)
+        if page >= total or len(donnees) < 100:
+            break
+    return elements
+
+
+def _documents_lies(html: str, base_url: str, titre: str, date_pub: Optional[datetime]) -> List[Dict]:
+    """Liens vers des documents (PDF, Word) du site dans le HTML d'un article ou d'une page."""
+    site = urlparse(base_url).netloc.lower().removeprefix("www.")
+    documents = []
+    for lien in BeautifulSoup(html or "", "html.parser").find_all("a", href=True):
+        cible = urljoin(base_url, lien["href"]).split("#")[0]
+        parsed = urlparse(cible)
+        if parsed.netloc.lower().removeprefix("www.") == site and _DOCUMENT.search(parsed.path):
+            documents.append({"url": cible, "titre": lien.get_text(" ", strip=True) or titre,
+                              "date_publication": date_pub})
+    return documents
+
+
+def _wp_types(session, modele: str, timeout: float, collecte: Collecte) -> Optional[List[str]]:
+    """rest_base des types de contenu personnalisés (agenda, délibérations...) ; None si /types ne répond pas."""
+    reponse = _get_json(session, modele.format("types"), {}, timeout, collecte)
+    if reponse is None or not isinstance(reponse[0], dict):
+        return None
+    return [
+        t["rest_base"] for nom, t in reponse[0].items()
+        if nom not in _WP_TYPES_EXCLUS and isinstance(t, dict) and t.get("rest_base")
+    ][:MAX_TYPES_WP]
+
+
+def _wordpress(session, base_url: str, soup: BeautifulSoup, depuis: datetime,
+               timeout: float) -> Optional[Collecte]:
+    collecte = Collecte("wordpress")
+    api = soup.find("link", rel="https://api.w.org/", href=True)
+    racines = [api["href"] if api else urljoin(base_url, "/wp-json/"), urljoin(base_url, "/?rest_route=/")]
+    apres = depuis.strftime("%Y-%m-%dT%H:%M:%S")
+    champs = "link,title,date,content"
+    for racine in dict.fromkeys(racines):
+        # Permaliens actifs : /wp-json/wp/v2/posts ; sinon ?rest_route=/wp/v2/posts
+        modele = racine.rstrip("/") + "/wp/v2/{}"
+        posts = _wp_liste(session, modele, "posts", {"after": apres, "_fields": champs}, timeout, collecte)
+        if posts is not None:
+            break
+    else:
+        return None
+
+    def ajouter(element: Dict, date_pub: Optional[datetime], source_type: str) -> None:
+        titre = _texte_html(element.get("title", {}).get("rendered", ""))
+        contenu = element.get("content", {}).get("rendered", "")
+        collecte.entrees.append({
+            "titre": titre,
+            "url": element.get("link", ""),
+            "date_publication": date_pub,
+            "texte": _texte_html(contenu),
+            "source_type": source_type,
+        })
+        # PDF insérés dans l'article sans passer par la médiathèque de la fenêtre
+        collecte.documents.extend(_documents_lies(contenu, element.get("link") or base_url, titre, date_pub))
+
+    for post in posts:
+        ajouter(post, _date(post.get("date", "")), "actualites")
+    # Types personnalisés (agenda, délibérations, marchés...) : hors de /posts
+    types = _wp_types(session, modele, timeout, collecte)
+    for route in types or []:
+        for element in _wp_liste(session, modele, route, {"after": apres, "_fields": champs},
+                                 timeout, collecte) or []:
+            ajouter(element, _date(element.get("date", "")), "actualites")
+    pages = _wp_liste(session, modele, "pages", {"modified_after": apres, "_fields": "link,title,modified,content"},
+                      timeout, collecte) or []
+    for page in pages:
+        modifiee = _date(page.get("modified", ""))
+        if modifiee is not None and modifiee < depuis:
+            continue  # WordPress < 5.7 ignore modified_after
+        ajouter(page, modifiee, "generique")
+    medias = _wp_liste(session, modele, "media",
+                       {"mime_type": "application/pdf", "after": apres, "_fields": "source_url,title,date"},
+                       timeout, collecte) or []
+    for media in medias:
+        if media.get("source_url"):
+            collecte.documents.append({
+                "url": media["source_url"],
+                "titre": _texte_html(media.get("title", {}).get("rendered", "")),
+                "date_publication": _date(media.get("date", "")),
+            })
+    # Exhaustive seulement si les types personnalisés ont pu être listés
+    collecte.exhaustive = types is not None
+    return collecte
+
+
+def _drupal(session, base_url: str, soup: BeautifulSoup, depuis: datetime,
+            timeout: float) -> Optional[Collecte]:
+    # Seul le type « article » est lu : les autres types de contenu (pages,
+    # délibérations...) restent à l'exploration générique, collecte non exhaustive
+    collecte = Collecte("drupal")
+    params = {
+        "filter[recent][condition][path]": "changed",
+        "filter[recent][condition][operator]": ">=",
+        "filter[recent][condition][value]": str(int(depuis.timestamp())),
+        "sort": "-changed",
+        "page[limit]": 50,
+    }
+    url = urljoin(base_url, "/jsonapi/node/article")
+    for _ in range(MAX_PAGES_API):
+        reponse = _get_json(session, url, params, timeout, collecte)
+        if reponse is None:
+            break
+        donnees = reponse[0]
+        for noeud in donnees.get("data", []):
+            attributs = noeud.get("attributes", {})
+            alias = (attributs.get("path") or {}).get("alias")
+            collecte.entrees.append({
+                "titre": attributs.get("title", ""),
+                "url": urljoin(base_url, alias) if alias else noeud.get("links", {}).get("self", {}).get("href", ""),
+                "date_publication": _date(attributs.get("changed") or attributs.get("created") or ""),
+                "texte": _texte_html((attributs.get("body") or {}).get("value", "")),
+                "source_type": "actualites",
+            })
+        suivante = donnees.get("links", {}).get("next", {}).get("href")
+        if not suivante:
+            break
+        url, params = suivante, {}
+    if collecte.entrees:
+        return collecte
+    # JSON:API désactivée : flux de la page d'accueil
+    if _lire_flux_dans(collecte, session, [urljoin(base_url, "/rss.xml")] + _flux_annonces(base_url, soup), timeout):
+        return collecte
+    return None
+
+
+def _spip(session, base_url: str, soup: BeautifulSoup, depuis: datetime,
+          timeout: float) -> Optional[Collecte]:
+    collecte = Collecte("spip")
+    flux = [urljoin(base_url, "spip.php?page=backend")] + _flux_annonces(base_url, soup)
+    return collecte if _lire_flux_dans(collecte, session, flux, timeout) else None
+
+
+def _joomla(session, base_url: str, soup: BeautifulSoup, depuis: datetime,
+            timeout: float) -> Optional[Collecte]:
+    collecte = Collecte("joomla")
+    netloc = urlparse(base_url).netloc
+    rubriques = []
+    for lien in soup.find_all("a", href=True):
+        cible = urljoin(base_url, lien["href"]).split("#")[0]
+        if urlparse(cible).netloc == netloc and _RUBRIQUES.search(cible) and not cible.lower().endswith(".pdf"):
+            rubriques.append(cible)
+    flux = [urljoin(base_url, "index.php?" + urlencode({"format": "feed", "type": "rss"}))]
+    for rubrique in list(dict.fromkeys(rubriques))[:5]:
+        separateur = "&" if "?" in rubrique else "?"
+        flux.append(f"{rubrique}{separateur}format=feed&type=rss")
+    flux += _flux_annonces(base_url, soup)
+    return collecte if _lire_flux_dans(collecte, session, flux, timeout) else None
+
+
+def _flux_plateforme(nom: str) -> Callable:
+    def adaptateur(session, base_url: str, soup: BeautifulSoup, depuis: datetime,
+                   timeout: float) -> Optional[Collecte]:
+        collecte = Collecte(nom)
+        flux = _flux_annonces(base_url, soup)
+        return collecte if flux and _lire_flux_dans(collecte, session, flux, timeout) else None
+    return adaptateur
+
+
+_adaptateurs: Dict[str, Callable] = {}
+
+
+def enregistrer(cms: str, adaptateur: Callable) -> Callable:
+    """Ajoute (ou remplace) l'adaptateur d'un CMS."""
+    _adaptateurs[cms] = adaptateur
+    return adaptateur
+
+
+enregistrer("wordpress", _wordpress)
+enregistrer("drupal", _drupal)
+enregistrer("spip", _spip)
+enregistrer("joomla", _joomla)
+enregistrer("campagneweb", _flux_plateforme("campagneweb"))
+enregistrer("stratis", _flux_plateforme("stratis"))
+
+
+def collecter(cms: str, session, base_url: str, soup: BeautifulSoup, depuis: datetime,
+              timeout: float = 15) -> Optional[Collecte]:
+    """
+    Collecte par l'adaptateur du CMS ; None si aucun adaptateur, si ses points
+    d'accès ne répondent pas ou s'ils ne renvoient rien (exploration générique).
+    """
+    import requests
+
+    adaptateur = _adaptateurs.get(cms)
+    if adaptateur is None:
+        return None
+    try:
+        collecte = adaptateur(session, base_url, soup, depuis, timeout)
+    except (requests.RequestException, ValueError) as exc:
+        log.warning("Collecte %s impossible sur %s : %s", cms, base_url, exc)
+        return None
+    return collecte or None
@@ -0,0 +1,353 @@
+"""
+Concurrence HTTP adaptative (AIMD) du mode turbo.
+
+Une limite globale et une limite par site remplacent le nombre fixe de
+requêtes parallèles :
+- hausse additive : +1 par « fenêtre » de requêtes réussies (autant que la
+  limite), seulement quand la limite est effectivement atteinte ;
+- baisse multiplicative (× FACTEUR) : la limite du site fautif recule
+  aussitôt sur timeout, erreur réseau, 429, 5xx ou latence dégradée (moyenne
+  glissante au-delà de SEUIL_LATENCE × la meilleure observée) ;
+- la limite globale ne suit que les signaux de congestion — 429, 5xx,
+  latence dégradée, timeout d'un site qui a déjà répondu — quand leur part
+  parmi les réponses récentes dépasse SEUIL_ECHECS. Un site injoignable (DNS,
+  connexion refusée, timeout sans réponse préalable : communes mortes de la
+  pré-qualification) ne dit rien de la charge et ne recule que sa propre limite ;
+- un recul par limite au plus toutes les REFROIDISSEMENT secondes : les
+  requêtes déjà en vol lors d'un incident ne le comptent pas dix fois.
+
+La capacité globale est répartie par classe de requête : « fetch » (pages)
+et « extract » (documents à extraire) ont chacune une part réservée, qu'un
+afflux de l'autre classe ne peut pas consommer. L'IA garde ses propres slots
+(ia.dispatcher), hors de ce budget : un LLM lent ne retient aucune connexion
+aux sites et inversement.
+
+Les retries de urllib3 (Retry de ScraperCore._make_session) sont lus dans
+l'historique de la réponse : un 429 suivi d'un succès compte comme un 429.
+
+Chaque décision (hausse, recul, motif) est gardée pour les métriques du run.
+
+Utilisé par scraper_core (ScraperCore.controleur) et dashboard/app.run_analysis.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+import urllib3
+
+FACTEUR = 0.5
+REFROIDISSEMENT = 2.0
+SEUIL_ECHECS = 0.2
+SEUIL_LATENCE = 3.0
+# Latence en deçà de laquelle un site n'est jamais jugé lent (s)
+LATENCE_MIN = 1.0
+# Issues gardées pour le taux d'échecs global
+FENETRE = 50
+
+RESERVES = {"fetch": 0.3, "extract": 0.3}
+
+_EXTENSIONS_DOCUMENTS = (".pdf", ".doc", ".docx", ".odt")
+
+
+def classe_requete(url: str) -> str:
+    """« extract » pour un document à extraire, « fetch » sinon."""
+    return "extract" if urlparse(url).path.lower().endswith(_EXTENSIONS_DOCUMENTS) else "fetch"
+
+
+def issue_reponse(r: requests.Response) -> str:
+    """ok, 429 ou 5xx, y compris parmi les tentatives rejouées par urllib3."""
+    statuts = [r.status_code]
+    retries = getattr(r.raw, "retries", None)
+    for tentative in getattr(retries, "history", ()) or ():
+        if tentative.status:
+            statuts.append(tentative.status)
+        elif tentative.error is not None:
+            return "erreur"
+    if 429 in statuts:
+        return "429"
+    if any(s >= 500 for s in statuts):
+        return "5xx"
+    return "ok"
+
+
+def issue_exception(exc: requests.RequestException) -> str:
+    """timeout (y compris après les retries de urllib3) ou erreur."""
+    if isinstance(exc, requests.Timeout):
+        return "timeout"
+    raison = getattr(exc.args[0], "reason", None) if exc.args else None
+    return "timeout" if isinstance(raison, urllib3.exceptions.TimeoutError) else "erreur"
+
+
+class Limite:
+    """Limite AIMD : +1 par fenêtre de `valeur` succès, × FACTEUR au recul."""
+
+    def __init__(self, initiale: int, minimum: int, maximum: int):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.valeur = float(min(max(initiale, self.minimum), self.maximum))
+        self._dernier_recul = 0.0
+
+    @property
+    def entier(self) -> int:
+        return int(self.valeur)
+
+    def augmenter(self) -> bool:
+        """True si la partie entière de la limite a changé."""
+        avant = self.entier
+        self.valeur = min(self.maximum, self.valeur + 1 / self.valeur)
+        return self.entier != avant
+
+    def reculer(self, maintenant: float) -> bool:
+        """True si la limite a reculé (pas pendant le refroidissement)."""
+        if maintenant - self._dernier_recul < REFROIDISSEMENT or self.valeur <= self.minimum:
+            return False
+        self._dernier_recul = maintenant
+        self.valeur = max(float(self.minimum), float(int(self.valeur * FACTEUR)))
+        return True
+
+
+class Creneau:
+    """Place accordée à une requête ; libérée une seule fois."""
+
+    def __init__(self, hote: str, classe: str, tenus: Dict[str, int]):
+        self.hote = hote
+        self.classe = classe
+        self.tenus = tenus
+        self.libere = False
+
+
+class ControleurAIMD:
+    """
+    Limites globale et par site, ajustées au fil des réponses (thread-safe).
+
+    Args:
+        initiale: Limite globale de départ (ancien parallel_requests).
+        maximum: Plafond de la limite globale.
+        par_hote: Limite de départ par site.
+        max_par_hote: Plafond par site.
+        reserves: Part réservée de la limite globale par classe de requête.
+    """
+
+    def __init__(self, initiale: int = 3, minimum: int = 1, maximum: int = 24,
+                 par_hote: int = 2, max_par_hote: int = 4,
+                 reserves: Optional[Dict[str, float]] = None):
+        self.globale = Limite(initiale, minimum, maximum)
+        self.par_hote = par_hote
+        self.max_par_hote = max_par_hote
+        self.reserves = dict(RESERVES if reserves is None else reserves)
+        self._hotes: Dict[str, Limite] = {}
+        self._en_cours = 0
+        self._en_cours_hote: Dict[str, int] = {}
+        self._en_cours_classe: Dict[str, int] = {}
+        self._attente_globale = 0
+        self._issues: deque = deque(maxlen=FENETRE)
+        self._latence: Dict[str, float] = {}
+        self._latence_base: Dict[str, float] = {}
+        # Sites qui ont déjà répondu (un statut HTTP, quel qu'il soit)
+        self._repondu: set = set()
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._t0 = time.time()
+        self.decisions: deque = deque(maxlen=200)
+        self.compteurs = {
+            "requetes": 0, "hausses": 0, "reculs": 0, "attente_s": 0.0,
+            "timeout": 0, "erreur": 0, "429": 0, "5xx": 0, "latence": 0,
+        }
+        self._initiale = self.globale.entier
+        self._min_atteint = self._max_atteint = self.globale.entier
+
+    # ── Places ─────────────────────────────────────────────────────────────────
+
+    def _hote(self, hote: str) -> Limite:
+        if hote not in self._hotes:
+            self._hotes[hote] = Limite(self.par_hote, 1, self.max_par_hote)
+        return self._hotes[hote]
+
+    def _reserve(self, classe: str) -> int:
+        part = self.reserves.get(classe, 0)
+        return max(1, int(part * self.globale.entier)) if part > 0 else 0
+
+    def _blocage(self, hote: str, classe: str) -> Optional[str]:
+        """None si la requête peut partir, sinon la limite qui la retient (hote / globale)."""
+        if self._en_cours_hote.get(hote, 0) >= self._hote(hote).entier:
+            return "hote"
+        if self._en_cours >= self.globale.entier:
+            return "globale"
+        if self._en_cours_classe.get(classe, 0) < self._reserve(classe):
+            return None
+        reserve_autres = sum(
+            max(0, self._reserve(c) - self._en_cours_classe.get(c, 0))
+            for c in self.reserves if c != classe
+        )
+        return None if self.globale.entier - self._en_cours > reserve_autres else "globale"
+
+    def acquerir(self, url: str) -> Optional[Creneau]:
+        """
+        Attend une place pour `url`. None si le thread en tient déjà une,
+        sur ce site ou un autre (redirection, y compris mairie-x.fr →
+        www.mairie-x.fr, requête pendant la lecture d'un flux) : la requête
+        passe sur la place déjà tenue. Sinon elle attendrait une place que
+        le thread est seul à pouvoir rendre — blocage définitif à la limite 1,
+        et entre threads qui se redirigent en même temps au-delà.
+        """
+        hote = urlparse(url).netloc
+        tenus = getattr(self._local, "tenus", None)
+        if tenus is None:
+            tenus = self._local.tenus = {}
+        if any(tenus.values()):
+            return None
+        classe = classe_requete(url)
+        t0 = time.time()
+        with self._cond:
+            while True:
+                blocage = self._blocage(hote, classe)
+                if blocage is None:
+                    break
+                # Requêtes retenues par la limite globale : demande au-delà de la limite
+                self._attente_globale += blocage == "globale"
+                self._cond.wait()
+                self._attente_globale -= blocage == "globale"
+            self._en_cours += 1
+            self._en_cours_hote[hote] = self._en_cours_hote.get(hote, 0) + 1
+            self._en_cours_classe[classe] = self._en_cours_classe.get(classe, 0) + 1
+            self.compteurs["requetes"] += 1
+            self.compteurs["attente_s"] += time.time() - t0
+        tenus[hote] = tenus.get(hote, 0) + 1
+        return Creneau(hote, classe, tenus)
+
+    def liberer(self, creneau: Creneau, issue: str, latence: Optional[float] = None) -> None:
+        """Rend la place et ajuste les limites d'après l'issue de la requête."""
+        if creneau.libere:
+            return
+        creneau.libere = True
+        creneau.tenus[creneau.hote] -= 1
+        hote = creneau.hote
+        maintenant = time.time()
+        with self._cond:
+            sature_global = self._en_cours >= self.globale.entier or self._attente_globale > 0
+            limite_hote = self._hote(hote)
+            sature_hote = self._en_cours_hote[hote] >= limite_hote.entier
+            self._en_cours -= 1
+            self._en_cours_hote[hote] -= 1
+            self._en_cours_classe[creneau.classe] -= 1
+
+            if issue == "ok" and latence is not None and self._lent(hote, latence):
+                issue = "latence"
+            congestion = issue in ("429", "5xx", "latence") or (issue == "timeout" and hote in self._repondu)
+            if issue not in ("timeout", "erreur"):
+                self._repondu.add(hote)
+            # Taux global : réponses et congestion seulement, pas les sites injoignables
+            if issue == "ok" or congestion:
+                self._issues.append(congestion)
+            echecs = sum(self._issues) / len(self._issues) if self._issues else 0.0
+
+            if issue != "ok":
+                self.compteurs[issue] += 1
+                if limite_hote.reculer(maintenant):
+                    self._decider(hote, "recul", limite_hote.entier, issue)
+                if congestion and len(self._issues) >= 10 and echecs > SEUIL_ECHECS \
+                        and self.globale.reculer(maintenant):
+                    self._decider("global", "recul", self.globale.entier, f"{issue}, {echecs:.0%} d'échecs")
+            else:
+                if sature_hote and limite_hote.augmenter():
+                    self._decider(hote, "hausse", limite_hote.entier, "site sain")
+                if sature_global and echecs <= SEUIL_ECHECS and self.globale.augmenter():
+                    self._decider("global", "hausse", self.globale.entier, f"{echecs:.0%} d'échecs")
+            self._cond.notify_all()
+
+    def _lent(self, hote: str, latence: float) -> bool:
+        """Moyenne glissante de latence du site au-delà de SEUIL_LATENCE × sa meilleure."""
+        moyenne = self._latence.get(hote)
+        moyenne = latence if moyenne is None else 0.7 * moyenne + 0.3 * latence
+        self._latence[hote] = moyenne
+        base = min(self._latence_base.get(hote, moyenne), moyenne)
+        self._latence_base[hote] = base
+        return moyenne > LATENCE_MIN and moyenne > SEUIL_LATENCE * base
+
+    def _decider(self, portee: str, action: str, limite: int, motif: str) -> None:
+        self.compteurs["hausses" if action == "hausse" else "reculs"] += 1
+        if portee == "global":
+            self._min_atteint = min(self._min_atteint, limite)
+            self._max_atteint = max(self._max_atteint, limite)
+        self.decisions.append({
+            "t_s": round(time.time() - self._t0, 1),
+            "portee": portee,
+            "action": action,
+            "limite": limite,
+            "motif": motif,
+        })
+
+    # ── Métriques ──────────────────────────────────────────────────────────────
+
+    def stats(self) -> Dict:
+        with self._cond:
+            sites_reduits = {h: l.entier for h, l in self._hotes.items() if l.entier < self.par_hote}
+            return {
+                "limite_initiale": self._initiale,
+                "limite_finale": self.globale.entier,
+                "limite_min": self._min_atteint,
+                "limite_max": self._max_atteint,
+                "plafond": self.globale.maximum,
+                "plafond_par_site": self.max_par_hote,
+                "reserves": {c: self._reserve(c) for c in self.reserves},
+                **{k: (round(v, 1) if isinstance(v, float) else v) for k, v in self.compteurs.items()},
+                "sites": len(self._hotes),
+                "sites_reduits": sites_reduits,
+                "decisions": list(self.decisions),
+            }
+
+    def format_stats(self) -> List[str]:
+        st = self.stats()
+        lignes = [
+            f"Limite globale {st['limite_initiale']} → {st['limite_finale']}"
+            f" (min {st['limite_min']}, max {st['limite_max']}, plafond {st['plafond']})"
+            f" | {st['hausses']} hausse(s), {st['reculs']} recul(s)"
+            f" | {st['requetes']} requête(s), {st['attente_s']:.0f}s d'attente de place",
+            f"Signaux : {st['timeout']} timeout, {st['erreur']} erreur(s) réseau, {st['429']}× 429,"
+            f" {st['5xx']}× 5xx, {st['latence']} latence dégradée"
+            f" | {len(st['sites_reduits'])}/{st['sites']} site(s) sous leur limite de départ",
+        ]
+        for d in [d for d in st["decisions"] if d["portee"] == "global"][-10:]:
+            lignes.append(f"  +{d['t_s']}s {d['action']} → {d['limite']} ({d['motif']})")
+        return lignes
+
+
+class SessionControlee(requests.Session):
+    """
+    Session dont chaque requête prend une place auprès d'un ControleurAIMD.
+    Pour un flux (stream=True), la place est rendue à la fermeture de la
+    réponse (bloc with) : la durée du transfert compte.
+    """
+
+    def __init__(self, controleur: ControleurAIMD):
+        super().__init__()
+        self.controleur = controleur
+
+    def send(self, request, **kwargs):
+        creneau = self.controleur.acquerir(request.url)
+        if creneau is None:
+            return super().send(request, **kwargs)
+        t0 = time.time()
+        try:
+            r = super().send(request, **kwargs)
+        except requests.RequestException as exc:
+            self.controleur.liberer(creneau, issue_exception(exc))
+            raise
+        issue, latence = issue_reponse(r), time.time() - t0
+        if kwargs.get("stream"):
+            fermer = r.close
+
+            def close():
+                try:
+                    fermer()
+                finally:
+                    self.controleur.liberer(creneau, issue, latence)
+
+            r.close = close
+        else:
+            self.controleur.liberer(creneau, issue, latence)
+        return r
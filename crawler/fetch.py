@@ -0,0 +1,779 @@
+"""
+Téléchargements de documents en flux, avec taille plafonnée.
+
+- la taille annoncée (Content-Length, via HEAD en option ou via les en-têtes
+  de la réponse GET, reçus avant le corps) est vérifiée avant de lire quoi
+  que ce soit ;
+- le corps est lu par blocs et abandonné dès que le plafond est dépassé
+  (serveurs sans Content-Length) ;
+- au-delà de SEUIL_DISQUE, le corps part dans un fichier temporaire mappé en
+  mémoire (mmap) au lieu de grossir en RAM ;
+- octets téléchargés et octets évités sont comptés par site ;
+- pré-filtrage des liens de documents par HEAD concurrents (type, taille,
+  Last-Modified) avant tout GET (voir sonder_entetes) ;
+- téléchargement partiel (HTTP Range) des PDF : en-tête, première page des
+  PDF linéarisés et dates de métadonnées, avant de décider du téléchargement
+  complet (voir telecharger_partiel) ;
+- lecture du seul début d'une page d'accueil, jusqu'au premier signal utile
+  (pré-qualification du mode turbo), gardé dans un cache du run et complété
+  au besoin par scraper_site (voir lire_debut, CacheAccueils).
+
+Utilisé par scraper_core, dashboard/app et pdf_pipeline/download.
+"""
+
+import mmap
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable, Optional, Union
+from urllib.parse import parse_qs, urlparse
+
+MO = 1024 * 1024
+
+# Plafond par document (DOWNLOAD_MAX_MO) : les annexes de PLU à 150 Mo sont écartées
+MAX_OCTETS = int(float(os.environ.get("DOWNLOAD_MAX_MO", "40")) * MO)
+
+# Au-delà, le corps est écrit sur disque et relu par mmap
+SEUIL_DISQUE = 8 * MO
+
+BLOC = 64 * 1024
+
+# En-tête des requêtes Range et de celles dont la suite est reprise par Range :
+# les positions d'octets portent sur la représentation non compressée, celle
+# dont les octets décodés ont été gardés
+IDENTITE = {"Accept-Encoding": "identity"}
+
+
+class Corps:
+    """
+    Contenu téléchargé, en mémoire (bytes) ou dans un fichier temporaire mappé.
+
+    `data` se lit comme des octets (indexation, regex, buffer) sans copie ;
+    `source` est ce qu'il faut passer aux extracteurs : les octets, ou le
+    chemin du fichier temporaire pour les gros documents.
+    """
+
+    def __init__(self, data: bytes = b"", chemin: Optional[str] = None):
+        self._bytes = data
+        self.chemin = chemin
+        self._fh = None
+        self._mmap: Optional[mmap.mmap] = None
+        if chemin:
+            self._fh = open(chemin, "rb")
+            taille = os.fstat(self._fh.fileno()).st_size
+            self._mmap = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ) if taille else None
+
+    @property
+    def data(self) -> Union[bytes, mmap.mmap]:
+        if self.chemin:
+            return self._mmap if self._mmap is not None else b""
+        return self._bytes
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        return self.chemin or self._bytes
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if self.chemin:
+            try:
+                os.unlink(self.chemin)
+            except OSError:
+                pass
+            self.chemin = None
+        self._bytes = b""
+
+    def __enter__(self) -> "Corps":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        self.close()
+
+
+class Telechargement:
+    """
+    Résultat d'un téléchargement.
+
+    statut : "ok", "trop_gros" (annoncé ou constaté au-delà du plafond),
+    "http" (statut HTTP ≠ 200) ou "erreur" (réseau).
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.url_finale = url
+        self.statut = "erreur"
+        self.status_code = 0
+        self.headers: Dict[str, str] = {}
+        self.encoding: Optional[str] = None
+        self.corps = Corps()
+        self.octets = 0
+        self.octets_evites = 0
+        self.erreur: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.statut == "ok"
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+
+    def texte(self) -> str:
+        """Corps décodé (pages HTML)."""
+        return bytes(self.corps.data).decode(self.encoding or "utf-8", errors="replace")
+
+
+def _taille_annoncee(headers) -> Optional[int]:
+    try:
+        return int(headers.get("Content-Length", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+class _Tampon:
+    """Accumule les blocs en mémoire, puis sur disque passé SEUIL_DISQUE."""
+
+    def __init__(self, debut: bytes = b""):
+        self.memoire = bytearray()
+        self.fichier = None
+        self.chemin: Optional[str] = None
+        self.taille = 0
+        if debut:
+            self.ecrire(debut)
+
+    def ecrire(self, bloc: bytes) -> None:
+        self.taille += len(bloc)
+        if self.fichier is None and self.taille > SEUIL_DISQUE:
+            fd, self.chemin = tempfile.mkstemp(suffix=".dl", prefix="doc_")
+            self.fichier = os.fdopen(fd, "wb")
+            self.fichier.write(self.memoire)
+            self.memoire = bytearray()
+        if self.fichier is not None:
+            self.fichier.write(bloc)
+        else:
+            self.memoire += bloc
+
+    def corps(self) -> Corps:
+        if self.fichier is not None:
+            self.fichier.close()
+            return Corps(chemin=self.chemin)
+        return Corps(bytes(self.memoire))
+
+    def abandonner(self) -> None:
+        if self.fichier is not None:
+            self.fichier.close()
+            self.fichier = None
+            try:
+                os.unlink(self.chemin)
+            except OSError:
+                pass
+        self.memoire = bytearray()
+
+
+# ── Compteurs par site ─────────────────────────────────────────────────────────
+
+class StatsSites:
+    """Octets téléchargés / évités et documents écartés, par site."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites: Dict[str, Dict[str, int]] = {}
+
+    def ajouter(self, url: str, octets: int = 0, evites: int = 0, trop_gros: bool = False,
+                document: bool = True) -> None:
+        """document=False : octets d'un téléchargement partiel, le document est compté à la décision."""
+        site = urlparse(url).netloc
+        with self._lock:
+            st = self._sites.setdefault(site, {"documents": 0, "octets": 0, "octets_evites": 0, "trop_gros": 0})
+            st["documents"] += int(document)
+            st["octets"] += octets
+            st["octets_evites"] += evites
+            st["trop_gros"] += int(trop_gros)
+
+    def site(self, url_ou_site: str) -> Dict[str, int]:
+        site = urlparse(url_ou_site).netloc or url_ou_site
+        with self._lock:
+            return dict(self._sites.get(site, {"documents": 0, "octets": 0, "octets_evites": 0, "trop_gros": 0}))
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {site: dict(st) for site, st in self._sites.items()}
+
+    def totaux(self, debut: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, int]:
+        """Compteurs cumulés sur tous les sites, depuis un snapshot() de début de run."""
+        debut = debut or {}
+        totaux = {"sites": 0, "documents": 0, "octets": 0, "octets_evites": 0, "trop_gros": 0}
+        for site, st in self.snapshot().items():
+            avant = debut.get(site, {})
+            delta = {k: v - avant.get(k, 0) for k, v in st.items()}
+            if delta["documents"]:
+                totaux["sites"] += 1
+                for k, v in delta.items():
+                    totaux[k] += v
+        return totaux
+
+
+_stats = StatsSites()
+
+
+def get_stats() -> StatsSites:
+    return _stats
+
+
+def format_octets(n: float) -> str:
+    for unite in ("o", "Ko", "Mo"):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unite}"
+        n /= 1024
+    return f"{n:.1f} Go"
+
+
+def format_site(st: Dict[str, int]) -> str:
+    return (
+        f"{format_octets(st['octets'])} téléchargés, {format_octets(st['octets_evites'])} évités"
+        f" ({st['trop_gros']} document(s) au-delà du plafond sur {st['documents']})"
+    )
+
+
+# ── requests ───────────────────────────────────────────────────────────────────
+
+def validateur(headers) -> Optional[str]:
+    """
+    Validateur fort d'une réponse pour If-Range : ETag, sinon Last-Modified
+    (un ETag faible « W/ » n'est pas admis par If-Range). Aucun pour une
+    réponse compressée malgré IDENTITE : ses octets décodés ne correspondent
+    pas aux positions d'une plage.
+    """
+    if headers.get("Content-Encoding", "identity").lower() != "identity":
+        return None
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+
+def telecharger(session, url: str, max_octets: int = MAX_OCTETS, timeout: float = 30,
+                head: bool = False, debut: bytes = b"", validateur: Optional[str] = None,
+                **kwargs) -> Telechargement:
+    """
+    GET en flux d'un document avec une requests.Session.
+
+    Args:
+        max_octets: Plafond de taille (au-delà : statut "trop_gros", corps vide).
+        head: Interroger d'abord HEAD (évite d'ouvrir le GET d'un document
+            trop gros sur les serveurs qui le supportent).
+        debut: Premiers octets déjà reçus (telecharger_partiel, lire_debut) :
+            seule la suite est demandée (Range), le document complet sinon.
+        validateur: ETag / Last-Modified de la réponse qui a fourni `debut`,
+            envoyé en If-Range : si la ressource a changé, le serveur renvoie
+            le document entier au lieu d'une suite incohérente. Sans
+            validateur, `debut` est ignoré.
+        kwargs: Passés à session.get (headers...).
+    """
+    import requests
+
+    dl = Telechargement(url)
+    if debut and validateur:
+        kwargs["headers"] = {**kwargs.get("headers", {}), **IDENTITE,
+                             "Range": f"bytes={len(debut)}-", "If-Range": validateur}
+    else:
+        debut = b""
+    try:
+        if head:
+            try:
+                h = session.head(url, timeout=timeout, allow_redirects=True)
+                annonce = _taille_annoncee(h.headers) if h.status_code == 200 else None
+                if annonce is not None and annonce > max_octets:
+                    dl.statut, dl.status_code, dl.headers = "trop_gros", h.status_code, dict(h.headers)
+                    dl.octets_evites = annonce
+                    _stats.ajouter(url, evites=annonce, trop_gros=True)
+                    return dl
+            except requests.RequestException:
+                pass  # HEAD non supporté : la vérification se fait sur le GET
+
+        with session.get(url, timeout=timeout, stream=True, **kwargs) as r:
+            return _recevoir(r, dl, max_octets, debut)
+    except requests.RequestException as exc:
+        dl.statut, dl.erreur = "erreur", str(exc)
+        raise
+
+
+def _recevoir(r, dl: Telechargement, max_octets: int, debut: bytes = b"") -> Telechargement:
+    """Lit en flux le corps d'une réponse requests ouverte avec stream=True."""
+    url = dl.url
+    dl.status_code = r.status_code
+    dl.headers = dict(r.headers)
+    dl.url_finale = r.url
+    dl.encoding = r.encoding
+    suite = bool(debut) and r.status_code == 206
+    if r.status_code != 200 and not suite:
+        dl.statut = "http"
+        _stats.ajouter(url)
+        return dl
+    if suite:
+        dl.status_code = 200  # document reconstitué
+    annonce = _taille_annoncee(r.headers)
+    if annonce is not None and suite:
+        annonce += len(debut)
+    if annonce is not None and annonce > max_octets:
+        dl.statut, dl.octets_evites = "trop_gros", annonce
+        _stats.ajouter(url, evites=annonce, trop_gros=True)
+        return dl
+    deja = len(debut) if suite else 0
+    tampon = _Tampon(debut if suite else b"")
+    try:
+        for bloc in r.iter_content(BLOC):
+            tampon.ecrire(bloc)
+            if tampon.taille > max_octets:
+                tampon.abandonner()
+                dl.statut, dl.octets = "trop_gros", tampon.taille - deja
+                _stats.ajouter(url, octets=dl.octets, trop_gros=True)
+                return dl
+    except BaseException:
+        # Coupure réseau, timeout, interruption : pas de fichier temporaire orphelin
+        tampon.abandonner()
+        raise
+    dl.corps = tampon.corps()
+    dl.octets = tampon.taille - deja
+    dl.statut = "ok"
+    _stats.ajouter(url, octets=dl.octets)
+    return dl
+
+
+# ── Pré-filtrage par HEAD ──────────────────────────────────────────────────────
+
+# HEAD simultanés par lot (un seul site à la fois : rester discret)
+HEAD_WORKERS = 6
+
+# Types acceptés pour un lien de document ; un type absent laisse le bénéfice du doute
+TYPES_DOCUMENTS = (
+    "application/pdf", "application/x-pdf", "application/acrobat",
+    "application/msword", "application/vnd.openxmlformats-officedocument",
+    "application/octet-stream", "binary/octet-stream",
+    "application/force-download", "application/download", "application/x-download",
+)
+
+
+# Extensions d'un lien de document (ScraperCore.DOC_EXTENSIONS)
+EXTENSIONS_DOCUMENTS = (".pdf", ".doc", ".docx")
+
+
+def est_document(url: str, extensions: Iterable[str] = EXTENSIONS_DOCUMENTS) -> bool:
+    """
+    Lien vers un document : chemin en .pdf/.doc/.docx, ou nom de fichier
+    en paramètre (cms_viewFile.php?path=BM-2026.pdf). Une extension au
+    milieu de l'URL (/actualites.pdf-du-mois/) ne suffit pas.
+    """
+    parsed = urlparse(url.lower())
+    cibles = [parsed.path] + [v for valeurs in parse_qs(parsed.query).values() for v in valeurs]
+    return any(c.endswith(tuple(extensions)) for c in cibles)
+
+
+class Entetes:
+    """En-têtes HEAD d'un lien de document."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.url_finale = url
+        self.status_code = 0
+        self.content_type = ""
+        self.taille: Optional[int] = None
+        self.last_modified: Optional[datetime] = None
+        self.plages = False
+        self.erreur: Optional[str] = None
+
+    def motif_rejet(self, max_octets: Optional[int] = MAX_OCTETS, depuis: Optional[datetime] = None) -> Optional[str]:
+        """
+        Raison d'écarter le lien sans le télécharger, None pour le garder.
+        Un HEAD refusé ou en erreur ne condamne pas le lien (le GET tranchera).
+
+        Args:
+            max_octets: Plafond de taille (None : pas de contrôle).
+            depuis: Début de la fenêtre temporelle, comparé à Last-Modified.
+        """
+        if self.status_code in (404, 410):
+            return f"HTTP {self.status_code}"
+        if self.status_code != 200:
+            return None
+        if self.content_type and not self.content_type.startswith(TYPES_DOCUMENTS):
+            return f"pas un document ({self.content_type})"
+        if max_octets is not None and self.taille is not None and self.taille > max_octets:
+            return f"trop volumineux ({format_octets(self.taille)})"
+        if depuis is not None and self.last_modified is not None and self.last_modified < depuis:
+            return f"modifié le {self.last_modified:%d/%m/%Y} (Last-Modified)"
+        return None
+
+
+def _head(session, url: str, timeout: float) -> Entetes:
+    import requests
+
+    e = Entetes(url)
+    try:
+        r = session.head(url, timeout=timeout, allow_redirects=True)
+    except requests.RequestException as exc:
+        e.erreur = str(exc)
+        return e
+    e.status_code = r.status_code
+    e.url_finale = r.url
+    e.content_type = r.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    e.taille = _taille_annoncee(r.headers)
+    e.plages = r.headers.get("Accept-Ranges", "").lower() == "bytes"
+    if r.headers.get("Last-Modified"):
+        try:
+            e.last_modified = parsedate_to_datetime(r.headers["Last-Modified"]).replace(tzinfo=None)
+        except (TypeError, ValueError):
+            pass
+    return e
+
+
+def sonder_entetes(session, urls: Iterable[str], workers: int = HEAD_WORKERS,
+                   timeout: float = 10) -> Dict[str, Entetes]:
+    """
+    HEAD concurrents d'un lot de liens (même requests.Session, pool de threads).
+
+    Returns:
+        {url: Entetes}, dans l'ordre des liens.
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls)))) as pool:
+        return dict(zip(urls, pool.map(lambda u: _head(session, u, timeout), urls)))
+
+
+# ── Téléchargement partiel (HTTP Range) ────────────────────────────────────────
+
+# Premiers octets demandés : en-tête, dictionnaire de linéarisation et, pour les
+# petits documents, souvent la première page entière
+TETE = 64 * 1024
+
+# Fin de fichier : trailer et dictionnaire Info des PDF non linéarisés
+QUEUE = 32 * 1024
+
+# Première page d'un PDF linéarisé au-delà de laquelle on renonce à la lire seule
+MAX_PREMIERE_PAGE = 2 * MO
+
+_LINEARISE = re.compile(rb"<<\s*/Linearized\s+[\d.]+(.{0,300}?)>>", re.S)
+_DATE_PDF = re.compile(
+    rb"/(CreationDate|ModDate)\s*\(\s*D:\s*(\d{4})(\d{2})?(\d{2})?(\d{2})?(\d{2})?(\d{2})?"
+)
+_DATE_XMP = re.compile(
+    rb"xmp:(CreateDate|ModifyDate)\s*(?:>|=\s*[\"'])\s*(\d{4})-(\d{2})-(\d{2})(?:T(\d{2}):(\d{2}):(\d{2}))?"
+)
+_CLES_DATE = {b"CreationDate": "creation", b"CreateDate": "creation",
+              b"ModDate": "modification", b"ModifyDate": "modification"}
+
+
+def linearisation(tete: bytes) -> Optional[Dict[str, int]]:
+    """
+    Dictionnaire de linéarisation en tête de PDF (/L taille du fichier,
+    /E fin de la première page, /N nombre de pages, /O objet de la première
+    page), None si le PDF n'est pas linéarisé.
+    """
+    m = _LINEARISE.search(tete[:2048])
+    if not m:
+        return None
+    cles = dict(re.findall(rb"/([LENOT])\s+(\d+)", m.group(1)))
+    return {cle.decode(): int(valeur) for cle, valeur in cles.items()}
+
+
+def dates_pdf(*morceaux: bytes) -> Dict[str, datetime]:
+    """
+    Dates CreationDate / ModDate lues dans des morceaux bruts de PDF
+    (dictionnaire Info non compressé, ou métadonnées XMP).
+    Les Info placés dans un flux d'objets compressé ne sont pas lisibles ainsi.
+    """
+    dates: Dict[str, datetime] = {}
+    for morceau in morceaux:
+        for motif in (_DATE_PDF, _DATE_XMP):
+            for m in motif.finditer(morceau):
+                cle = _CLES_DATE[m.group(1)]
+                if cle in dates:
+                    continue
+                champs = [int(g) if g else d for g, d in zip(m.groups()[1:], (0, 1, 1, 0, 0, 0))]
+                try:
+                    dates[cle] = datetime(*champs)
+                except ValueError:
+                    continue
+    return dates
+
+
+def _plage(session, url: str, plage: str, timeout: float, **kwargs) -> bytes:
+    """Octets d'une plage ; b"" si le serveur ne répond pas par un 206."""
+    kwargs["headers"] = {**kwargs.get("headers", {}), **IDENTITE, "Range": f"bytes={plage}"}
+    with session.get(url, timeout=timeout, stream=True, **kwargs) as r:
+        return b"".join(r.iter_content(BLOC)) if r.status_code == 206 else b""
+
+
+def _taille_totale(headers) -> Optional[int]:
+    """Taille du document d'après Content-Range (« bytes 0-65535/1234567 »)."""
+    m = re.search(r"/(\d+)\s*$", headers.get("Content-Range", ""))
+    return int(m.group(1)) if m else None
+
+
+class Partiel:
+    """
+    Résultat d'un téléchargement partiel.
+
+    statut : "partiel" (seuls les premiers octets sont là), "complet" (le
+    serveur ignore Range ou le document tient dans la tête : `complet` porte
+    le Telechargement entier), "http" ou "erreur".
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.statut = "erreur"
+        self.status_code = 0
+        self.plages = False
+        self.taille: Optional[int] = None
+        self.lineaire: Optional[Dict[str, int]] = None
+        self.tete = b""
+        self.dates: Dict[str, datetime] = {}
+        self.octets = 0
+        self.headers: Dict[str, str] = {}
+        self.complet: Optional[Telechargement] = None
+
+    @property
+    def validateur(self) -> Optional[str]:
+        """Condition If-Range de la reprise du document (telecharger(..., debut=tete))."""
+        return validateur(self.headers)
+
+    @property
+    def date(self) -> Optional[datetime]:
+        """Date la plus récente des métadonnées (bénéfice du doute)."""
+        return max(self.dates.values()) if self.dates else None
+
+    @property
+    def premiere_page(self) -> bool:
+        """La tête contient toute la première page d'un PDF linéarisé."""
+        return bool(self.lineaire) and len(self.tete) >= self.lineaire.get("E", 0) > 0
+
+    @property
+    def reste(self) -> int:
+        """Octets non téléchargés du document (0 si taille inconnue)."""
+        return max(0, (self.taille or 0) - self.octets)
+
+
+def telecharger_partiel(session, url: str, max_octets: int = MAX_OCTETS, timeout: float = 30,
+                        **kwargs) -> Partiel:
+    """
+    Premiers octets d'un PDF par requêtes Range, sans télécharger le reste.
+
+    - GET « Range: bytes=0-TETE » : un 206 prouve que le serveur accepte les
+      plages ; un 200 (Range ignoré) bascule en téléchargement complet plafonné
+      sur la même connexion, sans requête perdue ;
+    - PDF linéarisé : la première page (jusqu'à /E) est complétée par une
+      seconde plage ;
+    - dates CreationDate / ModDate cherchées dans la tête, puis dans les QUEUE
+      derniers octets (trailer et Info des PDF non linéarisés).
+
+    Le document complet s'obtient ensuite avec
+    telecharger(..., debut=p.tete, validateur=p.validateur).
+
+    Raises:
+        requests.RequestException: erreur réseau.
+    """
+    p = Partiel(url)
+    entetes = {**kwargs.pop("headers", {}), **IDENTITE, "Range": f"bytes=0-{TETE - 1}"}
+    with session.get(url, timeout=timeout, stream=True, headers=entetes, **kwargs) as r:
+        p.status_code = r.status_code
+        p.plages = r.status_code == 206 or r.headers.get("Accept-Ranges", "").lower() == "bytes"
+        if r.status_code == 200:
+            # Range ignoré : le document arrive en entier, lu sur la même réponse
+            p.complet = _recevoir(r, Telechargement(url), max_octets)
+        elif r.status_code == 206:
+            p.headers = dict(r.headers)
+            tete = b"".join(r.iter_content(BLOC))
+
+    if p.complet is not None:
+        p.statut = "complet" if p.complet.ok else p.complet.statut
+        p.octets = p.complet.octets
+        p.taille = p.complet.octets_evites or p.complet.octets or None
+        if p.complet.ok:
+            p.tete = bytes(p.complet.corps.data[:TETE])
+            p.lineaire = linearisation(p.tete)
+            p.dates = dates_pdf(p.tete, bytes(p.complet.corps.data[-QUEUE:]))
+        return p
+    if p.status_code != 206:
+        p.statut = "http"
+        _stats.ajouter(url)
+        return p
+
+    p.tete = tete
+    p.octets = len(tete)
+    p.taille = _taille_totale(r.headers)
+    p.lineaire = linearisation(tete)
+    if p.lineaire and p.taille is None:
+        p.taille = p.lineaire.get("L")
+
+    if p.taille is not None and p.taille <= len(tete):
+        # Le document tenait dans la tête
+        p.statut = "complet"
+        p.complet = Telechargement(url)
+        p.complet.statut, p.complet.status_code = "ok", 200
+        p.complet.headers, p.complet.url_finale = dict(r.headers), r.url
+        p.complet.corps, p.complet.octets = Corps(tete), len(tete)
+        p.dates = dates_pdf(tete)
+        _stats.ajouter(url, octets=len(tete))
+        return p
+
+    fin = (p.lineaire or {}).get("E", 0)
+    if len(tete) < fin <= MAX_PREMIERE_PAGE:
+        suite = _plage(session, url, f"{len(tete)}-{fin - 1}", timeout, **kwargs)
+        p.tete += suite
+        p.octets += len(suite)
+
+    p.dates = dates_pdf(p.tete)
+    if not p.dates and p.taille and p.taille > len(p.tete) + QUEUE:
+        queue = _plage(session, url, f"-{QUEUE}", timeout, **kwargs)
+        p.octets += len(queue)
+        p.dates = dates_pdf(queue)
+
+    p.statut = "partiel"
+    _stats.ajouter(url, octets=p.octets, document=False)
+    return p
+
+
+# ── Pages d'accueil (pré-qualification) ───────────────────────────────────────
+
+class Accueil:
+    """
+    Début d'une page d'accueil lu par la pré-qualification : octets reçus,
+    URL finale, en-têtes et repli HTTPS → HTTP, repris par scraper_site.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.url_finale = url
+        self.status_code = 0
+        self.headers: Dict[str, str] = {}
+        self.encoding: Optional[str] = None
+        self.contenu = b""
+        self.complet = False
+        self.repli_http = False
+
+    def texte(self) -> str:
+        return self.contenu.decode(self.encoding or "utf-8", errors="replace")
+
+    @property
+    def validateur(self) -> Optional[str]:
+        """ETag ou Last-Modified : condition If-Range de la reprise du corps."""
+        return validateur(self.headers)
+
+
+def lire_debut(session, url: str, max_octets: int, timeout: float = 30,
+               suffisant: Optional[Callable[[bytes], bool]] = None, **kwargs) -> Accueil:
+    """
+    GET en flux du début d'une page (connexion ensuite fermée) : au plus
+    `max_octets`, et pas au-delà du premier bloc après lequel
+    `suffisant(octets reçus)` est vrai.
+    """
+    accueil = Accueil(url)
+    # Non compressée : la suite se reprend par Range (telecharger(..., debut=contenu))
+    kwargs["headers"] = {**kwargs.get("headers", {}), **IDENTITE}
+    with session.get(url, timeout=timeout, stream=True, **kwargs) as r:
+        accueil.status_code = r.status_code
+        accueil.headers = dict(r.headers)
+        accueil.url_finale = r.url
+        accueil.encoding = r.encoding
+        if r.status_code != 200:
+            return accueil
+        tampon = bytearray()
+        accueil.complet = True
+        for bloc in r.iter_content(min(BLOC, max_octets)):
+            tampon += bloc
+            if len(tampon) >= max_octets or (suffisant is not None and suffisant(bytes(tampon))):
+                accueil.complet = False
+                break
+        accueil.contenu = bytes(tampon)
+    _stats.ajouter(url, octets=len(accueil.contenu), document=False)
+    return accueil
+
+
+class CacheAccueils:
+    """Pages d'accueil pré-qualifiées d'un run, prises une fois par scraper_site (thread-safe)."""
+
+    def __init__(self):
+        self._pages: Dict[str, Accueil] = {}
+        self._lock = threading.Lock()
+        self.gardees = 0
+        self.reprises = 0
+        self.octets_reutilises = 0
+
+    def garder(self, accueil: Accueil) -> None:
+        with self._lock:
+            self._pages[accueil.url] = accueil
+            self.gardees += 1
+
+    def prendre(self, url: str) -> Optional[Accueil]:
+        with self._lock:
+            accueil = self._pages.pop(url, None)
+            if accueil is not None:
+                self.reprises += 1
+                self.octets_reutilises += len(accueil.contenu)
+            return accueil
+
+
+# ── aiohttp ────────────────────────────────────────────────────────────────────
+
+async def telecharger_fichier(session, url: str, chemin: str, max_octets: int = MAX_OCTETS,
+                              timeout: float = 30, content_type: Optional[str] = None) -> Telechargement:
+    """
+    GET en flux (aiohttp) écrit directement dans `chemin`, sans passer par la
+    mémoire ; le fichier est supprimé si le plafond est dépassé.
+
+    Args:
+        content_type: Type attendu (ex. "application/pdf"), statut "http" sinon.
+    """
+    import aiohttp
+
+    dl = Telechargement(url)
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+        dl.status_code = resp.status
+        dl.headers = dict(resp.headers)
+        dl.url_finale = str(resp.url)
+        if resp.status != 200 or (content_type and resp.content_type != content_type):
+            dl.statut = "http"
+            _stats.ajouter(url)
+            return dl
+        annonce = resp.content_length
+        if annonce is not None and annonce > max_octets:
+            dl.statut, dl.octets_evites = "trop_gros", annonce
+            _stats.ajouter(url, evites=annonce, trop_gros=True)
+            return dl
+        taille = 0
+        try:
+            with open(chemin, "wb") as fh:
+                async for bloc in resp.content.iter_chunked(BLOC):
+                    taille += len(bloc)
+                    if taille > max_octets:
+                        break
+                    fh.write(bloc)
+        except BaseException:
+            if os.path.exists(chemin):
+                os.unlink(chemin)  # pas de fichier tronqué
+            raise
+        dl.octets = taille
+        if taille > max_octets:
+            os.unlink(chemin)
+            dl.statut = "trop_gros"
+            _stats.ajouter(url, octets=taille, trop_gros=True)
+            return dl
+        dl.statut = "ok"
+        _stats.ajouter(url, octets=taille)
+        return dl
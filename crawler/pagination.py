@@ -0,0 +1,148 @@
+"""
+Détection de la page suivante d'une liste paginée (délibérations, actualités).
+
+Schémas reconnus, par ordre de confiance :
+- <link rel="next"> / <a rel="next"> ;
+- paramètre de page : ?page=N, ?paged=N, ?p=N, ?start=N, ?offset=N ;
+- SPIP : ?debut_articles=K (tout paramètre debut_xxx, K = décalage) ;
+- chemin WordPress / Drupal : /page/N/.
+
+Pour les trois derniers, la page suivante est le lien de même schéma (même
+URL hors numéro) dont le numéro est le plus petit au-dessus de celui de la
+page courante : les liens « 1 2 3 … 12 » et « Suivant » se valent.
+
+Arrêt de la pagination : les dates des éléments de la liste sont lues dans
+la seule zone de contenu (hors en-tête, pied de page, menus et encadrés, où
+traînent des documents anciens épinglés) ; la liste étant triée du plus
+récent au plus ancien, la lecture s'arrête quand la plupart des éléments
+d'une page sortent de la fenêtre temporelle (voir arret_pagination).
+
+Utilisé par scraper_core (ScraperCore.scraper_site, étape 2).
+"""
+
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse
+
+PARAMS_PAGE = ("page", "paged", "p", "pg", "start", "offset")
+
+# Balises hors contenu de la liste
+HORS_CONTENU = ("header", "footer", "nav", "aside", "script", "style")
+
+# Part des éléments datés hors fenêtre au-delà de laquelle la page est la dernière utile
+PART_HORS_FENETRE = 0.5
+
+_CHEMIN_PAGE = re.compile(r"/page/(\d+)/?$", re.I)
+
+
+def position(url: str) -> Optional[Tuple[str, int]]:
+    """
+    (schéma, numéro) d'une URL de liste paginée, None si elle n'en porte pas.
+    Le schéma est l'URL sans le numéro : deux pages de la même liste ont le
+    même schéma.
+    """
+    parsed = urlparse(url)
+    params = parse_qsl(parsed.query, keep_blank_values=True)
+    for i, (cle, valeur) in enumerate(params):
+        cle_min = cle.lower()
+        if (cle_min in PARAMS_PAGE or cle_min.startswith("debut_")) and valeur.isdigit():
+            reste = urlencode(params[:i] + params[i + 1:])
+            return f"{parsed.netloc}{parsed.path}?{reste}#{cle_min}", int(valeur)
+    m = _CHEMIN_PAGE.search(parsed.path)
+    if m:
+        chemin = parsed.path[:m.start()].rstrip("/")
+        return f"{parsed.netloc}{chemin}/page/?{parsed.query}", int(m.group(1))
+    return None
+
+
+def _position_courante(url: str, schemas: set) -> Optional[Tuple[str, int]]:
+    """Position de la page courante ; la première page n'a souvent pas de numéro."""
+    pos = position(url)
+    if pos is not None:
+        return pos
+    parsed = urlparse(url)
+    chemin = parsed.path.rstrip("/")
+    base = urlencode(parse_qsl(parsed.query, keep_blank_values=True))
+    for schema in schemas:
+        if schema == f"{parsed.netloc}{chemin}/page/?{parsed.query}":
+            return schema, 1
+        prefixe, _, cle = schema.rpartition("#")
+        if prefixe == f"{parsed.netloc}{parsed.path}?{base}":
+            # Les décalages (SPIP debut_xxx, start, offset) partent de 0
+            return schema, 0 if cle.startswith("debut_") or cle in ("start", "offset") else 1
+    return None
+
+
+def page_suivante(soup, url: str) -> Optional[str]:
+    """URL absolue de la page suivante de la liste affichée par `soup`, ou None."""
+    netloc = urlparse(url).netloc
+    for balise in soup.find_all(["link", "a"], rel=True, href=True):
+        if "next" in [r.lower() for r in balise.get("rel", [])]:
+            suivante = urljoin(url, balise["href"])
+            if urlparse(suivante).netloc == netloc and suivante != url:
+                return suivante
+
+    candidats = {}
+    for lien in soup.find_all("a", href=True):
+        cible = urljoin(url, lien["href"]).split("#")[0]
+        if urlparse(cible).netloc != netloc:
+            continue
+        pos = position(cible)
+        if pos is not None:
+            candidats.setdefault(pos, cible)
+    if not candidats:
+        return None
+    courante = _position_courante(url, {schema for schema, _ in candidats})
+    if courante is None:
+        return None
+    schema, numero = courante
+    suivants = [(n, cible) for (s, n), cible in candidats.items() if s == schema and n > numero]
+    return min(suivants)[1] if suivants else None
+
+
+
+def hors_contenu(element) -> bool:
+    """Élément (balise ou texte) placé dans un en-tête, pied de page, menu ou encadré."""
+    return element.find_parent(HORS_CONTENU) is not None
+
+
+def zone_liste(soup):
+    """Zone de contenu d'une page de liste : <main>, [role=main], à défaut <body>."""
+    return soup.find("main") or soup.find(attrs={"role": "main"}) or soup.body or soup
+
+
+def liens_liste(soup, url: str) -> List[str]:
+    """Liens absolus des éléments de la liste : zone de contenu, hors en-tête / pied / menus."""
+    liens = []
+    for lien in zone_liste(soup).find_all("a", href=True):
+        if lien.name in HORS_CONTENU or hors_contenu(lien):
+            continue
+        liens.append(urljoin(url, lien["href"]).split("#")[0])
+    return list(dict.fromkeys(liens))
+
+
+def arret_pagination(dates: List[datetime], page_no: int, depuis: datetime,
+                     pages_max: int = 20, pages_sans_date: int = 3) -> Optional[str]:
+    """
+    Motif d'arrêt de la pagination d'une liste après la page `page_no`, None
+    pour lire la suivante.
+
+    Args:
+        dates: Dates des éléments de la page (zone de contenu).
+        depuis: Début de la fenêtre temporelle.
+        pages_max: Plafond de pages lues.
+        pages_sans_date: Pages consécutives sans date lisible tolérées.
+    """
+    if page_no >= pages_max:
+        return f"plafond de {pages_max} pages"
+    if not dates:
+        if page_no >= pages_sans_date:
+            return f"{page_no} page(s) sans date lisible"
+        return None
+    anciennes = [d for d in dates if d < depuis]
+    # Un élément ancien isolé (épinglé, mis à jour) ne suffit pas à conclure
+    if len(anciennes) > PART_HORS_FENETRE * len(dates):
+        return (f"{len(anciennes)}/{len(dates)} élément(s) avant le {depuis:%d/%m/%Y},"
+                f" hors fenêtre temporelle")
+    return None
@@ -0,0 +1,106 @@
+"""
+Recherche déléguée au moteur du site.
+
+Beaucoup de sites de mairie ont un formulaire de recherche (WordPress ?s=,
+/recherche?q=, SPIP spip.php?page=recherche&recherche=). Y soumettre les mots
+prioritaires de la campagne désigne directement les quelques pages utiles,
+au lieu de les chercher parmi des centaines.
+
+- detecter_formulaire : formulaire GET de la page d'accueil (champ type=search
+  ou nom usuel, champs cachés conservés) ; à défaut, URL de recherche du CMS
+  reconnu (crawler.cms) ;
+- liens_resultats : liens de la page de résultats, hors liens déjà présents
+  sur la page d'accueil (menus, pied de page) et hors pagination de la recherche.
+
+Utilisé par scraper_core (ScraperCore.scraper_site, étape 1 bis).
+"""
+
+import re
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlencode, urljoin, urlparse
+
+CHAMPS = ("s", "q", "recherche", "search", "keys", "searchword", "query",
+          "motcle", "mots", "keyword", "text", "texte", "search_api_fulltext")
+
+_ZONE_RESULTATS = re.compile(r"result|search|recherche", re.I)
+
+# CMS → (chemin, champ, paramètres fixes)
+_PAR_CMS = {
+    "wordpress": ("/", "s", {}),
+    "spip": ("spip.php", "recherche", {"page": "recherche"}),
+    "drupal": ("/search/node", "keys", {}),
+    "joomla": ("index.php", "searchword", {"option": "com_search"}),
+}
+
+
+class Formulaire:
+    """Formulaire de recherche GET : action, champ du texte, champs cachés."""
+
+    def __init__(self, action: str, champ: str, params: Optional[Dict[str, str]] = None):
+        self.action = action.split("?")[0].split("#")[0]
+        self.champ = champ
+        self.params = params or {}
+
+    def url(self, mots: str) -> str:
+        """URL de la page de résultats pour `mots` (soumission GET)."""
+        return f"{self.action}?{urlencode({**self.params, self.champ: mots})}"
+
+
+def detecter_formulaire(soup, base_url: str, cms: Optional[str] = None) -> Optional[Formulaire]:
+    """Formulaire de recherche de la page d'accueil, ou celui du CMS ; None sinon."""
+    netloc = urlparse(base_url).netloc
+    for form in soup.find_all("form"):
+        if (form.get("method") or "get").lower() != "get":
+            continue
+        action = urljoin(base_url, form.get("action") or base_url)
+        if urlparse(action).netloc != netloc:
+            continue
+        indice = " ".join([form.get("role") or "", form.get("id") or ""] + form.get("class", []))
+        champ = None
+        for entree in form.find_all("input", attrs={"name": True}):
+            type_ = (entree.get("type") or "text").lower()
+            nom = entree["name"]
+            if type_ == "search" or (type_ == "text" and (nom.lower() in CHAMPS or _ZONE_RESULTATS.search(indice))):
+                champ = nom
+                break
+        if champ is None:
+            continue
+        caches = {
+            e["name"]: e.get("value", "")
+            for e in form.find_all("input", attrs={"type": "hidden", "name": True})
+        }
+        return Formulaire(action, champ, caches)
+    if cms in _PAR_CMS:
+        chemin, champ, params = _PAR_CMS[cms]
+        return Formulaire(urljoin(base_url, chemin), champ, dict(params))
+    return None
+
+
+def liens_resultats(soup, page_url: str, formulaire: Formulaire, exclus: set) -> List[str]:
+    """
+    URLs candidates d'une page de résultats : liens internes de la zone de
+    résultats (à défaut <main>, sinon <body>) absents de `exclus`.
+    """
+    netloc = urlparse(page_url).netloc
+    zones = [z for z in soup.find_all(attrs={"class": _ZONE_RESULTATS}) + soup.find_all(attrs={"id": _ZONE_RESULTATS})
+             if z.name != "form"]
+    zone = max(zones, key=lambda z: len(z.find_all("a", href=True)), default=None)
+    if zone is None or not zone.find_all("a", href=True):
+        zone = soup.find("main") or soup.body or soup
+    for bruit in zone.find_all(["nav", "header", "footer", "form"]):
+        bruit.decompose()
+
+    liens = []
+    for lien in zone.find_all("a", href=True):
+        href = lien["href"].strip()
+        if not href or href.startswith(("#", "javascript:", "mailto:", "tel:")):
+            continue
+        cible = urljoin(page_url, href).split("#")[0]
+        parsed = urlparse(cible)
+        if parsed.netloc != netloc or cible in exclus:
+            continue
+        # Pagination / tri de la recherche elle-même
+        if cible.split("?")[0] == formulaire.action and formulaire.champ in parse_qs(parsed.query, keep_blank_values=True):
+            continue
+        liens.append(cible)
+    return list(dict.fromkeys(liens))
@@ -5,9 +5,18 @@ External API analyzer for municipal documents using Groq, OpenRouter, Together.a
 import requests
 import json
 import os
-import time
+import sys
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from ia.dispatcher import get_dispatcher, estimate_tokens
+from ia.cache import get_verdict_cache
+from ia.passages import select_passages
+from ia.chunking import analyser_par_morceaux
 
 def load_prompt():
     """Load the analysis prompt from file"""
@@ -23,7 +32,9 @@ def analyze_document_with_api(
     document_text: str,
     api_provider: str = 'groq',
     api_key: Optional[str] = None,
-    model: Optional[str] = None
+    model: Optional[str] = None,
+    chunked: bool = False,
+    mots_cles: Optional[Dict[str, List[str]]] = None
 ) -> Dict[str, Any]:
     """
     Analyze a document using external API
@@ -33,6 +44,10 @@ def analyze_document_with_api(
         api_provider: 'groq', 'openrouter', 'together', or 'openai'
         api_key: API key for the provider
         model: Model name (optional, uses default for provider)
+        chunked: Split long documents into overlapping chunks, analyze the
+                 chunks with keyword hits in parallel and merge the verdicts
+        mots_cles: Keywords of the run's config snapshot used to pick the
+                   passages (default: search_config.json)
     
     Returns:
         Dictionary with ia_pertinent, ia_score, ia_resume, ia_justification
@@ -43,6 +58,7 @@ def analyze_document_with_api(
         'ia_pertinent': False,
         'ia_score': 0,
         'ia_resume': 'Erreur API',
+        'ia_erreur': True,
         'ia_justification': 'Impossible de contacter l\'API',
         'ia_timestamp': datetime.now().isoformat()
     }
@@ -54,10 +70,17 @@ def analyze_document_with_api(
     # Load system prompt
     system_prompt = load_prompt()
     
-    # Truncate document if too long
+    # Keep the passages around keyword hits rather than the head of the document
     max_length = 8000
-    if len(document_text) > max_length:
-        document_text = document_text[:max_length] + "\n\n[...document tronqué...]"
+    if chunked and len(document_text) > max_length:
+        return analyser_par_morceaux(
+            document_text,
+            lambda chunk: analyze_document_with_api(chunk, api_provider, api_key, model, mots_cles=mots_cles),
+            taille=max_length, parallelisme=get_dispatcher(api_provider).parallelism,
+            mots_cles=mots_cles,
+        )
+    texte_source = document_text
+    document_text, selection = select_passages(document_text, max_length, mots_cles)
     
     # Build prompt
     full_prompt = f"""{system_prompt}
@@ -74,7 +97,7 @@ JSON:"""
     
     # Configure API endpoint and headers based on provider
     if api_provider == 'groq':
-        url = 'https://api.groq.com/openai/v1/chat/completions'
+        url = os.environ.get('GROQ_API_URL', 'https://api.groq.com/openai/v1/chat/completions')
         headers = {
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json'
@@ -91,7 +114,7 @@ JSON:"""
         }
         
     elif api_provider == 'openrouter':
-        url = 'https://openrouter.ai/api/v1/chat/completions'
+        url = os.environ.get('OPENROUTER_API_URL', 'https://openrouter.ai/api/v1/chat/completions')
         headers = {
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json',
@@ -110,7 +133,7 @@ JSON:"""
         }
         
     elif api_provider == 'together':
-        url = 'https://api.together.xyz/v1/chat/completions'
+        url = os.environ.get('TOGETHER_API_URL', 'https://api.together.xyz/v1/chat/completions')
         headers = {
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json'
@@ -127,7 +150,7 @@ JSON:"""
         }
         
     elif api_provider == 'openai':
-        url = 'https://api.openai.com/v1/chat/completions'
+        url = os.environ.get('OPENAI_API_URL', 'https://api.openai.com/v1/chat/completions')
         headers = {
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json'
@@ -146,48 +169,35 @@ JSON:"""
         default_result['ia_justification'] = f'Provider inconnu: {api_provider}'
         return default_result
     
-    # Call API with retry logic for rate limiting
-    max_retries = 5
-    retry_delay = 5  # Start with 5 seconds for better rate limit handling
+    # Verdict already cached for this text / prompt / model / truncation?
+    cache = get_verdict_cache()
+    cache_key = cache.make_key(
+        texte_source,
+        payload['messages'][0]['content'] + full_prompt.replace(document_text, ''),
+        f'{api_provider}:{default_model}', selection
+    )
+    cached = cache.get(cache_key)
+    if cached is not None:
+        cached['ia_timestamp'] = datetime.now().isoformat()
+        return cached
     
-    for attempt in range(max_retries):
-        try:
-            print(f"[API] Calling {api_provider} with model {default_model}... (attempt {attempt + 1}/{max_retries})")
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
-            
-            # Handle rate limiting (429)
-            if response.status_code == 429:
-                if attempt < max_retries - 1:
-                    # Use retry-after header if available, otherwise exponential backoff
-                    retry_after = response.headers.get('retry-after')
-                    if retry_after:
-                        wait_time = int(retry_after)
-                        print(f"[API] Rate limit hit (429). Groq says to wait {wait_time}s (from retry-after header)...")
-                    else:
-                        wait_time = retry_delay * (2 ** attempt)  # Exponential backoff
-                        print(f"[API] Rate limit hit (429). Waiting {wait_time}s before retry...")
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    print(f"[API] Rate limit hit after {max_retries} attempts. Giving up.")
-                    default_result['ia_justification'] = f'Rate limit dépassé après {max_retries} tentatives. Réessayez dans quelques minutes.'
-                    return default_result
-            
-            response.raise_for_status()
-            result = response.json()
-            break  # Success, exit retry loop
-            
-        except requests.exceptions.HTTPError as e:
-            if attempt < max_retries - 1 and '429' in str(e):
-                wait_time = retry_delay * (2 ** attempt)
-                print(f"[API] Rate limit error. Waiting {wait_time}s before retry...")
-                time.sleep(wait_time)
-                continue
-            else:
-                raise  # Re-raise if not rate limit or last attempt
-    else:
-        # This shouldn't happen but just in case
-        default_result['ia_justification'] = 'Erreur inattendue lors des tentatives API'
+    # Call API through the shared dispatcher: bounded parallelism, requests/tokens
+    # per minute limits, retries with jitter on 429/5xx, pooled connections
+    try:
+        print(f"[API] Calling {api_provider} with model {default_model}...")
+        response = get_dispatcher(api_provider).post(
+            url, headers=headers, json=payload, timeout=60,
+            est_tokens=estimate_tokens(full_prompt, payload['max_tokens'])
+        )
+        if response.status_code == 429:
+            print(f"[API] Rate limit still hit after retries. Giving up.")
+            default_result['ia_justification'] = 'Rate limit dépassé après plusieurs tentatives. Réessayez dans quelques minutes.'
+            return default_result
+        response.raise_for_status()
+        result = response.json()
+    except requests.exceptions.RequestException as e:
+        print(f"[ERROR] API request failed: {e}")
+        default_result['ia_justification'] = f'Erreur API: {str(e)[:100]}'
         return default_result
     
     try:
@@ -208,13 +218,15 @@ JSON:"""
                 
                 parsed = json.loads(response_text)
                 
-                return {
+                verdict = {
                     'ia_pertinent': bool(parsed.get('ia_pertinent', False)),
                     'ia_score': int(parsed.get('ia_score', 0)),
                     'ia_resume': str(parsed.get('ia_resume', '')),
                     'ia_justification': str(parsed.get('ia_justification', '')),
                     'ia_timestamp': datetime.now().isoformat()
                 }
+                cache.put(cache_key, verdict)
+                return verdict
                 
             except json.JSONDecodeError as e:
                 print(f"[ERROR] Failed to parse JSON: {e}")
@@ -241,6 +253,7 @@ JSON:"""
                     'ia_pertinent': False,
                     'ia_score': 0,
                     'ia_resume': 'Erreur de parsing JSON',
+                    'ia_erreur': True,
                     'ia_justification': f'Réponse API invalide: {response_text[:200]}',
                     'ia_timestamp': datetime.now().isoformat()
                 }
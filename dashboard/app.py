@@ -39,7 +39,8 @@ from url_finder import find_city_url
 from site_structure_cache import get_priority_sections, update_site_structure
 from regional_patterns import get_all_patterns
 from ocr_processor import extract_pdf_with_fallback
-from ia_analyzer import analyze_document_with_ollama, check_ollama_available, analyze_with_groq
+from crawler.fetch import CacheAccueils, format_octets, format_site, get_stats as get_fetch_stats, sonder_entetes, telecharger
+from ia_analyzer import analyze_document_with_ollama, check_ollama_available, analyze_with_groq, get_available_models, get_ollama_session
 
 # Load environment variables from .env file
 def load_env():
@@ -453,6 +454,18 @@ def scrape_municipal_website(base_url, city_name, status_queue=None, date_filter
         pdf_count = 0
         matching_count = 0
         
+        # Batched, concurrent HEAD of every same-site document link (Content-Type,
+        # Content-Length, Last-Modified) so HTML pages, oversized files and dead
+        # links are dropped before any GET
+        doc_links = [
+            u for u in (urljoin(base_url, link.get('href')) for link in all_links if link.get('href'))
+            if urlparse(u).netloc == urlparse(base_url).netloc
+            and any(ext in u.lower() for ext in doc_extensions)
+        ]
+        doc_headers = sonder_entetes(session, doc_links)
+        if doc_headers:
+            _sq(f'   ↳ HEAD × {len(doc_headers)} lien(s) de documents')
+        
         # Find all links - look for documents
         for link in all_links:
             href = link.get('href')
@@ -507,6 +520,12 @@ def scrape_municipal_website(base_url, city_name, status_queue=None, date_filter
                     _sq(f'      📎 PDF détecté : {filename[:60]}')
                     _sq(f'         URL : {full_url[:80]}')
                     
+                    entetes = doc_headers.get(full_url)
+                    motif = entetes.motif_rejet() if entetes else None
+                    if motif:
+                        _sq(f'         ↳ ⏭️ {motif} (HEAD) — ignoré')
+                        continue
+                    
                     # Check date BEFORE downloading if date filter is active
                     # Note: Empty strings should be treated as no filter
                     has_date_filter = bool(
@@ -524,7 +543,7 @@ def scrape_municipal_website(base_url, city_name, status_queue=None, date_filter
                     
                     if has_date_filter:
                         # Get most precise date with confidence level
-                        doc_date, date_source, date_confidence = get_most_precise_date(filename, full_url, session)
+                        doc_date, date_source, date_confidence = get_most_precise_date(filename, full_url, session, entetes)
                         
                         msg = f'Date extracted for {filename[:40]}: {format_date_for_display(doc_date)} (source: {date_source}, confidence: {date_confidence})'
                         print(msg)
@@ -644,7 +663,7 @@ def scrape_municipal_website(base_url, city_name, status_queue=None, date_filter
                                 _score_total = 0
 
                             # Get most precise date for storage with confidence
-                            doc_date, date_source, date_confidence = get_most_precise_date(filename, full_url, session)
+                            doc_date, date_source, date_confidence = get_most_precise_date(filename, full_url, session, entetes)
                             
                             document_data = {
                                 'nom_fichier': filename,
@@ -837,12 +856,20 @@ def extract_pdf_content(pdf_url, session=None, status_queue=None):
         headers = get_random_headers()
         session.headers.update(headers)
         
-        # Download PDF
-        response = session.get(pdf_url, timeout=30)
-        response.raise_for_status()
+        # Download PDF (streamed, size-capped; large files spill to a temp file)
+        dl = telecharger(session, pdf_url, timeout=30)
+        if dl.statut == 'trop_gros':
+            msg = f'PDF skipped: {format_octets(dl.octets_evites or dl.octets)} exceeds the download cap'
+            print(msg)
+            if status_queue:
+                status_queue.put({'status': 'warning', 'message': msg, 'timestamp': datetime.now().isoformat()})
+            return None
+        if dl.status_code != 200:
+            raise requests.HTTPError(f'HTTP {dl.status_code} for {pdf_url}')
         
         # Try extraction with OCR fallback for scanned PDFs
-        combined_text = extract_pdf_with_fallback(response.content)
+        with dl.corps:
+            combined_text = extract_pdf_with_fallback(dl.corps.source)
         
         if combined_text:
             msg = f'PDF extracted: {len(combined_text)} characters'
@@ -1007,10 +1034,17 @@ def run_analysis(config):
         try:
             status_queue.put({'status': 'running', 'message': '🚀 Initialisation du scraper...', 'timestamp': datetime.now().isoformat()})
 
+            # ── Config du run : search_config.json par défaut + overrides ─────
+            # Rien n'est réécrit sur disque : deux campagnes (ex. "conseil" et
+            # "pdf") peuvent tourner en même temps avec leur propre instantané.
+            # Sans mode_recherche dans la requête : 'complet', comme avant (pas celui du fichier)
+            run_overrides = {'mode_recherche': config.get('mode_recherche') or 'complet'}
+            run_overrides.update(config.get('search_overrides') or {})
+
             # Charger ScraperCore depuis la config centralisée
             try:
                 from scraper_core import ScraperCore
-                scraper = ScraperCore()
+                scraper = ScraperCore(config=config.get('search_config'), overrides=run_overrides)
                 status_queue.put({'status': 'running', 'message': f'✅ Config chargée — mots prioritaires : {scraper.mots_cles["prioritaires"][:3]}', 'timestamp': datetime.now().isoformat()})
             except Exception as e:
                 status_queue.put({'status': 'error', 'message': f'❌ Erreur chargement ScraperCore : {e}', 'timestamp': datetime.now().isoformat()})
@@ -1052,17 +1086,8 @@ def run_analysis(config):
 
             status_queue.put({'status': 'running', 'message': f'🎯 {len(targets)} site(s) à scraper', 'timestamp': datetime.now().isoformat()})
 
-            # ── Mode de recherche — injecter dans search_config.json ──────────
-            mode_recherche = config.get('mode_recherche', 'complet')
-            try:
-                cfg_path = os.path.join(_PROJECT_ROOT, 'config', 'search_config.json')
-                with open(cfg_path, 'r', encoding='utf-8') as _f:
-                    _cfg_data = json.load(_f)
-                _cfg_data['mode_recherche'] = mode_recherche
-                with open(cfg_path, 'w', encoding='utf-8') as _f:
-                    json.dump(_cfg_data, _f, ensure_ascii=False, indent=2)
-            except Exception as _e:
-                status_queue.put({'status': 'warning', 'message': f'⚠️ Impossible d\'écrire mode_recherche dans config : {_e}', 'timestamp': datetime.now().isoformat()})
+            # ── Mode de recherche (instantané du run, pas de réécriture disque) ─
+            mode_recherche = scraper.mode_recherche
             _MODE_LABELS = {'complet': '🌐 Complet', 'conseil': '📋 Conseils municipaux', 'pdf': '📄 PDFs uniquement'}
             status_queue.put({'status': 'running', 'message': f'🔎 Mode de recherche : {_MODE_LABELS.get(mode_recherche, mode_recherche)}', 'timestamp': datetime.now().isoformat()})
 
@@ -1080,152 +1105,292 @@ def run_analysis(config):
             all_results = []
             total = len(targets)
             turbo_mode = config.get('turbo_mode', False)
-            parallel_requests = max(1, min(10, int(config.get('parallel_requests', 3))))
+            parallel_requests = max(1, int(config.get('parallel_requests', 3)))
+
+            # ── Concurrence adaptative (AIMD) : parallel_requests n'est plus que
+            # la limite de départ ; concurrence = {"max", "par_site", "max_par_site", "reserves"}
+            controleur = None
+            if turbo_mode:
+                from crawler.concurrence import ControleurAIMD
+                conc_cfg = config.get('concurrence', {})
+                controleur = ControleurAIMD(
+                    initiale=parallel_requests,
+                    maximum=int(conc_cfg.get('max', 24)),
+                    par_hote=int(conc_cfg.get('par_site', 2)),
+                    max_par_hote=int(conc_cfg.get('max_par_site', 4)),
+                    reserves=conc_cfg.get('reserves'),
+                )
+                scraper.controleur = controleur
+                parallel_requests = controleur.globale.entier
 
             # ── Estimation du gain de temps ───────────────────────────────────
             if turbo_mode:
                 t_normal_min = round(total * 90 / 60)   # ~90s par commune en mode normal
                 t_turbo_min  = round(total * 5 / 60 / parallel_requests + total * 0.3 * 90 / 60 / parallel_requests)
                 status_queue.put({'status': 'running', 'message': (
-                    f'⚡ Mode turbo activé — {parallel_requests} requête(s) parallèle(s) | '
+                    f'⚡ Mode turbo activé — {parallel_requests} requête(s) parallèle(s) au départ, jusqu\'à {controleur.globale.maximum} | '
                     f'~{t_turbo_min} min estimées pour {total} communes (vs ~{t_normal_min} min en mode normal)'
                 ), 'timestamp': datetime.now().isoformat()})
 
-            # ── Étape 1 turbo : pré-qualification parallèle ───────────────────
-            if turbo_mode and total > 1:
-                from concurrent.futures import ThreadPoolExecutor, as_completed
-                import time as _time
-
-                qualifies = []
-                ignores = []
-
-                def _prequalifier(target):
-                    t0 = _time.time()
-                    ok, raison, duree = scraper.prequalifier_commune(target['url'], target['commune'], timeout=2)
-                    return target, ok, raison, duree
-
-                status_queue.put({'status': 'running', 'message': f'⚡ Pré-qualification de {total} communes ({parallel_requests} en parallèle)...', 'timestamp': datetime.now().isoformat()})
-
-                with ThreadPoolExecutor(max_workers=parallel_requests) as executor:
-                    futures = {executor.submit(_prequalifier, t): t for t in targets}
-                    for future in as_completed(futures):
-                        target, ok, raison, duree = future.result()
-                        if ok:
-                            qualifies.append(target)
-                            status_queue.put({'status': 'running', 'message': f'  ⚡ ✅ {target["commune"]} — pré-qualifiée ({raison}, {duree:.1f}s)', 'timestamp': datetime.now().isoformat()})
-                        else:
-                            ignores.append(target)
-                            status_queue.put({'status': 'running', 'message': f'  ⚡ ⏭️ {target["commune"]} — ignorée ({raison}, {duree:.1f}s)', 'timestamp': datetime.now().isoformat()})
-
-                status_queue.put({'status': 'running', 'message': (
-                    f'⚡ Pré-qualification terminée : {len(qualifies)}/{total} communes retenues'
-                    f' ({len(ignores)} ignorées)'
-                ), 'timestamp': datetime.now().isoformat()})
-                targets_a_scraper = qualifies
-            else:
-                targets_a_scraper = targets
+            # ── Paramètres IA ─────────────────────────────────────────────────
+            ai_cfg = config.get('ai', {})
+            ia_mode = ai_cfg.get('mode', 'local')          # 'local' | 'groq' | 'manuel'
+            model_ia = ai_cfg.get('model', 'tinyllama')
+            groq_key = ai_cfg.get('groq_api_key', '')
+            groq_model = ai_cfg.get('groq_model', 'llama3-8b-8192')
+            # Documents longs : morceaux avec mots-clés analysés en parallèle puis fusionnés
+            ia_chunked = ai_cfg.get('chunked', True)
 
-            # ── Étape 2 : Scraping complet (séquentiel ou parallèle) ─────────
-            total_scrape = len(targets_a_scraper)
+            if ia_mode == 'manuel':
+                status_queue.put({'status': 'running', 'message': '📋 Mode IA manuel — documents pertinents mis en file de validation', 'timestamp': datetime.now().isoformat()})
+            elif ia_mode == 'groq':
+                if not groq_key:
+                    status_queue.put({'status': 'warning', 'message': '⚠️ Clé API Groq manquante — passage en validation manuelle', 'timestamp': datetime.now().isoformat()})
+                    ia_mode = 'manuel'
+                else:
+                    status_queue.put({'status': 'running', 'message': f'☁️ Analyse Groq ({groq_model}) au fil du scraping', 'timestamp': datetime.now().isoformat()})
+            else:  # mode 'local' (Ollama)
+                if check_ollama_available():
+                    status_queue.put({'status': 'running', 'message': f'🤖 Analyse locale ({model_ia}) au fil du scraping', 'timestamp': datetime.now().isoformat()})
+                else:
+                    status_queue.put({'status': 'warning', 'message': '⚠️ Ollama non disponible — docs mis en validation manuelle', 'timestamp': datetime.now().isoformat()})
+                    ia_mode = 'manuel'
+
+            # ── Pré-filtre : classifieur local appris sur les validations manuelles ──
+            # (python -m ia.classifier train) — écarte sans appel LLM les docs sous son seuil
+            from ia.classifier import get_classifier, texte_document
+
+            classifieur = get_classifier() if ai_cfg.get('classifier', True) and ia_mode != 'manuel' else None
+            if classifieur is not None:
+                status_queue.put({'status': 'running', 'message': f'🧮 Pré-filtre classifieur local (seuil {classifieur.seuil:.2f}, {classifieur.meta.get("n_train", "?")} validations)', 'timestamp': datetime.now().isoformat()})
+
+            # ── Cascade : niveau rapide sur tout, expert sur la bande d'incertitude ──
+            # ai.cascade = {"rapide": "tinyllama" | "mots_cles", "bande": [3, 7], "audit": 0.0}
+            from ia.cascade import Cascade, verdict_mots_cles
+
+            # Passages choisis avec les mots-clés de l'instantané du run, pas du fichier
+            mots_cles_run = scraper.mots_cles
+
+            def ia_expert(texte):
+                if ia_mode == 'groq':
+                    return analyze_with_groq(texte, api_key=groq_key, model=groq_model, chunked=ia_chunked,
+                                             mots_cles=mots_cles_run)
+                return analyze_document_with_ollama(texte, model=model_ia, chunked=ia_chunked,
+                                                    mots_cles=mots_cles_run)
+
+            nom_expert = groq_model if ia_mode == 'groq' else model_ia
+            ia_analyse = ia_expert
+            cascade = None
+            cascade_cfg = ai_cfg.get('cascade') or {}
+            if cascade_cfg and ia_mode != 'manuel':
+                rapide = cascade_cfg.get('rapide', 'tinyllama')
+                ia_rapide = None
+                if rapide == 'mots_cles':
+                    ia_rapide = verdict_mots_cles
+                elif any(m.split(':')[0] == rapide.split(':')[0] for m in get_available_models()):
+                    ia_rapide = lambda t: analyze_document_with_ollama(t, model=rapide, chunked=ia_chunked,
+                                                                       mots_cles=mots_cles_run)
+                if ia_rapide is None:
+                    # Un niveau rapide absent répondrait "non pertinent" à tout
+                    status_queue.put({'status': 'warning', 'message': f'⚠️ Cascade désactivée : modèle rapide {rapide} absent d\'Ollama', 'timestamp': datetime.now().isoformat()})
+                else:
+                    cascade = Cascade(ia_rapide, ia_expert, bande=tuple(cascade_cfg.get('bande', (3, 7))),
+                                      audit=float(cascade_cfg.get('audit', 0.0)), noms=(rapide, nom_expert))
+                    ia_analyse = cascade.analyse
+                    status_queue.put({'status': 'running', 'message': f'🪜 Cascade IA : {rapide} puis {nom_expert} si score dans {list(cascade.bande)}', 'timestamp': datetime.now().isoformat()})
+
+            # ── Sessions Ollama chaudes : modèle épinglé (keep_alive), prompt système
+            # évalué pendant que la découverte / le scraping démarrent ─────────
+            ollama_sessions = []
+            if ia_mode == 'local':
+                ollama_sessions.append(get_ollama_session(model_ia))
+            if cascade is not None and cascade_cfg.get('rapide', 'tinyllama') != 'mots_cles':
+                session_rapide = get_ollama_session(cascade_cfg.get('rapide', 'tinyllama'))
+                # Modèle rapide = modèle expert : même session, un seul préchauffage
+                if session_rapide not in ollama_sessions:
+                    ollama_sessions.append(session_rapide)
+            ollama_debut = [session.snapshot() for session in ollama_sessions]
+            for session in ollama_sessions:
+                Thread(target=session.warm, daemon=True).start()
+
+            # ── Pipeline : découverte → scraping → IA → persistance ──────────
+            # Files bornées entre étapes : un document part en IA dès qu'il est
+            # scoré par scraper_site, au lieu d'attendre la fin de toutes les
+            # communes. Chaque étape a sa propre concurrence.
+            from pipeline import Pipeline, Stage, format_metrics
+            from ia.dispatcher import get_dispatcher
+            from ia.cache import get_verdict_cache, diff_stats, format_stats
+
+            ia_dispatcher = get_dispatcher('groq' if ia_mode == 'groq' else 'ollama')
+            ia_stats_debut = ia_dispatcher.snapshot()  # dispatcher partagé entre runs
+            ia_cache = get_verdict_cache()
+            ia_cache_debut = ia_cache.stats()
+            cache_stats = None
+            fetch_debut = get_fetch_stats().snapshot()
+
+            pipe_cfg = config.get('pipeline', {})
+            # En turbo, assez de workers pour le plafond : le contrôleur borne les requêtes
+            scrape_workers = controleur.globale.maximum if turbo_mode else 1
+            queue_size = int(pipe_cfg.get('queue_size', 50))
+            checkpoint_every = int(pipe_cfg.get('checkpoint_every', 20))
+            prequalifier = turbo_mode and total > 1
+            # Pages d'accueil lues par la pré-qualification, reprises par scraper_site
+            accueils = CacheAccueils() if prequalifier else None
+            compteurs = {'qualifies': 0, 'ignores': 0, 'scrapes': 0, 'ia': 0, 'classifieur': 0}
+            compteurs_lock = threading.Lock()
+            run_state = {'saved_path': None, 'non_sauves': 0}
+
+            def _etape_decouverte(target, emit):
+                if not prequalifier:
+                    emit(target)
+                    return
+                ok, raison, duree = scraper.prequalifier_commune(target['url'], target['commune'], timeout=2, accueils=accueils)
+                with compteurs_lock:
+                    compteurs['qualifies' if ok else 'ignores'] += 1
+                if ok:
+                    status_queue.put({'status': 'running', 'message': f'  ⚡ ✅ {target["commune"]} — pré-qualifiée ({raison}, {duree:.1f}s)', 'timestamp': datetime.now().isoformat()})
+                    emit(target)
+                else:
+                    status_queue.put({'status': 'running', 'message': f'  ⚡ ⏭️ {target["commune"]} — ignorée ({raison}, {duree:.1f}s)', 'timestamp': datetime.now().isoformat()})
 
-            def _scraper_target(args):
-                i, target = args
-                results_local = []
+            def _etape_scraping(target, emit):
+                with compteurs_lock:
+                    compteurs['scrapes'] += 1
+                    i = compteurs['scrapes']
+                status_queue.put({'status': 'running', 'message': f'[{i}/{total}] 🔍 Scraping {target["commune"]} ({target["url"]})...', 'timestamp': datetime.now().isoformat()})
                 def cb(msg, level="info"):
                     status_map = {"warning": "warning", "error": "error", "info": "running", "success": "running"}
                     status_queue.put({'status': status_map.get(level, 'running'), 'message': f'  ↳ {msg}', 'timestamp': datetime.now().isoformat()})
                 try:
-                    docs = scraper.scraper_site(target['url'], target['commune'], target['dept'], status_callback=cb)
+                    docs = scraper.scraper_site(target['url'], target['commune'], target['dept'], status_callback=cb, on_document=emit, accueils=accueils)
                     pertinents = [d for d in docs if d.get('pertinent')]
                     status_queue.put({'status': 'running', 'message': f'  ✅ {target["commune"]} : {len(docs)} docs, {len(pertinents)} pertinents', 'timestamp': datetime.now().isoformat()})
-                    results_local.extend(docs)
                 except Exception as exc:
                     status_queue.put({'status': 'warning', 'message': f'  ⚠️ Erreur sur {target["commune"]} : {exc}', 'timestamp': datetime.now().isoformat()})
-                return results_local
-
-            if turbo_mode and parallel_requests > 1 and total_scrape > 1:
-                from concurrent.futures import ThreadPoolExecutor as _TPE
-                with _TPE(max_workers=parallel_requests) as executor:
-                    for i, target in enumerate(targets_a_scraper, 1):
-                        status_queue.put({'status': 'running', 'message': f'[{i}/{total_scrape}] 🔍 Scraping {target["commune"]}...', 'timestamp': datetime.now().isoformat()})
-                    futures_scrape = list(executor.map(_scraper_target, enumerate(targets_a_scraper, 1)))
-                    for docs in futures_scrape:
-                        all_results.extend(docs)
-            else:
-                for i, target in enumerate(targets_a_scraper, 1):
-                    status_queue.put({'status': 'running', 'message': f'[{i}/{total_scrape}] 🔍 Scraping {target["commune"]} ({target["url"]})...', 'timestamp': datetime.now().isoformat()})
-                    all_results.extend(_scraper_target((i, target)))
-
-            # ── Analyse IA — dispatcher multi-mode ───────────────────────────
-            pertinents_scraping = [d for d in all_results if d.get('pertinent')]
-            ai_cfg = config.get('ai', {})
-            ia_mode = ai_cfg.get('mode', 'local')          # 'local' | 'groq' | 'manuel'
-            model_ia = ai_cfg.get('model', 'tinyllama')
-            groq_key = ai_cfg.get('groq_api_key', '')
-            groq_model = ai_cfg.get('groq_model', 'llama3-8b-8192')
-
-            if not pertinents_scraping:
-                pass  # rien à analyser
 
-            elif ia_mode == 'manuel':
-                # Marquer les docs comme "en attente de validation manuelle"
-                for doc in pertinents_scraping:
+            def _etape_ia(doc, emit):
+                texte = doc.get('texte', '')
+                if not doc.get('pertinent'):
+                    emit(doc)
+                    return
+                if ia_mode == 'manuel':
+                    # Marquer le doc comme "en attente de validation manuelle"
                     doc['ia_pertinent'] = False
                     doc['ia_score'] = 0
                     doc['ia_resume'] = ''
                     doc['ia_justification'] = ''
                     doc['validation_status'] = 'pending'
-                status_queue.put({'status': 'running', 'message': f'📋 {len(pertinents_scraping)} document(s) mis en file de validation manuelle', 'timestamp': datetime.now().isoformat()})
+                    emit(doc)
+                    return
+                if not texte or len(texte) < 100:
+                    emit(doc)
+                    return
+                if classifieur is not None:
+                    proba = classifieur.proba(texte_document(doc))
+                    if proba < classifieur.seuil:
+                        with compteurs_lock:
+                            compteurs['classifieur'] += 1
+                        doc['ia_pertinent'] = False
+                        doc['ia_score'] = 0
+                        doc['ia_resume'] = 'Écarté par le classifieur local'
+                        doc['ia_justification'] = f'Probabilité {proba:.2f} < seuil {classifieur.seuil:.2f}'
+                        doc['ia_niveau'] = 'classifieur'
+                        doc['validation_status'] = 'validated_auto'
+                        emit(doc)
+                        return
+                with compteurs_lock:
+                    compteurs['ia'] += 1
+                    idx = compteurs['ia']
+                try:
+                    if ia_mode == 'groq':
+                        status_queue.put({'status': 'running', 'message': f'  ☁️ [IA #{idx}] Groq : {doc.get("commune","")} — {doc.get("nom_fichier","")[:40]}', 'timestamp': datetime.now().isoformat()})
+                    else:
+                        status_queue.put({'status': 'running', 'message': f'  🤖 [IA #{idx}] IA : {doc.get("commune","")} — {doc.get("nom_fichier","")[:40]}', 'timestamp': datetime.now().isoformat()})
+                    res = ia_analyse(texte)
+                    doc['ia_pertinent'] = res.get('ia_pertinent', False)
+                    doc['ia_score'] = res.get('ia_score', 0)
+                    doc['ia_resume'] = res.get('ia_resume', '')
+                    doc['ia_justification'] = res.get('ia_justification', '')
+                    if res.get('ia_passage'):
+                        doc['ia_passage'] = res['ia_passage']
+                    if res.get('ia_niveau'):
+                        doc['ia_niveau'] = res['ia_niveau']
+                    doc['validation_status'] = 'validated_auto'
+                except Exception as e_ia:
+                    status_queue.put({'status': 'warning', 'message': f'  ⚠️ IA échouée ({ia_mode}) : {e_ia}', 'timestamp': datetime.now().isoformat()})
+                    doc['validation_status'] = 'pending'
+                emit(doc)
+
+            def _etape_persistance(doc, emit):
+                # Un seul worker : pas de verrou nécessaire sur all_results
+                all_results.append(doc)
+                run_state['non_sauves'] += 1
+                if run_state['non_sauves'] >= checkpoint_every:
+                    run_state['saved_path'] = scraper.sauvegarder_resultats(all_results, output_dir, path=run_state['saved_path'])
+                    run_state['non_sauves'] = 0
+                emit(doc)
+
+            stages = [
+                Stage('decouverte', _etape_decouverte,
+                      workers=pipe_cfg.get('discover_workers', controleur.globale.maximum if prequalifier else 1),
+                      queue_size=0),
+                Stage('scraping', _etape_scraping,
+                      workers=pipe_cfg.get('scrape_workers', scrape_workers), queue_size=queue_size),
+                # Par défaut, autant de workers IA que de slots du dispatcher LLM
+                # (OLLAMA_NUM_PARALLEL ou palier Groq) — le dispatcher borne de toute façon
+                Stage('ia', _etape_ia,
+                      workers=pipe_cfg.get('ia_workers', ai_cfg.get('workers', ia_dispatcher.parallelism)),
+                      queue_size=queue_size),
+                Stage('persistance', _etape_persistance, workers=1, queue_size=queue_size),
+            ]
 
-            elif ia_mode == 'groq':
-                if not groq_key:
-                    status_queue.put({'status': 'warning', 'message': '⚠️ Clé API Groq manquante — passage en validation manuelle', 'timestamp': datetime.now().isoformat()})
-                    for doc in pertinents_scraping:
-                        doc['validation_status'] = 'pending'
-                else:
-                    status_queue.put({'status': 'running', 'message': f'☁️ Analyse Groq ({groq_model}) de {len(pertinents_scraping)} document(s)...', 'timestamp': datetime.now().isoformat()})
-                    for idx, doc in enumerate(pertinents_scraping, 1):
-                        texte = doc.get('texte', '')
-                        if not texte or len(texte) < 100:
-                            continue
-                        try:
-                            status_queue.put({'status': 'running', 'message': f'  ☁️ [{idx}/{len(pertinents_scraping)}] Groq : {doc.get("commune","")} — {doc.get("nom_fichier","")[:40]}', 'timestamp': datetime.now().isoformat()})
-                            res = analyze_with_groq(texte, api_key=groq_key, model=groq_model)
-                            doc['ia_pertinent'] = res.get('ia_pertinent', False)
-                            doc['ia_score'] = res.get('ia_score', 0)
-                            doc['ia_resume'] = res.get('ia_resume', '')
-                            doc['ia_justification'] = res.get('ia_justification', '')
-                            doc['validation_status'] = 'validated_auto'
-                        except Exception as e_groq:
-                            status_queue.put({'status': 'warning', 'message': f'  ⚠️ Groq échoué : {e_groq}', 'timestamp': datetime.now().isoformat()})
-                            doc['validation_status'] = 'pending'
+            def _on_pipeline_error(etape, item, exc):
+                status_queue.put({'status': 'warning', 'message': f'  ⚠️ Étape {etape} : {exc}', 'timestamp': datetime.now().isoformat()})
 
-            else:  # mode 'local' (Ollama)
-                if check_ollama_available():
-                    status_queue.put({'status': 'running', 'message': f'🤖 Analyse locale ({model_ia}) de {len(pertinents_scraping)} document(s)...', 'timestamp': datetime.now().isoformat()})
-                    for idx, doc in enumerate(pertinents_scraping, 1):
-                        texte = doc.get('texte', '')
-                        if not texte or len(texte) < 100:
-                            continue
-                        try:
-                            status_queue.put({'status': 'running', 'message': f'  🤖 [{idx}/{len(pertinents_scraping)}] IA : {doc.get("commune","")} — {doc.get("nom_fichier","")[:40]}', 'timestamp': datetime.now().isoformat()})
-                            res = analyze_document_with_ollama(texte, model=model_ia)
-                            doc['ia_pertinent'] = res.get('ia_pertinent', False)
-                            doc['ia_score'] = res.get('ia_score', 0)
-                            doc['ia_resume'] = res.get('ia_resume', '')
-                            doc['ia_justification'] = res.get('ia_justification', '')
-                            doc['validation_status'] = 'validated_auto'
-                        except Exception as e_ia:
-                            status_queue.put({'status': 'warning', 'message': f'  ⚠️ IA locale échouée : {e_ia}', 'timestamp': datetime.now().isoformat()})
-                            doc['validation_status'] = 'pending'
-                else:
-                    status_queue.put({'status': 'warning', 'message': '⚠️ Ollama non disponible — docs mis en validation manuelle', 'timestamp': datetime.now().isoformat()})
-                    for doc in pertinents_scraping:
-                        doc['validation_status'] = 'pending'
+            if prequalifier:
+                status_queue.put({'status': 'running', 'message': f'⚡ Pré-qualification de {total} communes ({stages[0].workers} en parallèle)...', 'timestamp': datetime.now().isoformat()})
+
+            pipeline_metrics = Pipeline(stages, on_error=_on_pipeline_error).run(targets)
+
+            if prequalifier:
+                status_queue.put({'status': 'running', 'message': (
+                    f'⚡ Pré-qualification terminée : {compteurs["qualifies"]}/{total} communes retenues'
+                    f' ({compteurs["ignores"]} ignorées)'
+                ), 'timestamp': datetime.now().isoformat()})
+                status_queue.put({'status': 'running', 'message': (
+                    f'♻️ Pages d\'accueil reprises de la pré-qualification : {accueils.reprises}/{accueils.gardees}'
+                    f' ({format_octets(accueils.octets_reutilises)} non retéléchargés)'
+                ), 'timestamp': datetime.now().isoformat()})
+
+            if ia_mode != 'manuel':
+                ia_stats = {k: v - ia_stats_debut[k] for k, v in ia_dispatcher.snapshot().items()}
+                status_queue.put({'status': 'running', 'message': (
+                    f'🤖 Dispatcher IA ({ia_dispatcher.name}) : {int(ia_stats["appels"])} appel(s),'
+                    f' {int(ia_stats["retries"])} retry, {int(ia_stats["rate_limited"])} rate-limited,'
+                    f' {ia_stats["attente_debit_s"]:.0f}s d\'attente de débit'
+                ), 'timestamp': datetime.now().isoformat()})
+                ia_cache.save()
+                cache_stats = diff_stats(ia_cache_debut, ia_cache.stats())
+                status_queue.put({'status': 'running', 'message': f'🗃️ {format_stats(cache_stats)}', 'timestamp': datetime.now().isoformat()})
+                if cascade is not None:
+                    status_queue.put({'status': 'running', 'message': f'🪜 {cascade.format_stats()}', 'timestamp': datetime.now().isoformat()})
+                for session, debut in zip(ollama_sessions, ollama_debut):
+                    status_queue.put({'status': 'running', 'message': f'⏱️ {session.format_stats(debut)}', 'timestamp': datetime.now().isoformat()})
+                if classifieur is not None:
+                    status_queue.put({'status': 'running', 'message': f'🧮 Classifieur local : {compteurs["classifieur"]} doc(s) écarté(s) sans appel LLM, {compteurs["ia"]} envoyé(s) au LLM', 'timestamp': datetime.now().isoformat()})
+            fetch_stats = get_fetch_stats().totaux(fetch_debut)
+            status_queue.put({'status': 'running', 'message': f'📦 Téléchargements : {format_site(fetch_stats)}, {fetch_stats["sites"]} site(s)', 'timestamp': datetime.now().isoformat()})
+            if controleur is not None:
+                status_queue.put({'status': 'running', 'message': '🎚️ Concurrence adaptative :', 'timestamp': datetime.now().isoformat()})
+                for ligne in controleur.format_stats():
+                    status_queue.put({'status': 'running', 'message': f'   {ligne}', 'timestamp': datetime.now().isoformat()})
+            status_queue.put({'status': 'running', 'message': '📈 Débit par étape :', 'timestamp': datetime.now().isoformat()})
+            for ligne in format_metrics(pipeline_metrics):
+                status_queue.put({'status': 'running', 'message': f'   {ligne}', 'timestamp': datetime.now().isoformat()})
 
             # Sauvegarde globale (tous les docs, IA renseignée sur les pertinents)
             if all_results:
-                saved_path = scraper.sauvegarder_resultats(all_results, output_dir)
+                saved_path = scraper.sauvegarder_resultats(all_results, output_dir, path=run_state['saved_path'])
                 status_queue.put({'status': 'running', 'message': f'💾 Résultats sauvegardés : {saved_path}', 'timestamp': datetime.now().isoformat()})
 
             pertinents_total = [d for d in all_results if d.get('ia_pertinent') or d.get('pertinent')]
@@ -1246,7 +1411,12 @@ def run_analysis(config):
                     'documents_processed': len(all_results),
                     'relevant_found': len(pertinents_total),
                     'mode': mode,
-                    'target_info': f'{total} site(s)'
+                    'target_info': f'{total} site(s)',
+                    'pipeline': pipeline_metrics,
+                    'cache_ia': cache_stats,
+                    'telechargements': fetch_stats,
+                    'concurrence': controleur.stats() if controleur is not None else None,
+                    'cascade_ia': cascade.stats() if cascade is not None else None,
                 }
             })
             save_history(history)
@@ -1776,10 +1946,7 @@ def run_analysis_LEGACY(config):
                                 api_provider=api_provider,
                                 api_key=api_key
                             )
-                            # Rate limiting: Groq allows 30 req/min = 1 req every 2 seconds
-                            # Add 3s pause to be safe and avoid 429 errors
-                            if api_provider == 'groq' and i < len(documents):
-                                time.sleep(3.0)
+                            # Rate limiting (30 req/min on Groq) is enforced by the shared LLM dispatcher
                         else:
                             analysis = analyze_document_with_ollama(
                                 doc.get('texte', ''),
@@ -126,7 +126,7 @@ def is_date_in_range(doc_date: Optional[datetime], start_date: Optional[str], en
         # If date parsing fails, accept the document
         return True
 
-def get_pdf_metadata_date(pdf_url: str, session=None) -> Optional[datetime]:
+def get_pdf_metadata_date(pdf_url: str, session=None, entetes=None) -> Optional[datetime]:
     """
     Get PDF modification date from HTTP headers without downloading the full file.
     Uses HEAD request to get Last-Modified header.
@@ -134,10 +134,13 @@ def get_pdf_metadata_date(pdf_url: str, session=None) -> Optional[datetime]:
     Args:
         pdf_url: URL of the PDF
         session: Optional requests session to reuse
+        entetes: Headers already fetched by crawler.fetch.sonder_entetes (no new request)
     
     Returns:
         datetime object from Last-Modified header (timezone-naive), or None if not available
     """
+    if entetes is not None:
+        return entetes.last_modified
     try:
         if session is None:
             session = requests.Session()
@@ -202,7 +205,7 @@ def get_date_confidence(filename: str) -> str:
     
     return 'none'
 
-def get_most_precise_date(filename: str, pdf_url: str, session=None) -> Tuple[Optional[datetime], str, str]:
+def get_most_precise_date(filename: str, pdf_url: str, session=None, entetes=None) -> Tuple[Optional[datetime], str, str]:
     """
     Get the most precise date from both filename and PDF metadata.
     
@@ -210,6 +213,7 @@ def get_most_precise_date(filename: str, pdf_url: str, session=None) -> Tuple[Op
         filename: Name of the PDF file
         pdf_url: URL of the PDF
         session: Optional requests session to reuse
+        entetes: Headers from a batched HEAD (crawler.fetch.sonder_entetes)
     
     Returns:
         Tuple of (most_precise_date, source, confidence) where:
@@ -220,15 +224,15 @@ def get_most_precise_date(filename: str, pdf_url: str, session=None) -> Tuple[Op
     filename_date = extract_date_from_filename(filename)
     confidence = get_date_confidence(filename)
     
-    # Get date from PDF metadata
-    metadata_date = get_pdf_metadata_date(pdf_url, session)
-    
     # Determine most precise date
     # PRIORITIZE filename over metadata because many servers return current date in metadata
     # instead of actual document date
     if filename_date:
         return (filename_date, 'filename', confidence)
-    elif metadata_date:
+    
+    # Get date from PDF metadata (only needed when the filename has no date)
+    metadata_date = get_pdf_metadata_date(pdf_url, session, entetes)
+    if metadata_date:
         return (metadata_date, 'metadata', 'medium')  # Metadata is medium confidence
     else:
         return (None, 'none', 'none')
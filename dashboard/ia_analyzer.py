@@ -5,30 +5,45 @@ AI analyzer for municipal documents using Ollama local models
 import requests
 import json
 import os
+import sys
+import threading
 
-def analyze_document_with_ollama(document_text: str, model: str = "tinyllama", prompt_file: str = None) -> dict:
-    """
-    Analyze a document using Ollama local AI
-    
-    Args:
-        document_text: The text content to analyze
-        model: Ollama model to use (mistral, llama2, tinyllama, etc.)
-        prompt_file: Path to prompt file (default: prompt_ia_analyse.md)
-    
-    Returns:
-        dict with ia_pertinent, ia_score, ia_resume, ia_justification
-    """
-    
-    # Load prompt from file
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from ia.dispatcher import get_dispatcher, ollama_url, estimate_tokens
+from ia.cache import get_verdict_cache
+from ia.passages import select_passages
+from ia.chunking import analyser_par_morceaux
+from ia.ollama_session import OllamaSession, format_appel, get_session
+
+# Prompt ultra-compact pour TinyLlama (contexte limité)
+TINYLLAMA_SYSTEM = """Analyse ce texte. Réponds UNIQUEMENT en JSON, sans aucun texte avant ou après.
+
+JSON (ia_pertinent=true si le texte parle d'énergie renouvelable/solaire/biomasse/chaleur):
+{"ia_pertinent": false, "ia_score": 0, "ia_resume": "court", "ia_justification": "raison"}"""
+
+JSON_INSTRUCTIONS = """# IMPORTANT: Ta réponse doit être UNIQUEMENT un objet JSON valide, RIEN D'AUTRE.
+# Ne commence PAS par "Sure!" ou "Voici" ou toute autre phrase.
+# Ne mets PAS de backticks ou de markdown.
+# Retourne DIRECTEMENT le JSON, première ligne = première accolade.
+
+Format JSON EXACT requis:
+{"ia_pertinent": true, "ia_score": 8, "ia_resume": "résumé court", "ia_justification": "explication"}"""
+
+
+def _load_system_prompt(prompt_file: str = None) -> str:
+    """Load the analysis prompt from file (default: prompt_ia_analyse.md)"""
     if prompt_file is None:
         prompt_file = os.path.join(os.path.dirname(__file__), '..', 'prompt_ia_analyse.md')
     
     try:
         with open(prompt_file, 'r', encoding='utf-8') as f:
-            system_prompt = f.read()
+            return f.read()
     except Exception as e:
         print(f"Warning: Could not load prompt file: {e}")
-        system_prompt = """Tu es un expert en analyse de documents municipaux français spécialisé dans l'identification de projets liés aux énergies renouvelables et à la transition énergétique.
+        return """Tu es un expert en analyse de documents municipaux français spécialisé dans l'identification de projets liés aux énergies renouvelables et à la transition énergétique.
 
 Analyse le document et retourne un JSON avec:
 - ia_pertinent: true/false
@@ -37,114 +52,147 @@ Analyse le document et retourne un JSON avec:
 - ia_justification: explication détaillée
 
 Recherche particulièrement: biomasse, chaufferies bois, réseaux de chaleur, solaire, PCAET, transition énergétique."""
-    
-    # TinyLlama a un contexte limité (~2048 tokens) — on tronque à 1500 chars
-    max_length = 1500 if 'tinyllama' in model.lower() else 4000
-    if len(document_text) > max_length:
-        document_text = document_text[:max_length] + "\n[...tronqué...]"
-    
-    # Prompt ultra-compact pour TinyLlama (contexte limité)
-    if 'tinyllama' in model.lower():
-        full_prompt = f"""Analyse ce texte. Réponds UNIQUEMENT en JSON, sans aucun texte avant ou après.
-
-Texte: {document_text}
 
-JSON (ia_pertinent=true si le texte parle d'énergie renouvelable/solaire/biomasse/chaleur):
-{{"ia_pertinent": false, "ia_score": 0, "ia_resume": "court", "ia_justification": "raison"}}
-
-JSON:"""
-    else:
-        full_prompt = f"""{system_prompt}
 
-# Document à analyser
+# Session par (modèle, fichier de prompt) : le prompt est lu une fois, à la
+# création de la session, et non à chaque document
+_sessions = {}
+_sessions_lock = threading.Lock()
 
-{document_text}
 
-# IMPORTANT: Ta réponse doit être UNIQUEMENT un objet JSON valide, RIEN D'AUTRE.
-# Ne commence PAS par "Sure!" ou "Voici" ou toute autre phrase.
-# Ne mets PAS de backticks ou de markdown.
-# Retourne DIRECTEMENT le JSON, première ligne = première accolade.
+def get_ollama_session(model: str = "tinyllama", prompt_file: str = None) -> OllamaSession:
+    """
+    Warm Ollama session for a model: fixed system message (prompt + JSON
+    instructions) so Ollama reuses the evaluated prefix across documents,
+    model pinned with keep_alive. Call .warm() at job start.
+    The prompt file is read once per (model, prompt_file).
+    """
+    with _sessions_lock:
+        session = _sessions.get((model, prompt_file))
+        if session is None:
+            small = 'tinyllama' in model.lower()
+            system = TINYLLAMA_SYSTEM if small else f"{_load_system_prompt(prompt_file)}\n\n{JSON_INSTRUCTIONS}"
+            session = _sessions[(model, prompt_file)] = get_session(model, system, options={
+                'temperature': 0.1,
+                'num_predict': 150 if small else 500,
+                'num_ctx': 2048 if small else 4096,
+            })
+        return session
 
-Format JSON EXACT requis:
-{{"ia_pertinent": true, "ia_score": 8, "ia_resume": "résumé court", "ia_justification": "explication"}}
 
-JSON:"""
+def analyze_document_with_ollama(document_text: str, model: str = "tinyllama", prompt_file: str = None,
+                                 chunked: bool = False, mots_cles: dict = None) -> dict:
+    """
+    Analyze a document using Ollama local AI
     
-    # Call Ollama API
-    try:
-        response = requests.post(
-            'http://localhost:11434/api/generate',
-            json={
-                'model': model,
-                'prompt': full_prompt,
-                'stream': False,
-                'options': {
-                    'temperature': 0.1,
-                    'num_predict': 150 if 'tinyllama' in model.lower() else 500,
-                    'num_ctx': 2048 if 'tinyllama' in model.lower() else 4096,
-                }
-            },
-            timeout=30 if 'tinyllama' in model.lower() else 60
+    Args:
+        document_text: The text content to analyze
+        model: Ollama model to use (mistral, llama2, tinyllama, etc.)
+        prompt_file: Path to prompt file (default: prompt_ia_analyse.md)
+        chunked: Long documents are split into overlapping chunks; chunks with
+                 keyword hits are analyzed in parallel and merged (ia.chunking)
+        mots_cles: Keywords of the run's config snapshot used to pick the
+                   passages (default: search_config.json)
+    
+    Returns:
+        dict with ia_pertinent, ia_score, ia_resume, ia_justification
+    """
+    
+    # TinyLlama a un contexte limité (~2048 tokens) — extrait de 1500 chars max,
+    # construit autour des mots-clés plutôt que sur le début du document
+    max_length = 1500 if 'tinyllama' in model.lower() else 4000
+    if chunked and len(document_text) > max_length:
+        return analyser_par_morceaux(
+            document_text,
+            lambda morceau: analyze_document_with_ollama(morceau, model, prompt_file, mots_cles=mots_cles),
+            taille=max_length, parallelisme=get_dispatcher('ollama').parallelism,
+            mots_cles=mots_cles,
         )
-        
-        if response.status_code == 200:
-            result = response.json()
-            ai_response = result.get('response', '').strip()
-            
-            # Try to parse JSON from response
-            # Remove markdown code blocks if present
-            if '```json' in ai_response:
-                ai_response = ai_response.split('```json')[1].split('```')[0].strip()
-            elif '```' in ai_response:
-                ai_response = ai_response.split('```')[1].split('```')[0].strip()
-            
-            # Parse JSON
-            try:
-                print(f"[DEBUG] AI raw response: {ai_response[:500]}")
-                analysis = json.loads(ai_response)
-                
-                print(f"[DEBUG] Parsed successfully: pertinent={analysis.get('ia_pertinent')}, score={analysis.get('ia_score')}")
-                
-                # Validate and return
-                return {
-                    'ia_pertinent': bool(analysis.get('ia_pertinent', False)),
-                    'ia_score': int(analysis.get('ia_score', 0)),
-                    'ia_resume': str(analysis.get('ia_resume', '')),
-                    'ia_justification': str(analysis.get('ia_justification', ''))
-                }
-            except json.JSONDecodeError as e:
-                print(f"[ERROR] Failed to parse AI response as JSON: {e}")
-                print(f"[ERROR] Full response was: {ai_response}")
-                
-                # Fallback: try to extract info from text using regex
-                # Look for keywords that indicate relevance
-                keywords = ['biomasse', 'chaufferie', 'solaire', 'éolien', 'renouvelable', 'pcaet', 'transition énergétique']
-                text_lower = ai_response.lower()
-                found_keywords = [kw for kw in keywords if kw in text_lower]
-                
-                if found_keywords:
-                    print(f"[FALLBACK] Found keywords in response: {found_keywords}")
-                    return {
-                        'ia_pertinent': True,
-                        'ia_score': 5,
-                        'ia_resume': f'Document mentionnant: {", ".join(found_keywords)}',
-                        'ia_justification': f'Réponse IA non-JSON mais contient mots-clés pertinents. Réponse: {ai_response[:200]}'
-                    }
-                else:
-                    return {
-                        'ia_pertinent': False,
-                        'ia_score': 0,
-                        'ia_resume': 'Erreur de parsing JSON',
-                        'ia_justification': f'Réponse IA invalide: {ai_response[:100]}'
-                    }
-        else:
-            print(f"Ollama API error: {response.status_code}")
+    texte_source = document_text
+    document_text, selection = select_passages(document_text, max_length, mots_cles)
+    
+    # Le prompt système est porté par la session ; seul le document change
+    session = get_ollama_session(model, prompt_file)
+    if 'tinyllama' in model.lower():
+        user_message = f"Texte: {document_text}\n\nJSON:"
+    else:
+        user_message = f"# Document à analyser\n\n{document_text}\n\nJSON:"
+    
+    # Verdict déjà connu pour ce texte, ce prompt, ce modèle et cette troncature ?
+    cache = get_verdict_cache()
+    cache_key = cache.make_key(texte_source, session.system + user_message.replace(document_text, ''),
+                               f'ollama:{model}', selection)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    # Call Ollama API (parallélisme borné + retries via le dispatcher partagé)
+    try:
+        try:
+            ai_response, metriques = session.chat(
+                user_message, timeout=30 if 'tinyllama' in model.lower() else 60
+            )
+        except RuntimeError as e:
+            print(f"Ollama API error: {e}")
             return {
                 'ia_pertinent': False,
                 'ia_score': 0,
                 'ia_resume': 'Erreur API Ollama',
-                'ia_justification': f'HTTP {response.status_code}'
+                'ia_erreur': True,
+                'ia_justification': str(e)
+            }
+        print(f"[IA] {model} — {format_appel(metriques)}")
+        ai_response = ai_response.strip()
+        
+        # Try to parse JSON from response
+        # Remove markdown code blocks if present
+        if '```json' in ai_response:
+            ai_response = ai_response.split('```json')[1].split('```')[0].strip()
+        elif '```' in ai_response:
+            ai_response = ai_response.split('```')[1].split('```')[0].strip()
+
+        # Parse JSON
+        try:
+            print(f"[DEBUG] AI raw response: {ai_response[:500]}")
+            analysis = json.loads(ai_response)
+
+            print(f"[DEBUG] Parsed successfully: pertinent={analysis.get('ia_pertinent')}, score={analysis.get('ia_score')}")
+
+            # Validate and return
+            verdict = {
+                'ia_pertinent': bool(analysis.get('ia_pertinent', False)),
+                'ia_score': int(analysis.get('ia_score', 0)),
+                'ia_resume': str(analysis.get('ia_resume', '')),
+                'ia_justification': str(analysis.get('ia_justification', ''))
             }
+            cache.put(cache_key, verdict)
+            return verdict
+        except json.JSONDecodeError as e:
+            print(f"[ERROR] Failed to parse AI response as JSON: {e}")
+            print(f"[ERROR] Full response was: {ai_response}")
+
+            # Fallback: try to extract info from text using regex
+            # Look for keywords that indicate relevance
+            keywords = ['biomasse', 'chaufferie', 'solaire', 'éolien', 'renouvelable', 'pcaet', 'transition énergétique']
+            text_lower = ai_response.lower()
+            found_keywords = [kw for kw in keywords if kw in text_lower]
+
+            if found_keywords:
+                print(f"[FALLBACK] Found keywords in response: {found_keywords}")
+                return {
+                    'ia_pertinent': True,
+                    'ia_score': 5,
+                    'ia_resume': f'Document mentionnant: {", ".join(found_keywords)}',
+                    'ia_justification': f'Réponse IA non-JSON mais contient mots-clés pertinents. Réponse: {ai_response[:200]}'
+                }
+            else:
+                return {
+                    'ia_pertinent': False,
+                    'ia_score': 0,
+                    'ia_resume': 'Erreur de parsing JSON',
+                    'ia_erreur': True,
+                    'ia_justification': f'Réponse IA invalide: {ai_response[:100]}'
+                }
             
     except requests.exceptions.ConnectionError:
         print("Cannot connect to Ollama. Is it running? (ollama serve)")
@@ -152,7 +200,8 @@ JSON:"""
             'ia_pertinent': False,
             'ia_score': 0,
             'ia_resume': 'Ollama non disponible',
-            'ia_justification': 'Impossible de se connecter à Ollama sur localhost:11434'
+            'ia_erreur': True,
+            'ia_justification': f"Impossible de se connecter à Ollama sur {ollama_url('')}"
         }
     except Exception as e:
         print(f"Error calling Ollama: {e}")
@@ -160,14 +209,26 @@ JSON:"""
             'ia_pertinent': False,
             'ia_score': 0,
             'ia_resume': 'Erreur analyse IA',
+            'ia_erreur': True,
             'ia_justification': str(e)
         }
 
-def analyze_with_groq(document_text: str, api_key: str, model: str = "llama3-8b-8192") -> dict:
-    """Analyse via API Groq (cloud, rapide, gratuit jusqu'à 30 req/min)"""
+GROQ_API_URL = os.environ.get('GROQ_API_URL', 'https://api.groq.com/openai/v1/chat/completions')
+
+
+def analyze_with_groq(document_text: str, api_key: str, model: str = "llama3-8b-8192",
+                      chunked: bool = False, mots_cles: dict = None) -> dict:
+    """Analyse via API Groq (cloud, rapide, gratuit jusqu'à 30 req/min) ; mots_cles du run pour l'extrait"""
     max_length = 3000
-    if len(document_text) > max_length:
-        document_text = document_text[:max_length] + "\n[...tronqué...]"
+    if chunked and len(document_text) > max_length:
+        return analyser_par_morceaux(
+            document_text,
+            lambda morceau: analyze_with_groq(morceau, api_key, model, mots_cles=mots_cles),
+            taille=max_length, parallelisme=get_dispatcher('groq').parallelism,
+            mots_cles=mots_cles,
+        )
+    texte_source = document_text
+    document_text, selection = select_passages(document_text, max_length, mots_cles)
 
     prompt = f"""Analyse ce document administratif français. Réponds UNIQUEMENT en JSON valide.
 
@@ -178,9 +239,16 @@ JSON (ia_pertinent=true si le document parle d'un projet concret d'énergie reno
 
 JSON:"""
 
+    cache = get_verdict_cache()
+    cache_key = cache.make_key(texte_source, prompt.replace(document_text, ''),
+                               f'groq:{model}', selection)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        response = requests.post(
-            'https://api.groq.com/openai/v1/chat/completions',
+        response = get_dispatcher('groq').post(
+            GROQ_API_URL,
             headers={
                 'Authorization': f'Bearer {api_key}',
                 'Content-Type': 'application/json'
@@ -191,7 +259,8 @@ JSON:"""
                 'temperature': 0.1,
                 'max_tokens': 200,
             },
-            timeout=30
+            timeout=30,
+            est_tokens=estimate_tokens(prompt, 200),
         )
         if response.status_code == 200:
             content = response.json()['choices'][0]['message']['content'].strip()
@@ -201,24 +270,26 @@ JSON:"""
                 content = content.split('```')[1].split('```')[0].strip()
             try:
                 analysis = json.loads(content)
-                return {
+                verdict = {
                     'ia_pertinent': bool(analysis.get('ia_pertinent', False)),
                     'ia_score': int(analysis.get('ia_score', 0)),
                     'ia_resume': str(analysis.get('ia_resume', '')),
                     'ia_justification': str(analysis.get('ia_justification', ''))
                 }
+                cache.put(cache_key, verdict)
+                return verdict
             except json.JSONDecodeError:
-                return {'ia_pertinent': False, 'ia_score': 0, 'ia_resume': 'Erreur parsing', 'ia_justification': content[:100]}
+                return {'ia_pertinent': False, 'ia_score': 0, 'ia_resume': 'Erreur parsing', 'ia_justification': content[:100], 'ia_erreur': True}
         else:
-            return {'ia_pertinent': False, 'ia_score': 0, 'ia_resume': f'Erreur Groq {response.status_code}', 'ia_justification': response.text[:100]}
+            return {'ia_pertinent': False, 'ia_score': 0, 'ia_resume': f'Erreur Groq {response.status_code}', 'ia_justification': response.text[:100], 'ia_erreur': True}
     except Exception as e:
-        return {'ia_pertinent': False, 'ia_score': 0, 'ia_resume': 'Erreur API Groq', 'ia_justification': str(e)}
+        return {'ia_pertinent': False, 'ia_score': 0, 'ia_resume': 'Erreur API Groq', 'ia_justification': str(e), 'ia_erreur': True}
 
 
 def check_ollama_available() -> bool:
     """Check if Ollama is running and available"""
     try:
-        response = requests.get('http://localhost:11434/api/tags', timeout=5)
+        response = requests.get(ollama_url('/api/tags'), timeout=5)
         return response.status_code == 200
     except:
         return False
@@ -226,7 +297,7 @@ def check_ollama_available() -> bool:
 def get_available_models() -> list:
     """Get list of available Ollama models"""
     try:
-        response = requests.get('http://localhost:11434/api/tags', timeout=5)
+        response = requests.get(ollama_url('/api/tags'), timeout=5)
         if response.status_code == 200:
             data = response.json()
             return [model['name'] for model in data.get('models', [])]
@@ -3,38 +3,29 @@ OCR processor for scanned PDFs
 Extracts text from image-based PDFs using Tesseract OCR
 """
 
-import io
 import os
-from typing import Optional
-import pdfplumber
+import sys
+from typing import Optional, Union
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
 
 def is_scanned_pdf(pdf_content: bytes) -> bool:
     """
     Detect if a PDF is scanned (image-based) or text-based
     
     Args:
-        pdf_content: PDF file content as bytes
+        pdf_content: PDF file content as bytes, or path of the downloaded file
     
     Returns:
         True if PDF appears to be scanned
     """
     try:
-        pdf_file = io.BytesIO(pdf_content)
+        from ocr.extraction import lire_pages
         
-        with pdfplumber.open(pdf_file) as pdf:
-            # Check first 3 pages
-            pages_to_check = min(3, len(pdf.pages))
-            
-            for i in range(pages_to_check):
-                page = pdf.pages[i]
-                text = page.extract_text()
-                
-                # If we find substantial text, it's not scanned
-                if text and len(text.strip()) > 100:
-                    return False
-            
-            # If no text found in first pages, likely scanned
-            return True
+        # Check first 3 pages: if we find substantial text, it's not scanned
+        return not any(len(page['texte']) > 100 for page in lire_pages(pdf_content, max_pages=3))
             
     except Exception:
         # If we can't determine, assume not scanned
@@ -45,7 +36,7 @@ def extract_text_with_ocr(pdf_content: bytes, pdf_name: str = "unknown") -> Opti
     Extract text from scanned PDF using OCR with enhanced quality
     
     Args:
-        pdf_content: PDF file content as bytes
+        pdf_content: PDF file content as bytes, or path of the downloaded file
         pdf_name: Name of PDF for logging
     
     Returns:
@@ -53,55 +44,33 @@ def extract_text_with_ocr(pdf_content: bytes, pdf_name: str = "unknown") -> Opti
     """
     try:
         # Check if tesseract is installed
-        import pytesseract
-        from pdf2image import convert_from_bytes
-        from PIL import Image, ImageEnhance, ImageFilter
+        import pytesseract  # noqa: F401
+        from ocr.engine import assembler, format_stats, ocr_document
         
         print(f"[OCR] Starting OCR extraction for {pdf_name}...")
         
-        # Convert PDF to images with higher DPI for better quality
-        images = convert_from_bytes(
-            pdf_content, 
-            dpi=400,  # Increased from 300 to 400 for better quality
-            fmt='png',
-            thread_count=2
-        )
-        
-        print(f"[OCR] Converted {len(images)} pages to images")
-        
-        extracted_text = []
-        
-        # OCR each page with preprocessing
-        for i, image in enumerate(images):
-            # Preprocess image for better OCR
-            # Convert to grayscale
-            image = image.convert('L')
-            
-            # Enhance contrast
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(2.0)
-            
-            # Sharpen image
-            image = image.filter(ImageFilter.SHARPEN)
-            
-            # Perform OCR with French language and custom config
-            # PSM 3 = Fully automatic page segmentation (default)
-            # OEM 3 = Default, based on what is available (LSTM + Legacy)
-            custom_config = r'--oem 3 --psm 3'
-            text = pytesseract.image_to_string(
-                image, 
-                lang='fra+eng',  # French + English for better coverage
-                config=custom_config
-            )
-            
+        def on_page(index, text):
             if text.strip():
-                extracted_text.append(f"--- Page {i+1} ---\n{text}")
-                print(f"[OCR] Page {i+1}: Extracted {len(text)} characters")
+                print(f"[OCR] Page {index+1}: Extracted {len(text)} characters")
             else:
-                print(f"[OCR] Page {i+1}: No text extracted")
+                print(f"[OCR] Page {index+1}: No text extracted")
         
-        result = '\n\n'.join(extracted_text)
-        print(f"[OCR] Total extracted: {len(result)} characters from {len(extracted_text)} pages")
+        # Pages rendues une à une (400 DPI) et OCRisées en parallèle dans le pool
+        # partagé ; texte conservé : toutes les pages, sans arrêt anticipé
+        # PSM 3 = Fully automatic page segmentation (default)
+        # OEM 3 = Default, based on what is available (LSTM + Legacy)
+        resultat = ocr_document(
+            pdf_content,
+            dpi=400,
+            lang='fra+eng',  # French + English for better coverage
+            config=r'--oem 3 --psm 3',
+            nettete=True,
+            on_page=on_page,
+        )
+        
+        result = assembler(resultat, entetes=True)
+        print(f"[OCR] {pdf_name} : {format_stats(resultat)}")
+        print(f"[OCR] Total extracted: {len(result)} characters from {resultat['pages_ocr']} pages")
         return result if result.strip() else None
         
     except ImportError as e:
@@ -113,50 +82,52 @@ def extract_text_with_ocr(pdf_content: bytes, pdf_name: str = "unknown") -> Opti
         print(f"[OCR] Extraction failed for {pdf_name}: {e}")
         return None
 
-def extract_pdf_with_fallback(pdf_content: bytes) -> Optional[str]:
+def extract_pdf_with_fallback(pdf_content: Union[bytes, str]) -> Optional[str]:
     """
-    Extract text from PDF with OCR fallback for scanned PDFs
+    Extract text from PDF with OCR fallback for scanned pages
+    
+    Texte natif des pages qui en ont, OCR des seules pages image (PDF
+    scanné ou annexes scannées), sans arrêt anticipé : le texte est conservé.
     
     Args:
-        pdf_content: PDF file content as bytes
+        pdf_content: PDF file content as bytes, or path of the downloaded file
     
     Returns:
         Extracted text
     """
     try:
-        # First try normal text extraction
-        pdf_file = io.BytesIO(pdf_content)
+        from ocr.extraction import extraire_pdf, format_pages
         
-        with pdfplumber.open(pdf_file) as pdf:
-            text_parts = []
-            
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    text_parts.append(text)
-            
-            combined_text = '\n\n'.join(text_parts)
-            
-            # If we got substantial text, return it
-            if len(combined_text.strip()) > 100:
-                print(f"[PDF] Extracted {len(combined_text)} characters using standard extraction")
-                return combined_text
-            
-            # Otherwise, try OCR
-            print(f"[PDF] Only {len(combined_text.strip())} characters extracted, attempting OCR...")
-            ocr_text = extract_text_with_ocr(pdf_content, "PDF")
-            
-            if ocr_text and len(ocr_text.strip()) > 50:
-                print(f"[PDF] OCR successful: {len(ocr_text)} characters")
-                return ocr_text
-            
-            # If OCR failed or returned little text, return what we have
-            if combined_text.strip():
-                print(f"[PDF] OCR failed, returning {len(combined_text)} characters from standard extraction")
-                return combined_text
-            else:
-                print("[PDF] No text could be extracted (empty or unreadable PDF)")
-                return None
+        extraction = extraire_pdf(
+            pdf_content,
+            ocr=check_tesseract_installed(),
+            dpi=400,
+            lang='fra+eng',
+            config=r'--oem 3 --psm 3',
+            nettete=True,
+            entetes=True,
+        )
+        combined_text = extraction['texte']
+        print(f"[PDF] {extraction['nb_pages']} pages : {format_pages(extraction['pages'])}")
+        
+        if extraction['statut'] in ('protégé', 'corrompu'):
+            print(f"PDF extraction failed: {extraction['erreur']}")
+            return None
+        
+        if extraction['ocr']:
+            from ocr.engine import format_stats
+            print(f"[OCR] {format_stats(extraction['ocr'])}")
+        
+        if len(combined_text.strip()) > 50:
+            print(f"[PDF] Extracted {len(combined_text)} characters")
+            return combined_text
+        
+        if combined_text.strip():
+            print(f"[PDF] Only {len(combined_text.strip())} characters extracted")
+            return combined_text
+        
+        print("[PDF] No text could be extracted (empty or unreadable PDF)")
+        return None
             
     except Exception as e:
         print(f"PDF extraction failed: {e}")
@@ -0,0 +1,264 @@
+"""
+Benchmark du débit IA contre le faux serveur LLM (ia.fake_llm_server).
+
+Mesure, sans GPU ni réseau ni clé API, le débit des analyseurs, l'effet des
+retries / limites de débit du dispatcher et du cache de verdicts :
+
+    python -m ia.bench --cible api    --docs 40 --rate-limit 0.1
+    python -m ia.bench --cible ollama --docs 40 --latency 0.3 --prompt-tps 200
+    python -m ia.bench --cible batch  --docs 40 --passes 2
+
+    python -m ia.bench --cible run_analysis --docs 20 --passes 2
+
+Cibles : api (analyze_document_with_api, Groq), ollama
+(analyze_document_with_ollama), groq (analyze_with_groq), batch
+(pdf_pipeline.ia_analyzer.batch_analyze sur des JSON générés), run_analysis
+(pipeline complet du dashboard — scraping → IA → persistance — sur un site de
+commune factice servi en local, une page HTML par document ; les pauses de
+politesse du scraper comptent dans la durée).
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from ia.fake_llm_server import FakeLLMConfig, FakeLLMServer
+
+_PERTINENTS = [
+    "Le conseil approuve l'étude de faisabilité d'une chaufferie biomasse et d'un réseau de chaleur.",
+    "Marché de maîtrise d'œuvre pour la chaudière bois du groupe scolaire, plaquettes forestières.",
+    "Inscription au budget primitif d'une autorisation de programme pour la chaufferie collective.",
+]
+_NEUTRES = [
+    "Le conseil municipal approuve le compte rendu de la séance précédente.",
+    "Travaux de voirie rue des écoles et renouvellement de l'éclairage public.",
+    "Tarifs de la cantine scolaire et du périscolaire pour l'année.",
+    "Convention de mise à disposition de la salle des fêtes aux associations.",
+]
+
+
+def documents(n: int, longueur: int = 6000, seed: int = 1) -> List[str]:
+    """Documents synthétiques : ~30 % contiennent un passage pertinent noyé dans le texte."""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n):
+        phrases: List[str] = []
+        while sum(len(p) for p in phrases) < longueur:
+            phrases.append(rng.choice(_NEUTRES))
+        if rng.random() < 0.3:
+            phrases.insert(rng.randrange(len(phrases)), rng.choice(_PERTINENTS))
+        docs.append(f"Délibération n°{i}. " + " ".join(phrases))
+    return docs
+
+
+def _mesurer(nom: str, fn: Callable[[str], Dict], docs: List[str], workers: int) -> Dict:
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        verdicts = list(pool.map(fn, docs))
+    duree = time.time() - t0
+    return {
+        "cible": nom,
+        "docs": len(docs),
+        "duree_s": round(duree, 2),
+        "docs_par_s": round(len(docs) / duree, 2) if duree else 0.0,
+        "pertinents": sum(1 for v in verdicts if v and v.get("ia_pertinent")),
+        "erreurs": sum(1 for v in verdicts if not v or str(v.get("ia_resume", "")).startswith("Erreur")),
+    }
+
+
+def _batch(docs: List[str]) -> Callable[[], None]:
+    from pdf_pipeline import ia_analyzer as pdf_ia
+
+    base = tempfile.mkdtemp(prefix="bench_batch_")
+    for i, texte in enumerate(docs):
+        with open(os.path.join(base, f"doc_{i}.pdf.json"), "w", encoding="utf-8") as fh:
+            json.dump({"nom_fichier": f"doc_{i}.pdf", "statut": "texte", "texte": texte}, fh,
+                      ensure_ascii=False)
+
+    def run() -> None:
+        # Les JSON enrichis par une passe précédente redeviennent éligibles
+        for nom in os.listdir(base):
+            chemin = os.path.join(base, nom)
+            if not nom.startswith("doc_"):
+                continue
+            with open(chemin, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            for cle in [k for k in data if k.startswith("ia_")]:
+                del data[cle]
+            with open(chemin, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, ensure_ascii=False)
+        pdf_ia.batch_analyze(base)
+    return run
+
+
+def _site(docs: List[str]) -> ThreadingHTTPServer:
+    """Site de commune factice : page d'accueil listant une page HTML datée du jour par document."""
+    date = datetime.now().strftime("%d/%m/%Y")
+    pages = {
+        f"/deliberation-{i}.html": (
+            f"<html><head><title>Délibération n°{i}</title></head><body><main><article>"
+            f"<h1>Délibération n°{i}</h1><p>Publié le {date}</p><p>{texte}</p></article></main></body></html>"
+        )
+        for i, texte in enumerate(docs)
+    }
+    liens = "".join(f'<li><a href="{chemin}">Délibération</a></li>' for chemin in pages)
+    pages["/"] = f"<html><head><title>Mairie</title></head><body><ul>{liens}</ul></body></html>"
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            corps = pages.get(self.path.split("?")[0])
+            if corps is None:
+                self.send_error(404)
+                return
+            data = corps.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    serveur = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return serveur
+
+
+def _run_analysis(docs: List[str], args) -> Callable[[], Dict]:
+    import app
+
+    site = _site(docs)
+    site_url = f"http://127.0.0.1:{site.server_address[1]}/"
+    # Résultats et historique du run hors de data/ du projet
+    travail = tempfile.mkdtemp(prefix="bench_run_")
+    app._PROJECT_ROOT = travail
+    app.HISTORY_FILE = os.path.join(travail, "history.json")
+    config = {
+        "nom_campagne": "bench",
+        "crawling": {"mode": "single", "predefined_urls": [site_url]},
+        "ai": {"mode": "local", "model": "mistral", "chunked": args.chunked, "classifier": False},
+    }
+    if args.workers:
+        config["ai"]["workers"] = args.workers
+
+    def run() -> Dict:
+        t0 = time.time()
+        app.run_analysis(dict(config))
+        while True:
+            msg = app.status_queue.get()
+            if msg.get("status") in ("completed", "error"):
+                break
+        duree = time.time() - t0
+        if msg["status"] == "error":
+            print(f"[BENCH]   run_analysis : {msg['message']}")
+        historique = app.load_history()
+        resultats = historique[-1]["results"] if historique and msg["status"] == "completed" else {}
+        return {
+            "cible": "run_analysis", "docs": len(docs), "duree_s": round(duree, 2),
+            "docs_par_s": round(len(docs) / duree, 2) if duree else 0.0,
+            "retenus": resultats.get("documents_processed", 0),
+            "pertinents": resultats.get("relevant_found", 0),
+            "pipeline": resultats.get("pipeline"),
+        }
+    return run
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m ia.bench", description=__doc__.split("\n")[1])
+    parser.add_argument("--cible", choices=["api", "ollama", "groq", "batch", "run_analysis"], default="api")
+    parser.add_argument("--docs", type=int, default=30)
+    parser.add_argument("--longueur", type=int, default=6000, help="Caractères par document")
+    parser.add_argument("--passes", type=int, default=2, help="Passes successives (la 2e mesure le cache)")
+    parser.add_argument("--workers", type=int, default=None, help="Threads clients (défaut : parallélisme du backend)")
+    parser.add_argument("--parallel", type=int, default=4, help="Slots du dispatcher")
+    parser.add_argument("--rpm", type=int, default=None, help="Requêtes/min du dispatcher (défaut : illimité)")
+    parser.add_argument("--chunked", action="store_true", help="Analyse map-reduce des documents longs")
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--tps", type=float, default=0.0)
+    parser.add_argument("--prompt-tps", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    serveur = FakeLLMServer(FakeLLMConfig(
+        latency=args.latency, tps=args.tps, prompt_tps=args.prompt_tps,
+        error_rate=args.error_rate, rate_limit=args.rate_limit,
+        retry_after=args.retry_after, seed=42,
+    )).start()
+
+    # Tout pointe vers le faux serveur ; cache de verdicts jetable
+    os.environ["OLLAMA_HOST"] = serveur.url
+    for fournisseur in ("GROQ", "OPENROUTER", "TOGETHER", "OPENAI"):
+        os.environ[f"{fournisseur}_API_URL"] = serveur.url + "/v1/chat/completions"
+    os.environ["IA_CACHE_FILE"] = os.path.join(tempfile.mkdtemp(prefix="bench_cache_"), "cache.json")
+
+    from ia.cache import diff_stats, format_stats, get_verdict_cache
+    from ia.dispatcher import configure_dispatcher
+
+    backend = {"api": "groq", "groq": "groq", "ollama": "ollama", "batch": "ollama",
+               "run_analysis": "ollama"}[args.cible]
+    # rpm / tpm à 0 = pas de limite de débit côté client
+    dispatcher = configure_dispatcher(backend, parallelism=args.parallel, rpm=args.rpm or 0, tpm=0,
+                                      backoff=0.1, max_backoff=2.0)
+    workers = args.workers or dispatcher.parallelism
+
+    sys.path.insert(0, os.path.join(_ROOT, "dashboard"))
+    docs = documents(args.docs, args.longueur)
+    cache = get_verdict_cache()
+
+    if args.cible == "api":
+        from api_analyzer import analyze_document_with_api
+        fn = lambda t: analyze_document_with_api(t, "groq", api_key="bench", chunked=args.chunked)
+    elif args.cible == "groq":
+        import ia_analyzer
+        ia_analyzer.GROQ_API_URL = os.environ["GROQ_API_URL"]
+        fn = lambda t: ia_analyzer.analyze_with_groq(t, api_key="bench", chunked=args.chunked)
+    elif args.cible == "ollama":
+        from ia_analyzer import analyze_document_with_ollama, get_ollama_session
+        get_ollama_session("mistral").warm()
+        fn = lambda t: analyze_document_with_ollama(t, model="mistral", chunked=args.chunked)
+    elif args.cible == "run_analysis":
+        run_pipeline = _run_analysis(docs, args)
+    else:
+        run_batch = _batch(docs)
+
+    for passe in range(1, args.passes + 1):
+        cache_debut, disp_debut = cache.stats(), dispatcher.snapshot()
+        if args.cible == "batch":
+            t0 = time.time()
+            run_batch()
+            duree = time.time() - t0
+            res = {"cible": "batch", "docs": len(docs), "duree_s": round(duree, 2),
+                   "docs_par_s": round(len(docs) / duree, 2) if duree else 0.0}
+        elif args.cible == "run_analysis":
+            res = run_pipeline()
+        else:
+            res = _mesurer(args.cible, fn, docs, workers)
+        disp = {k: v - disp_debut[k] for k, v in dispatcher.snapshot().items()}
+        print(f"[BENCH] passe {passe} | {json.dumps(res, ensure_ascii=False)}")
+        print(f"[BENCH]   dispatcher {backend} : {int(disp['appels'])} appel(s), {int(disp['retries'])} retry,"
+              f" {int(disp['rate_limited'])} rate-limited, {int(disp['erreurs'])} échec(s)")
+        print(f"[BENCH]   {format_stats(diff_stats(cache_debut, cache.stats()))}")
+
+    print(f"[BENCH] serveur : {json.dumps(serveur.stats())}")
+    serveur.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
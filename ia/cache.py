@@ -0,0 +1,151 @@
+"""
+Cache persistant des verdicts IA.
+
+Clé = (hash du texte normalisé, hash du prompt, modèle, politique de troncature).
+Un document déjà vu n'est renvoyé au modèle que si son contenu, le prompt, le
+modèle ou la façon de le tronquer a changé. Stocké dans
+data/ia_verdict_cache.json, sur le modèle de data/site_structure_cache.json.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+log = logging.getLogger("ia.cache")
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_FILE = os.environ.get("IA_CACHE_FILE") or os.path.join(_ROOT, "data", "ia_verdict_cache.json")
+
+# Champs conservés pour un verdict
+VERDICT_FIELDS = ("ia_pertinent", "ia_score", "ia_resume", "ia_justification")
+
+
+def normalize_text(texte: str) -> str:
+    """Normalise un texte avant hachage (casse et espaces sans importance)."""
+    return re.sub(r"\s+", " ", (texte or "")).strip().lower()
+
+
+def _sha(texte: str) -> str:
+    return hashlib.sha256(texte.encode("utf-8", "ignore")).hexdigest()
+
+
+class VerdictCache:
+    """
+    Cache clé → verdict, thread-safe, sauvegardé par lots.
+
+    Args:
+        path: Fichier JSON de stockage.
+        autosave_every: Nombre d'écritures entre deux sauvegardes disque.
+    """
+
+    def __init__(self, path: str = CACHE_FILE, autosave_every: int = 20):
+        self.path = path
+        self.autosave_every = autosave_every
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+
+    @staticmethod
+    def make_key(texte: str, prompt: str, model: str, policy: str) -> str:
+        """Construit la clé de cache d'un appel."""
+        return "|".join((_sha(normalize_text(texte))[:32], _sha(prompt)[:16], model, policy))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return {f: entry[f] for f in VERDICT_FIELDS if f in entry}
+
+    def put(self, key: str, verdict: Dict[str, Any]) -> None:
+        entry = {f: verdict.get(f) for f in VERDICT_FIELDS}
+        entry["cached_at"] = datetime.now().isoformat()
+        with self._lock:
+            self._entries[key] = entry
+            self._dirty += 1
+            flush = self._dirty >= self.autosave_every
+        if flush:
+            self.save()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "entrees": len(self._entries),
+            }
+
+    def save(self) -> None:
+        """Écrit le cache sur disque (atomique)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = dict(self._entries)
+            self._dirty = 0
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(snapshot, fh, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            log.warning("Sauvegarde du cache IA impossible : %s", exc)
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError) as exc:
+            log.warning("Cache IA illisible (%s) — repart de zéro", exc)
+            return {}
+
+
+_cache: Optional[VerdictCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_verdict_cache() -> VerdictCache:
+    """Cache partagé par tous les analyseurs du processus."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = VerdictCache()
+            atexit.register(_cache.save)
+        return _cache
+
+
+def diff_stats(debut: Dict[str, Any], fin: Dict[str, Any]) -> Dict[str, Any]:
+    """Stats limitées à un run (le cache est partagé par tout le processus)."""
+    hits = fin["hits"] - debut["hits"]
+    misses = fin["misses"] - debut["misses"]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 3) if total else 0.0,
+        "entrees": fin["entrees"],
+    }
+
+
+def format_stats(stats: Dict[str, Any]) -> str:
+    """Résumé d'une ligne pour les bilans de run."""
+    total = stats["hits"] + stats["misses"]
+    return (
+        f"cache IA : {stats['hits']}/{total} hits ({int(stats['hit_rate'] * 100)}%)"
+        f" — {stats['misses']} appel(s) modèle"
+    )
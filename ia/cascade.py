@@ -0,0 +1,166 @@
+"""
+Cascade de modèles : un niveau rapide sur tous les documents, un niveau
+expert seulement pour les cas incertains.
+
+Le niveau rapide (tinyllama, ou le classement par mots-clés sans appel LLM)
+note chaque document ; seuls ceux dont le score tombe dans la bande
+d'incertitude (ex. 3–7) sont réanalysés par le niveau expert (mistral,
+Groq 70B). La cascade mesure la latence de chaque niveau et le taux d'accord
+entre le niveau rapide et le niveau expert sur les documents escaladés.
+"""
+
+import logging
+import math
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ia.passages import trouver_occurrences
+
+Verdict = Dict[str, Any]
+
+log = logging.getLogger("ia.cascade")
+
+# Résumés des verdicts d'erreur (dashboard/ia_analyzer, api_analyzer), pour les
+# analyseurs ou verdicts en cache qui ne portent pas le drapeau ia_erreur
+_RESUMES_ERREUR = re.compile(r"^(?:Erreur\b|Ollama non disponible)", re.IGNORECASE)
+
+
+def est_erreur(verdict: Optional[Verdict]) -> bool:
+    """Verdict produit par un échec d'appel ou de parsing, et non par le modèle."""
+    if not verdict:
+        return False
+    return bool(verdict.get("ia_erreur")) or bool(_RESUMES_ERREUR.match(str(verdict.get("ia_resume", ""))))
+
+
+def _score(verdict: Optional[Verdict]) -> float:
+    try:
+        score = float((verdict or {}).get("ia_score", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    return score / 10 if score > 10 else score
+
+
+def verdict_mots_cles(texte: str, seuil: int = 7) -> Verdict:
+    """
+    Niveau 0 sans LLM : score 0–10 d'après le poids des mots-clés trouvés
+    (prioritaire = 3, secondaire = 2, signal faible = 1), en échelle log.
+    """
+    hits = trouver_occurrences(texte or "")
+    poids = sum(p for _, p in hits)
+    score = min(10, int(round(2 * math.log2(1 + poids))))
+    return {
+        "ia_pertinent": score >= seuil,
+        "ia_score": score,
+        "ia_resume": f"{len(hits)} occurrence(s) de mots-clés",
+        "ia_justification": f"Classement par mots-clés (poids {poids})",
+    }
+
+
+class _NiveauStats:
+    def __init__(self) -> None:
+        self.appels = 0
+        self.duree_s = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "appels": self.appels,
+            "duree_s": round(self.duree_s, 2),
+            "latence_moy_s": round(self.duree_s / self.appels, 3) if self.appels else 0.0,
+        }
+
+
+class Cascade:
+    """
+    Args:
+        rapide: Analyseur texte → verdict du niveau rapide.
+        expert: Analyseur texte → verdict du niveau expert.
+        bande: (min, max) des scores du niveau rapide escaladés (bornes incluses).
+        audit: Part des documents hors bande envoyés aussi à l'expert, pour
+               mesurer l'accord sur les cas « tranchés » (0 = jamais).
+        noms: Noms des niveaux dans les stats (ex. ("tinyllama", "mistral")).
+    """
+
+    def __init__(self, rapide: Callable[[str], Verdict], expert: Callable[[str], Verdict],
+                 bande: Tuple[float, float] = (3, 7), audit: float = 0.0,
+                 noms: Tuple[str, str] = ("rapide", "expert")):
+        self.rapide = rapide
+        self.expert = expert
+        self.bande = (float(bande[0]), float(bande[1]))
+        self.audit = audit
+        self.noms = noms
+        self._lock = threading.Lock()
+        self._niveaux = {"rapide": _NiveauStats(), "expert": _NiveauStats()}
+        self.documents = 0
+        self.escalades = 0
+        self.audits = 0
+        self.accords = 0
+        self.comparaisons = 0
+
+    def analyse(self, texte: str) -> Verdict:
+        """Analyse un document ; le verdict porte ia_niveau (nom du niveau retenu)."""
+        try:
+            verdict = self._appel("rapide", self.rapide, texte)
+        except Exception as exc:
+            log.warning("Cascade : niveau %s en échec (%s) — escalade", self.noms[0], exc)
+            verdict = None
+        # Un échec du niveau rapide (HTTP, timeout, JSON invalide) n'est pas un
+        # « non pertinent » : le document part toujours chez l'expert
+        erreur = not verdict or est_erreur(verdict)
+        score = _score(verdict)
+        incertain = erreur or self.bande[0] <= score <= self.bande[1]
+        audite = not incertain and self.audit > 0 and random.random() < self.audit
+
+        with self._lock:
+            self.documents += 1
+            self.escalades += incertain
+            self.audits += audite
+
+        if not (incertain or audite):
+            return dict(verdict, ia_niveau=self.noms[0])
+
+        final = self._appel("expert", self.expert, texte)
+        if not erreur and final and not est_erreur(final):
+            with self._lock:
+                self.comparaisons += 1
+                self.accords += bool(verdict.get("ia_pertinent")) == bool(final.get("ia_pertinent"))
+        if audite:
+            # Audit : on garde le verdict rapide, l'appel expert ne sert qu'à la mesure
+            return dict(verdict, ia_niveau=self.noms[0])
+        return dict(final or verdict or {}, ia_niveau=self.noms[1])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": self.documents,
+                "escalades": self.escalades,
+                "taux_escalade": round(self.escalades / self.documents, 3) if self.documents else 0.0,
+                "audits": self.audits,
+                "accord": round(self.accords / self.comparaisons, 3) if self.comparaisons else None,
+                "niveaux": {
+                    self.noms[0]: self._niveaux["rapide"].as_dict(),
+                    self.noms[1]: self._niveaux["expert"].as_dict(),
+                },
+            }
+
+    def format_stats(self) -> str:
+        st = self.stats()
+        rapide, expert = (st["niveaux"][n] for n in self.noms)
+        accord = f"{int(st['accord'] * 100)}%" if st["accord"] is not None else "n/a"
+        return (
+            f"cascade : {st['escalades']}/{st['documents']} escaladé(s) vers {self.noms[1]}"
+            f" | {self.noms[0]} {rapide['latence_moy_s']}s/doc, {self.noms[1]} {expert['latence_moy_s']}s/doc"
+            f" | accord {accord}"
+        )
+
+    def _appel(self, niveau: str, fn: Callable[[str], Verdict], texte: str) -> Optional[Verdict]:
+        t0 = time.time()
+        try:
+            return fn(texte)
+        finally:
+            with self._lock:
+                st = self._niveaux[niveau]
+                st.appels += 1
+                st.duree_s += time.time() - t0
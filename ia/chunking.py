@@ -0,0 +1,130 @@
+"""
+Analyse map-reduce des documents longs.
+
+Un bulletin municipal ou un procès-verbal dépasse largement le contexte du
+modèle (num_ctx 1024–4096). Le document est découpé en morceaux qui se
+recouvrent ; seuls les morceaux contenant des mots-clés sont envoyés au
+modèle, en parallèle (map), puis les verdicts sont fusionnés en un seul
+résultat portant le passage le plus probant (reduce). La latence d'un
+document est celle du morceau le plus lent, dans la limite du parallélisme
+du backend (voir ia.dispatcher).
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ia.cascade import est_erreur
+from ia.passages import select_passages, trouver_occurrences
+
+log = logging.getLogger("ia.chunking")
+
+Verdict = Dict[str, Any]
+
+
+def decouper(texte: str, taille: int, recouvrement: int = 200) -> List[Tuple[int, int]]:
+    """Bornes (début, fin) de morceaux de `taille` caractères qui se recouvrent."""
+    if taille <= 0:
+        raise ValueError("taille de morceau invalide")
+    recouvrement = max(0, min(recouvrement, taille // 2))
+    bornes = []
+    debut = 0
+    while debut < len(texte):
+        fin = min(len(texte), debut + taille)
+        if fin < len(texte):
+            # Coupe sur un espace pour ne pas tronquer un mot-clé
+            esp = texte.rfind(" ", debut + taille - recouvrement, fin)
+            fin = esp if esp > debut else fin
+        bornes.append((debut, fin))
+        if fin >= len(texte):
+            break
+        debut = max(fin - recouvrement, debut + 1)
+    return bornes
+
+
+def morceaux_pertinents(texte: str, taille: int, recouvrement: int = 200,
+                        max_morceaux: int = 4,
+                        mots_cles: Optional[Dict[str, List[str]]] = None
+                        ) -> Tuple[List[Tuple[int, int, int]], int]:
+    """
+    Morceaux contenant au moins un mot-clé, les plus denses d'abord.
+
+    Returns:
+        ([(début, fin, poids)], nombre total de morceaux)
+    """
+    bornes = decouper(texte, taille, recouvrement)
+    hits = trouver_occurrences(texte, mots_cles)
+    retenus = []
+    for debut, fin in bornes:
+        poids = sum(p for pos, p in hits if debut <= pos < fin)
+        if poids:
+            retenus.append((debut, fin, poids))
+    retenus.sort(key=lambda m: -m[2])
+    return retenus[:max_morceaux], len(bornes)
+
+
+def reduire(verdicts: List[Tuple[Verdict, str]], total: int) -> Verdict:
+    """
+    Fusionne les verdicts des morceaux : le morceau le mieux noté porte le
+    résultat (pertinent s'il l'est), les autres morceaux pertinents sont cités.
+    """
+    def _score(v: Verdict) -> float:
+        try:
+            return float(v.get("ia_score", 0) or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    verdicts = sorted(verdicts, key=lambda vp: (bool(vp[0].get("ia_pertinent")), _score(vp[0])),
+                      reverse=True)
+    meilleur, passage = verdicts[0]
+    pertinents = sum(1 for v, _ in verdicts if v.get("ia_pertinent"))
+
+    resultat = dict(meilleur)
+    # Passage probant : fenêtres autour des mots-clés du meilleur morceau
+    resultat["ia_passage"] = select_passages(passage, 600, tete=0)[0].strip()
+    resultat["ia_morceaux"] = {"analyses": len(verdicts), "total": total, "pertinents": pertinents}
+    if len(verdicts) > 1:
+        resultat["ia_justification"] = (
+            f"{meilleur.get('ia_justification', '')} "
+            f"[{pertinents}/{len(verdicts)} passage(s) pertinent(s) sur {total} morceaux]"
+        ).strip()
+    return resultat
+
+
+def analyser_par_morceaux(texte: str, analyse: Callable[[str], Optional[Verdict]], taille: int,
+                          recouvrement: int = 200, max_morceaux: int = 4,
+                          parallelisme: int = 4,
+                          mots_cles: Optional[Dict[str, List[str]]] = None) -> Optional[Verdict]:
+    """
+    Analyse map-reduce d'un document long.
+
+    Args:
+        texte: Texte complet.
+        analyse: Fonction texte → verdict (ia_pertinent, ia_score, ...) appliquée à
+                 chaque morceau ; un morceau dont l'analyse renvoie None est ignoré.
+        taille: Taille d'un morceau (= budget de caractères de l'analyseur).
+        recouvrement: Caractères partagés entre morceaux consécutifs.
+        max_morceaux: Plafond de morceaux envoyés au modèle (les plus denses).
+        parallelisme: Appels simultanés (borné en plus par le dispatcher du backend).
+        mots_cles: Dict prioritaires/secondaires (défaut : search_config.json).
+    """
+    if len(texte) <= taille:
+        return analyse(texte)
+
+    retenus, total = morceaux_pertinents(texte, taille, recouvrement, max_morceaux, mots_cles)
+    if not retenus:
+        # Aucun mot-clé : un seul appel, l'analyseur choisit lui-même l'extrait
+        return analyse(texte)
+
+    passages = [texte[d:f] for d, f, _ in retenus]
+    log.info("Analyse par morceaux : %d/%d morceaux envoyés", len(passages), total)
+    with ThreadPoolExecutor(max_workers=max(1, min(parallelisme, len(passages))),
+                            thread_name_prefix="ia-morceau") as pool:
+        verdicts = list(pool.map(analyse, passages))
+    # Un morceau en erreur (HTTP, JSON invalide) ne vaut pas un « non pertinent »
+    obtenus = [(v, p) for v, p in zip(verdicts, passages) if v and not est_erreur(v)]
+    if not obtenus and any(verdicts):
+        return next(v for v in verdicts if v)
+    if not obtenus:
+        return None
+    return reduire(obtenus, total)
@@ -0,0 +1,338 @@
+"""
+Classifieur local de pertinence appris sur les validations manuelles.
+
+Les documents validés à la main dans le dashboard (validation_status =
+"validated_manual", voir /api/documents/validate) servent d'exemples. Les
+textes sont projetés par hachage (mots + bigrammes, tf sous-linéaire,
+normalisation L2) et une régression logistique est entraînée par descente
+de gradient stochastique. Python pur : pas de numpy ni de scikit-learn,
+inférence en quelques millisecondes par document.
+
+Le seuil enregistré avec le modèle est choisi sur les validations mises de
+côté pour garder un rappel cible (95 % par défaut) : sous ce seuil, un
+document est écarté sans appel LLM.
+
+CLI :
+    python -m ia.classifier train    [--data data/resultats] [--test 0.2] [--rappel 0.95]
+    python -m ia.classifier evaluate [--data data/resultats]
+    python -m ia.classifier predict  fichier.txt
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_FILE = os.path.join(_ROOT, "data", "ia_classifier.json")
+DATA_DIR = os.path.join(_ROOT, "data", "resultats")
+
+N_FEATURES = 2 ** 18
+MAX_CHARS = 20000  # au-delà, le début du document suffit pour le classement
+_TOKEN_RE = re.compile(r"\w{2,}", re.UNICODE)
+
+Exemple = Tuple[str, bool]
+
+
+# ── Représentation ─────────────────────────────────────────────────────────────
+
+def vectoriser(texte: str) -> Dict[int, float]:
+    """Vecteur creux {indice: valeur} d'un texte (hachage signé, L2)."""
+    tokens = _TOKEN_RE.findall((texte or "")[:MAX_CHARS].lower())
+    termes = tokens + [a + " " + b for a, b in zip(tokens, tokens[1:])]
+    tf: Dict[int, float] = {}
+    for terme in termes:
+        h = zlib.crc32(terme.encode("utf-8"))
+        idx = h % N_FEATURES
+        signe = 1.0 if (h >> 31) & 1 else -1.0
+        tf[idx] = tf.get(idx, 0.0) + signe
+    vec = {i: math.copysign(1.0 + math.log(abs(v)), v) for i, v in tf.items() if v}
+    norme = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+    return {i: v / norme for i, v in vec.items()}
+
+
+def _sigmoide(z: float) -> float:
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+
+# ── Modèle ─────────────────────────────────────────────────────────────────────
+
+class RelevanceClassifier:
+    """
+    Régression logistique sur caractéristiques hachées.
+
+    Args:
+        poids: Poids non nuls {indice: poids}.
+        biais: Terme constant.
+        seuil: Probabilité sous laquelle un document est écarté avant le LLM.
+        meta: Informations d'entraînement (date, effectifs, métriques).
+    """
+
+    def __init__(self, poids: Optional[Dict[int, float]] = None, biais: float = 0.0,
+                 seuil: float = 0.5, meta: Optional[Dict] = None):
+        self.poids = poids or {}
+        self.biais = biais
+        self.seuil = seuil
+        self.meta = meta or {}
+
+    def proba(self, texte: str) -> float:
+        vec = vectoriser(texte)
+        z = self.biais + sum(v * self.poids.get(i, 0.0) for i, v in vec.items())
+        return _sigmoide(z)
+
+    def garder(self, texte: str) -> bool:
+        """True si le document doit passer au LLM."""
+        return self.proba(texte) >= self.seuil
+
+    @classmethod
+    def entrainer(cls, exemples: List[Exemple], epochs: int = 15, l2: float = 1e-5,
+                  pas: float = 0.5, seed: int = 42) -> "RelevanceClassifier":
+        """SGD avec poids de classes équilibrés (le rappel prime)."""
+        if not exemples:
+            raise ValueError("Aucun exemple d'entraînement")
+        vecs = [(vectoriser(t), 1.0 if y else 0.0) for t, y in exemples]
+        n_pos = sum(1 for _, y in vecs if y)
+        n_neg = len(vecs) - n_pos
+        w_pos = len(vecs) / (2.0 * n_pos) if n_pos else 1.0
+        w_neg = len(vecs) / (2.0 * n_neg) if n_neg else 1.0
+
+        poids: Dict[int, float] = {}
+        biais = 0.0
+        rng = random.Random(seed)
+        ordre = list(range(len(vecs)))
+        t = 0
+        for _ in range(epochs):
+            rng.shuffle(ordre)
+            for k in ordre:
+                t += 1
+                eta = pas / (1.0 + pas * l2 * t)
+                vec, y = vecs[k]
+                z = biais + sum(v * poids.get(i, 0.0) for i, v in vec.items())
+                grad = (_sigmoide(z) - y) * (w_pos if y else w_neg)
+                for i, v in vec.items():
+                    poids[i] = poids.get(i, 0.0) * (1.0 - eta * l2) - eta * grad * v
+                biais -= eta * grad
+        poids = {i: w for i, w in poids.items() if abs(w) > 1e-6}
+        return cls(poids, biais, meta={"n_train": len(vecs), "n_pos": n_pos, "n_neg": n_neg})
+
+    # ── Persistance ────────────────────────────────────────────────────────────
+
+    def sauvegarder(self, path: str = MODEL_FILE) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump({
+                "n_features": N_FEATURES,
+                "biais": self.biais,
+                "seuil": self.seuil,
+                "meta": self.meta,
+                "poids": {str(i): round(w, 6) for i, w in self.poids.items()},
+            }, fh, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def charger(cls, path: str = MODEL_FILE) -> "RelevanceClassifier":
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        if data.get("n_features") != N_FEATURES:
+            raise ValueError("Modèle entraîné avec une autre taille de hachage — réentraîner")
+        return cls({int(i): w for i, w in data["poids"].items()},
+                   data["biais"], data["seuil"], data.get("meta"))
+
+
+_modele: Optional[RelevanceClassifier] = None
+_modele_mtime: Optional[float] = None
+_modele_lock = threading.Lock()
+
+
+def get_classifier() -> Optional[RelevanceClassifier]:
+    """
+    Modèle entraîné partagé, ou None s'il n'a jamais été entraîné.
+    Rechargé si le fichier a changé (réentraînement pendant que le dashboard tourne).
+    """
+    global _modele, _modele_mtime
+    try:
+        mtime = os.path.getmtime(MODEL_FILE)
+    except OSError:
+        return None
+    with _modele_lock:
+        if mtime != _modele_mtime:
+            _modele_mtime = mtime
+            try:
+                _modele = RelevanceClassifier.charger(MODEL_FILE)
+            except (OSError, ValueError, KeyError):
+                _modele = None
+        return _modele
+
+
+def texte_document(doc: Dict) -> str:
+    """Texte classé pour un document résultat (nom de fichier + contenu)."""
+    return " ".join(filter(None, [doc.get("nom_fichier", ""), doc.get("texte", "")]))
+
+
+# ── Données ────────────────────────────────────────────────────────────────────
+
+def charger_validations(data_dir: str = DATA_DIR) -> List[Exemple]:
+    """Documents validés à la main (dédoublonnés par URL, validation la plus récente)."""
+    par_url: Dict[str, Tuple[str, str, bool]] = {}
+    for path in sorted(glob.glob(os.path.join(data_dir, "*.json"))):
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                docs = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        if not isinstance(docs, list):
+            continue
+        for doc in docs:
+            if not isinstance(doc, dict) or doc.get("validation_status") != "validated_manual":
+                continue
+            texte = texte_document(doc)
+            if not texte.strip():
+                continue
+            cle = doc.get("source_url") or texte[:200]
+            date = doc.get("validated_at") or ""
+            if cle not in par_url or date >= par_url[cle][0]:
+                par_url[cle] = (date, texte, bool(doc.get("ia_pertinent")))
+    return [(texte, y) for _, texte, y in par_url.values()]
+
+
+def separer(exemples: List[Exemple], part_test: float, seed: int = 42) -> Tuple[List[Exemple], List[Exemple]]:
+    """Découpage stratifié apprentissage / test."""
+    rng = random.Random(seed)
+    train, test = [], []
+    for classe in (True, False):
+        groupe = [e for e in exemples if e[1] is classe]
+        rng.shuffle(groupe)
+        n_test = int(round(len(groupe) * part_test))
+        test.extend(groupe[:n_test])
+        train.extend(groupe[n_test:])
+    return train, test
+
+
+def seuil_pour_rappel(scores: Iterable[Tuple[float, bool]], rappel: float) -> float:
+    """Plus haut seuil gardant au moins `rappel` des positifs."""
+    positifs = sorted((p for p, y in scores if y), reverse=True)
+    if not positifs:
+        return 0.5
+    k = max(1, math.ceil(rappel * len(positifs)))
+    return positifs[k - 1]
+
+
+def evaluer(modele: RelevanceClassifier, exemples: List[Exemple]) -> Dict[str, float]:
+    """Rappel, précision et part d'appels LLM évités au seuil du modèle."""
+    vp = fp = fn = vn = 0
+    for texte, y in exemples:
+        garde = modele.garder(texte)
+        if garde and y:
+            vp += 1
+        elif garde:
+            fp += 1
+        elif y:
+            fn += 1
+        else:
+            vn += 1
+    n = len(exemples)
+    return {
+        "n": n,
+        "rappel": round(vp / (vp + fn), 3) if vp + fn else None,
+        "precision": round(vp / (vp + fp), 3) if vp + fp else None,
+        "appels_evites": round((vn + fn) / n, 3) if n else 0.0,
+        "vp": vp, "fp": fp, "fn": fn, "vn": vn,
+    }
+
+
+# ── CLI ────────────────────────────────────────────────────────────────────────
+
+def _cmd_train(args: argparse.Namespace) -> int:
+    exemples = charger_validations(args.data)
+    n_pos = sum(1 for _, y in exemples if y)
+    print(f"[CLASSIFIEUR] {len(exemples)} validations manuelles ({n_pos} pertinentes)")
+    if n_pos < 2 or len(exemples) - n_pos < 2:
+        print("[CLASSIFIEUR] Pas assez de validations des deux classes pour entraîner")
+        return 1
+
+    train, test = separer(exemples, args.test)
+    modele = RelevanceClassifier.entrainer(train, epochs=args.epochs)
+    if test:
+        # Jamais au-dessus de 0.5 : sur un petit jeu de test le seuil serait trop optimiste
+        modele.seuil = min(0.5, seuil_pour_rappel([(modele.proba(t), y) for t, y in test], args.rappel))
+        metriques = evaluer(modele, test)
+        print(f"[CLASSIFIEUR] Test ({len(test)} docs) : seuil {modele.seuil:.3f} | "
+              f"rappel {metriques['rappel']} | précision {metriques['precision']} | "
+              f"{int(metriques['appels_evites'] * 100)}% d'appels LLM évités")
+    else:
+        metriques = {}
+
+    # Modèle final sur toutes les validations, seuil choisi sur le jeu de test
+    final = RelevanceClassifier.entrainer(exemples, epochs=args.epochs)
+    final.seuil = modele.seuil
+    final.meta.update({
+        "entraine_le": datetime.now().isoformat(),
+        "rappel_cible": args.rappel,
+        "test": metriques,
+    })
+    final.sauvegarder(args.model)
+    print(f"[CLASSIFIEUR] Modèle sauvegardé : {args.model}")
+    return 0
+
+
+def _cmd_evaluate(args: argparse.Namespace) -> int:
+    modele = RelevanceClassifier.charger(args.model)
+    exemples = charger_validations(args.data)
+    if not exemples:
+        print("[CLASSIFIEUR] Aucune validation manuelle trouvée")
+        return 1
+    m = evaluer(modele, exemples)
+    print(f"[CLASSIFIEUR] {m['n']} docs | seuil {modele.seuil:.3f} | rappel {m['rappel']} | "
+          f"précision {m['precision']} | {int(m['appels_evites'] * 100)}% d'appels LLM évités "
+          f"(vp={m['vp']} fp={m['fp']} fn={m['fn']} vn={m['vn']})")
+    return 0
+
+
+def _cmd_predict(args: argparse.Namespace) -> int:
+    modele = RelevanceClassifier.charger(args.model)
+    with open(args.fichier, "r", encoding="utf-8") as fh:
+        texte = fh.read()
+    p = modele.proba(texte)
+    print(f"{p:.3f} ({'LLM' if p >= modele.seuil else 'écarté'}, seuil {modele.seuil:.3f})")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m ia.classifier",
+                                     description="Classifieur local de pertinence")
+    parser.add_argument("--model", default=MODEL_FILE, help="Fichier du modèle")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_train = sub.add_parser("train", help="Entraîner sur les validations manuelles")
+    p_train.add_argument("--data", default=DATA_DIR)
+    p_train.add_argument("--test", type=float, default=0.2, help="Part mise de côté pour l'évaluation")
+    p_train.add_argument("--rappel", type=float, default=0.95, help="Rappel cible du seuil")
+    p_train.add_argument("--epochs", type=int, default=15)
+    p_train.set_defaults(func=_cmd_train)
+
+    p_eval = sub.add_parser("evaluate", help="Évaluer le modèle sur les validations")
+    p_eval.add_argument("--data", default=DATA_DIR)
+    p_eval.set_defaults(func=_cmd_evaluate)
+
+    p_pred = sub.add_parser("predict", help="Probabilité de pertinence d'un fichier texte")
+    p_pred.add_argument("fichier")
+    p_pred.set_defaults(func=_cmd_predict)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
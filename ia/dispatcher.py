@@ -0,0 +1,251 @@
+"""
+Dispatcher LLM partagé : parallélisme borné, limites de débit, retries, keep-alive.
+
+Un dispatcher par backend (ollama, groq, openrouter, together, openai) :
+- un sémaphore limite les appels simultanés (OLLAMA_NUM_PARALLEL pour Ollama,
+  palier du compte pour les API cloud) ;
+- deux seaux à jetons limitent les requêtes/min et les tokens/min ;
+- les 429 / 5xx / erreurs réseau sont retentés avec backoff exponentiel + jitter
+  (l'en-tête Retry-After est respecté) ;
+- une requests.Session commune réutilise les connexions HTTP.
+
+Utilisé par dashboard/ia_analyzer, dashboard/api_analyzer et
+pdf_pipeline/ia_analyzer.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+log = logging.getLogger("ia.dispatcher")
+
+# Statuts HTTP retentés (rate limit + erreurs serveur transitoires)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Approximation grossière pour le français : ~4 caractères par token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str, max_output_tokens: int = 0) -> int:
+    """Estime le coût en tokens d'un appel (prompt + sortie max)."""
+    return len(text or "") // CHARS_PER_TOKEN + max_output_tokens
+
+
+def ollama_url(path: str = "/api/generate") -> str:
+    """URL Ollama ; OLLAMA_HOST permet de viser un autre hôte (ou un faux serveur)."""
+    host = os.environ.get("OLLAMA_HOST", "http://localhost:11434").rstrip("/")
+    if not host.startswith("http"):
+        host = "http://" + host
+    return host + path
+
+
+class TokenBucket:
+    """
+    Seau à jetons rechargé en continu (capacité par minute).
+    acquire(n) bloque jusqu'à ce que n jetons soient disponibles.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n: float = 1.0) -> float:
+        """Consomme n jetons ; retourne le temps d'attente subi (s)."""
+        n = min(float(n), self.capacity)  # une requête énorme passe seule
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return waited
+                manque = (n - self.tokens) / self.rate
+            time.sleep(manque)
+            waited += manque
+
+    def penalize(self, seconds: float) -> None:
+        """Vide le seau pour `seconds` (après un 429, le serveur a raison)."""
+        with self._lock:
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class LLMDispatcher:
+    """
+    Point d'entrée unique pour les appels HTTP vers un backend LLM.
+
+    Args:
+        name: Nom du backend (logs / stats).
+        parallelism: Nombre max d'appels simultanés.
+        rpm: Requêtes par minute (None = illimité).
+        tpm: Tokens par minute (None = illimité).
+        max_retries: Nombre de nouvelles tentatives sur 429/5xx/réseau.
+        backoff: Délai de base (s) du backoff exponentiel.
+        max_backoff: Plafond (s) d'une attente entre deux tentatives.
+    """
+
+    def __init__(self, name: str, parallelism: int = 1,
+                 rpm: Optional[float] = None, tpm: Optional[float] = None,
+                 max_retries: int = 4, backoff: float = 1.0, max_backoff: float = 60.0):
+        self.name = name
+        self.parallelism = max(1, int(parallelism))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._slots = threading.BoundedSemaphore(self.parallelism)
+        self._rpm = TokenBucket(rpm) if rpm else None
+        self._tpm = TokenBucket(tpm) if tpm else None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.parallelism)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, float] = {
+            "appels": 0, "retries": 0, "rate_limited": 0, "erreurs": 0,
+            "attente_debit_s": 0.0, "duree_s": 0.0,
+        }
+
+    # ── Appels ─────────────────────────────────────────────────────────────────
+
+    def post(self, url: str, json: Optional[Dict] = None,
+             headers: Optional[Dict[str, str]] = None, timeout: float = 60,
+             est_tokens: int = 0) -> requests.Response:
+        """
+        POST avec limitation de débit et retries.
+
+        Retourne la dernière Response (l'appelant traite les statuts non 200).
+        Lève requests.RequestException si le réseau échoue à chaque tentative.
+        """
+        last_exc: Optional[Exception] = None
+        response: Optional[requests.Response] = None
+
+        for attempt in range(self.max_retries + 1):
+            waited = 0.0
+            if self._rpm:
+                waited += self._rpm.acquire(1)
+            if self._tpm and est_tokens:
+                waited += self._tpm.acquire(est_tokens)
+
+            with self._slots:
+                t0 = time.time()
+                try:
+                    response = self.session.post(url, json=json, headers=headers, timeout=timeout)
+                    last_exc = None
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as exc:
+                    response, last_exc = None, exc
+                elapsed = time.time() - t0
+
+            self._count(appels=1, attente_debit_s=waited, duree_s=elapsed)
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                return response
+            if attempt >= self.max_retries:
+                break
+
+            delay = self._retry_delay(attempt, response)
+            if response is not None and response.status_code == 429:
+                self._count(rate_limited=1)
+                for bucket in (self._rpm, self._tpm):
+                    if bucket:
+                        bucket.penalize(delay)
+            self._count(retries=1)
+            log.info(
+                "[%s] %s — nouvelle tentative dans %.1fs (%d/%d)",
+                self.name,
+                f"HTTP {response.status_code}" if response is not None else last_exc.__class__.__name__,
+                delay, attempt + 1, self.max_retries,
+            )
+            time.sleep(delay)
+
+        self._count(erreurs=1)
+        if response is not None:
+            return response
+        raise last_exc  # type: ignore[misc]
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """Applique fn aux items avec autant de threads que de slots du backend."""
+        with ThreadPoolExecutor(max_workers=self.parallelism,
+                                thread_name_prefix=f"llm-{self.name}") as pool:
+            return list(pool.map(fn, items))
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    # ── Internes ───────────────────────────────────────────────────────────────
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    return min(self.max_backoff, float(retry_after)) + random.uniform(0, 0.5)
+                except ValueError:
+                    pass
+        # Backoff exponentiel avec "full jitter"
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt))) + 0.1
+
+    def _count(self, **deltas: float) -> None:
+        with self._stats_lock:
+            for key, val in deltas.items():
+                self.stats[key] += val
+
+
+# ── Registre par backend ───────────────────────────────────────────────────────
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    val = os.environ.get(name)
+    try:
+        return int(val) if val else default
+    except ValueError:
+        return default
+
+
+# Valeurs par défaut prudentes (palier gratuit Groq : 30 req/min, 6 000 tokens/min)
+_BACKEND_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "ollama": {"parallelism": _env_int("OLLAMA_NUM_PARALLEL", 1), "rpm": None, "tpm": None,
+               "max_retries": 2},
+    "groq": {"parallelism": _env_int("GROQ_PARALLEL", 4), "rpm": _env_int("GROQ_RPM", 30),
+             "tpm": _env_int("GROQ_TPM", 6000)},
+    "openrouter": {"parallelism": 4, "rpm": 20, "tpm": None},
+    "together": {"parallelism": 4, "rpm": 60, "tpm": None},
+    "openai": {"parallelism": 4, "rpm": 500, "tpm": 200000},
+}
+
+_dispatchers: Dict[str, LLMDispatcher] = {}
+_registry_lock = threading.Lock()
+
+
+def get_dispatcher(backend: str) -> LLMDispatcher:
+    """Retourne (en le créant si besoin) le dispatcher partagé d'un backend."""
+    with _registry_lock:
+        if backend not in _dispatchers:
+            params = _BACKEND_DEFAULTS.get(backend, {"parallelism": 1})
+            _dispatchers[backend] = LLMDispatcher(backend, **params)
+        return _dispatchers[backend]
+
+
+def configure_dispatcher(backend: str, **params: Any) -> LLMDispatcher:
+    """
+    Remplace le dispatcher d'un backend (ex. palier Groq payant, autre parallélisme).
+
+    Exemple : configure_dispatcher("groq", parallelism=8, rpm=1000, tpm=250000)
+    """
+    base = dict(_BACKEND_DEFAULTS.get(backend, {"parallelism": 1}))
+    base.update({k: v for k, v in params.items() if v is not None})
+    with _registry_lock:
+        _dispatchers[backend] = LLMDispatcher(backend, **base)
+        return _dispatchers[backend]
@@ -0,0 +1,328 @@
+"""
+Faux serveur LLM local pour tests et benchmarks IA sans GPU, réseau ni clé API.
+
+Imite :
+- Ollama : POST /api/generate, POST /api/chat, GET /api/tags ;
+- API compatibles OpenAI (Groq, OpenRouter, Together, OpenAI) :
+  POST .../chat/completions.
+
+Latence de base, débit en tokens/s (génération et évaluation du prompt),
+taux d'erreurs 500 et de 429 (avec Retry-After) sont configurables. Le
+verdict JSON est soit fixe, soit calculé par règles sur les mots-clés du
+document extrait du prompt (ia.cascade.verdict_mots_cles). Il porte à la fois les clés du
+dashboard (ia_pertinent, ia_score...) et celles de pdf_pipeline
+(pertinent, score...). Le cache KV d'Ollama est simulé : un message système
+identique au précédent pour le même modèle n'est pas réévalué.
+
+Pour viser le faux serveur :
+    OLLAMA_HOST=http://127.0.0.1:11500
+    GROQ_API_URL=http://127.0.0.1:11500/openai/v1/chat/completions
+    (OPENROUTER|TOGETHER|OPENAI)_API_URL=http://127.0.0.1:11500/v1/chat/completions
+
+CLI :
+    python -m ia.fake_llm_server --port 11500 --latency 0.2 --tps 40 --rate-limit 0.1
+GET /__stats renvoie les compteurs de requêtes.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+from ia.cascade import verdict_mots_cles
+from ia.dispatcher import CHARS_PER_TOKEN
+
+DEFAULT_MODELS = ["tinyllama:latest", "mistral:latest", "llama3-8b-8192", "llama-3.1-8b-instant"]
+
+
+class FakeLLMConfig:
+    """
+    Args:
+        latency: Latence fixe ajoutée à chaque requête (s).
+        tps: Tokens générés par seconde.
+        prompt_tps: Tokens de prompt évalués par seconde (0 = instantané).
+        error_rate: Probabilité d'une réponse 500.
+        rate_limit: Probabilité d'une réponse 429.
+        retry_after: Valeur de l'en-tête Retry-After des 429 (s).
+        verdict: "regles" (mots-clés) ou un dict JSON fixe renvoyé tel quel.
+        seuil: Score mots-clés à partir duquel la règle déclare le document pertinent.
+        output_tokens: Tokens « générés » par réponse (pour le temps de génération).
+        models: Modèles annoncés par /api/tags.
+        seed: Graine du tirage des erreurs (reproductibilité).
+    """
+
+    def __init__(self, latency: float = 0.05, tps: float = 0.0, prompt_tps: float = 0.0,
+                 error_rate: float = 0.0, rate_limit: float = 0.0, retry_after: float = 1.0,
+                 verdict: Any = "regles", seuil: int = 5, output_tokens: int = 60,
+                 models: Optional[list] = None, seed: Optional[int] = None):
+        self.latency = latency
+        self.tps = tps
+        self.prompt_tps = prompt_tps
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.verdict = verdict
+        self.seuil = seuil
+        self.output_tokens = output_tokens
+        self.models = models or list(DEFAULT_MODELS)
+        self.rng = random.Random(seed)
+
+
+class _Etat:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {"requetes": 0, "ok": 0, "erreurs_500": 0, "rate_limited": 0}
+        self.dernier_systeme: Dict[str, str] = {}
+
+
+# Le document est encadré par les consignes dans les prompts des analyseurs :
+# seul le texte entre le marqueur et la consigne finale est classé.
+_DEBUT_DOCUMENT = re.compile(r"(?:# Document à analyser|Document\s*:|Texte(?: à analyser)?\s*:(?:\s*---)?)\s*")
+_FIN_DOCUMENT = re.compile(r"\n(?:---|# IMPORTANT|JSON)")
+
+
+def _extraire_document(prompt: str) -> str:
+    debuts = list(_DEBUT_DOCUMENT.finditer(prompt))
+    if not debuts:
+        return prompt
+    reste = prompt[debuts[-1].end():]
+    fin = _FIN_DOCUMENT.search(reste)
+    return reste[:fin.start()] if fin else reste
+
+
+def _verdict_json(config: FakeLLMConfig, prompt: str) -> str:
+    if isinstance(config.verdict, dict):
+        return json.dumps(config.verdict, ensure_ascii=False)
+    v = verdict_mots_cles(_extraire_document(prompt), seuil=config.seuil)
+    return json.dumps({
+        "ia_pertinent": v["ia_pertinent"], "ia_score": v["ia_score"],
+        "ia_resume": v["ia_resume"], "ia_justification": v["ia_justification"],
+        "pertinent": v["ia_pertinent"], "score": v["ia_score"],
+        "resume": v["ia_resume"], "justification": v["ia_justification"],
+    }, ensure_ascii=False)
+
+
+def _tokens(texte: str) -> int:
+    return max(1, len(texte or "") // CHARS_PER_TOKEN)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "FakeLLM/1.0"
+    config: FakeLLMConfig
+    etat: _Etat
+
+    def log_message(self, format: str, *args: Any) -> None:  # silencieux
+        pass
+
+    # ── Routage ────────────────────────────────────────────────────────────────
+
+    def do_GET(self) -> None:
+        if self.path.startswith("/api/tags"):
+            self._json(200, {"models": [{"name": m} for m in self.config.models]})
+        elif self.path.startswith("/__stats"):
+            with self.etat.lock:
+                self._json(200, dict(self.etat.stats))
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        longueur = int(self.headers.get("Content-Length") or 0)
+        try:
+            corps = json.loads(self.rfile.read(longueur) or b"{}")
+        except ValueError:
+            self._json(400, {"error": "invalid json"})
+            return
+
+        with self.etat.lock:
+            self.etat.stats["requetes"] += 1
+            tirage = self.config.rng.random()
+        # Déchargement du modèle (keep_alive = 0) : pas de génération
+        if self.path.startswith("/api/generate") and "prompt" not in corps and not corps.get("messages"):
+            self._json(200, {"model": corps.get("model"), "done": True, "done_reason": "unload"})
+            return
+        if tirage < self.config.rate_limit:
+            with self.etat.lock:
+                self.etat.stats["rate_limited"] += 1
+            self._json(429, {"error": {"message": "Rate limit reached"}},
+                       {"Retry-After": str(self.config.retry_after)})
+            return
+        if tirage < self.config.rate_limit + self.config.error_rate:
+            with self.etat.lock:
+                self.etat.stats["erreurs_500"] += 1
+            self._json(500, {"error": "injected failure"})
+            return
+
+        if self.path.startswith("/api/generate"):
+            self._ollama_generate(corps)
+        elif self.path.startswith("/api/chat"):
+            self._ollama_chat(corps)
+        elif self.path.rstrip("/").endswith("/chat/completions"):
+            self._openai_chat(corps)
+        else:
+            self._json(404, {"error": "not found"})
+            return
+        with self.etat.lock:
+            self.etat.stats["ok"] += 1
+
+    # ── Endpoints ──────────────────────────────────────────────────────────────
+
+    def _simuler(self, prompt_tokens: int) -> Tuple[float, float]:
+        """Attend le temps simulé ; retourne (prompt_eval_s, eval_s)."""
+        prompt_s = prompt_tokens / self.config.prompt_tps if self.config.prompt_tps else 0.0
+        eval_s = self.config.output_tokens / self.config.tps if self.config.tps else 0.0
+        time.sleep(self.config.latency + prompt_s + eval_s)
+        return prompt_s, eval_s
+
+    def _ollama_durees(self, prompt_tokens: int, prompt_s: float, eval_s: float) -> Dict[str, Any]:
+        ns = 1e9
+        return {
+            "done": True,
+            "total_duration": int((self.config.latency + prompt_s + eval_s) * ns),
+            "load_duration": 0,
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prompt_s * ns),
+            "eval_count": self.config.output_tokens,
+            "eval_duration": int(eval_s * ns),
+        }
+
+    def _ollama_generate(self, corps: Dict[str, Any]) -> None:
+        prompt = corps.get("prompt", "")
+        prompt_tokens = _tokens(prompt)
+        prompt_s, eval_s = self._simuler(prompt_tokens)
+        self._json(200, {
+            "model": corps.get("model"),
+            "response": _verdict_json(self.config, prompt),
+            **self._ollama_durees(prompt_tokens, prompt_s, eval_s),
+        })
+
+    def _ollama_chat(self, corps: Dict[str, Any]) -> None:
+        messages = corps.get("messages") or []
+        systeme = "".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        utilisateur = "".join(m.get("content", "") for m in messages if m.get("role") != "system")
+        modele = corps.get("model", "")
+        with self.etat.lock:
+            # Préfixe système identique au précédent : déjà dans le cache KV
+            prefixe_en_cache = self.etat.dernier_systeme.get(modele) == systeme
+            self.etat.dernier_systeme[modele] = systeme
+        prompt_tokens = _tokens(utilisateur) + (0 if prefixe_en_cache else _tokens(systeme))
+        prompt_s, eval_s = self._simuler(prompt_tokens)
+        self._json(200, {
+            "model": modele,
+            "message": {"role": "assistant", "content": _verdict_json(self.config, utilisateur)},
+            **self._ollama_durees(prompt_tokens, prompt_s, eval_s),
+        })
+
+    def _openai_chat(self, corps: Dict[str, Any]) -> None:
+        if not (self.headers.get("Authorization") or "").startswith("Bearer "):
+            self._json(401, {"error": {"message": "missing api key"}})
+            return
+        messages = corps.get("messages") or []
+        prompt = "".join(m.get("content", "") for m in messages)
+        utilisateur = "".join(m.get("content", "") for m in messages if m.get("role") == "user")
+        prompt_tokens = _tokens(prompt)
+        self._simuler(prompt_tokens)
+        self._json(200, {
+            "id": "fake-" + str(int(time.time() * 1000)),
+            "object": "chat.completion",
+            "model": corps.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": _verdict_json(self.config, utilisateur)},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": self.config.output_tokens,
+                      "total_tokens": prompt_tokens + self.config.output_tokens},
+        })
+
+    def _json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for cle, val in (headers or {}).items():
+            self.send_header(cle, val)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeLLMServer:
+    """
+    Serveur lancé dans un thread du processus courant.
+
+        with FakeLLMServer(FakeLLMConfig(latency=0.1, rate_limit=0.2)) as srv:
+            os.environ["OLLAMA_HOST"] = srv.url
+    """
+
+    def __init__(self, config: Optional[FakeLLMConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeLLMConfig()
+        self.etat = _Etat()
+        handler = type("FakeLLMHandler", (_Handler,), {"config": self.config, "etat": self.etat})
+        self._httpd = ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True,
+                                        name="fake-llm-server")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def stats(self) -> Dict[str, int]:
+        with self.etat.lock:
+            return dict(self.etat.stats)
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m ia.fake_llm_server",
+                                     description="Faux serveur Ollama / OpenAI pour les benchmarks IA")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", type=float, default=0.05, help="Latence fixe (s)")
+    parser.add_argument("--tps", type=float, default=0.0, help="Tokens générés/s (0 = instantané)")
+    parser.add_argument("--prompt-tps", type=float, default=0.0, help="Tokens de prompt évalués/s")
+    parser.add_argument("--output-tokens", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Part de réponses 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Part de réponses 429")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--verdict", default="regles",
+                        help='"regles" ou verdict JSON fixe, ex. \'{"ia_pertinent": true, "ia_score": 8}\'')
+    parser.add_argument("--seuil", type=int, default=5, help="Score mots-clés de pertinence (verdict par règles)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    verdict = args.verdict if args.verdict == "regles" else json.loads(args.verdict)
+    config = FakeLLMConfig(latency=args.latency, tps=args.tps, prompt_tps=args.prompt_tps,
+                           error_rate=args.error_rate, rate_limit=args.rate_limit,
+                           retry_after=args.retry_after, verdict=verdict,
+                           seuil=args.seuil, output_tokens=args.output_tokens, seed=args.seed)
+    serveur = FakeLLMServer(config, args.host, args.port)
+    print(f"[FAKE-LLM] {serveur.url} — Ollama /api/generate, /api/chat ; OpenAI /v1/chat/completions")
+    try:
+        serveur._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Session Ollama « chaude » : modèle épinglé en mémoire, prompt système réutilisé.
+
+- keep_alive garde le modèle chargé entre deux appels espacés (sinon Ollama
+  le décharge après 5 min et le rechargement coûte plusieurs secondes) ;
+- warm() charge le modèle et évalue le prompt système en début de job ;
+- les appels passent par /api/chat avec un message système fixe placé en
+  tête : le préfixe est identique d'un document à l'autre, Ollama réutilise
+  son cache KV et n'évalue plus que le message utilisateur ;
+- les durées renvoyées par Ollama (chargement, évaluation du prompt,
+  génération) sont relevées pour chaque appel.
+
+Utilisé par dashboard/ia_analyzer et pdf_pipeline/ia_analyzer.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from ia.dispatcher import get_dispatcher, ollama_url
+
+log = logging.getLogger("ia.ollama_session")
+
+KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+
+_NS = 1e9
+
+
+class OllamaSession:
+    """
+    Args:
+        model: Modèle Ollama.
+        system: Prompt système fixe (identique pour tous les documents).
+        options: Options Ollama (temperature, num_ctx, num_predict...).
+        format: "json" pour forcer une sortie JSON, None sinon.
+        keep_alive: Durée de maintien en mémoire (ex. "30m", -1 = toujours).
+    """
+
+    def __init__(self, model: str, system: str, options: Optional[Dict[str, Any]] = None,
+                 format: Optional[str] = None, keep_alive: Any = KEEP_ALIVE):
+        self.model = model
+        self.system = system
+        self.options = dict(options or {})
+        self.format = format
+        self.keep_alive = keep_alive
+        self._lock = threading.Lock()
+        self.warm_s: Optional[float] = None
+        self.stats: Dict[str, float] = {
+            "appels": 0, "prompt_tokens": 0, "prompt_eval_s": 0.0,
+            "eval_tokens": 0, "eval_s": 0.0, "load_s": 0.0, "total_s": 0.0,
+        }
+
+    # ── Appels ─────────────────────────────────────────────────────────────────
+
+    def warm(self, timeout: float = 300) -> bool:
+        """Charge le modèle et évalue le prompt système (à appeler en début de job)."""
+        try:
+            _, metriques = self.chat("OK", timeout=timeout, num_predict=1, compter=False)
+        except Exception as exc:
+            log.warning("Préchauffage Ollama %s impossible : %s", self.model, exc)
+            return False
+        self.warm_s = metriques.get("total_s")
+        log.info("Ollama %s préchauffé en %.1fs (chargement %.1fs, prompt système %d tokens)",
+                 self.model, metriques.get("total_s", 0), metriques.get("load_s", 0),
+                 metriques.get("prompt_tokens", 0))
+        return True
+
+    def chat(self, user: str, timeout: float = 90, num_predict: Optional[int] = None,
+             compter: bool = True) -> Tuple[str, Dict[str, float]]:
+        """
+        Envoie un message utilisateur après le message système fixe.
+
+        Returns:
+            (contenu de la réponse, métriques de l'appel)
+
+        Raises:
+            requests.RequestException: erreur réseau après retries.
+            RuntimeError: statut HTTP non 200.
+        """
+        options = dict(self.options)
+        if num_predict is not None:
+            options["num_predict"] = num_predict
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.system},
+                {"role": "user", "content": user},
+            ],
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": options,
+        }
+        if self.format:
+            payload["format"] = self.format
+
+        response = get_dispatcher("ollama").post(ollama_url("/api/chat"), json=payload, timeout=timeout)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        data = response.json()
+        metriques = {
+            "prompt_tokens": data.get("prompt_eval_count", 0) or 0,
+            "prompt_eval_s": (data.get("prompt_eval_duration", 0) or 0) / _NS,
+            "eval_tokens": data.get("eval_count", 0) or 0,
+            "eval_s": (data.get("eval_duration", 0) or 0) / _NS,
+            "load_s": (data.get("load_duration", 0) or 0) / _NS,
+            "total_s": (data.get("total_duration", 0) or 0) / _NS,
+        }
+        if compter:
+            with self._lock:
+                self.stats["appels"] += 1
+                for cle, val in metriques.items():
+                    self.stats[cle] += val
+        return (data.get("message") or {}).get("content", ""), metriques
+
+    def release(self) -> None:
+        """Libère le modèle côté Ollama (keep_alive = 0)."""
+        try:
+            get_dispatcher("ollama").post(
+                ollama_url("/api/generate"),
+                json={"model": self.model, "keep_alive": 0}, timeout=10,
+            )
+        except Exception as exc:
+            log.debug("Libération Ollama %s : %s", self.model, exc)
+
+    # ── Stats ──────────────────────────────────────────────────────────────────
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self.stats)
+
+    def format_stats(self, debut: Optional[Dict[str, float]] = None) -> str:
+        st = self.snapshot()
+        if debut:
+            st = {k: v - debut.get(k, 0) for k, v in st.items()}
+        n = st["appels"] or 1
+        return (
+            f"Ollama {self.model} : {int(st['appels'])} appel(s) | prompt-eval "
+            f"{st['prompt_eval_s'] / n:.2f}s/appel ({int(st['prompt_tokens'] / n)} tokens)"
+            f" | génération {st['eval_s'] / n:.2f}s/appel | rechargements {st['load_s']:.1f}s"
+        )
+
+
+def format_appel(metriques: Dict[str, float]) -> str:
+    """Résumé d'un appel pour les logs."""
+    return (
+        f"prompt-eval {metriques['prompt_eval_s']:.2f}s ({int(metriques['prompt_tokens'])} tok)"
+        f", génération {metriques['eval_s']:.2f}s ({int(metriques['eval_tokens'])} tok)"
+        + (f", chargement {metriques['load_s']:.1f}s" if metriques["load_s"] > 0.5 else "")
+    )
+
+
+_sessions: Dict[Tuple[str, str, Optional[str]], OllamaSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(model: str, system: str, options: Optional[Dict[str, Any]] = None,
+                format: Optional[str] = None) -> OllamaSession:
+    """Session partagée par (modèle, prompt système, format) dans le processus."""
+    cle = (model, hashlib.sha1(system.encode("utf-8")).hexdigest(), format)
+    with _sessions_lock:
+        if cle not in _sessions:
+            _sessions[cle] = OllamaSession(model, system, options, format)
+        return _sessions[cle]
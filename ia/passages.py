@@ -0,0 +1,190 @@
+"""
+Sélection de passages avant appel LLM.
+
+Au lieu d'envoyer les N premiers caractères d'un document (en-têtes, sommaire,
+mentions légales), on repère les mots-clés prioritaires / secondaires et les
+signaux faibles, puis on assemble les fenêtres de texte les plus denses en
+occurrences dans un budget de caractères. Le début du document (titre, date)
+est conservé en tête d'extrait.
+
+Utilisé par dashboard/ia_analyzer, dashboard/api_analyzer et
+pdf_pipeline/ia_analyzer.
+"""
+
+import bisect
+import hashlib
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from config.config_loader import SIGNAUX_FAIBLES, get_mots_cles_courants
+
+# Poids d'une occurrence selon sa catégorie
+POIDS = {"prioritaires": 3, "secondaires": 2, "signaux": 1}
+
+SEPARATEUR = "\n[...]\n"
+VERSION = "v2"  # à incrémenter si l'algorithme change (invalide le cache IA)
+
+# Fenêtre minimale (caractères) qui vaut encore un séparateur dans l'extrait
+MIN_FENETRE = 80
+
+
+def _charger_mots_cles(mots_cles: Optional[Dict[str, List[str]]]) -> Dict[str, List[str]]:
+    if mots_cles is None:
+        mots_cles = get_mots_cles_courants()
+    return {
+        "prioritaires": list(mots_cles.get("prioritaires", [])),
+        "secondaires": list(mots_cles.get("secondaires", [])),
+        "signaux": [m for mots in SIGNAUX_FAIBLES.values() for m in mots],
+    }
+
+
+@lru_cache(maxsize=32)
+def _regex(mots: Tuple[str, ...]) -> Optional["re.Pattern"]:
+    mots = tuple(m for m in mots if m.strip())
+    if not mots:
+        return None
+    # Mots entiers : "PAC" ne doit pas matcher "espace"
+    alternatives = "|".join(re.escape(m) for m in sorted(mots, key=len, reverse=True))
+    return re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)", re.IGNORECASE)
+
+
+def trouver_occurrences(texte: str, mots_cles: Optional[Dict[str, List[str]]] = None) -> List[Tuple[int, int]]:
+    """Positions (début, poids) des mots-clés dans le texte, triées."""
+    hits = []
+    for categorie, mots in _charger_mots_cles(mots_cles).items():
+        pattern = _regex(tuple(mots))
+        if pattern is None:
+            continue
+        poids = POIDS[categorie]
+        hits.extend((m.start(), poids) for m in pattern.finditer(texte))
+    hits.sort()
+    return hits
+
+
+def politique(max_chars: int, mots_cles: Optional[Dict[str, List[str]]] = None) -> str:
+    """Identifiant de la politique de sélection (pour la clé du cache IA)."""
+    mots = _charger_mots_cles(mots_cles)
+    empreinte = hashlib.sha1(repr(sorted(mots.items())).encode("utf-8")).hexdigest()[:8]
+    return f"kw-{VERSION}:{max_chars}:{empreinte}"
+
+
+def _borner(texte: str, debut: int, fin: int) -> Tuple[int, int]:
+    """Recale une fenêtre sur des espaces pour ne pas couper les mots."""
+    if debut > 0:
+        esp = texte.rfind(" ", max(0, debut - 40), debut)
+        debut = esp + 1 if esp != -1 else debut
+    if fin < len(texte):
+        esp = texte.find(" ", fin, fin + 40)
+        fin = esp if esp != -1 else fin
+    return debut, fin
+
+
+def _rogner(texte: str, debut: int, fin: int) -> Tuple[int, int]:
+    """Recale une fenêtre réduite sur des espaces, vers l'intérieur."""
+    if debut > 0:
+        esp = texte.find(" ", debut, min(fin, debut + 40))
+        debut = esp + 1 if esp != -1 else debut
+    if fin < len(texte):
+        esp = texte.rfind(" ", max(debut, fin - 40), fin)
+        fin = esp if esp != -1 else fin
+    return debut, fin
+
+
+def _fusionner(fenetres: List[Tuple[int, int]]) -> List[List[int]]:
+    """Fenêtres dans l'ordre du document, celles qui se chevauchent fusionnées."""
+    fusion: List[List[int]] = []
+    for debut, fin in sorted(fenetres):
+        if fusion and debut <= fusion[-1][1]:
+            fusion[-1][1] = max(fusion[-1][1], fin)
+        else:
+            fusion.append([debut, fin])
+    return fusion
+
+
+def _longueur(fenetres: List[Tuple[int, int]], total: int) -> int:
+    """Longueur de l'extrait assemblé à partir de ces fenêtres (séparateurs compris)."""
+    fusion = _fusionner(fenetres)
+    if not fusion:
+        return 0
+    longueur = sum(f - d for d, f in fusion) + len(SEPARATEUR) * (len(fusion) - 1)
+    return longueur + (len(SEPARATEUR) if fusion[-1][1] < total else 0)
+
+
+def select_passages(texte: str, max_chars: int,
+                    mots_cles: Optional[Dict[str, List[str]]] = None,
+                    fenetre: int = 600, tete: int = 300) -> Tuple[str, str]:
+    """
+    Construit un extrait d'au plus ~max_chars caractères centré sur les mots-clés.
+
+    Args:
+        texte: Texte complet du document.
+        max_chars: Budget de l'extrait (≈ 4 caractères par token).
+        mots_cles: Dict prioritaires/secondaires (défaut : search_config.json).
+        fenetre: Largeur d'une fenêtre autour d'une occurrence.
+        tete: Caractères de début de document conservés (titre, date).
+
+    Returns:
+        (extrait, politique) — la politique identifie la sélection pour le cache.
+    """
+    mots_cles = _charger_mots_cles(mots_cles)  # une seule lecture de la config
+    policy = politique(max_chars, mots_cles)
+    texte = texte or ""
+    if len(texte) <= max_chars:
+        return texte, policy
+
+    # Petits budgets (contexte 1024 tokens) : fenêtres plus étroites, plus nombreuses
+    fenetre = min(fenetre, max(200, max_chars // 3))
+    tete = min(tete, max_chars // 5)
+
+    hits = trouver_occurrences(texte, mots_cles)
+    if not hits:
+        # Aucun mot-clé : comportement historique (début du document)
+        return texte[:max_chars] + SEPARATEUR, policy
+
+    positions = [p for p, _ in hits]
+    cumul = [0]
+    for _, poids in hits:
+        cumul.append(cumul[-1] + poids)
+
+    # Score d'une fenêtre centrée sur chaque occurrence = somme des poids couverts
+    demi = fenetre // 2
+    candidates = []
+    for pos, _ in hits:
+        debut, fin = max(0, pos - demi), min(len(texte), pos + demi)
+        i, j = bisect.bisect_left(positions, debut), bisect.bisect_left(positions, fin)
+        candidates.append((cumul[j] - cumul[i], debut, fin, pos))
+    candidates.sort(key=lambda c: (-c[0], c[1]))
+
+    retenues: List[Tuple[int, int]] = []
+    if tete > 0:
+        retenues.append(_borner(texte, 0, min(tete, len(texte))))
+    longueur = _longueur(retenues, len(texte))
+    for _, debut, fin, pos in candidates:
+        if max_chars - longueur < MIN_FENETRE:
+            break
+        debut, fin = _borner(texte, debut, fin)
+        essai = _longueur(retenues + [(debut, fin)], len(texte))
+        if essai <= longueur:
+            continue  # déjà couverte
+        if essai > max_chars:
+            # Fenêtre réduite autour de l'occurrence au budget restant
+            largeur = fin - debut - (essai - max_chars)
+            if largeur < MIN_FENETRE:
+                continue
+            debut = max(debut, min(pos - largeur // 2, fin - largeur))
+            debut, fin = _rogner(texte, debut, debut + largeur)
+            essai = _longueur(retenues + [(debut, fin)], len(texte))
+            if fin - debut < MIN_FENETRE or essai > max_chars:
+                continue
+        retenues.append((debut, fin))
+        longueur = essai
+
+    fusion = _fusionner(retenues)
+    if not fusion:
+        return texte[:max_chars] + SEPARATEUR, policy
+    morceaux = [texte[d:f].strip() for d, f in fusion]
+    extrait = SEPARATEUR.join(morceaux)
+    if fusion[-1][1] < len(texte):
+        extrait += SEPARATEUR
+    return extrait, policy
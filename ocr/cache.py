@@ -0,0 +1,137 @@
+"""
+Cache persistant du texte OCR, page par page.
+
+Clé = (hash SHA-256 du PDF, index de page, DPI, langue, profil Tesseract).
+Un PDF scanné déjà OCRisé — par pdf_pipeline.ocr ou dashboard/ocr_processor —
+n'est plus repassé dans Tesseract : relance, nouveau scoring ou changement de
+mots-clés relisent le texte en cache. Seules les pages jamais OCRisées (par
+exemple après un arrêt anticipé) coûtent encore.
+
+Contrairement au cache IA (quelques centaines d'octets par verdict, un JSON
+réécrit par lots), le texte OCR pèse plusieurs Ko par page et le cache est
+partagé par plusieurs processus : stockage SQLite (data/ocr_cache.sqlite),
+une ligne par page.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+log = logging.getLogger("ocr.cache")
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_FILE = os.environ.get("OCR_CACHE_FILE") or os.path.join(_ROOT, "data", "ocr_cache.sqlite")
+
+
+def hash_document(source: Union[str, bytes]) -> str:
+    """SHA-256 du contenu du PDF (chemin ou octets)."""
+    h = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        h.update(source)
+    else:
+        with open(source, "rb") as fh:
+            for bloc in iter(lambda: fh.read(1 << 20), b""):
+                h.update(bloc)
+    return h.hexdigest()
+
+
+class OCRCache:
+    """
+    Cache (document, page, dpi, langue, profil) → texte, thread-safe.
+
+    Args:
+        path: Base SQLite de stockage.
+    """
+
+    def __init__(self, path: str = CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = self._ouvrir()
+
+    def _ouvrir(self) -> Optional[sqlite3.Connection]:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " doc TEXT, page INTEGER, dpi INTEGER, lang TEXT, profil TEXT,"
+                " texte TEXT, cached_at TEXT, statut TEXT,"
+                " PRIMARY KEY (doc, page, dpi, lang, profil))"
+            )
+            colonnes = {ligne[1] for ligne in db.execute("PRAGMA table_info(pages)")}
+            if "statut" not in colonnes:  # base créée avant le tri des pages
+                db.execute("ALTER TABLE pages ADD COLUMN statut TEXT")
+            db.commit()
+            return db
+        except sqlite3.Error as exc:
+            log.warning("Cache OCR indisponible (%s) — OCR sans cache", exc)
+            return None
+
+    def get_pages(self, doc: str, dpi: int, lang: str, profil: str = "",
+                  pages: Optional[Iterable[int]] = None) -> Dict[int, Tuple[Optional[str], str]]:
+        """
+        Pages en cache d'un document : {index: (texte, statut)} ; texte None
+        pour une page ignorée car porteuse de texte natif, statut = catégorie
+        du tri (ocr.triage) ou "" si inconnue.
+        """
+        if self._db is None:
+            return {}
+        with self._lock:
+            try:
+                lignes = self._db.execute(
+                    "SELECT page, texte, statut FROM pages WHERE doc=? AND dpi=? AND lang=? AND profil=?",
+                    (doc, dpi, lang, profil),
+                ).fetchall()
+            except sqlite3.Error as exc:
+                log.warning("Lecture du cache OCR impossible : %s", exc)
+                return {}
+            trouvees = {page: (texte, statut or "") for page, texte, statut in lignes}
+            if pages is not None:
+                voulues = set(pages)
+                trouvees = {p: t for p, t in trouvees.items() if p in voulues}
+                self.misses += len(voulues) - len(trouvees)
+            self.hits += len(trouvees)
+            return trouvees
+
+    def put(self, doc: str, page: int, dpi: int, lang: str, texte: Optional[str], profil: str = "",
+            statut: str = "") -> None:
+        if self._db is None:
+            return
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (doc, page, dpi, lang, profil, texte, datetime.now().isoformat(), statut),
+                )
+                self._db.commit()
+            except sqlite3.Error as exc:
+                log.warning("Écriture du cache OCR impossible : %s", exc)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+_cache: Optional[OCRCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> OCRCache:
+    """Cache partagé par tous les appels OCR du processus."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = OCRCache()
+        return _cache
@@ -0,0 +1,406 @@
+"""
+Moteur OCR page par page, en flux.
+
+Au lieu de convertir tout le PDF en images puis d'enchaîner les pages :
+- chaque page est rendue seule, dans le processus qui l'OCRise (PyMuPDF,
+  à défaut pdf2image limité à une page) : la mémoire ne dépend plus du
+  nombre de pages mais du nombre de pages en vol ;
+- le rendu se fait directement en niveaux de gris, le prétraitement est
+  appliqué au tampon brut et l'image part vers Tesseract sans passer par
+  un PNG (tesserocr si installé, sinon PGM non compressé) ;
+- les pages sont OCRisées dans un pool de processus partagé (Tesseract est
+  limité à un thread par processus, le parallélisme vient des pages) ;
+- le nombre de pages soumises en même temps est plafonné ;
+- un tri préalable (ocr.triage) écarte les pages blanches et les photos
+  sans texte (sonde OCR à bas DPI) ;
+- dès que les mots-clés trouvés atteignent un seuil de preuves, les pages
+  restantes sont abandonnées ;
+- le texte de chaque page est conservé dans le cache OCR (ocr.cache) : une
+  page déjà OCRisée n'est jamais resoumise à Tesseract.
+
+Utilisé par dashboard/ocr_processor et pdf_pipeline/ocr.
+"""
+
+import atexit
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from ocr.cache import get_ocr_cache, hash_document
+from ocr.triage import IGNOREES, trier_page
+
+log = logging.getLogger("ocr.engine")
+
+# Processus OCR (OCR_WORKERS) ; un cœur laissé au serveur / au scraping
+WORKERS = int(os.environ.get("OCR_WORKERS", "0")) or max(1, (os.cpu_count() or 2) - 1)
+
+# Pages soumises simultanément par document (rendues ou en cours d'OCR)
+MAX_EN_VOL = WORKERS + 1
+
+# Somme des poids de mots-clés (ia.passages.POIDS) suffisante pour conclure :
+# ~4 mots-clés prioritaires, ou un mélange équivalent
+SEUIL_PREUVES = int(os.environ.get("OCR_SEUIL_PREUVES", "12"))
+
+# Texte natif au-delà duquel une page n'est pas OCRisée (ignorer_pages_texte)
+MIN_TEXTE_NATIF = 20
+
+
+# ── Côté processus OCR ─────────────────────────────────────────────────────────
+
+# Document ouvert par le processus (ou le thread, sans pool) : les pages d'un
+# même PDF se suivent, inutile de le rouvrir à chaque page
+_local = threading.local()
+
+
+def _init_worker() -> None:
+    # Tesseract lance un thread OpenMP par cœur : contre-productif à N processus
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _ouvrir(chemin: str):
+    """Document PyMuPDF courant (réouvert seulement si le fichier change)."""
+    st = os.stat(chemin)
+    cle = (chemin, st.st_mtime_ns, st.st_size)  # un fichier temporaire peut réutiliser un nom
+    if getattr(_local, "cle", None) != cle:
+        import fitz  # PyMuPDF
+        _fermer()
+        _local.doc = fitz.open(chemin)
+        _local.cle = cle
+    return _local.doc
+
+
+def _fermer() -> None:
+    if getattr(_local, "doc", None) is not None:
+        _local.doc.close()
+    _local.doc = _local.cle = None
+
+
+def _contraste(image, facteur: float = 2.0):
+    """
+    Équivalent d'ImageEnhance.Contrast en une seule passe : moyenne tirée de
+    l'histogramme, puis table de correspondance appliquée aux octets bruts.
+    """
+    histo = image.histogram()
+    total = sum(histo) or 1
+    moyenne = int(sum(i * n for i, n in enumerate(histo)) / total + 0.5)
+    lut = [min(255, max(0, int(moyenne + facteur * (i - moyenne) + 0.5))) for i in range(256)]
+    return image.point(lut)
+
+
+def _rendre_page(chemin: str, index: int, dpi: int, nettete: bool = False):
+    """
+    Page rendue directement en niveaux de gris et contrastée (image PIL « L »).
+
+    Le pixmap est produit en GRAY par PyMuPDF et lu sans copie (samples_mv) :
+    ni encodage PNG ni décodage, ni conversion RGB → gris côté PIL.
+    """
+    from PIL import Image, ImageFilter
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        from pdf2image import convert_from_path
+        brute = convert_from_path(chemin, dpi=dpi, first_page=index + 1, last_page=index + 1,
+                                  grayscale=True)[0]
+        pix = None
+    else:
+        pix = _ouvrir(chemin)[index].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+        samples = getattr(pix, "samples_mv", None) or pix.samples
+        brute = Image.frombuffer("L", (pix.width, pix.height), samples, "raw", "L", pix.stride, 1)
+    image = _contraste(brute)
+    del brute, pix  # le tampon du pixmap n'est plus référencé
+    if nettete:
+        image = image.filter(ImageFilter.SHARPEN)
+    return image
+
+
+def _api_tesserocr(lang: str, config: str):
+    """
+    API Tesseract native du processus (tesserocr), None si indisponible ou si
+    la config utilise des options que seul le binaire tesseract comprend.
+    """
+    options = dict(re.findall(r"--(psm|oem)\s+(\d+)", config))
+    variables = re.findall(r"-c\s+(\w+)=(\S+)", config)
+    reste = re.sub(r"--(?:psm|oem)\s+\d+|-c\s+\w+=\S+", "", config).strip()
+    if reste:
+        return None
+    cle = (lang, config)
+    apis = getattr(_local, "tesseract", None)
+    if apis is None:
+        apis = _local.tesseract = {}
+    if cle not in apis:
+        try:
+            import tesserocr
+        except ImportError:
+            apis[cle] = None
+        else:
+            api = tesserocr.PyTessBaseAPI(
+                lang=lang,
+                psm=int(options.get("psm", tesserocr.PSM.AUTO)),
+                oem=int(options.get("oem", tesserocr.OEM.DEFAULT)),
+            )
+            for nom, valeur in variables:
+                api.SetVariable(nom, valeur)
+            apis[cle] = api
+    return apis[cle]
+
+
+def _tesseract(image, lang: str, config: str) -> str:
+    """OCR d'une image « L » en passant le tampon brut au moteur."""
+    api = _api_tesserocr(lang, config)
+    if api is not None:
+        api.SetImageBytes(image.tobytes(), image.width, image.height, 1, image.width)
+        return api.GetUTF8Text()
+    import pytesseract
+    # pytesseract transmet l'image par fichier : PGM brut plutôt que PNG
+    # compressé, ni zlib à l'écriture ni à la lecture par Tesseract
+    image.format = "PPM"
+    return pytesseract.image_to_string(image, lang=lang, config=config)
+
+
+def _texte_natif(chemin: str, index: int) -> str:
+    try:
+        return _ouvrir(chemin)[index].get_text().strip()
+    except ImportError:
+        return ""
+
+
+def ocr_page(chemin: str, index: int, dpi: int = 300, lang: str = "fra",
+             config: str = "", nettete: bool = False,
+             ignorer_pages_texte: bool = False, triage: bool = True) -> Tuple[int, Optional[str], str]:
+    """
+    Rend et OCRise une page (exécuté dans un processus du pool).
+
+    Returns:
+        (index, texte, statut). statut vaut « texte_natif » (texte None) si la
+        page porte déjà du texte et que ignorer_pages_texte est demandé ;
+        sinon la catégorie du tri (ocr.triage), texte "" pour une page
+        blanche ou une photo sans texte, non soumise à l'OCR complet.
+    """
+    if ignorer_pages_texte and len(_texte_natif(chemin, index)) > MIN_TEXTE_NATIF:
+        return index, None, "texte_natif"
+    categorie = "texte"
+    if triage:
+        try:
+            sonde = lambda dpi_sonde: _tesseract(_rendre_page(chemin, index, dpi_sonde, False), lang, config)
+            categorie, dpi_page, _ = trier_page(_ouvrir(chemin)[index], dpi, sonde)
+        except ImportError:  # tri réservé au rendu PyMuPDF
+            dpi_page = dpi
+        if dpi_page is None:
+            return index, "", categorie
+        dpi = dpi_page
+    return index, _tesseract(_rendre_page(chemin, index, dpi, nettete), lang, config), categorie
+
+
+# ── Pool partagé ───────────────────────────────────────────────────────────────
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    """Pool de processus OCR partagé ; None si les processus sont indisponibles."""
+    global _pool
+    with _pool_lock:
+        if _pool is None and WORKERS > 1:
+            try:
+                _pool = ProcessPoolExecutor(max_workers=WORKERS, initializer=_init_worker)
+                atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+            except (OSError, NotImplementedError, ValueError) as exc:
+                log.warning("Pool OCR indisponible (%s) : OCR dans le processus courant", exc)
+        return _pool
+
+
+class _Immediat(Future):
+    """Future déjà résolue (OCR sans pool)."""
+
+    def __init__(self, fn: Callable, *args, **kwargs):
+        super().__init__()
+        try:
+            self.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            self.set_exception(exc)
+
+
+# ── Orchestration ──────────────────────────────────────────────────────────────
+
+def nombre_pages(chemin: str) -> int:
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        from pdf2image import pdfinfo_from_path
+        return int(pdfinfo_from_path(chemin)["Pages"])
+    with fitz.open(chemin) as doc:
+        return doc.page_count
+
+
+def score_preuves(texte: str, mots_cles: Optional[Dict[str, List[str]]] = None) -> int:
+    """Somme des poids des mots-clés trouvés (prioritaire 3, secondaire 2, signal 1)."""
+    from ia.passages import trouver_occurrences
+    return sum(poids for _, poids in trouver_occurrences(texte, mots_cles))
+
+
+def ocr_document(source: Union[str, bytes], dpi: int = 300, lang: str = "fra", config: str = "",
+                 nettete: bool = False, ignorer_pages_texte: bool = False,
+                 pages: Optional[List[int]] = None,
+                 seuil_preuves: Optional[int] = None,
+                 mots_cles: Optional[Dict[str, List[str]]] = None,
+                 max_en_vol: Optional[int] = None,
+                 on_page: Optional[Callable[[int, str], None]] = None,
+                 cache: bool = True, triage: bool = True) -> Dict:
+    """
+    OCRise un PDF page par page.
+
+    Args:
+        source: Chemin du PDF ou contenu binaire (écrit dans un fichier temporaire).
+        dpi, lang, config, nettete: Paramètres de rendu / Tesseract.
+        ignorer_pages_texte: Ne pas OCRiser les pages qui ont du texte natif.
+        pages: Indices de pages à traiter (défaut : toutes).
+        seuil_preuves: Score de mots-clés déclenchant l'arrêt anticipé. None
+            (défaut) : toutes les pages ; SEUIL_PREUVES pour un simple tri.
+        mots_cles: Mots-clés pour le score (défaut : configuration de la campagne).
+        max_en_vol: Pages soumises simultanément (défaut : MAX_EN_VOL).
+        on_page: Rappel (index, texte) à chaque page terminée.
+        cache: Lire / alimenter le cache OCR persistant.
+        triage: Trier les pages (ocr.triage) : pages blanches et photos
+            ignorées, DPI réduit pour les pages mixtes.
+
+    Returns:
+        dict avec pages ({index: texte}), nb_pages, pages_ocr, pages_cache,
+        pages_ignorees (texte natif), statuts ({catégorie: nombre}),
+        statut_pages ({index: catégorie}), arret_anticipe, score, duree_s.
+    """
+    t0 = time.time()
+    temporaire = None
+    if isinstance(source, (bytes, bytearray)):
+        fd, temporaire = tempfile.mkstemp(suffix=".pdf", prefix="ocr_")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(source)
+        chemin = temporaire
+    else:
+        chemin = source
+
+    pool = None
+    try:
+        nb_pages = nombre_pages(chemin)
+        a_faire = [i for i in (pages if pages is not None else range(nb_pages)) if 0 <= i < nb_pages]
+        pool = get_pool()
+        en_vol_max = max(1, max_en_vol or MAX_EN_VOL)
+        kwargs = dict(dpi=dpi, lang=lang, config=config, nettete=nettete,
+                      ignorer_pages_texte=ignorer_pages_texte, triage=triage)
+
+        textes: Dict[int, str] = {}
+        statuts: Dict[str, int] = {}
+        statut_pages: Dict[int, str] = {}
+        score = 0
+        arret = False
+        en_vol: set = set()
+
+        def recevoir(index: int, texte: Optional[str], statut: str) -> None:
+            nonlocal score, arret
+            statuts[statut] = statuts.get(statut, 0) + 1
+            statut_pages[index] = statut
+            if texte is None or statut in IGNOREES:
+                return
+            textes[index] = texte
+            if on_page:
+                on_page(index, texte)
+            if seuil_preuves is not None and texte.strip():
+                score += score_preuves(texte, mots_cles)
+                arret = arret or score >= seuil_preuves
+
+        # Pages déjà OCRisées (même document, DPI, langue et profil) : lues en
+        # cache dans l'ordre, elles comptent pour l'arrêt anticipé
+        ocr_cache = get_ocr_cache() if cache else None
+        doc = hash_document(source if temporaire else chemin) if ocr_cache else ""
+        profil = f"{config}|nettete={int(nettete)}|triage={int(triage)}"
+        en_cache = ocr_cache.get_pages(doc, dpi, lang, profil, a_faire) if ocr_cache else {}
+        if not ignorer_pages_texte:
+            en_cache = {i: v for i, v in en_cache.items() if v[0] is not None}
+        depuis_cache = 0
+        for index in a_faire:
+            if arret:
+                break
+            if index in en_cache:
+                texte, statut = en_cache[index]
+                recevoir(index, texte, statut or ("texte_natif" if texte is None else "texte"))
+                depuis_cache += 1
+        suivantes = iter([] if arret else [i for i in a_faire if i not in en_cache])
+
+        def soumettre() -> None:
+            while len(en_vol) < en_vol_max:
+                index = next(suivantes, None)
+                if index is None:
+                    return
+                if pool is not None:
+                    en_vol.add(pool.submit(ocr_page, chemin, index, **kwargs))
+                else:
+                    en_vol.add(_Immediat(ocr_page, chemin, index, **kwargs))
+                    return  # sans pool : une page à la fois, le seuil est vérifié entre deux
+
+        soumettre()
+        while en_vol:
+            faites, _ = wait(en_vol, return_when=FIRST_COMPLETED)
+            for future in faites:
+                en_vol.discard(future)
+                try:
+                    index, texte, statut = future.result()
+                except Exception as exc:
+                    log.warning("OCR page échouée (%s) : %s", os.path.basename(chemin), exc)
+                    continue
+                if ocr_cache:
+                    ocr_cache.put(doc, index, dpi, lang, texte, profil, statut)
+                recevoir(index, texte, statut)
+            if arret:
+                for future in en_vol:
+                    future.cancel()
+                break
+            soumettre()
+
+        return {
+            "pages": dict(sorted(textes.items())),
+            "nb_pages": nb_pages,
+            "pages_ocr": len(textes),
+            "pages_cache": depuis_cache,
+            "pages_ignorees": statuts.get("texte_natif", 0),
+            "statuts": statuts,
+            "statut_pages": dict(sorted(statut_pages.items())),
+            "arret_anticipe": arret and sum(statuts.values()) < len(a_faire),
+            "score": score,
+            "duree_s": round(time.time() - t0, 2),
+        }
+    finally:
+        if pool is None:
+            _fermer()
+        if temporaire:
+            try:
+                os.unlink(temporaire)
+            except OSError:
+                pass
+
+
+def assembler(resultat: Dict, entetes: bool = False) -> str:
+    """Texte du document, pages dans l'ordre (en-têtes « --- Page n --- » optionnels)."""
+    morceaux = []
+    for index, texte in resultat["pages"].items():
+        texte = texte.strip()
+        if texte:
+            morceaux.append(f"--- Page {index + 1} ---\n{texte}" if entetes else texte)
+    return "\n\n".join(morceaux)
+
+
+def format_stats(resultat: Dict) -> str:
+    n = resultat["pages_ocr"] or 1
+    return (
+        f"{resultat['pages_ocr']}/{resultat['nb_pages']} page(s) OCR en {resultat['duree_s']:.1f}s"
+        f" ({resultat['duree_s'] / n:.1f}s/page)"
+        + (f", {resultat['pages_cache']} depuis le cache" if resultat.get("pages_cache") else "")
+        + (f", {resultat['pages_ignorees']} page(s) texte ignorée(s)" if resultat["pages_ignorees"] else "")
+        + "".join(f", {n} page(s) {categorie}(s) ignorée(s)"
+                  for categorie, n in resultat.get("statuts", {}).items() if categorie in IGNOREES)
+        + (f", arrêt anticipé (score mots-clés {resultat['score']})" if resultat["arret_anticipe"] else "")
+    )
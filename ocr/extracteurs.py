@@ -0,0 +1,427 @@
+"""
+Chaîne d'extracteurs de texte PDF, ordonnée par coût mesuré.
+
+La couche texte est d'abord lue par l'extracteur le moins cher (PyMuPDF) ;
+un extracteur plus lourd (pdfplumber, mise en page et tableaux) n'est appelé
+que si le contenu des tableaux est demandé ou si le texte obtenu échoue aux
+contrôles de qualité (texte trop court, glyphes « (cid:NN) » non décodés,
+lettres espacées, caractères non imprimables).
+
+L'ordre suit le coût par page mesuré par le benchmark
+(data/extracteurs_couts.json), à défaut un coût nominal. De nouveaux
+extracteurs s'ajoutent avec enregistrer().
+
+Benchmark sur un corpus :
+    python -m ocr.extracteurs bench data/pdfs --pages 10 --reference pdfplumber
+
+Utilisé par scraper_core (ScraperCore._extraire_texte_document*).
+"""
+
+import argparse
+import importlib.util
+import io
+import itertools
+import json
+import logging
+import os
+import re
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+log = logging.getLogger("ocr.extracteurs")
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COUTS_FILE = os.path.join(_ROOT, "data", "extracteurs_couts.json")
+
+# Texte minimal (sur les pages lues) en dessous duquel on tente l'extracteur suivant
+MIN_CARACTERES = 100
+
+_CID = re.compile(r"\(cid:\d+\)")
+
+# Ponctuation et symboles courants des actes (tirets, guillemets, puces, montants)
+_PONCTUATION = ".,;:!?'’‘\"«»“”()[]{}-‐–—/\\&+*=<>#@_€$£%°§…•·"
+
+
+class Extracteur:
+    """
+    Args:
+        nom: Identifiant (clé du registre et du fichier de coûts).
+        pages: fn(contenu, max_pages, tableaux) → (nb_pages total, itérateur
+            du texte des pages).
+        cout: Coût nominal par page (s), remplacé par la mesure si disponible.
+        module: Module requis (extracteur ignoré s'il n'est pas installé).
+        tableaux: Sait restituer le contenu des tableaux.
+    """
+
+    def __init__(self, nom: str, pages: Callable, cout: float, module: str, tableaux: bool = False):
+        self.nom = nom
+        self.pages = pages
+        self.cout = cout
+        self.module = module
+        self.tableaux = tableaux
+
+    def disponible(self) -> bool:
+        return importlib.util.find_spec(self.module) is not None
+
+
+class _Pages:
+    """
+    Itérateur du texte des pages, propriétaire du document ouvert : close()
+    le ferme, y compris si aucune page n'a été lue (un générateur jamais
+    démarré n'exécute ni son `with` ni son `finally`).
+    """
+
+    def __init__(self, textes: Iterator[str], document) -> None:
+        self._textes = textes
+        self._document = document
+
+    def __iter__(self) -> "_Pages":
+        return self
+
+    def __next__(self) -> str:
+        try:
+            return next(self._textes)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        document, self._document = self._document, None
+        if document is None:
+            return
+        try:
+            fermer = getattr(self._textes, "close", None)
+            if fermer:
+                fermer()
+        finally:
+            document.close()
+
+    def __del__(self) -> None:
+        self.close()
+
+
+def _pymupdf(contenu: Union[str, bytes], max_pages: Optional[int], tableaux: bool = False):
+    import fitz  # PyMuPDF
+    doc = fitz.open(contenu) if isinstance(contenu, str) else fitz.open(stream=contenu, filetype="pdf")
+    try:
+        total = doc.page_count
+    except BaseException:
+        doc.close()
+        raise
+    n = total if max_pages is None else min(max_pages, total)
+    return total, _Pages((doc[i].get_text() for i in range(n)), doc)
+
+
+def _textes_pdfplumber(pdf, max_pages: Optional[int], tableaux: bool) -> Iterator[str]:
+    for page in pdf.pages[:max_pages]:
+        texte = page.extract_text() or ""
+        if tableaux:
+            for tableau in page.extract_tables() or []:
+                lignes = (" | ".join(c or "" for c in ligne) for ligne in tableau)
+                texte += "\n" + "\n".join(lignes)
+        yield texte
+        page.flush_cache()  # libère les objets de mise en page au fil des pages
+
+
+def _pdfplumber(contenu: Union[str, bytes], max_pages: Optional[int], tableaux: bool = False):
+    import pdfplumber
+    pdf = pdfplumber.open(contenu if isinstance(contenu, str) else io.BytesIO(contenu))
+    try:
+        total = len(pdf.pages)
+    except BaseException:
+        pdf.close()
+        raise
+    return total, _Pages(_textes_pdfplumber(pdf, max_pages, tableaux), pdf)
+
+
+_registre: Dict[str, Extracteur] = {}
+
+
+def enregistrer(extracteur: Extracteur) -> Extracteur:
+    """Ajoute (ou remplace) un extracteur de la chaîne."""
+    _registre[extracteur.nom] = extracteur
+    return extracteur
+
+
+enregistrer(Extracteur("pymupdf", _pymupdf, cout=0.005, module="fitz"))
+enregistrer(Extracteur("pdfplumber", _pdfplumber, cout=0.1, module="pdfplumber", tableaux=True))
+
+
+def _couts_mesures() -> Dict[str, float]:
+    try:
+        with open(COUTS_FILE, "r", encoding="utf-8") as fh:
+            return {nom: float(v["s_par_page"]) for nom, v in json.load(fh).items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def chaine(tableaux: bool = False) -> List[Extracteur]:
+    """Extracteurs disponibles, du moins cher au plus cher (tableaux d'abord si demandés)."""
+    couts = _couts_mesures()
+    dispo = [e for e in _registre.values() if e.disponible()]
+    return sorted(dispo, key=lambda e: (tableaux and not e.tableaux, couts.get(e.nom, e.cout)))
+
+
+def qualite(texte: str, nb_pages: int = 1, longueur: bool = True) -> Optional[str]:
+    """
+    Motif de rejet du texte extrait, None s'il est exploitable.
+    longueur=False ne juge que le décodage (une page de garde peut être courte).
+    """
+    propre = texte.strip()
+    if longueur and len(propre) < MIN_CARACTERES:
+        return f"{len(propre)} caractères"
+    if not propre:
+        return None
+    if len(_CID.findall(propre)) > 5 * max(1, nb_pages):
+        return "glyphes (cid:NN) non décodés"
+    imprimables = sum(1 for c in propre if c.isalnum() or c.isspace() or c in _PONCTUATION)
+    if imprimables / len(propre) < 0.8:
+        return "caractères non imprimables"
+    mots = propre.split()
+    if mots and sum(1 for m in mots if len(m) == 1 and m.isalpha()) / len(mots) > 0.4:
+        return "lettres espacées"
+    return None
+
+
+def extraire_pages(contenu: Union[str, bytes], max_pages: Optional[int] = 10, tableaux: bool = False,
+                   log_fn: Optional[Callable[[str, str], None]] = None) -> Dict:
+    """
+    Extrait le texte des premières pages avec la chaîne d'extracteurs.
+
+    Returns:
+        dict avec texte, pages (texte par page), nb_pages, extracteur (nom
+        retenu ou None), essais ([(nom, durée s, motif de rejet)]).
+    """
+    meilleur: Dict = {"texte": "", "pages": [], "nb_pages": 0, "extracteur": None, "essais": []}
+    for extracteur in chaine(tableaux):
+        t0 = time.time()
+        try:
+            nb_pages, iterateur = extracteur.pages(contenu, max_pages, tableaux)
+            pages = list(iterateur)
+        except Exception as exc:
+            meilleur["essais"].append((extracteur.nom, round(time.time() - t0, 3), f"erreur : {exc}"))
+            if log_fn:
+                log_fn(f"{extracteur.nom} échoué : {exc}", "warning")
+            continue
+        texte = "\n".join(pages).strip()
+        motif = qualite(texte, len(pages))
+        meilleur["essais"].append((extracteur.nom, round(time.time() - t0, 3), motif))
+        meilleur["nb_pages"] = meilleur["nb_pages"] or nb_pages
+        if len(texte) > len(meilleur["texte"]):
+            meilleur.update(texte=texte, pages=pages, extracteur=extracteur.nom)
+        if motif is None:
+            meilleur.update(texte=texte, pages=pages, extracteur=extracteur.nom)
+            break
+    return meilleur
+
+
+def flux_pages(contenu: Union[str, bytes], tableaux: bool = False, controle: int = 2,
+               log_fn: Optional[Callable[[str, str], None]] = None) -> Tuple[int, Iterator[str]]:
+    """
+    Texte des pages une à une, pour une lecture interrompable.
+
+    Les `controle` premières pages sont lues d'avance et vérifiées : si leur
+    texte est mal décodé, l'extracteur suivant de la chaîne prend le relais
+    depuis le début. L'itérateur peut être abandonné à tout moment (close()).
+
+    Returns:
+        (nombre total de pages, itérateur du texte des pages)
+    """
+    extracteurs = chaine(tableaux)
+    for rang, extracteur in enumerate(extracteurs):
+        try:
+            total, iterateur = extracteur.pages(contenu, None, tableaux)
+            tete = list(itertools.islice(iterateur, controle))
+        except Exception as exc:
+            if log_fn:
+                log_fn(f"{extracteur.nom} échoué : {exc}", "warning")
+            continue
+        motif = qualite("\n".join(tete), len(tete), longueur=False)
+        if motif and rang < len(extracteurs) - 1:
+            if log_fn:
+                log_fn(f"{extracteur.nom} écarté : {motif}", "warning")
+            iterateur.close()
+            continue
+
+        return total, _Pages(itertools.chain(tete, iterateur), iterateur)
+    return 0, (page for page in ())
+
+
+def lecture_incrementale(pages: Iterator[str],
+                         analyser: Callable[[str], Tuple[Dict[str, List[str]], List[str]]],
+                         seuil: int, pages_min: int = 10, pages_max: int = 40,
+                         sans_mot_cle: int = 5) -> Tuple[List[str], str]:
+    """
+    Lit les pages (flux_pages) jusqu'à pouvoir conclure.
+
+    `analyser(page)` rend les mots-clés trouvés par catégorie (prioritaires,
+    secondaires, budget) et les catégories de signaux de maturité. Arrêts :
+      - pertinent : score ≥ seuil, un signal, et un mot prioritaire ou un
+        score ≥ 2 × seuil — possible dès la première page ;
+      - sans mot-clé : `sans_mot_cle` pages consécutives vides, une fois
+        `pages_min` pages lues (un mot-clé en page 6 à 10 n'est pas manqué) ;
+      - peu dense : moins de 2 pages touchées sur les `sans_mot_cle`
+        dernières, une fois `pages_min` pages lues ;
+      - plafond de `pages_max` pages.
+    L'itérateur est fermé dans tous les cas.
+
+    Returns:
+        (texte des pages lues, motif d'arrêt)
+    """
+    textes: List[str] = []
+    trouves: Dict[str, set] = {"prioritaires": set(), "secondaires": set(), "budget": set()}
+    categories: set = set()
+    touchees: List[bool] = []
+    motif = "fin du document"
+    try:
+        for page in pages:
+            textes.append(page)
+            details, signaux = analyser(page)
+            for cat, mots in details.items():
+                trouves.setdefault(cat, set()).update(mots)
+            categories.update(signaux)
+            touchees.append(any(details.values()) or bool(signaux))
+
+            n = len(textes)
+            score = len(trouves["prioritaires"]) * 2 + len(trouves["secondaires"]) + len(trouves["budget"])
+            recentes = touchees[-sans_mot_cle:]
+            # Sûrement pertinent : un mot prioritaire au moins, ou un score
+            # très au-dessus du seuil (secondaires / budget seuls sinon trop faibles)
+            sur = trouves["prioritaires"] or score >= 2 * seuil
+            if score >= seuil and categories and sur:
+                motif = f"pertinent (score {score}, signaux {', '.join(sorted(categories))})"
+                break
+            if n >= pages_max:
+                motif = f"plafond de {pages_max} pages"
+                break
+            if n < pages_min:
+                continue
+            if len(recentes) >= sans_mot_cle and not any(recentes):
+                motif = f"{sans_mot_cle} page(s) sans mot-clé"
+                break
+            if sum(recentes) < 2:
+                motif = f"{n} pages, mots-clés peu denses"
+                break
+    finally:
+        fermer = getattr(pages, "close", None)
+        if fermer:
+            fermer()
+    return textes, motif
+
+
+# ── Benchmark ──────────────────────────────────────────────────────────────────
+
+def _fidelite(texte: str, reference: str) -> float:
+    """Similarité (0-1) des textes normalisés, ordre des mots compris."""
+    a = " ".join(texte.lower().split())
+    b = " ".join(reference.lower().split())
+    if not a and not b:
+        return 1.0
+    try:
+        from rapidfuzz import fuzz
+        return fuzz.ratio(a, b) / 100
+    except ImportError:
+        from difflib import SequenceMatcher
+        return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def _corpus(chemins: List[str]) -> Iterator[str]:
+    for chemin in chemins:
+        if os.path.isdir(chemin):
+            for racine, _, fichiers in os.walk(chemin):
+                for nom in sorted(fichiers):
+                    if nom.lower().endswith(".pdf"):
+                        yield os.path.join(racine, nom)
+        elif chemin.lower().endswith(".pdf"):
+            yield chemin
+
+
+def bench(chemins: List[str], max_pages: Optional[int] = 10, reference: str = "pdfplumber",
+          enregistrer_couts: bool = True) -> Dict[str, Dict[str, float]]:
+    """
+    Compare les extracteurs disponibles sur un corpus de PDF : temps par page,
+    caractères par page, fidélité au texte de l'extracteur de référence et
+    taux de rejet par les contrôles de qualité.
+    """
+    extracteurs = chaine()
+    mesures = {e.nom: {"pages": 0, "duree_s": 0.0, "caracteres": 0, "fidelite": 0.0,
+                       "documents": 0, "rejets": 0} for e in extracteurs}
+    for chemin in _corpus(chemins):
+        with open(chemin, "rb") as fh:
+            contenu = fh.read()
+        textes: Dict[str, str] = {}
+        for extracteur in extracteurs:
+            t0 = time.time()
+            try:
+                _, iterateur = extracteur.pages(contenu, max_pages)
+                pages = list(iterateur)
+            except Exception as exc:
+                log.warning("%s : %s échoué (%s)", os.path.basename(chemin), extracteur.nom, exc)
+                continue
+            m = mesures[extracteur.nom]
+            m["duree_s"] += time.time() - t0
+            m["pages"] += len(pages)
+            m["documents"] += 1
+            textes[extracteur.nom] = "\n".join(pages)
+            m["caracteres"] += len(textes[extracteur.nom])
+            m["rejets"] += qualite(textes[extracteur.nom], len(pages)) is not None
+        ref = textes.get(reference)
+        for nom, texte in textes.items():
+            mesures[nom]["fidelite"] += _fidelite(texte, ref) if ref is not None else 0.0
+
+    resultats = {}
+    for nom, m in mesures.items():
+        if not m["documents"]:
+            continue
+        resultats[nom] = {
+            "s_par_page": round(m["duree_s"] / max(1, m["pages"]), 5),
+            "caracteres_par_page": int(m["caracteres"] / max(1, m["pages"])),
+            "fidelite": round(m["fidelite"] / m["documents"], 3),
+            "taux_rejet": round(m["rejets"] / m["documents"], 3),
+            "documents": m["documents"],
+            "pages": m["pages"],
+        }
+    if enregistrer_couts and resultats:
+        os.makedirs(os.path.dirname(COUTS_FILE), exist_ok=True)
+        with open(COUTS_FILE, "w", encoding="utf-8") as fh:
+            json.dump(resultats, fh, ensure_ascii=False, indent=2)
+    return resultats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m ocr.extracteurs",
+                                     description="Chaîne d'extracteurs de texte PDF")
+    sub = parser.add_subparsers(dest="commande", required=True)
+    p_bench = sub.add_parser("bench", help="Compare les extracteurs sur un corpus")
+    p_bench.add_argument("chemins", nargs="+", help="PDF ou dossiers de PDF")
+    p_bench.add_argument("--pages", type=int, default=10, help="Pages lues par document (0 = toutes)")
+    p_bench.add_argument("--reference", default="pdfplumber", help="Extracteur de référence pour la fidélité")
+    p_bench.add_argument("--no-save", action="store_true", help=f"Ne pas écrire {os.path.relpath(COUTS_FILE, _ROOT)}")
+    p_ext = sub.add_parser("extract", help="Extrait un PDF avec la chaîne")
+    p_ext.add_argument("pdf")
+    p_ext.add_argument("--pages", type=int, default=10)
+    p_ext.add_argument("--tableaux", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.commande == "bench":
+        resultats = bench(args.chemins, args.pages or None, args.reference, not args.no_save)
+        if not resultats:
+            print("Aucun PDF exploitable.")
+            return 1
+        print(f"{'extracteur':<12} {'ms/page':>8} {'car./page':>10} {'fidélité':>9} {'rejets':>7} {'docs':>5}")
+        for nom, r in sorted(resultats.items(), key=lambda kv: kv[1]["s_par_page"]):
+            print(f"{nom:<12} {r['s_par_page'] * 1000:>8.1f} {r['caracteres_par_page']:>10} "
+                  f"{r['fidelite']:>9.3f} {r['taux_rejet']:>7.0%} {r['documents']:>5}")
+        return 0
+
+    with open(args.pdf, "rb") as fh:
+        res = extraire_pages(fh.read(), args.pages or None, args.tableaux)
+    for nom, duree, motif in res["essais"]:
+        print(f"[{nom}] {duree * 1000:.0f} ms — {motif or 'retenu'}")
+    print(res["texte"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Extraction de texte d'un PDF, texte natif et OCR des seules pages image.
+
+Le texte natif est lu en une ouverture : chaque page est classée (texte
+natif, image à OCRiser, vide) au moment où son texte est lu. Seules les
+pages image partent ensuite à l'OCR (ocr.engine, qui rouvre le fichier dans
+ses processus pour les rendre). Le résultat porte le statut de chaque page,
+y compris dans les documents mixtes (pages tapées + annexes scannées) dont
+les pages scannées étaient jusqu'ici perdues.
+
+Utilisé par pdf_pipeline/process et dashboard/ocr_processor.
+"""
+
+import io
+import logging
+from typing import Dict, List, Optional, Union
+
+from ocr.engine import MIN_TEXTE_NATIF, format_stats, ocr_document
+from ocr.triage import IGNOREES
+
+log = logging.getLogger("ocr.extraction")
+
+
+def _pages_pymupdf(source: Union[str, bytes], max_pages: Optional[int]) -> List[Dict]:
+    import fitz  # PyMuPDF
+    doc = fitz.open(source) if isinstance(source, str) else fitz.open(stream=source, filetype="pdf")
+    with doc:
+        if doc.needs_pass:
+            raise PermissionError("PDF protégé par mot de passe")
+        pages = []
+        for i, page in enumerate(doc):
+            if max_pages is not None and i >= max_pages:
+                break
+            pages.append({"texte": page.get_text().strip(), "images": bool(page.get_images())})
+        return pages
+
+
+def _pages_pdfplumber(source: Union[str, bytes], max_pages: Optional[int]) -> List[Dict]:
+    import pdfplumber
+    with pdfplumber.open(source if isinstance(source, str) else io.BytesIO(source)) as pdf:
+        return [
+            {"texte": (page.extract_text() or "").strip(), "images": bool(page.images)}
+            for page in pdf.pages[:max_pages]
+        ]
+
+
+def lire_pages(source: Union[str, bytes], max_pages: Optional[int] = None) -> List[Dict]:
+    """
+    Texte natif et présence d'images de chaque page, en une ouverture
+    (PyMuPDF, à défaut pdfplumber).
+
+    Raises:
+        PermissionError: PDF protégé.
+        Exception: PDF illisible.
+    """
+    try:
+        return _pages_pymupdf(source, max_pages)
+    except ImportError:
+        return _pages_pdfplumber(source, max_pages)
+
+
+def classer(page: Dict) -> str:
+    """Statut d'une page lue : « texte », « image » (à OCRiser) ou « vide »."""
+    if len(page["texte"]) > MIN_TEXTE_NATIF:
+        return "texte"
+    return "image" if page["images"] else "vide"
+
+
+def extraire_pdf(source: Union[str, bytes], ocr: bool = True, dpi: int = 300, lang: str = "fra",
+                 config: str = "", nettete: bool = False, entetes: bool = False,
+                 seuil_preuves: Optional[int] = None, nom: str = "") -> Dict:
+    """
+    Extrait le texte d'un PDF, OCR des seules pages image.
+
+    Args:
+        source: Chemin du PDF ou contenu binaire.
+        ocr: OCRiser les pages image (sinon elles restent « image »).
+        dpi, lang, config, nettete: Paramètres de ocr.engine.
+        seuil_preuves: Arrêt anticipé de l'OCR (ocr.engine.SEUIL_PREUVES), pour
+            un tri qui ne conserve pas le texte ; None = texte complet.
+        entetes: Préfixer les pages OCRisées par « --- Page n --- ».
+        nom: Nom du document pour les logs.
+
+    Returns:
+        dict avec statut (texte, ocr_ok, ocr_failed, vide, protégé, corrompu),
+        texte, pages ({numéro de page: statut}), nb_pages, ocr (résultat de
+        ocr.engine ou None), erreur.
+    """
+    resultat: Dict = {"statut": None, "texte": "", "pages": {}, "nb_pages": 0, "ocr": None, "erreur": None}
+    try:
+        pages = lire_pages(source)
+    except PermissionError as exc:
+        resultat.update(statut="protégé", erreur=str(exc))
+        return resultat
+    except Exception as exc:
+        statut = "protégé" if "password" in str(exc).lower() else "corrompu"
+        resultat.update(statut=statut, erreur=str(exc))
+        return resultat
+
+    statuts = {i: classer(p) for i, p in enumerate(pages)}
+    textes = {i: p["texte"] for i, p in enumerate(pages) if statuts[i] == "texte"}
+    a_ocr = [i for i, s in statuts.items() if s == "image"]
+    resultat["nb_pages"] = len(pages)
+
+    if a_ocr and ocr:
+        try:
+            res_ocr = ocr_document(source, dpi=dpi, lang=lang, config=config, nettete=nettete,
+                                   pages=a_ocr, seuil_preuves=seuil_preuves)
+        except Exception as exc:
+            log.warning("OCR impossible (%s) : %s", nom or "PDF", exc)
+            resultat["erreur"] = f"OCR error: {exc}"
+            res_ocr = None
+        if res_ocr is not None:
+            resultat["ocr"] = res_ocr
+            log.info("OCR %s : %s", nom or "PDF", format_stats(res_ocr))
+            for i in a_ocr:
+                texte = (res_ocr["pages"].get(i) or "").strip()
+                if texte:
+                    statuts[i] = "ocr"
+                    textes[i] = f"--- Page {i + 1} ---\n{texte}" if entetes else texte
+                elif i in res_ocr["statut_pages"]:
+                    # Page blanche / photo écartée par le tri, ou OCR sans résultat
+                    categorie = res_ocr["statut_pages"][i]
+                    statuts[i] = categorie if categorie in IGNOREES else "ocr_vide"
+                else:
+                    statuts[i] = "non_traitee"  # arrêt anticipé ou échec
+
+    resultat["texte"] = "\n\n".join(textes[i] for i in sorted(textes))
+    resultat["pages"] = {i + 1: s for i, s in statuts.items()}
+    if not pages:
+        resultat["statut"] = "vide"
+    elif any(s == "texte" for s in statuts.values()):
+        resultat["statut"] = "texte"
+    elif not a_ocr:
+        resultat["statut"] = "vide"
+    else:
+        resultat["statut"] = "ocr_ok" if resultat["texte"].strip() else "ocr_failed"
+        if resultat["statut"] == "ocr_failed" and not resultat["erreur"]:
+            resultat["erreur"] = "OCR vide ou non concluant"
+    return resultat
+
+
+def format_pages(pages: Dict[int, str]) -> str:
+    """Résumé des statuts de pages : « 12 texte, 3 ocr, 1 photo »."""
+    compte: Dict[str, int] = {}
+    for statut in pages.values():
+        compte[statut] = compte.get(statut, 0) + 1
+    return ", ".join(f"{n} {statut}" for statut, n in sorted(compte.items(), key=lambda kv: -kv[1]))
@@ -0,0 +1,110 @@
+"""
+Tri des pages avant OCR, sur des signaux peu coûteux.
+
+Chaque page est rendue en niveaux de gris à 72 DPI (quelques millisecondes)
+et classée d'après l'histogramme de ce rendu et la surface couverte par des
+images :
+- « blanche » : quasi aucun pixel d'encre, ou écart-type négligeable ;
+- « photo » : page dominée par des demi-teintes (photos, illustrations des
+  bulletins municipaux) — un scan de texte est bimodal, papier + encre ;
+- « mixte » : texte et images ;
+- « texte » : page de texte dense (actes, PV).
+
+Une page n'échappe à Tesseract que sur une preuve d'absence de texte : page
+blanche, ou page « photo » dont une sonde OCR à bas DPI ne lit presque rien.
+Les seuils de demi-teintes ne sont pas calibrés sur un corpus (un scan
+jauni ou tramé passe facilement pour une photo, et sa couverture par des
+images vaut ~1) : dans le doute, la page est OCRisée au DPI demandé.
+Utilisé par ocr.engine.
+"""
+
+import math
+import re
+from typing import Callable, Dict, Optional, Tuple
+
+# Niveaux de gris : en dessous = encre, entre les deux = demi-teinte
+ENCRE_MAX = 80
+DEMI_TEINTE_MAX = 190
+
+# Seuils de classement (parts de pixels du rendu 72 DPI)
+ENCRE_MIN = 0.002
+ECART_TYPE_MIN = 4.0
+DEMI_TEINTES_PHOTO = 0.45
+DEMI_TEINTES_MIXTE = 0.15
+COUVERTURE_PHOTO = 0.6
+
+# Sonde des pages « photo » : OCR à bas DPI, page ignorée sous SONDE_MOTS_MIN mots
+SONDE_DPI = 100
+SONDE_MOTS_MIN = 5
+
+IGNOREES = ("blanche", "photo")
+
+_MOT = re.compile(r"[^\W\d_]{3,}")
+
+
+def couverture_images(page) -> float:
+    """Part de la surface de la page couverte par des images (PyMuPDF)."""
+    surface = abs(page.rect) or 1.0
+    total = 0.0
+    for info in page.get_image_info():
+        boite = page.rect & info["bbox"]
+        if not boite.is_empty:
+            total += abs(boite)
+    return min(1.0, total / surface)
+
+
+def mesurer(page) -> Dict[str, float]:
+    """Signaux de tri d'une page PyMuPDF : couverture, écart-type, encre, demi-teintes."""
+    import fitz  # PyMuPDF
+    from PIL import Image
+
+    pix = page.get_pixmap(dpi=72, colorspace=fitz.csGRAY, alpha=False)
+    samples = getattr(pix, "samples_mv", None) or pix.samples
+    histo = Image.frombuffer("L", (pix.width, pix.height), samples, "raw", "L", pix.stride, 1).histogram()
+    total = sum(histo) or 1
+    moyenne = sum(i * n for i, n in enumerate(histo)) / total
+    variance = sum(n * (i - moyenne) ** 2 for i, n in enumerate(histo)) / total
+    return {
+        "couverture": round(couverture_images(page), 3),
+        "ecart_type": round(math.sqrt(variance), 1),
+        "encre": round(sum(histo[:ENCRE_MAX]) / total, 4),
+        "demi_teintes": round(sum(histo[ENCRE_MAX:DEMI_TEINTE_MAX]) / total, 4),
+    }
+
+
+def classer(mesures: Dict[str, float]) -> str:
+    if mesures["ecart_type"] < ECART_TYPE_MIN or (
+            mesures["encre"] < ENCRE_MIN and mesures["demi_teintes"] < ENCRE_MIN):
+        return "blanche"
+    if mesures["demi_teintes"] >= DEMI_TEINTES_PHOTO and mesures["couverture"] >= COUVERTURE_PHOTO:
+        return "photo"
+    if mesures["demi_teintes"] >= DEMI_TEINTES_MIXTE:
+        return "mixte"
+    return "texte"
+
+
+def decider(mesures: Dict[str, float], dpi: int,
+            sonde: Optional[Callable[[int], str]] = None) -> Tuple[str, Optional[int]]:
+    """
+    (catégorie, DPI d'OCR ou None = page non OCRisée) d'après les mesures.
+
+    sonde(dpi) OCRise la page au DPI donné : une page « photo » n'est ignorée
+    que si la sonde y lit moins de SONDE_MOTS_MIN mots ; sans sonde, elle est
+    OCRisée comme une page mixte.
+    """
+    categorie = classer(mesures)
+    if categorie == "blanche":
+        return categorie, None
+    if categorie == "photo":
+        if sonde is not None and len(_MOT.findall(sonde(min(dpi, SONDE_DPI)) or "")) < SONDE_MOTS_MIN:
+            return categorie, None
+        return "mixte", dpi
+    return categorie, dpi
+
+
+def trier_page(page, dpi: int,
+               sonde: Optional[Callable[[int], str]] = None) -> Tuple[str, Optional[int], Dict[str, float]]:
+    """(catégorie, DPI retenu ou None, mesures) d'une page PyMuPDF."""
+    mesures = mesurer(page)
+    categorie, dpi_page = decider(mesures, dpi, sonde)
+    return categorie, dpi_page, mesures
@@ -1,20 +1,22 @@
 import aiohttp
 import os
 import asyncio
+from crawler.fetch import MAX_OCTETS, format_octets, telecharger_fichier
 
-async def download_pdf(url, outdir):
+async def download_pdf(url, outdir, max_octets=MAX_OCTETS):
     os.makedirs(outdir, exist_ok=True)
     fname = os.path.basename(url.split('?')[0])
     fpath = os.path.join(outdir, fname)
     try:
         async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=30) as resp:
-                if resp.status == 200 and resp.content_type == 'application/pdf':
-                    with open(fpath, 'wb') as f:
-                        f.write(await resp.read())
-                    return fpath
-                else:
-                    return None
+            # Écrit par blocs sur disque ; abandon au-delà du plafond de taille
+            dl = await telecharger_fichier(session, url, fpath, max_octets=max_octets,
+                                           timeout=30, content_type='application/pdf')
+            if dl.ok:
+                return fpath
+            if dl.statut == 'trop_gros':
+                print(f"[SKIP] PDF trop volumineux ({format_octets(dl.octets_evites or dl.octets)}) : {url}")
+            return None
     except Exception as e:
         print(f"[ERROR] Download failed: {url} ({e})")
         return None
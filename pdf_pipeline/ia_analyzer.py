@@ -1,16 +1,36 @@
 import json
 import os
-import time
+import sys
+import threading
 import requests
 from typing import Dict, List, Optional
 from datetime import datetime
 
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from ia.dispatcher import get_dispatcher, ollama_url
+from ia.cache import get_verdict_cache, diff_stats, format_stats
+from ia.passages import select_passages
+from ia.chunking import analyser_par_morceaux
+from ia.cascade import Cascade, verdict_mots_cles
+from ia.classifier import get_classifier, texte_document
+from ia.ollama_session import OllamaSession, format_appel, get_session
+
 # Configuration Ollama
-OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_URL = ollama_url("/api/generate")
 MODEL_NAME = "mistral"  # Mistral-7B Instruct
 MAX_RETRIES = 3
 TIMEOUT = 90  # secondes - augmenté pour Mistral
-BATCH_SIZE = 2  # Petit batch pour M1
+BATCH_SIZE = 2  # Petit batch pour M1 (fréquence des logs de progression)
+CONTEXT_CHARS = 1000  # Extrait envoyé par appel (num_ctx 1024)
+CHUNKED_ANALYSIS = True  # Documents longs : analyse map-reduce par morceaux
+MAX_CHUNKS = 4  # Morceaux (les plus denses en mots-clés) envoyés par document
+# Cascade : modèle rapide ("tinyllama", ou "mots_cles" sans LLM) sur tous les
+# documents, MODEL_NAME seulement si le score rapide tombe dans CASCADE_BAND.
+CASCADE_FAST_MODEL = None
+CASCADE_BAND = (3, 7)
 
 # Paramètres d'optimisation Mistral
 MODEL_PARAMS = {
@@ -45,62 +65,103 @@ Réponds UNIQUEMENT au format JSON :
     "justification": "Pourquoi pertinent/non (20 mots max)"
 }"""
 
-def call_ollama(text: str, retries: int = MAX_RETRIES) -> Optional[Dict]:
+def get_ollama_session(model: str = MODEL_NAME) -> OllamaSession:
+    """Session chaude : SYSTEM_PROMPT en message système fixe, modèle maintenu chargé"""
+    return get_session(model, SYSTEM_PROMPT, options=MODEL_PARAMS, format="json")
+
+def call_ollama(text: str, retries: int = MAX_RETRIES, model: str = MODEL_NAME) -> Optional[Dict]:
     """Appel à Ollama avec retries"""
-    # Réduit la taille du contexte pour M1
-    # Réduit le contexte pour M1
-    text_tronque = text[:1000]
-    prompt = f"{SYSTEM_PROMPT}\n\nTexte à analyser :\n---\n{text_tronque}\n---\n\nRéponse JSON :"
+    # Contexte réduit pour M1 (num_ctx 1024) : extrait de 1000 caractères
+    # construit autour des mots-clés, pas le début du document
+    text_tronque, selection = select_passages(text, CONTEXT_CHARS)
+    # Le prompt système est porté par la session (préfixe réutilisé par Ollama)
+    session = get_ollama_session(model)
+    message = f"Texte à analyser :\n---\n{text_tronque}\n---\n\nRéponse JSON :"
+    
+    # Verdict déjà calculé pour ce texte avec ce prompt et ce modèle ?
+    cache = get_verdict_cache()
+    cache_key = cache.make_key(text, session.system + message.replace(text_tronque, ''),
+                               f"ollama:{model}:ctx{MODEL_PARAMS['num_ctx']}", selection)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        cached['ia_timestamp'] = datetime.utcnow().isoformat()
+        return cached
     
+    # Les erreurs HTTP/réseau sont déjà retentées (avec backoff) par le
+    # dispatcher : elles terminent l'appel. Seule une réponse JSON invalide
+    # est redemandée, immédiatement.
     for attempt in range(retries):
         try:
-            response = requests.post(
-                OLLAMA_URL,
-                json={
-                    "model": MODEL_NAME,
-                    "prompt": prompt,
-                    "stream": False,
-                    "format": "json",
-                    **MODEL_PARAMS
-                },
-                timeout=TIMEOUT
-            )
-            if response.status_code == 200:
-                result = response.json()
-                # Parse la réponse JSON de l'IA
-                try:
-                    ia_result = json.loads(result.get('response', '{}'))
-                    return {
-                        'ia_pertinent': ia_result.get('pertinent', False),
-                        'ia_score': ia_result.get('score', 0),
-                        'ia_resume': ia_result.get('resume', ''),
-                        'ia_justification': ia_result.get('justification', ''),
-                        'ia_timestamp': datetime.utcnow().isoformat()
-                    }
-                except json.JSONDecodeError:
-                    print(f"[IA] Erreur parsing JSON, tentative {attempt+1}/{retries}")
-                    continue
-            else:
-                print(f"[IA] HTTP {response.status_code}, tentative {attempt+1}/{retries}")
+            contenu, metriques = session.chat(message, timeout=TIMEOUT)
         except requests.exceptions.Timeout:
-            print(f"[IA] Timeout, tentative {attempt+1}/{retries}")
+            print("[IA] Timeout après les tentatives du dispatcher")
+            return None
         except Exception as e:
-            print(f"[IA] Erreur: {e}, tentative {attempt+1}/{retries}")
-        
-        if attempt < retries - 1:
-            time.sleep(2 ** attempt)  # Backoff exponentiel
+            print(f"[IA] Erreur: {e}")
+            return None
+        print(f"[IA] {model} — {format_appel(metriques)}")
+        # Parse la réponse JSON de l'IA
+        try:
+            ia_result = json.loads(contenu or '{}')
+        except json.JSONDecodeError:
+            print(f"[IA] Erreur parsing JSON, tentative {attempt+1}/{retries}")
+            continue
+        verdict = {
+            'ia_pertinent': ia_result.get('pertinent', False),
+            'ia_score': ia_result.get('score', 0),
+            'ia_resume': ia_result.get('resume', ''),
+            'ia_justification': ia_result.get('justification', ''),
+            'ia_timestamp': datetime.utcnow().isoformat()
+        }
+        cache.put(cache_key, verdict)
+        return verdict
     
     return None
 
-def analyze_pdf(pdf_path: str, json_path: str) -> bool:
-    """Analyse un PDF avec Ollama et enrichit le JSON"""
+def _analyze_with(text: str, model: str) -> Optional[Dict]:
+    """Appel unique, ou map-reduce par morceaux si le texte dépasse le contexte"""
+    if CHUNKED_ANALYSIS and len(text) > CONTEXT_CHARS:
+        return analyser_par_morceaux(
+            text, lambda morceau: call_ollama(morceau, model=model),
+            taille=CONTEXT_CHARS, max_morceaux=MAX_CHUNKS,
+            parallelisme=get_dispatcher("ollama").parallelism,
+        )
+    return call_ollama(text, model=model)
+
+_cascade: Optional[Cascade] = None
+_cascade_lock = threading.Lock()
+
+def get_cascade() -> Optional[Cascade]:
+    """Cascade rapide → MODEL_NAME si CASCADE_FAST_MODEL est défini"""
+    global _cascade
+    if not CASCADE_FAST_MODEL:
+        return None
+    with _cascade_lock:
+        if _cascade is None:
+            if CASCADE_FAST_MODEL == "mots_cles":
+                rapide = verdict_mots_cles
+            else:
+                rapide = lambda text: _analyze_with(text, CASCADE_FAST_MODEL)
+            _cascade = Cascade(rapide, lambda text: _analyze_with(text, MODEL_NAME),
+                               bande=CASCADE_BAND, noms=(CASCADE_FAST_MODEL, MODEL_NAME))
+        return _cascade
+
+def analyze_text(text: str) -> Optional[Dict]:
+    """Analyse un texte (cascade si configurée, sinon MODEL_NAME directement)"""
+    cascade = get_cascade()
+    if cascade is not None:
+        return cascade.analyse(text)
+    return _analyze_with(text, MODEL_NAME)
+
+def analyze_pdf(pdf_path: str, json_path: str, force: bool = False) -> bool:
+    """Analyse un PDF avec Ollama et enrichit le JSON (force=True : réanalyse même si déjà fait)"""
     try:
         # Lire le JSON existant
         with open(json_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
         # Vérifier si déjà analysé
-        if data.get('ia_analyse') or data.get('ia_pertinent') is not None:
+        if not force and (data.get('ia_analyse') or data.get('ia_pertinent') is not None):
             print(f"Déjà analysé : {pdf_path}")
             return True
         
@@ -132,49 +193,62 @@ def analyze_pdf(pdf_path: str, json_path: str) -> bool:
                 json.dump(data, f, ensure_ascii=False, indent=2)
             return True
         
-        # Appel à Ollama
-        result = call_ollama(text)
-        if result:
-            # Parser la réponse JSON
-            try:
-                ia_result = json.loads(result)
-                score = ia_result.get('score', 0)
-                
-                # Normaliser le score : si >10, le diviser par 10
-                if score > 10:
-                    score = score / 10
-                
-                # Validation stricte du score
-                if not isinstance(score, (int, float)) or score < 0 or score > 10:
-                    score = 0
-                
-                # Seuils plus stricts
-                ia_pertinent = ia_result.get('pertinent', False) and score >= 7
-                
-                # Correction automatique si incohérence
-                if ia_pertinent and score < 7:
-                    ia_pertinent = False
-                    ia_result['justification'] = f"Score trop bas ({score}/10)"
-                elif not ia_pertinent and score >= 7:
-                    score = 3  # Baisser le score si non pertinent
-                
-                data.update({
-                    'ia_pertinent': ia_pertinent,
-                    'ia_score': score,
-                    'ia_resume': ia_result.get('resume', ''),
-                    'ia_justification': ia_result.get('justification', ''),
-                    'ia_timestamp': datetime.now().isoformat()
-                })
-                
+        # Pré-filtre : classifieur local appris sur les validations manuelles
+        classifieur = get_classifier()
+        if classifieur is not None:
+            proba = classifieur.proba(texte_document(data))
+            if proba < classifieur.seuil:
+                print(f"Écarté par le classifieur ({proba:.2f}) : {pdf_path}")
+                data['ia_pertinent'] = False
+                data['ia_score'] = 0
+                data['ia_resume'] = 'Écarté par le classifieur local'
+                data['ia_justification'] = f'Probabilité {proba:.2f} < seuil {classifieur.seuil:.2f}'
+                data['ia_timestamp'] = datetime.now().isoformat()
                 with open(json_path, 'w', encoding='utf-8') as f:
                     json.dump(data, f, ensure_ascii=False, indent=2)
-                
-                print(f"✅ Analysé : {pdf_path} -> pertinent={ia_pertinent}, score={score}/10")
                 return True
-                
-            except json.JSONDecodeError as e:
-                print(f"❌ Erreur parsing JSON {pdf_path}: {e}")
-                return False
+        
+        # Appel à Ollama
+        result = analyze_text(text)
+        if result:
+            try:
+                score = float(result.get('ia_score', 0) or 0)
+            except (TypeError, ValueError):
+                score = 0
+            
+            # Normaliser le score : si >10, le diviser par 10
+            if score > 10:
+                score = score / 10
+            
+            # Validation stricte du score
+            if score < 0 or score > 10:
+                score = 0
+            
+            # Seuils plus stricts
+            justification = result.get('ia_justification', '')
+            ia_pertinent = bool(result.get('ia_pertinent', False)) and score >= 7
+            
+            # Correction automatique si incohérence
+            if result.get('ia_pertinent') and score < 7:
+                justification = f"Score trop bas ({score}/10)"
+            elif not ia_pertinent and score >= 7:
+                score = 3  # Baisser le score si non pertinent
+            
+            data.update({
+                'ia_pertinent': ia_pertinent,
+                'ia_score': score,
+                'ia_resume': result.get('ia_resume', ''),
+                'ia_justification': justification,
+                'ia_timestamp': datetime.now().isoformat()
+            })
+            if result.get('ia_passage'):
+                data['ia_passage'] = result['ia_passage']
+            
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            
+            print(f"✅ Analysé : {pdf_path} -> pertinent={ia_pertinent}, score={score}/10")
+            return True
         
         return False
         
@@ -208,18 +282,44 @@ def batch_analyze(base_dir: str = 'data/pdf_texts'):
     
     print(f"[BATCH] {len(eligible)} PDF éligibles pour analyse IA")
     
-    # Traitement par lots
-    analyzed = 0
-    for i, path in enumerate(eligible, 1):
-        if analyze_pdf(path):
-            analyzed += 1
-        
-        # Pause entre lots
-        if i % BATCH_SIZE == 0:
-            print(f"[BATCH] Pause... ({i}/{len(eligible)} traités)")
-            time.sleep(2)
+    # Traitement concurrent : le dispatcher borne le parallélisme (OLLAMA_NUM_PARALLEL)
+    # et gère les retries, plus besoin de pause fixe entre lots
+    dispatcher = get_dispatcher("ollama")
+    cache = get_verdict_cache()
+    cache_debut = cache.stats()
+    
+    # Modèle(s) chargé(s) et prompt système évalué avant le premier document
+    sessions = [get_ollama_session(MODEL_NAME)]
+    if CASCADE_FAST_MODEL and CASCADE_FAST_MODEL not in ("mots_cles", MODEL_NAME):
+        sessions.append(get_ollama_session(CASCADE_FAST_MODEL))
+    if eligible:
+        for session in sessions:
+            session.warm()
+    sessions_debut = [session.snapshot() for session in sessions]
+    progress = {'done': 0}
+    progress_lock = threading.Lock()
+    
+    def _analyze(path: str) -> bool:
+        ok = analyze_pdf(path[:-len('.json')], path)
+        with progress_lock:
+            progress['done'] += 1
+            if progress['done'] % BATCH_SIZE == 0:
+                print(f"[BATCH] {progress['done']}/{len(eligible)} traités")
+        return ok
+    
+    results = dispatcher.map(_analyze, eligible)
+    analyzed = sum(1 for ok in results if ok)
     
-    print(f"[BATCH] Terminé: {analyzed}/{len(eligible)} analysés avec succès")
+    stats = dispatcher.snapshot()
+    print(f"[BATCH] Terminé: {analyzed}/{len(eligible)} analysés avec succès "
+          f"({dispatcher.parallelism} en parallèle, {int(stats['retries'])} retries, "
+          f"{int(stats['rate_limited'])} rate-limited)")
+    cache.save()
+    print("[BATCH] " + format_stats(diff_stats(cache_debut, cache.stats())))
+    if get_cascade() is not None:
+        print("[BATCH] " + get_cascade().format_stats())
+    for session, debut in zip(sessions, sessions_debut):
+        print("[BATCH] " + session.format_stats(debut))
     
     # Générer index global
     build_ia_index(base_dir)
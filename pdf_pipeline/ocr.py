@@ -1,26 +1,8 @@
-import fitz  # PyMuPDF
-import pytesseract
-from PIL import Image, ImageOps, ImageEnhance
-import io
-
-def preprocess_image(img):
-    img = ImageOps.grayscale(img)
-    img = ImageEnhance.Contrast(img).enhance(2.0)
-    return img
+from ocr.engine import assembler, format_stats, ocr_document
 
 def ocr_pdf(filepath, lang='fra'):
-    doc = fitz.open(filepath)
-    ocr_text = []
-    for page in doc:
-        if page.get_text().strip():
-            continue
-        pix = page.get_pixmap(dpi=300)
-        img = Image.open(io.BytesIO(pix.tobytes()))
-        img = preprocess_image(img)
-        try:
-            text = pytesseract.image_to_string(img, lang=lang)
-        except Exception as e:
-            text = ''
-        if text.strip():
-            ocr_text.append(text.strip())
-    return '\n\n'.join(ocr_text)
+    # Pages sans texte natif uniquement, rendues une à une et OCRisées dans le
+    # pool partagé ; texte conservé, donc sans arrêt anticipé
+    resultat = ocr_document(filepath, dpi=300, lang=lang, ignorer_pages_texte=True)
+    print(f"[OCR] {filepath} : {format_stats(resultat)}")
+    return assembler(resultat)
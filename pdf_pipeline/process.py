@@ -3,9 +3,7 @@ import json
 import asyncio
 from datetime import datetime
 from pdf_pipeline.download import download_pdf
-from pdf_pipeline.pdf_type import detect_pdf_type
-from pdf_pipeline.extract_text import extract_pdf_text
-from pdf_pipeline.ocr import ocr_pdf
+from ocr.extraction import extraire_pdf, format_pages
 
 # Traite un PDF à partir des métadonnées du crawler
 async def process_pdf(meta, base_outdir):
@@ -25,24 +23,15 @@ async def process_pdf(meta, base_outdir):
         result['statut'] = 'download_failed'
         result['erreur'] = 'Téléchargement impossible'
     else:
-        pdf_type = detect_pdf_type(local_path)
-        result['statut'] = pdf_type
-        if pdf_type == 'texte':
-            result['texte'] = extract_pdf_text(local_path)
-        elif pdf_type == 'scanne':
-            try:
-                ocr_result = ocr_pdf(local_path)
-                if ocr_result.strip():
-                    result['texte'] = ocr_result
-                    result['statut'] = 'ocr_ok'
-                else:
-                    result['statut'] = 'ocr_failed'
-                    result['erreur'] = 'OCR vide ou non concluant'
-            except Exception as e:
-                result['statut'] = 'ocr_failed'
-                result['erreur'] = f'OCR error: {e}'
-        elif pdf_type in ('vide', 'protégé', 'corrompu'):
-            result['texte'] = ""
+        # Statut de chaque page, texte natif, OCR des seules pages image (y
+        # compris les annexes scannées d'un PDF texte) ; texte complet, sauvegardé
+        extraction = extraire_pdf(local_path, dpi=300, lang='fra', nom=meta['nom_fichier'])
+        result['statut'] = extraction['statut']
+        result['texte'] = extraction['texte']
+        result['pages'] = extraction['pages']
+        if extraction['erreur'] and extraction['statut'] != 'texte':
+            result['erreur'] = extraction['erreur']
+        print(f"[PDF] {meta['nom_fichier']} : {extraction['statut']} ({format_pages(extraction['pages'])})")
     # Sauvegarde individuelle
     save_dir = os.path.join(base_outdir, site)
     os.makedirs(save_dir, exist_ok=True)
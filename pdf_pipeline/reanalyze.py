@@ -6,6 +6,7 @@ import os
 import json
 from datetime import datetime
 from ia_analyzer import analyze_pdf
+from ia.cache import get_verdict_cache, format_stats
 
 def quick_reanalyze():
     """Réanalyse tous les documents avec les nouveaux critères stricts"""
@@ -16,6 +17,9 @@ def quick_reanalyze():
     reanalyzed = 0
     pertinent_found = 0
     
+    # Un prompt inchangé sur un texte inchangé est servi par le cache de verdicts
+    cache = get_verdict_cache()
+    
     print("🔍 Réanalyse avec filtrage strict...")
     print("=" * 50)
     
@@ -36,7 +40,7 @@ def quick_reanalyze():
                 # Réanalyser si : score élevé OU jamais analysé
                 if current_score >= 7 or current_pertinent is None:
                     print(f"🔄 Réanalyse : {filename}")
-                    if analyze_pdf(pdf_path, json_path):
+                    if analyze_pdf(pdf_path, json_path, force=True):
                         reanalyzed += 1
                         
                         # Vérifier le nouveau résultat
@@ -59,6 +63,8 @@ def quick_reanalyze():
     print(f"   Réanalysés : {reanalyzed}")
     print(f"   Pertinents trouvés : {pertinent_found}")
     print(f"   Taux de pertinence : {pertinent_found/total*100:.1f}%")
+    cache.save()
+    print(f"   {format_stats(cache.stats())}")
 
 if __name__ == "__main__":
     quick_reanalyze()
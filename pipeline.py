@@ -0,0 +1,207 @@
+"""
+Pipeline par étapes reliées par des files bornées (producteur / consommateur).
+
+Chaque étape possède son propre pool de threads et sa file d'entrée bornée :
+une étape lente freine l'amont (back-pressure) au lieu d'accumuler tout le
+travail en mémoire, et chaque élément atteint l'étape suivante dès qu'il est
+produit. Exemple (dashboard/app.run_analysis) :
+
+    découverte → scraping (fetch/extract/score) → IA → persistance
+
+Une fonction d'étape reçoit (item, emit) et appelle emit(sortie) zéro, une
+ou plusieurs fois. Les métriques (débit, temps actif, profondeur max de file)
+sont collectées par étape.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+log = logging.getLogger("pipeline")
+
+# Marqueur de fin de flux propagé d'une étape à la suivante
+_FIN = object()
+
+
+class StageMetrics:
+    """Compteurs d'une étape (thread-safe)."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy_s = 0.0
+        self.queue_max = 0
+        self.t_start: Optional[float] = None
+        self.t_end: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, busy_s: float, n_out: int, error: bool) -> None:
+        with self._lock:
+            self.items_in += 1
+            self.items_out += n_out
+            self.busy_s += busy_s
+            if error:
+                self.errors += 1
+
+    def observe_queue(self, depth: int) -> None:
+        with self._lock:
+            if depth > self.queue_max:
+                self.queue_max = depth
+
+    def as_dict(self) -> Dict[str, Any]:
+        wall = (self.t_end or time.time()) - (self.t_start or time.time())
+        return {
+            "etape": self.name,
+            "workers": self.workers,
+            "entrees": self.items_in,
+            "sorties": self.items_out,
+            "erreurs": self.errors,
+            "duree_s": round(wall, 2),
+            "actif_s": round(self.busy_s, 2),
+            "debit_par_min": round(self.items_in / wall * 60, 1) if wall > 0 else 0.0,
+            # Part du temps où les workers ont travaillé (1.0 = étape saturée)
+            "occupation": round(self.busy_s / (wall * self.workers), 2) if wall > 0 else 0.0,
+            "file_max": self.queue_max,
+        }
+
+
+class Stage:
+    """
+    Étape de pipeline.
+
+    Args:
+        name: Nom affiché dans les métriques.
+        fn: Fonction (item, emit) -> None.
+        workers: Nombre de threads consommant la file d'entrée.
+        queue_size: Taille max de la file d'entrée (0 = non bornée).
+    """
+
+    def __init__(self, name: str, fn: Callable[[Any, Callable[[Any], None]], None],
+                 workers: int = 1, queue_size: int = 50):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, int(workers))
+        self.queue_size = max(0, int(queue_size))
+        self.metrics = StageMetrics(name, self.workers)
+
+
+class Pipeline:
+    """
+    Enchaîne des Stage via des files bornées et les exécute en parallèle.
+
+    Args:
+        stages: Étapes dans l'ordre du flux.
+        on_error: Callback (nom_etape, item, exception) appelé si fn lève ;
+                  l'item est alors abandonné et le pipeline continue.
+    """
+
+    def __init__(self, stages: List[Stage],
+                 on_error: Optional[Callable[[str, Any, Exception], None]] = None):
+        if not stages:
+            raise ValueError("Pipeline sans étape")
+        self.stages = stages
+        self.on_error = on_error
+        self._queues = [queue.Queue(maxsize=s.queue_size) for s in stages]
+
+    def run(self, items: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        Injecte les items dans la première étape et attend la fin du flux.
+
+        Returns:
+            Liste des métriques par étape (voir StageMetrics.as_dict).
+        """
+        t0 = time.time()
+        for stage in self.stages:
+            stage.metrics.t_start = t0
+
+        threads: List[threading.Thread] = []
+        for idx, stage in enumerate(self.stages):
+            workers = [
+                threading.Thread(target=self._worker, args=(idx,), daemon=True,
+                                 name=f"{stage.name}-{w}")
+                for w in range(stage.workers)
+            ]
+            for th in workers:
+                th.start()
+            # Quand tous les workers d'une étape ont fini, on clôt l'étape suivante
+            closer = threading.Thread(target=self._close_after, args=(idx, workers),
+                                      daemon=True, name=f"{stage.name}-close")
+            closer.start()
+            threads.extend(workers)
+            threads.append(closer)
+
+        first_q, first = self._queues[0], self.stages[0]
+        for item in items:
+            first_q.put(item)
+            first.metrics.observe_queue(first_q.qsize())
+        for _ in range(first.workers):
+            first_q.put(_FIN)
+
+        for th in threads:
+            th.join()
+        return self.metrics()
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        return [s.metrics.as_dict() for s in self.stages]
+
+    # ── Internes ───────────────────────────────────────────────────────────────
+
+    def _worker(self, idx: int) -> None:
+        stage = self.stages[idx]
+        in_q = self._queues[idx]
+        out_q = self._queues[idx + 1] if idx + 1 < len(self.stages) else None
+        nxt = self.stages[idx + 1] if out_q is not None else None
+
+        while True:
+            item = in_q.get()
+            if item is _FIN:
+                return
+            produits = []
+
+            def emit(out: Any) -> None:
+                produits.append(out)
+                if out_q is not None:
+                    out_q.put(out)  # bloque si l'aval est saturé
+                    nxt.metrics.observe_queue(out_q.qsize())
+
+            t0 = time.time()
+            error = False
+            try:
+                stage.fn(item, emit)
+            except Exception as exc:
+                error = True
+                log.warning("Étape %s : erreur sur %r — %s", stage.name, item, exc)
+                if self.on_error:
+                    # Un callback qui lève ne doit pas tuer le worker : l'amont
+                    # resterait bloqué sur la file bornée
+                    try:
+                        self.on_error(stage.name, item, exc)
+                    except Exception as exc_cb:
+                        log.warning("Étape %s : callback on_error en échec — %s", stage.name, exc_cb)
+            stage.metrics.record(time.time() - t0, len(produits), error)
+
+    def _close_after(self, idx: int, workers: List[threading.Thread]) -> None:
+        for th in workers:
+            th.join()
+        self.stages[idx].metrics.t_end = time.time()
+        if idx + 1 < len(self.stages):
+            nxt_q = self._queues[idx + 1]
+            for _ in range(self.stages[idx + 1].workers):
+                nxt_q.put(_FIN)
+
+
+def format_metrics(metrics: List[Dict[str, Any]]) -> List[str]:
+    """Formate les métriques d'un run en lignes lisibles (logs / status_queue)."""
+    lignes = []
+    for m in metrics:
+        lignes.append(
+            f"{m['etape']:<12} | {m['workers']} worker(s) | {m['entrees']} → {m['sorties']}"
+            f" | {m['debit_par_min']}/min | occupation {int(m['occupation'] * 100)}%"
+            f" | file max {m['file_max']} | {m['erreurs']} erreur(s)"
+        )
+    return lignes
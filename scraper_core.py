@@ -11,7 +11,7 @@ import time
 import random
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from urllib.parse import urljoin, urlparse
 
 import hashlib
@@ -41,12 +41,15 @@ _ROOT = os.path.dirname(os.path.abspath(__file__))
 if _ROOT not in sys.path:
     sys.path.insert(0, _ROOT)
 
-from config.config_loader import (
-    get_mots_cles,
-    get_parametres,
-    get_zones,
-    get_seuil_ia,
-    load_config,
+from config.config_loader import resolve_config, SIGNAUX_FAIBLES
+from ocr.extracteurs import extraire_pages, flux_pages, lecture_incrementale
+from crawler.pagination import arret_pagination, hors_contenu, liens_liste, page_suivante, zone_liste
+from crawler.cms import collecter as collecter_cms, detecter_cms
+from crawler.recherche import detecter_formulaire, liens_resultats
+from crawler.concurrence import ControleurAIMD, SessionControlee
+from crawler.fetch import (
+    HEAD_WORKERS, MO, Accueil, CacheAccueils, Corps, Entetes, Partiel, est_document, format_octets,
+    get_stats as get_fetch_stats, lire_debut, sonder_entetes, telecharger, telecharger_partiel,
 )
 
 # ── Logging ────────────────────────────────────────────────────────────────────
@@ -69,28 +72,6 @@ _USER_AGENTS = [
 ]
 
 
-# ── Signaux faibles ────────────────────────────────────────────────────────────
-SIGNAUX_FAIBLES = {
-    "budgetaires": [
-        "budget primitif", "plan pluriannuel d'investissement", "ppi",
-        "programmation budgétaire", "autorisation de programme",
-        "crédit de paiement", "ligne budgétaire énergie",
-        "section d'investissement", "dotation", "enveloppe budgétaire",
-    ],
-    "reflexion": [
-        "étude de faisabilité", "diagnostic énergétique", "audit énergétique",
-        "bilan carbone", "transition énergétique", "plan climat", "pcaet",
-        "rénovation thermique", "sobriété énergétique", "décarbonation",
-        "bilan thermique", "dpe", "performance énergétique",
-    ],
-    "consultation": [
-        "appel à manifestation d'intérêt", "ami énergie", "concertation",
-        "marché de maîtrise d'œuvre", "mission d'étude", "prestataire énergie",
-        "appel d'offres", "dce", "cahier des charges", "consultation entreprise",
-        "marché public travaux",
-    ],
-}
-
 # Niveau de maturité : (label, emoji, bonus_score, délai_estimé)
 MATURITE_NIVEAUX = {
     "consultation": ("Consultation imminente", "🔴", 4, "< 3 mois"),
@@ -130,6 +111,9 @@ _DATE_PATTERNS = [
     re.compile(r'(\d{4})[/\-\.](\d{1,2})[/\-\.](\d{1,2})'),
 ]
 
+# Dates numériques des listes (15/03/2024, 15.03.2024)
+_DATE_NUMERIQUE = re.compile(r'\b(\d{1,2}[/.]\d{1,2}[/.]\d{4})\b')
+
 _MOIS_FR = {
     'janvier':1,'février':2,'mars':3,'avril':4,'mai':5,'juin':6,
     'juillet':7,'août':8,'septembre':9,'octobre':10,'novembre':11,'décembre':12,
@@ -138,34 +122,85 @@ _MOIS_FR = {
 
 class ScraperCore:
     """
-    Scraper générique piloté par search_config.json.
+    Scraper générique piloté par search_config.json (ou une config en mémoire).
     Aucun mot-clé n'est codé en dur dans cette classe.
     """
 
     # Extensions de documents supportées
     DOC_EXTENSIONS = [".pdf", ".doc", ".docx"]
 
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        config: Optional[Dict] = None,
+        overrides: Optional[Dict] = None,
+    ):
         """
         Args:
             config_path: Chemin alternatif vers search_config.json.
                          Si None, utilise config/search_config.json.
+            config: Configuration complète en mémoire (remplace le fichier).
+            overrides: Valeurs propres à ce run, appliquées par-dessus
+                       (ex. {"mode_recherche": "conseil"}).
+
+        La configuration est figée à la construction : deux instances peuvent
+        tourner en parallèle avec des modes différents sans réécrire le fichier.
         """
         self._config_path = config_path
+        self._config_source = config
+        self._overrides = overrides or {}
+        # Concurrence adaptative du mode turbo (dashboard/app.run_analysis) ; None = sans limite
+        self.controleur: Optional[ControleurAIMD] = None
         self._reload_config()
 
     # ── Chargement / rechargement de la config ─────────────────────────────────
 
     def _reload_config(self) -> None:
-        """Recharge la configuration depuis le fichier JSON."""
-        self.mots_cles = get_mots_cles(self._config_path)
-        self.parametres = get_parametres(self._config_path)
-        self.zones = get_zones(self._config_path)
+        """Reconstruit l'instantané de config (fichier ou mémoire + overrides)."""
+        cfg = resolve_config(self._config_source, self._config_path, self._overrides)
+        self._apply_config(cfg)
+
+    def _apply_config(self, cfg: Dict) -> None:
+        """Applique un instantané de configuration aux attributs du scraper."""
+        self.config = cfg
+        self.mots_cles = cfg["mots_cles"]
+        self.parametres = cfg["parametres_scraping"]
+        self.zones = cfg["zones_geographiques"]
         self.seuil_confiance = int(self.parametres.get("seuil_confiance_min", 2))
-        self.seuil_ia = get_seuil_ia(self._config_path)
+        self.seuil_ia = int(cfg.get("seuil_ia", 7))
         self.delai = float(self.parametres.get("delai_entre_requetes", 1.5))
         self.timeout = int(self.parametres.get("timeout", 30))
-        cfg = load_config(self._config_path)
+        # Lecture des PDF page par page avec arrêt anticipé (sinon 10 premières pages)
+        self.extraction_incrementale = bool(self.parametres.get("extraction_incrementale", True))
+        self.pages_pdf = int(self.parametres.get("pages_pdf", 10))
+        self.pages_pdf_max = int(self.parametres.get("pages_pdf_max", 40))
+        self.pages_sans_mot_cle = int(self.parametres.get("pages_sans_mot_cle", 5))
+        # Plafond de taille des documents téléchargés (Mo)
+        self.taille_max_document = int(float(self.parametres.get("taille_max_document_mo", 40)) * MO)
+        # Sonde Range des PDF (dates de métadonnées, 1re page des PDF linéarisés)
+        self.telechargement_partiel = bool(self.parametres.get("telechargement_partiel", True))
+        # Taille (HEAD) en dessous de laquelle un PDF est téléchargé sans sonde
+        self.sonde_range_octets = int(float(self.parametres.get("sonde_range_ko", 512)) * 1024)
+        # HEAD groupés des liens de documents d'une page avant tout GET
+        self.prefiltrage_head = bool(self.parametres.get("prefiltrage_head", True))
+        self.head_paralleles = int(self.parametres.get("head_paralleles", HEAD_WORKERS))
+        # Pagination des listes (plus récent d'abord) jusqu'à sortir de la fenêtre
+        self.pagination = bool(self.parametres.get("pagination", True))
+        self.pages_liste_max = int(self.parametres.get("pages_liste_max", 20))
+        self.pages_liste_sans_date = int(self.parametres.get("pages_liste_sans_date", 3))
+        # Pré-qualification turbo : page d'accueil lue par blocs de 64 Ko jusqu'au
+        # premier signal, au plus prequalification_ko (les liens /conseil, /deliber
+        # des menus et pieds de page arrivent souvent après 100 Ko de CSS / JS en ligne)
+        self.prequalification_octets = int(float(self.parametres.get("prequalification_ko", 512)) * 1024)
+        # Empreinte CMS et collecte par points d'accès structurés (API REST, flux)
+        self.adaptateurs_cms = bool(self.parametres.get("adaptateurs_cms", True))
+        # Collecte CMS exhaustive → pas d'exploration HTML générique (étapes 2 et 3) ;
+        # désactivé par défaut : les API ne voient pas les pages hors CMS (extensions, iframes)
+        self.cms_exclusif = bool(self.parametres.get("cms_exclusif", False))
+        # Mots prioritaires soumis au moteur de recherche du site
+        self.recherche_site = bool(self.parametres.get("recherche_site", True))
+        self.recherche_mots_max = int(self.parametres.get("recherche_mots_max", 3))
+        self.recherche_resultats_max = int(self.parametres.get("recherche_resultats_max", 20))
         # Fenêtre temporelle (jours) — défaut 90
         self.fenetre_jours = int(cfg.get("fenetre_temporelle", 90))
         # Signaux faibles actifs par catégorie
@@ -176,8 +211,9 @@ class ScraperCore:
         # Mode de recherche : "complet" | "conseil" | "pdf"
         self.mode_recherche = cfg.get("mode_recherche", "complet")
         log.info(
-            "Config chargée — campagne : %s | fenêtre : %dj | mots prioritaires : %s",
+            "Config chargée — campagne : %s | mode : %s | fenêtre : %dj | mots prioritaires : %s",
             cfg.get("nom_campagne", "?"),
+            self.mode_recherche,
             self.fenetre_jours,
             self.mots_cles["prioritaires"][:3],
         )
@@ -194,7 +230,7 @@ class ScraperCore:
         }
 
     def _make_session(self) -> requests.Session:
-        session = requests.Session()
+        session = SessionControlee(self.controleur) if self.controleur is not None else requests.Session()
         session.headers.update(self._get_headers())
         session.verify = False
         retry = Retry(
@@ -302,6 +338,43 @@ class ScraperCore:
             pass
         return None
 
+    def _dates_liste(self, soup: BeautifulSoup, url: str) -> List[datetime]:
+        """
+        Dates des éléments d'une page de liste, lues dans la zone de contenu
+        (hors en-tête, pied de page, menus) : balises <time>, à défaut dates
+        écrites dans le texte, plus les dates des URL des éléments liés.
+        """
+        zone = zone_liste(soup)
+        dates = []
+        for tag in zone.find_all("time"):
+            if hors_contenu(tag):
+                continue
+            parsed = self._parse_date_str(tag.get("datetime") or tag.get_text(strip=True))
+            if parsed:
+                dates.append(parsed)
+        if len(dates) < 2:
+            for bloc in zone.find_all(string=True):
+                if hors_contenu(bloc):
+                    continue
+                for pat in _DATE_PATTERNS + [_DATE_NUMERIQUE]:
+                    for m in pat.finditer(bloc):
+                        parsed = self._parse_date_match(m)
+                        if parsed:
+                            dates.append(parsed)
+        dates += [d for d in (self.extraire_date(url=u) for u in liens_liste(soup, url)) if d]
+        annee_max = datetime.utcnow().year + 1
+        return [d for d in dates if 1990 <= d.year <= annee_max]
+
+    def _arret_pagination(self, dates: List[datetime], page_no: int) -> Optional[str]:
+        """
+        Motif d'arrêt de la pagination d'une liste après la page `page_no`,
+        None pour lire la suivante (crawler.pagination.arret_pagination).
+        """
+        return arret_pagination(
+            dates, page_no, datetime.utcnow() - timedelta(days=self.fenetre_jours),
+            pages_max=self.pages_liste_max, pages_sans_date=self.pages_liste_sans_date,
+        )
+
     def est_dans_fenetre(self, date_pub: Optional[datetime]) -> bool:
         """Vérifie si une date est dans la fenêtre temporelle configurée."""
         if date_pub is None:
@@ -539,48 +612,74 @@ class ScraperCore:
     ]
 
     def prequalifier_commune(
-        self, url: str, commune: str, timeout: int = 2
+        self, url: str, commune: str, timeout: int = 2, accueils: Optional[CacheAccueils] = None
     ) -> Tuple[bool, str, float]:
         """
         Pré-qualification rapide d'une commune en mode turbo.
         Retourne (qualifiée, raison, durée_s).
         Critères : mots-clés dans title/body500, flux RSS, liens /conseil ou /deliber.
+
+        La page d'accueil est lue jusqu'au premier signal, au plus
+        prequalification_ko : tous les critères portent sur les octets lus.
+        Une commune qualifiée est gardée dans `accueils` : scraper_site reprend
+        ces octets, l'URL finale et le repli HTTPS → HTTP au lieu de refaire la connexion.
         """
         import time as _time
         t0 = _time.time()
         session = self._make_session()
-        try:
-            r = session.get(url, timeout=timeout, allow_redirects=True)
-            elapsed = _time.time() - t0
-            if r.status_code != 200:
-                return False, f"HTTP {r.status_code}", elapsed
-
-            html = r.text
-            # 1. Mots-clés dans <title> + 500 premiers chars du body
-            title_match = re.search(r"<title[^>]*>(.*?)</title>", html, re.IGNORECASE | re.DOTALL)
-            title = title_match.group(1).lower() if title_match else ""
-            body_start = html[:2000].lower()
-            kw_found = next(
-                (kw for kw in self._TURBO_KW if kw in title or kw in body_start), None
-            )
-            if kw_found:
-                return True, f"mot-clé '{kw_found}'", _time.time() - t0
 
-            # 2. Flux RSS
-            if re.search(r'type=["\']application/rss\+xml', html, re.IGNORECASE):
-                return True, "flux RSS détecté", _time.time() - t0
+        def suffisant(debut: bytes) -> bool:
+            return self._signal_prequalification(debut.decode("utf-8", errors="replace")) is not None
 
-            # 3. Liens vers /conseil ou /deliber dans le HTML
-            if self._TURBO_URL_PATTERNS.search(html):
-                return True, "lien /conseil ou /deliber détecté", _time.time() - t0
+        try:
+            try:
+                accueil = lire_debut(session, url, self.prequalification_octets, timeout=timeout,
+                                     suffisant=suffisant)
+            except requests.exceptions.Timeout:
+                raise
+            except (requests.exceptions.SSLError, requests.exceptions.ConnectionError):
+                if not url.startswith("https://"):
+                    raise
+                accueil = lire_debut(session, "http://" + url[len("https://"):],
+                                     self.prequalification_octets, timeout=timeout, suffisant=suffisant)
+                accueil.url, accueil.repli_http = url, True
+            elapsed = _time.time() - t0
+            if accueil.status_code != 200:
+                return False, f"HTTP {accueil.status_code}", elapsed
 
-            return False, "aucun signal", _time.time() - t0
+            qualifiee = self._signal_prequalification(accueil.texte())
+            if qualifiee is None:
+                return False, "aucun signal", _time.time() - t0
+            if accueils is not None:
+                accueils.garder(accueil)
+            return True, qualifiee, _time.time() - t0
 
         except requests.exceptions.Timeout:
             return False, f"timeout ({timeout}s)", _time.time() - t0
         except requests.RequestException as exc:
             return False, f"erreur réseau : {exc.__class__.__name__}", _time.time() - t0
 
+    def _signal_prequalification(self, html: str) -> Optional[str]:
+        """Raison de qualifier une commune d'après le début de sa page d'accueil, None sinon."""
+        # 1. Mots-clés dans <title> + début du body
+        title_match = re.search(r"<title[^>]*>(.*?)</title>", html, re.IGNORECASE | re.DOTALL)
+        title = title_match.group(1).lower() if title_match else ""
+        body_start = html[:2000].lower()
+        kw_found = next(
+            (kw for kw in self._TURBO_KW if kw in title or kw in body_start), None
+        )
+        if kw_found:
+            return f"mot-clé '{kw_found}'"
+
+        # 2. Flux RSS
+        if re.search(r'type=["\']application/rss\+xml', html, re.IGNORECASE):
+            return "flux RSS détecté"
+
+        # 3. Liens vers /conseil ou /deliber dans le HTML
+        if self._TURBO_URL_PATTERNS.search(html):
+            return "lien /conseil ou /deliber détecté"
+        return None
+
     # ── Scraping d'un site ─────────────────────────────────────────────────────
 
     def scraper_site(
@@ -589,14 +688,21 @@ class ScraperCore:
         commune: str,
         dept: Optional[str] = None,
         status_callback=None,
+        on_document=None,
+        accueils: Optional[CacheAccueils] = None,
     ) -> List[Dict]:
         """
         Scrape un site municipal avec priorisation des sources fraîches :
         1. Flux RSS  2. Actualités  3. Délibérations  4. Bulletins PDF  5. Accueil
         Filtre par fenêtre temporelle, détecte signaux faibles, calcule score composite.
         Logs diagnostics complets via status_callback.
+
+        on_document(doc) est appelé dès qu'un document est retenu, sans attendre
+        la fin du site : l'étape IA du pipeline peut démarrer immédiatement.
+
+        accueils : cache du run rempli par prequalifier_commune ; la page
+        d'accueil pré-qualifiée n'est pas téléchargée une seconde fois.
         """
-        self._reload_config()
         mode_recherche = self.mode_recherche  # "complet" | "conseil" | "pdf"
 
         def _log(msg: str, level: str = "info") -> None:
@@ -618,14 +724,71 @@ class ScraperCore:
             "docs_retenus": 0,
             "docs_ecartes": 0,
             "score_max": 0,
+            "octets_telecharges": 0,
+            "octets_evites": 0,
+            "docs_trop_gros": 0,
+            "docs_ecartes_head": 0,
+            "candidats_recherche": 0,
         }
 
         session = self._make_session()
         found: List[Dict] = []
+
+        def _retenir(doc: Dict) -> None:
+            found.append(doc)
+            if on_document:
+                on_document(doc)
+
         seen_urls: set = set()
         seen_hashes: set = set()
+        # HEAD du pré-filtrage, par URL de document (taille reprise par la sonde Range)
+        entetes_head: Dict[str, Entetes] = {}
         base_netloc = urlparse(url).netloc
 
+        def _traiter_pdf(pdf_url: str, rejets_head: Dict[str, str],
+                         date_connue: Optional[datetime] = None) -> None:
+            """Sonde, télécharge, analyse et retient un PDF (étape 4, documents du CMS)."""
+            seen_urls.add(pdf_url)
+            fname = os.path.basename(urlparse(pdf_url).path) or pdf_url
+            _log(f"   📎 PDF : {fname[:60]}")
+            bilan["pdfs_tentes"] += 1
+            if pdf_url in rejets_head:
+                _log(f"      ↳ ⏭️ {rejets_head[pdf_url]} (HEAD) — ignoré")
+                return
+            garder, partiel = self._sonder_pdf(pdf_url, session, _log, bilan, entetes_head.get(pdf_url))
+            if not garder:
+                return
+            texte, nb_pages, nb_chars = self._extraire_texte_document_verbose(
+                pdf_url, session, _log, bilan, partiel=partiel
+            )
+            if not texte:
+                bilan["pdfs_scannes"] += 1
+                return
+            bilan["pdfs_reussis"] += 1
+            analyse = self.analyser_texte(texte)
+            if not analyse["pertinent"]:
+                bilan["docs_ecartes"] += 1
+                return
+            date_pub = self.extraire_date(url=pdf_url, texte=texte) or date_connue
+            sf = self.analyser_signaux_faibles(texte)
+            sc = self.calculer_score_composite(analyse, sf, date_pub, "pdf")
+            doc = self._build_result(
+                fname, pdf_url, url, commune, dept, texte, analyse,
+                source_type="pdf",
+                date_pub=date_pub,
+                signaux_faibles=sf,
+                score_composite=sc,
+            )
+            _hash = hashlib.md5(texte[:500].encode()).hexdigest()
+            if _hash in seen_hashes:
+                _log(f"      ⏭️ Contenu dupliqué ignoré : {fname}")
+                return
+            seen_hashes.add(_hash)
+            _retenir(doc)
+            bilan["docs_retenus"] += 1
+            bilan["score_max"] = max(bilan["score_max"], sc["score_composite"])
+            _log(f"      ✅ Retenu | score={sc['score_composite']} | {sf['maturite_emoji']} {sf['maturite_label']}")
+
         # ── Étape 0 : Connexion page d'accueil ────────────────────────────────
         _log(f"🔍 [{commune}] Connexion → {url}")
 
@@ -671,32 +834,61 @@ class ScraperCore:
                 _log(f"   ❓ Erreur inconnue : {exc.__class__.__name__} — {str(exc)[:120]}", "warning")
                 return None
 
-        time.sleep(random.uniform(self.delai * 0.5, self.delai * 1.5))
-        response = _connecter(url)
-
-        # Fallback HTTP si HTTPS a échoué
-        if response is None and url.startswith("https://"):
-            http_url = "http://" + url[len("https://"):]
-            _log(f"   ⚠️ HTTPS échoué → tentative HTTP sur {http_url}", "warning")
-            response = _connecter(http_url)
-            if response is not None:
-                url = http_url  # utiliser l'URL HTTP pour la suite
+        accueil = accueils.prendre(url) if accueils is not None else None
+        html_accueil = self._reprendre_accueil(accueil, session, _log) if accueil is not None else None
+        if html_accueil is not None:
+            entetes_accueil = accueil.headers
+            if accueil.repli_http:
+                url = "http://" + url[len("https://"):]
                 base_netloc = urlparse(url).netloc
-
-        if response is None:
-            _log(f"   ❌ Impossible de joindre {commune} — site ignoré", "warning")
-            return []
+        else:
+            time.sleep(random.uniform(self.delai * 0.5, self.delai * 1.5))
+            response = _connecter(url)
+
+            # Fallback HTTP si HTTPS a échoué
+            if response is None and url.startswith("https://"):
+                http_url = "http://" + url[len("https://"):]
+                _log(f"   ⚠️ HTTPS échoué → tentative HTTP sur {http_url}", "warning")
+                response = _connecter(http_url)
+                if response is not None:
+                    url = http_url  # utiliser l'URL HTTP pour la suite
+                    base_netloc = urlparse(url).netloc
+
+            if response is None:
+                _log(f"   ❌ Impossible de joindre {commune} — site ignoré", "warning")
+                return []
+            html_accueil, entetes_accueil = response.text, response.headers
 
         bilan["pages_visitees"] += 1
-        home_soup = BeautifulSoup(response.text, "html.parser")
+        home_soup = BeautifulSoup(html_accueil, "html.parser")
 
-        # ── Étape 1 : Flux RSS ────────────────────────────────────────────────
+        # ── Étape 1 : Flux RSS et points d'accès du CMS ───────────────────────
         rss_entries = self.detecter_flux_rss(url, home_soup, session)
         if rss_entries:
             _log(f"📡 RSS : {len(rss_entries)} entrée(s) détectée(s)")
         else:
             _log("   ℹ️ Aucun RSS détecté — passage aux sections HTML")
 
+        collecte = None
+        cms = None
+        if self.adaptateurs_cms:
+            empreinte = detecter_cms(html_accueil, entetes_accueil, home_soup)
+            cms = empreinte.cms
+            if empreinte:
+                _log(f"🧩 CMS : {empreinte.cms} ({', '.join(empreinte.indices)})")
+                depuis = datetime.utcnow() - timedelta(days=self.fenetre_jours)
+                collecte = collecter_cms(empreinte.cms, session, url, home_soup, depuis, timeout=self.timeout)
+                if collecte is None:
+                    _log("   ↳ Points d'accès structurés indisponibles — exploration générique")
+                else:
+                    _log(
+                        f"   ↳ {len(collecte.entrees)} entrée(s), {len(collecte.documents)} document(s)"
+                        f" en {collecte.requetes} requête(s)"
+                        + (" — collecte exhaustive" if collecte.exhaustive else "")
+                    )
+                    urls_rss = {e.get("url") for e in rss_entries}
+                    rss_entries += [e for e in collecte.entrees if e.get("url") not in urls_rss]
+
         rss_ecartees = 0
         rss_retenues = 0
         for entry in rss_entries:
@@ -709,16 +901,17 @@ class ScraperCore:
                 rss_ecartees += 1
                 continue
             sf = self.analyser_signaux_faibles(texte)
-            sc = self.calculer_score_composite(analyse, sf, entry.get("date_publication"), "rss")
+            source_type = entry.get("source_type", "rss")
+            sc = self.calculer_score_composite(analyse, sf, entry.get("date_publication"), source_type)
             doc = self._build_result(
                 entry.get("titre", "rss_entry")[:80],
                 entry.get("url", url), url, commune, dept, texte, analyse,
-                source_type="rss",
+                source_type=source_type,
                 date_pub=entry.get("date_publication"),
                 signaux_faibles=sf,
                 score_composite=sc,
             )
-            found.append(doc)
+            _retenir(doc)
             seen_urls.add(entry.get("url", ""))
             rss_retenues += 1
             bilan["docs_retenus"] += 1
@@ -730,6 +923,34 @@ class ScraperCore:
                 f" (hors fenêtre ou non pertinent)"
             )
 
+        if collecte is not None and collecte.documents:
+            docs_cms = [
+                d for d in collecte.documents
+                if d["url"] not in seen_urls and self.est_dans_fenetre(d.get("date_publication"))
+            ]
+            docs_cms = list({d["url"]: d for d in docs_cms}.values())
+            _log(f"📄 CMS : {len(docs_cms)} document(s) PDF dans la fenêtre")
+            rejets_head = self._prefiltrer_documents([d["url"] for d in docs_cms], session, _log, bilan, entetes_head)
+            for d in docs_cms:
+                _traiter_pdf(d["url"], rejets_head, date_connue=d.get("date_publication"))
+
+        cms_exhaustif = collecte is not None and collecte.exhaustive and self.cms_exclusif
+
+        # ── Étape 1 bis : Moteur de recherche du site ─────────────────────────
+        resultats_recherche: List[Tuple[str, str]] = []
+        if self.recherche_site and not cms_exhaustif and mode_recherche != "conseil":
+            candidats = [u for u in self._rechercher_sur_site(url, home_soup, session, cms, _log, bilan)
+                         if u not in seen_urls]
+            docs_recherche = [u for u in candidats if self._is_document(u)]
+            if docs_recherche:
+                rejets_head = self._prefiltrer_documents(docs_recherche, session, _log, bilan, entetes_head)
+                for doc_url in docs_recherche:
+                    _traiter_pdf(doc_url, rejets_head)
+            for u in candidats:
+                if not self._is_document(u):
+                    stype = next((st for st, pat in _SECTION_PATTERNS.items() if pat.search(u)), "generique")
+                    resultats_recherche.append((u, stype))
+
         # ── Étape 2 : Sources prioritaires ────────────────────────────────────
         sources_prioritaires = self._get_sources_prioritaires(url, home_soup, base_netloc)
 
@@ -752,16 +973,27 @@ class ScraperCore:
         elif mode_recherche == "pdf":
             _log("📄 Mode PDFs uniquement — étape 2 (sections HTML) ignorée")
             sources_prioritaires = []  # on saute toute l'étape 2
+        if cms_exhaustif and mode_recherche != "pdf":
+            _log(f"🧩 Collecte {collecte.cms} exhaustive — étapes 2 et 3 (exploration HTML) ignorées")
+            sources_prioritaires = []
+
+        if resultats_recherche and mode_recherche != "pdf":
+            # Résultats du moteur du site en tête : les pages désignées d'abord
+            deja = {u for u, _ in resultats_recherche}
+            sources_prioritaires = resultats_recherche + [
+                (u, st) for u, st in sources_prioritaires if u not in deja
+            ]
 
         if sources_prioritaires:
             _log(f"📂 {len(sources_prioritaires)} section(s) à visiter")
             _log(f"📋 Ordre de visite : {[u for u, _ in sources_prioritaires[:10]]}" +
                  (f" … (+{len(sources_prioritaires)-10} autres)" if len(sources_prioritaires) > 10 else ""))
-        elif mode_recherche == "complet":
+        elif mode_recherche == "complet" and not cms_exhaustif:
             _log("   ℹ️ Aucune section prioritaire détectée (délibérations, actualités…)")
 
         _TIMEOUT_MOTS = ["deliber", "conseil", "budget", "projet", "marche"]
         nb_sections = len(sources_prioritaires)
+        pages_liste: Dict[str, int] = {}  # page suivante d'une liste → numéro de page
         for sec_idx, (section_url, section_type) in enumerate(sources_prioritaires, 1):
             if section_url in seen_urls:
                 _log(f"   [{sec_idx}/{nb_sections}] ⏭️ Déjà visitée : {section_url}")
@@ -841,7 +1073,7 @@ class ScraperCore:
                             _log(f"      ⏭️ Contenu dupliqué ignoré : {fname_sec}")
                         else:
                             seen_hashes.add(_hash)
-                            found.append(doc_sec)
+                            _retenir(doc_sec)
                             bilan["docs_avec_mots_cles"] += 1
                             bilan["docs_retenus"] += 1
                             bilan["score_max"] = max(bilan["score_max"], sc_sec["score_composite"])
@@ -855,18 +1087,21 @@ class ScraperCore:
 
                 sub_soup = BeautifulSoup(r.text, "html.parser")
 
-                for link in sub_soup.find_all("a", href=True):
-                    href = link.get("href", "")
-                    # Résoudre l'URL relative par rapport à la section (pas la page d'accueil)
-                    full_url = urljoin(section_url, href)
-                    if full_url in seen_urls:
-                        continue
-                    if urlparse(full_url).netloc != base_netloc:
-                        continue
-
-                    if not self._is_document(full_url):
-                        continue
+                # Résoudre les URL relatives par rapport à la section (pas la page d'accueil)
+                doc_urls = [
+                    u for u in dict.fromkeys(
+                        urljoin(section_url, lk.get("href", "")) for lk in sub_soup.find_all("a", href=True)
+                    )
+                    if u not in seen_urls
+                    and urlparse(u).netloc == base_netloc
+                    and self._is_document(u)
+                ]
+                rejets_head = self._prefiltrer_documents(
+                    [u for u in doc_urls if self.est_dans_fenetre(self.extraire_date(url=u))],
+                    session, _log, bilan, entetes_head,
+                )
 
+                for full_url in doc_urls:
                     # ── PDF / Document — marquer seulement les docs, pas les pages HTML ──
                     seen_urls.add(full_url)
                     fname = os.path.basename(urlparse(full_url).path) or full_url
@@ -877,9 +1112,16 @@ class ScraperCore:
                     if not self.est_dans_fenetre(date_fname):
                         _log(f"         ↳ ⏭️ Hors fenêtre temporelle (date fichier) — ignoré")
                         continue
+                    if full_url in rejets_head:
+                        _log(f"         ↳ ⏭️ {rejets_head[full_url]} (HEAD) — ignoré")
+                        continue
+
+                    garder, partiel = self._sonder_pdf(full_url, session, _log, bilan, entetes_head.get(full_url))
+                    if not garder:
+                        continue
 
                     texte, nb_pages, nb_chars = self._extraire_texte_document_verbose(
-                        full_url, session, _log
+                        full_url, session, _log, bilan, partiel=partiel
                     )
                     if not texte:
                         bilan["pdfs_scannes"] += 1
@@ -940,7 +1182,7 @@ class ScraperCore:
                         _log(f"         ⏭️ Contenu dupliqué ignoré : {fname}")
                         continue
                     seen_hashes.add(_hash)
-                    found.append(doc)
+                    _retenir(doc)
                     bilan["docs_retenus"] += 1
                     bilan["score_max"] = max(bilan["score_max"], sc["score_composite"])
                     _log(
@@ -948,6 +1190,21 @@ class ScraperCore:
                         f" | {sf['maturite_emoji']} {sf['maturite_label']}"
                     )
 
+                # ── Pagination : listes triées du plus récent au plus ancien ──
+                if self.pagination:
+                    suivante = page_suivante(sub_soup, section_url)
+                    if suivante and suivante not in pages_liste and suivante not in seen_urls:
+                        page_no = pages_liste.get(section_url, 1)
+                        arret = self._arret_pagination(self._dates_liste(sub_soup, section_url), page_no)
+                        if arret:
+                            _log(f"      ↳ Pagination arrêtée (page {page_no}) : {arret}")
+                        else:
+                            pages_liste[suivante] = page_no + 1
+                            # Visitée juste après la page courante
+                            sources_prioritaires.insert(sec_idx, (suivante, section_type))
+                            nb_sections += 1
+                            _log(f"      ↳ Page {page_no + 1} de la liste : {suivante}")
+
             except requests.exceptions.Timeout:
                 _log(
                     f"   [{sec_idx}/{nb_sections}] ⏱️ Timeout ({sec_timeout}s) | {section_url}",
@@ -964,6 +1221,8 @@ class ScraperCore:
         if mode_recherche in ("conseil", "pdf"):
             _log(f"   ℹ️ Mode {mode_recherche} — étape 3 (pages génériques) ignorée")
             html3_links = []
+        elif cms_exhaustif:
+            html3_links = []
         else:
             html3_links = [
                 urljoin(url, lk.get("href", ""))
@@ -1026,7 +1285,7 @@ class ScraperCore:
                     score_composite=sc,
                 )
                 doc["document_type"] = "html"
-                found.append(doc)
+                _retenir(doc)
                 bilan["docs_retenus"] += 1
                 bilan["score_max"] = max(bilan["score_max"], sc["score_composite"])
                 _log(f"      ✅ Retenu | score composite={sc['score_composite']}")
@@ -1043,39 +1302,9 @@ class ScraperCore:
             ]
             pdf_home_links = [u for u in dict.fromkeys(pdf_home_links) if u not in seen_urls]
             _log(f"📄 Mode PDFs — {len(pdf_home_links)} lien(s) PDF détecté(s) sur la page d'accueil")
+            rejets_head = self._prefiltrer_documents(pdf_home_links, session, _log, bilan, entetes_head)
             for pdf_url in pdf_home_links:
-                seen_urls.add(pdf_url)
-                fname = os.path.basename(urlparse(pdf_url).path) or pdf_url
-                _log(f"   📎 PDF : {fname[:60]}")
-                bilan["pdfs_tentes"] += 1
-                texte, nb_pages, nb_chars = self._extraire_texte_document_verbose(pdf_url, session, _log)
-                if not texte:
-                    bilan["pdfs_scannes"] += 1
-                    continue
-                bilan["pdfs_reussis"] += 1
-                analyse = self.analyser_texte(texte)
-                if not analyse["pertinent"]:
-                    bilan["docs_ecartes"] += 1
-                    continue
-                date_pub = self.extraire_date(url=pdf_url, texte=texte)
-                sf = self.analyser_signaux_faibles(texte)
-                sc = self.calculer_score_composite(analyse, sf, date_pub, "pdf")
-                doc = self._build_result(
-                    fname, pdf_url, url, commune, dept, texte, analyse,
-                    source_type="pdf",
-                    date_pub=date_pub,
-                    signaux_faibles=sf,
-                    score_composite=sc,
-                )
-                _hash = hashlib.md5(texte[:500].encode()).hexdigest()
-                if _hash in seen_hashes:
-                    _log(f"      ⏭️ Contenu dupliqué ignoré : {fname}")
-                    continue
-                seen_hashes.add(_hash)
-                found.append(doc)
-                bilan["docs_retenus"] += 1
-                bilan["score_max"] = max(bilan["score_max"], sc["score_composite"])
-                _log(f"      ✅ Retenu | score={sc['score_composite']} | {sf['maturite_emoji']} {sf['maturite_label']}")
+                _traiter_pdf(pdf_url, rejets_head)
 
         # ── Bilan par site ─────────────────────────────────────────────────────
         found.sort(key=lambda r: r.get("score_composite", 0), reverse=True)
@@ -1092,62 +1321,106 @@ class ScraperCore:
         _log(f"   ✅ Docs retenus          : {bilan['docs_retenus']} (score ≥ {self.seuil_confiance})")
         _log(f"   ❌ Docs écartés          : {bilan['docs_ecartes']}")
         _log(f"   🏆 Score max atteint     : {bilan['score_max']} (seuil = {self.seuil_confiance})")
+        _log(f"   🚫 Écartés sur HEAD       : {bilan['docs_ecartes_head']} (type, taille ou Last-Modified)")
+        _log(f"   🔎 Candidats recherche    : {bilan['candidats_recherche']} (moteur du site)")
+        _log(
+            f"   📦 Documents             : {format_octets(bilan['octets_telecharges'])} téléchargés,"
+            f" {format_octets(bilan['octets_evites'])} évités"
+            f" ({bilan['docs_trop_gros']} au-delà de {format_octets(self.taille_max_document)})"
+        )
         _log(sep)
 
         return found
 
+    def _reprendre_accueil(self, accueil: Accueil, session: requests.Session, _log) -> Optional[str]:
+        """
+        HTML complet d'une page d'accueil lue par prequalifier_commune. Une
+        page tronquée est complétée par Range + If-Range (ETag / Last-Modified) :
+        seule la suite est transférée si la page n'a pas changé, la page entière
+        sinon. None si la reprise échoue (connexion classique).
+        """
+        repli = " (repli HTTP de la pré-qualification)" if accueil.repli_http else ""
+        if accueil.complet:
+            _log(f"   ♻️ Page d'accueil reprise de la pré-qualification | {len(accueil.contenu):,} octets{repli}")
+            return accueil.texte()
+        try:
+            dl = telecharger(session, accueil.url_finale, max_octets=self.taille_max_document,
+                             timeout=self.timeout, debut=accueil.contenu, validateur=accueil.validateur)
+        except requests.RequestException as exc:
+            _log(f"   ⚠️ Reprise de la page d'accueil impossible ({exc.__class__.__name__}) — reconnexion", "warning")
+            return None
+        if not dl.ok:
+            return None
+        try:
+            dl.encoding = dl.encoding or accueil.encoding
+            suite = len(dl.corps.data) > dl.octets
+            html = dl.texte()
+        finally:
+            dl.corps.close()
+        _log(
+            f"   ♻️ Page d'accueil reprise de la pré-qualification | {len(accueil.contenu):,} octets"
+            f" + {dl.octets:,} octets {'(suite)' if suite else '(page entière)'}{repli}"
+        )
+        return html
+
     def _extraire_texte_document_verbose(
         self,
         url: str,
         session: requests.Session,
         _log,
+        bilan: Optional[Dict] = None,
+        partiel: Optional[Partiel] = None,
     ) -> Tuple[Optional[str], int, int]:
         """
-        Télécharge et extrait le texte d'un document.
-        Retourne (texte, nb_pages, nb_chars). Logs détaillés via _log.
+        Télécharge (en flux, taille plafonnée) et extrait le texte d'un document.
+        Retourne (texte, nb_pages, nb_chars). Logs détaillés via _log ; octets
+        téléchargés / évités ajoutés à `bilan` s'il est fourni.
+
+        Avec `partiel` (_sonder_pdf), seule la suite du document est demandée ;
+        un PDF linéarisé trop gros est lu sur sa seule première page.
         """
         try:
-            time.sleep(random.uniform(self.delai * 0.5, self.delai))
             t0 = time.time()
-            r = session.get(url, timeout=self.timeout)
+            if partiel is not None and partiel.complet is not None:
+                dl = partiel.complet
+            elif partiel is not None and partiel.statut == "partiel" and (partiel.taille or 0) > self.taille_max_document:
+                return self._premiere_page(url, partiel, _log, bilan)
+            elif partiel is not None and partiel.statut == "partiel":
+                # Suite immédiate de la sonde Range : pas de nouvelle pause de politesse
+                dl = telecharger(session, url, max_octets=self.taille_max_document, timeout=self.timeout,
+                                 debut=partiel.tete, validateur=partiel.validateur)
+            else:
+                time.sleep(random.uniform(self.delai * 0.5, self.delai))
+                dl = telecharger(session, url, max_octets=self.taille_max_document, timeout=self.timeout)
             elapsed_ms = int((time.time() - t0) * 1000)
+            if bilan is not None:
+                bilan["octets_telecharges"] += dl.octets
+                bilan["octets_evites"] += dl.octets_evites
+                bilan["docs_trop_gros"] += int(dl.statut == "trop_gros")
 
-            if r.status_code != 200:
+            if dl.statut == "trop_gros":
+                _log(
+                    f"         ⏭️ Document trop volumineux ({format_octets(dl.octets_evites or dl.octets)}"
+                    f" > {format_octets(self.taille_max_document)}) — ignoré",
+                    "warning",
+                )
+                return None, 0, 0
+            if dl.status_code != 200:
                 _log(
-                    f"         ❌ Téléchargement échoué HTTP {r.status_code} ({elapsed_ms} ms)",
+                    f"         ❌ Téléchargement échoué HTTP {dl.status_code} ({elapsed_ms} ms)",
                     "warning",
                 )
                 return None, 0, 0
 
-            _log(f"         ↳ HTTP {r.status_code} | {len(r.content):,} octets | {elapsed_ms} ms")
+            _log(f"         ↳ HTTP {dl.status_code} | {dl.octets:,} octets | {elapsed_ms} ms")
 
             if url.lower().endswith(".pdf") or "pdf" in url.lower():
-                import io
-                nb_pages = 0
-                texte = ""
-                # Tentative 1 : pdfplumber
-                try:
-                    import pdfplumber
-                    with pdfplumber.open(io.BytesIO(r.content)) as pdf:
-                        nb_pages = len(pdf.pages)
-                        textes = [p.extract_text() or "" for p in pdf.pages[:10]]
-                    texte = "\n".join(textes).strip()
-                except Exception as exc:
-                    _log(f"         ⚠️ pdfplumber échoué : {exc}", "warning")
-                # Tentative 2 : pymupdf si pdfplumber insuffisant
-                if len(texte) < 100:
-                    try:
-                        import fitz
-                        doc_fitz = fitz.open(stream=r.content, filetype="pdf")
-                        nb_pages = nb_pages or doc_fitz.page_count
-                        texte_fitz = "\n".join(
-                            doc_fitz[i].get_text() for i in range(min(10, doc_fitz.page_count))
-                        ).strip()
-                        if len(texte_fitz) > len(texte):
-                            texte = texte_fitz
-                            _log(f"         ↳ pymupdf fallback : {len(texte):,} car.")
-                    except Exception as exc2:
-                        _log(f"         ⚠️ pymupdf échoué : {exc2}", "warning")
+                with dl.corps:
+                    texte, nb_pages, resume = self._lire_pdf(
+                        dl.corps.source, lambda msg, lvl: _log(f"         ⚠️ {msg}", lvl)
+                    )
+                if resume:
+                    _log(f"         ↳ {resume}")
                 nb_chars = len(texte)
                 _log(f"         ↳ {nb_pages} page(s) | {nb_chars:,} caractères extraits")
                 if nb_chars < 100:
@@ -1158,7 +1431,7 @@ class ScraperCore:
                     return None, nb_pages, nb_chars
                 return texte, nb_pages, nb_chars
             else:
-                texte = self._extraire_texte_html(r.text, url=url)
+                texte = self._extraire_texte_html(dl.texte(), url=url)
                 nb_chars = len(texte)
                 _log(f"         ↳ HTML | {nb_chars:,} caractères extraits")
                 return texte or None, 1, nb_chars
@@ -1167,6 +1440,177 @@ class ScraperCore:
             _log(f"         ❌ Erreur téléchargement : {exc}", "warning")
             return None, 0, 0
 
+    def _prefiltrer_documents(self, urls: List[str], session: requests.Session, _log,
+                              bilan: Dict, connus: Optional[Dict[str, Entetes]] = None) -> Dict[str, str]:
+        """
+        HEAD concurrents des liens de documents d'une page, avant tout GET.
+        Retourne {url: motif} des liens à écarter : page HTML derrière une
+        URL en .pdf, document trop gros, Last-Modified hors fenêtre, 404.
+        Un document trop gros reste candidat si le serveur accepte les plages
+        (1re page lue par _sonder_pdf). Les en-têtes reçus sont ajoutés à
+        `connus` (taille reprise par _sonder_pdf).
+        """
+        if not self.prefiltrage_head or not urls:
+            return {}
+        t0 = time.time()
+        entetes = sonder_entetes(session, urls, workers=self.head_paralleles, timeout=min(self.timeout, 10))
+        if connus is not None:
+            connus.update(entetes)
+        depuis = datetime.utcnow() - timedelta(days=self.fenetre_jours)
+        rejets = {}
+        for url, e in entetes.items():
+            plafond = None if (self.telechargement_partiel and e.plages) else self.taille_max_document
+            motif = e.motif_rejet(max_octets=plafond, depuis=depuis)
+            if motif:
+                rejets[url] = motif
+                evites = (e.taille or 0) if e.status_code == 200 else 0
+                bilan["octets_evites"] += evites
+                get_fetch_stats().ajouter(url, evites=evites, trop_gros=motif.startswith("trop"))
+        bilan["docs_ecartes_head"] += len(rejets)
+        _log(
+            f"      ↳ HEAD × {len(urls)} en {int((time.time() - t0) * 1000)} ms"
+            f" — {len(rejets)} lien(s) écarté(s) avant téléchargement"
+        )
+        return rejets
+
+    def _rechercher_sur_site(self, url: str, home_soup: BeautifulSoup, session: requests.Session,
+                             cms: Optional[str], _log, bilan: Dict) -> List[str]:
+        """
+        Soumet les mots prioritaires au moteur de recherche du site (formulaire
+        de la page d'accueil, sinon URL de recherche du CMS) et retourne les
+        URLs candidates des pages de résultats, pages et documents confondus.
+        """
+        formulaire = detecter_formulaire(home_soup, url, cms)
+        if formulaire is None:
+            return []
+        exclus = {urljoin(url, a["href"]).split("#")[0] for a in home_soup.find_all("a", href=True)}
+        exclus.add(url)
+        candidats: List[str] = []
+        for mot in self.mots_cles["prioritaires"][:self.recherche_mots_max]:
+            cible = formulaire.url(mot)
+            try:
+                time.sleep(random.uniform(self.delai * 0.5, self.delai))
+                r = session.get(cible, timeout=self.timeout)
+                bilan["pages_visitees"] += 1
+            except requests.RequestException as exc:
+                _log(f"   🔎 Recherche « {mot} » impossible : {exc.__class__.__name__}", "warning")
+                continue
+            if r.status_code != 200:
+                _log(f"   🔎 Recherche « {mot} » : HTTP {r.status_code} — moteur du site ignoré")
+                break
+            liens = liens_resultats(BeautifulSoup(r.text, "html.parser"), r.url, formulaire, exclus)
+            nouveaux = [lien for lien in liens if lien not in candidats]
+            _log(f"   🔎 Recherche « {mot} » : {len(nouveaux)} résultat(s) | {cible}")
+            candidats.extend(nouveaux)
+            if len(candidats) >= self.recherche_resultats_max:
+                break
+        candidats = candidats[:self.recherche_resultats_max]
+        bilan["candidats_recherche"] += len(candidats)
+        return candidats
+
+    def _sonder_pdf(self, url: str, session: requests.Session, _log, bilan: Dict,
+                    entetes: Optional[Entetes] = None) -> Tuple[bool, Optional[Partiel]]:
+        """
+        Téléchargement partiel (HTTP Range) d'un PDF avant son téléchargement
+        complet : un document dont les métadonnées (CreationDate / ModDate)
+        sont hors fenêtre temporelle est écarté sans être téléchargé.
+
+        Seuls les documents plus gros que sonde_range_ko, ou de taille
+        inconnue, sont sondés : la taille vient du HEAD du pré-filtrage
+        (`entetes`) quand il a eu lieu. En dessous, la sonde (tête + queue)
+        coûterait presque autant que le document.
+
+        Retourne (à garder, partiel) ; partiel None si la sonde est désactivée,
+        inutile ou a échoué (téléchargement complet classique).
+        """
+        if not self.telechargement_partiel or "pdf" not in url.lower():
+            return True, None
+        if entetes is not None and entetes.status_code == 200 and entetes.taille is not None \
+                and entetes.taille <= self.sonde_range_octets:
+            return True, None
+        try:
+            time.sleep(random.uniform(self.delai * 0.5, self.delai))
+            partiel = telecharger_partiel(session, url, max_octets=self.taille_max_document, timeout=self.timeout)
+        except requests.RequestException as exc:
+            _log(f"         ↳ Sonde Range impossible ({exc}) — téléchargement complet", "warning")
+            return True, None
+        if partiel.complet is None:
+            bilan["octets_telecharges"] += partiel.octets  # sinon compté avec le document
+        if partiel.statut == "partiel":
+            details = f"{format_octets(partiel.octets)}/{format_octets(partiel.taille or 0)}"
+            if partiel.lineaire:
+                details += f", linéarisé, {partiel.lineaire.get('N', '?')} page(s)"
+            _log(f"         ↳ Sonde Range : {details}")
+        date_meta = partiel.date
+        if date_meta and not self.est_dans_fenetre(date_meta):
+            _log(
+                f"         ↳ ⏭️ Hors fenêtre temporelle (métadonnées PDF : {date_meta:%d/%m/%Y})"
+                f" — {format_octets(partiel.reste)} évités"
+            )
+            if partiel.complet is not None:
+                bilan["octets_telecharges"] += partiel.complet.octets
+                partiel.complet.corps.close()
+            else:
+                bilan["octets_evites"] += partiel.reste
+                get_fetch_stats().ajouter(url, evites=partiel.reste)
+            return False, None
+        if partiel.statut == "partiel" or partiel.complet is not None:
+            return True, partiel
+        return True, None  # sonde en erreur HTTP : nouvel essai sans Range
+
+    def _premiere_page(self, url: str, partiel: Partiel, _log,
+                       bilan: Optional[Dict]) -> Tuple[Optional[str], int, int]:
+        """Texte de la première page d'un PDF linéarisé trop gros pour être téléchargé."""
+        if bilan is not None:
+            bilan["octets_evites"] += partiel.reste
+            bilan["docs_trop_gros"] += 1
+        get_fetch_stats().ajouter(url, evites=partiel.reste, trop_gros=True)
+        taille = format_octets(partiel.taille or 0)
+        if not partiel.premiere_page:
+            _log(
+                f"         ⏭️ Document trop volumineux ({taille}"
+                f" > {format_octets(self.taille_max_document)}) — ignoré",
+                "warning",
+            )
+            return None, 0, 0
+        with Corps(partiel.tete) as corps:
+            texte, _, _ = self._lire_pdf(corps.source, lambda msg, lvl: _log(f"         ⚠️ {msg}", lvl))
+        nb_chars = len(texte)
+        _log(f"         ↳ Document volumineux ({taille}) : 1re page seule | {nb_chars:,} caractères extraits")
+        return (texte or None), 1, nb_chars
+
+    def _lire_pdf(self, contenu: Union[bytes, str], log_fn) -> Tuple[str, int, str]:
+        """
+        Extrait le texte d'un PDF (octets ou chemin du fichier téléchargé).
+        Retourne (texte, nb_pages, résumé pour les logs).
+
+        Mode incrémental : les pages sont lues et scorées une à une
+        (ocr.extracteurs.lecture_incrementale) ; la lecture s'arrête dès que
+        le document est sûrement pertinent, ou, passé pages_pdf pages, quand
+        les mots-clés sont absents (pages_sans_mot_cle pages vides) ou peu
+        denses, et au plus tard à pages_pdf_max pages.
+        """
+        if not self.extraction_incrementale:
+            extraction = extraire_pages(contenu, max_pages=self.pages_pdf, log_fn=log_fn)
+            essais = " → ".join(
+                f"{nom} {duree * 1000:.0f} ms" + (f" ({motif})" if motif else "")
+                for nom, duree, motif in extraction["essais"]
+            )
+            return extraction["texte"], extraction["nb_pages"], f"extraction : {essais}" if essais else ""
+
+        def analyser(page: str) -> Tuple[Dict[str, List[str]], List[str]]:
+            return self.analyser_texte(page)["details"], self.analyser_signaux_faibles(page)["categories"]
+
+        t0 = time.time()
+        nb_pages, pages = flux_pages(contenu, log_fn=log_fn)
+        textes, motif = lecture_incrementale(
+            pages, analyser, self.seuil_confiance, pages_min=self.pages_pdf,
+            pages_max=self.pages_pdf_max, sans_mot_cle=self.pages_sans_mot_cle,
+        )
+        duree_ms = int((time.time() - t0) * 1000)
+        resume = f"lecture incrémentale : {len(textes)}/{nb_pages} page(s) en {duree_ms} ms — arrêt : {motif}"
+        return "\n".join(textes).strip(), nb_pages, resume
+
     # ── Helpers privés ─────────────────────────────────────────────────────────
 
     def _get_sources_prioritaires(self, base_url: str, soup: BeautifulSoup,
@@ -1220,8 +1664,8 @@ class ScraperCore:
         return [(u, st) for u, st, _ in candidates]
 
     def _is_document(self, url: str) -> bool:
-        url_lower = url.lower()
-        return any(url_lower.endswith(ext) or ext in url_lower for ext in self.DOC_EXTENSIONS)
+        """Lien vers un document (crawler.fetch.est_document)."""
+        return est_document(url, self.DOC_EXTENSIONS)
 
     # URLs clairement inutiles à exclure (blacklist)
     _HTML_BLACKLIST = [
@@ -1242,41 +1686,28 @@ class ScraperCore:
     def _extraire_texte_document(
         self, url: str, session: requests.Session, log_fn
     ) -> Optional[str]:
-        """Télécharge et extrait le texte d'un document (PDF/DOC)."""
+        """Télécharge (en flux, taille plafonnée) et extrait le texte d'un document (PDF/DOC)."""
         try:
             time.sleep(random.uniform(self.delai * 0.5, self.delai))
-            r = session.get(url, timeout=self.timeout)
-            r.raise_for_status()
+            dl = telecharger(session, url, max_octets=self.taille_max_document, timeout=self.timeout)
+            if dl.statut == "trop_gros":
+                log_fn(f"Document trop volumineux ignoré ({format_octets(dl.octets_evites or dl.octets)}) — {url}", "warning")
+                return None
+            if dl.status_code != 200:
+                log_fn(f"Erreur téléchargement {url} : HTTP {dl.status_code}", "warning")
+                return None
 
             if url.lower().endswith(".pdf") or "pdf" in url.lower():
-                import io
-                texte = ""
-                # Tentative 1 : pdfplumber
-                try:
-                    import pdfplumber
-                    with pdfplumber.open(io.BytesIO(r.content)) as pdf:
-                        textes = [p.extract_text() or "" for p in pdf.pages[:10]]
-                    texte = "\n".join(textes).strip()
-                except Exception as exc:
-                    log_fn(f"pdfplumber échoué pour {url} : {exc}", "warning")
-                # Tentative 2 : pymupdf si pdfplumber insuffisant
-                if len(texte) < 100:
-                    try:
-                        import fitz
-                        doc_fitz = fitz.open(stream=r.content, filetype="pdf")
-                        texte_fitz = "\n".join(
-                            doc_fitz[i].get_text() for i in range(min(10, doc_fitz.page_count))
-                        ).strip()
-                        if len(texte_fitz) > len(texte):
-                            texte = texte_fitz
-                    except Exception as exc2:
-                        log_fn(f"pymupdf échoué pour {url} : {exc2}", "warning")
+                with dl.corps:
+                    texte, _, _ = self._lire_pdf(
+                        dl.corps.source, lambda msg, lvl: log_fn(f"{msg} pour {url}", lvl)
+                    )
                 if len(texte) < 100:
                     log_fn(f"⚠️ PDF potentiellement scanné (image) — {url}", "warning")
                     return None
                 return texte
             else:
-                return self._extraire_texte_html(r.text, url=url)
+                return self._extraire_texte_html(dl.texte(), url=url)
 
         except requests.RequestException as exc:
             log_fn(f"Erreur téléchargement {url} : {exc}", "warning")
@@ -1351,14 +1782,22 @@ class ScraperCore:
     # ── Sauvegarde ─────────────────────────────────────────────────────────────
 
     def sauvegarder_resultats(
-        self, resultats: List[Dict], output_dir: str = "data"
+        self, resultats: List[Dict], output_dir: str = "data",
+        path: Optional[str] = None,
     ) -> str:
-        """Sauvegarde les résultats dans data/<timestamp>.json."""
-        os.makedirs(output_dir, exist_ok=True)
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        path = os.path.join(output_dir, f"resultats_{ts}.json")
-        with open(path, "w", encoding="utf-8") as fh:
+        """
+        Sauvegarde les résultats dans data/<timestamp>.json.
+        Si path est fourni, réécrit ce fichier (checkpoints successifs d'un run).
+        L'écriture est atomique : un lecteur ne voit jamais un JSON tronqué.
+        """
+        if path is None:
+            os.makedirs(output_dir, exist_ok=True)
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(output_dir, f"resultats_{ts}.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
             json.dump(resultats, fh, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
         log.info("Résultats sauvegardés : %s (%d docs)", path, len(resultats))
         return path
 
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Les modules du projet s'importent depuis la racine (crawler.*, ia.*, ocr.*)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,59 @@
+import json
+
+from ia.cache import VerdictCache, diff_stats, format_stats
+
+VERDICT = {"ia_pertinent": True, "ia_score": 8, "ia_resume": "Chaufferie bois", "ia_justification": "PPI 2025",
+           "ia_timestamp": "2026-10-19T10:00:00"}
+
+
+def _cle(texte="Délibération : chaufferie biomasse", prompt="prompt", modele="ollama:mistral", politique="kw-v2:4000"):
+    return VerdictCache.make_key(texte, prompt, modele, politique)
+
+
+def test_cle_insensible_a_la_casse_et_aux_espaces():
+    assert _cle("Délibération :  chaufferie\nbiomasse ") == _cle("délibération : CHAUFFERIE biomasse")
+
+
+def test_cle_change_avec_chaque_composante():
+    base = _cle()
+    assert _cle(texte="Délibération : réseau de chaleur") != base
+    assert _cle(prompt="autre prompt") != base
+    assert _cle(modele="ollama:tinyllama") != base
+    assert _cle(politique="kw-v2:1500") != base
+
+
+def test_miss_puis_hit(tmp_path):
+    cache = VerdictCache(str(tmp_path / "cache.json"))
+    assert cache.get(_cle()) is None
+    cache.put(_cle(), VERDICT)
+    assert cache.get(_cle()) == {k: VERDICT[k] for k in ("ia_pertinent", "ia_score", "ia_resume", "ia_justification")}
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entrees": 1}
+
+
+def test_persistance_entre_instances(tmp_path):
+    chemin = str(tmp_path / "cache.json")
+    cache = VerdictCache(chemin, autosave_every=100)
+    cache.put(_cle(), VERDICT)
+    cache.save()
+    assert VerdictCache(chemin).get(_cle())["ia_score"] == 8
+
+
+def test_sauvegarde_par_lots(tmp_path):
+    chemin = tmp_path / "cache.json"
+    cache = VerdictCache(str(chemin), autosave_every=2)
+    cache.put(_cle(texte="a"), VERDICT)
+    assert not chemin.exists()
+    cache.put(_cle(texte="b"), VERDICT)
+    assert len(json.loads(chemin.read_text(encoding="utf-8"))) == 2
+
+
+def test_fichier_illisible_repart_de_zero(tmp_path):
+    chemin = tmp_path / "cache.json"
+    chemin.write_text("{pas du json", encoding="utf-8")
+    assert VerdictCache(str(chemin)).stats()["entrees"] == 0
+
+
+def test_stats_d_un_run():
+    stats = diff_stats({"hits": 2, "misses": 3, "entrees": 5}, {"hits": 5, "misses": 4, "entrees": 6})
+    assert stats == {"hits": 3, "misses": 1, "hit_rate": 0.75, "entrees": 6}
+    assert format_stats(stats) == "cache IA : 3/4 hits (75%) — 1 appel(s) modèle"
@@ -0,0 +1,59 @@
+import requests
+
+from ia.cascade import Cascade, est_erreur
+from ia.chunking import analyser_par_morceaux
+
+PERTINENT = {"ia_pertinent": True, "ia_score": 9, "ia_resume": "Chaufferie bois", "ia_justification": ""}
+NON_PERTINENT = {"ia_pertinent": False, "ia_score": 1, "ia_resume": "Voirie", "ia_justification": ""}
+ERREUR_PARSING = {"ia_pertinent": False, "ia_score": 0, "ia_resume": "Erreur de parsing JSON",
+                  "ia_justification": "Réponse IA invalide", "ia_erreur": True}
+
+
+def _cascade(rapide, appels):
+    def expert(texte):
+        appels.append(texte)
+        return PERTINENT
+    return Cascade(rapide, expert, bande=(3, 7), noms=("tinyllama", "mistral"))
+
+
+def test_verdict_tranche_non_escalade():
+    appels = []
+    verdict = _cascade(lambda t: NON_PERTINENT, appels).analyse("doc")
+    assert appels == []
+    assert verdict["ia_niveau"] == "tinyllama"
+
+
+def test_erreur_de_parsing_escalade():
+    appels = []
+    cascade = _cascade(lambda t: ERREUR_PARSING, appels)
+    verdict = cascade.analyse("doc")
+    assert appels == ["doc"]
+    assert verdict["ia_pertinent"] and verdict["ia_niveau"] == "mistral"
+    # Une erreur n'entre pas dans le taux d'accord rapide / expert
+    assert cascade.stats()["accord"] is None
+
+
+def test_erreur_sans_drapeau_reconnue_au_resume():
+    verdict = {"ia_pertinent": False, "ia_score": 0, "ia_resume": "Ollama non disponible"}
+    assert est_erreur(verdict)
+    appels = []
+    _cascade(lambda t: verdict, appels).analyse("doc")
+    assert appels == ["doc"]
+
+
+def test_niveau_rapide_qui_leve_escalade():
+    def rapide(texte):
+        raise requests.exceptions.ConnectionError("Ollama injoignable")
+    appels = []
+    cascade = _cascade(rapide, appels)
+    verdict = cascade.analyse("doc")
+    assert appels == ["doc"]
+    assert verdict["ia_niveau"] == "mistral"
+    assert cascade.stats()["escalades"] == 1
+
+
+def test_morceaux_en_erreur_ignores():
+    texte = ("chaufferie biomasse " + "x " * 400) * 3
+    reponses = iter([ERREUR_PARSING, PERTINENT, ERREUR_PARSING])
+    verdict = analyser_par_morceaux(texte, lambda t: next(reponses), taille=900, parallelisme=1)
+    assert verdict["ia_pertinent"] and not est_erreur(verdict)
@@ -0,0 +1,76 @@
+from ia.chunking import analyser_par_morceaux, decouper, morceaux_pertinents, reduire
+
+MOTS = {"prioritaires": ["chaufferie"], "secondaires": ["isolation"]}
+
+
+def _verdict(pertinent, score, justification="raison"):
+    return {"ia_pertinent": pertinent, "ia_score": score, "ia_resume": f"score {score}",
+            "ia_justification": justification}
+
+
+def test_decoupe_avec_recouvrement_sans_couper_les_mots():
+    texte = " ".join(f"mot{i:03d}" for i in range(400))
+    bornes = decouper(texte, 500, recouvrement=100)
+    assert bornes[0][0] == 0 and bornes[-1][1] == len(texte)
+    for (d1, f1), (d2, f2) in zip(bornes, bornes[1:]):
+        assert d2 < f1  # recouvrement
+        assert texte[f1] == " "
+
+
+def test_morceaux_sans_mot_cle_ecartes_et_plus_denses_d_abord():
+    texte = "rien " * 200 + "chaufferie " * 3 + "rien " * 200 + "isolation " + "rien " * 200
+    retenus, total = morceaux_pertinents(texte, 500, 100, max_morceaux=4, mots_cles=MOTS)
+    assert total > len(retenus) > 0
+    assert "chaufferie" in texte[retenus[0][0]:retenus[0][1]]
+    assert [p for _, _, p in retenus] == sorted((p for _, _, p in retenus), reverse=True)
+
+
+def test_reduire_le_pertinent_le_mieux_note_porte_le_resultat():
+    verdicts = [
+        (_verdict(False, 9), "rien de notable"),
+        (_verdict(True, 6, "chaufferie"), "projet de chaufferie bois"),
+        (_verdict(True, 8, "réseau"), "réseau de chaleur et chaufferie"),
+    ]
+    resultat = reduire(verdicts, total=10)
+    assert resultat["ia_pertinent"] is True and resultat["ia_score"] == 8
+    assert resultat["ia_morceaux"] == {"analyses": 3, "total": 10, "pertinents": 2}
+    assert resultat["ia_justification"] == "réseau [2/3 passage(s) pertinent(s) sur 10 morceaux]"
+    assert "réseau de chaleur" in resultat["ia_passage"]
+
+
+def test_reduire_un_seul_verdict_justification_inchangee():
+    resultat = reduire([(_verdict(False, 2, "hors sujet"), "texte")], total=3)
+    assert resultat["ia_justification"] == "hors sujet"
+    assert resultat["ia_morceaux"]["pertinents"] == 0
+
+
+def test_reduire_score_non_numerique():
+    resultat = reduire([(_verdict(True, "n/a"), "a"), (_verdict(True, 4), "b")], total=2)
+    assert resultat["ia_score"] == 4
+
+
+def _document():
+    return "rien " * 300 + "chaufferie " + "rien " * 300 + "chaufferie isolation " + "rien " * 300
+
+
+def test_morceau_en_erreur_ignore():
+    def analyse(morceau):
+        if morceau.count("chaufferie") == 1 and "isolation" not in morceau:
+            return {**_verdict(False, 0), "ia_erreur": True}
+        return _verdict(True, 7)
+
+    resultat = analyser_par_morceaux(_document(), analyse, taille=800, recouvrement=100, mots_cles=MOTS)
+    assert resultat["ia_score"] == 7
+    assert resultat["ia_morceaux"]["analyses"] == 1
+
+
+def test_tous_les_morceaux_en_erreur_renvoie_l_erreur():
+    erreur = {**_verdict(False, 0, "HTTP 500"), "ia_erreur": True}
+    resultat = analyser_par_morceaux(_document(), lambda m: erreur, taille=800, mots_cles=MOTS)
+    assert resultat is erreur
+
+
+def test_texte_court_un_seul_appel():
+    appels = []
+    analyser_par_morceaux("chaufferie", lambda m: appels.append(m) or _verdict(True, 5), taille=800)
+    assert appels == ["chaufferie"]
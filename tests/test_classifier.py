@@ -0,0 +1,105 @@
+import json
+import random
+
+import pytest
+
+from ia import classifier
+from ia.classifier import RelevanceClassifier, charger_validations, evaluer, seuil_pour_rappel, separer
+
+PERTINENTS = ["chaufferie biomasse", "réseau de chaleur bois", "centrale photovoltaïque",
+              "panneaux solaires toiture", "étude de faisabilité géothermie"]
+HORS_SUJET = ["cantine scolaire menus", "fête du village", "voirie nids de poule",
+              "horaires de la bibliothèque", "élection du maire"]
+
+
+def _exemples(n=60, seed=3):
+    rnd = random.Random(seed)
+    exemples = []
+    for i in range(n):
+        pertinent = i % 2 == 0
+        sujet = rnd.choice(PERTINENTS if pertinent else HORS_SUJET)
+        exemples.append((f"Conseil municipal séance {i} : délibération sur {sujet}", pertinent))
+    return exemples
+
+
+@pytest.fixture(scope="module")
+def modele():
+    return RelevanceClassifier.entrainer(_exemples())
+
+
+def test_entrainement_separe_les_classes(modele):
+    assert modele.proba("délibération sur la chaufferie biomasse") > 0.5
+    assert modele.proba("délibération sur la cantine scolaire menus") < 0.5
+    assert modele.meta == {"n_train": 60, "n_pos": 30, "n_neg": 30}
+
+
+def test_entrainement_sans_exemple():
+    with pytest.raises(ValueError):
+        RelevanceClassifier.entrainer([])
+
+
+def test_seuil_garde_le_rappel_cible():
+    scores = [(0.9, True), (0.8, True), (0.4, True), (0.1, True), (0.7, False), (0.2, False)]
+    assert seuil_pour_rappel(scores, 0.75) == 0.4
+    assert seuil_pour_rappel(scores, 1.0) == 0.1
+    assert seuil_pour_rappel([(0.3, False)], 0.95) == 0.5
+
+
+def test_predict_au_seuil(modele):
+    texte = "délibération sur le réseau de chaleur bois"
+    p = modele.proba(texte)
+    modele_strict = RelevanceClassifier(modele.poids, modele.biais, seuil=min(1.0, p + 0.01))
+    assert modele_strict.garder(texte) is False
+    assert RelevanceClassifier(modele.poids, modele.biais, seuil=p).garder(texte) is True
+
+
+def test_evaluation(modele):
+    metriques = evaluer(modele, _exemples(20, seed=7))
+    assert metriques["n"] == 20
+    assert metriques["rappel"] == 1.0
+    assert metriques["vp"] + metriques["fn"] == 10
+
+
+def test_separation_stratifiee():
+    train, test = separer(_exemples(), 0.2)
+    assert len(test) == 12 and sum(y for _, y in test) == 6
+    assert len(train) + len(test) == 60
+
+
+def test_sauvegarde_et_rechargement(modele, tmp_path):
+    chemin = str(tmp_path / "modele.json")
+    RelevanceClassifier(modele.poids, modele.biais, seuil=0.3, meta=modele.meta).sauvegarder(chemin)
+    recharge = RelevanceClassifier.charger(chemin)
+    assert recharge.seuil == 0.3
+    assert recharge.proba("chaufferie biomasse") == pytest.approx(modele.proba("chaufferie biomasse"), abs=1e-4)
+
+
+def test_modele_d_une_autre_taille_refuse(modele, tmp_path, monkeypatch):
+    chemin = str(tmp_path / "modele.json")
+    modele.sauvegarder(chemin)
+    monkeypatch.setattr(classifier, "N_FEATURES", 2 ** 10)
+    with pytest.raises(ValueError):
+        RelevanceClassifier.charger(chemin)
+
+
+def test_validations_dedoublonnees_par_url(tmp_path):
+    docs = [
+        {"source_url": "u1", "texte": "chaufferie", "ia_pertinent": False,
+         "validation_status": "validated_manual", "validated_at": "2026-01-01"},
+        {"source_url": "u1", "texte": "chaufferie", "ia_pertinent": True,
+         "validation_status": "validated_manual", "validated_at": "2026-02-01"},
+        {"source_url": "u2", "texte": "fête", "ia_pertinent": True},
+    ]
+    (tmp_path / "resultats.json").write_text(json.dumps(docs), encoding="utf-8")
+    assert charger_validations(str(tmp_path)) == [("chaufferie", True)]
+
+
+def test_train_cli(tmp_path):
+    docs = [{"source_url": f"u{i}", "texte": t, "ia_pertinent": y, "validation_status": "validated_manual"}
+            for i, (t, y) in enumerate(_exemples(40))]
+    (tmp_path / "resultats.json").write_text(json.dumps(docs), encoding="utf-8")
+    chemin = str(tmp_path / "modele.json")
+    assert classifier.main(["--model", chemin, "train", "--data", str(tmp_path), "--epochs", "5"]) == 0
+    modele = RelevanceClassifier.charger(chemin)
+    assert 0.0 < modele.seuil <= 0.5
+    assert modele.meta["n_train"] == 40 and modele.meta["test"]["rappel"] >= 0.95
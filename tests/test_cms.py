@@ -0,0 +1,88 @@
+from datetime import datetime
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+
+from crawler.cms import collecter
+
+SITE = "https://www.mairie.example/"
+DEPUIS = datetime(2026, 7, 1)
+
+
+class _Reponse:
+    def __init__(self, donnees, status_code=200):
+        self.donnees = donnees
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/json", "X-WP-TotalPages": "1"}
+        self.content = b""
+
+    def json(self):
+        return self.donnees
+
+
+class _SessionWP:
+    """API REST WordPress : une route par chemin /wp-json/wp/v2/<route>."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.appels = []
+
+    def get(self, url, params=None, timeout=None):
+        route = urlparse(url).path.rpartition("/wp/v2/")[2]
+        self.appels.append(route)
+        if route not in self.routes:
+            return _Reponse({"code": "rest_no_route"}, status_code=404)
+        return _Reponse(self.routes[route])
+
+
+def _post(lien, html, date="2026-09-14T10:00:00"):
+    return {"link": lien, "date": date, "title": {"rendered": "Conseil municipal"},
+            "content": {"rendered": html}}
+
+
+ROUTES = {
+    "posts": [_post(SITE + "conseil-du-14-septembre/",
+                    '<p>Compte rendu : <a href="/wp-content/uploads/2026/09/cr-cm.pdf">PDF</a>'
+                    ' <a href="https://autre.example/x.pdf">externe</a></p>')],
+    "types": {"post": {"rest_base": "posts"}, "page": {"rest_base": "pages"},
+              "attachment": {"rest_base": "media"}, "deliberation": {"rest_base": "deliberations"}},
+    "deliberations": [_post(SITE + "deliberations/2026-42/", "<p>Chaufferie bois</p>")],
+    "pages": [],
+    "media": [],
+}
+
+
+def _collecter(session):
+    return collecter("wordpress", session, SITE, BeautifulSoup("<html></html>", "html.parser"), DEPUIS)
+
+
+def test_wordpress_documents_lies_dans_le_contenu():
+    collecte = _collecter(_SessionWP(ROUTES))
+    assert [d["url"] for d in collecte.documents] == [SITE + "wp-content/uploads/2026/09/cr-cm.pdf"]
+    assert collecte.documents[0]["date_publication"] == datetime(2026, 9, 14, 10)
+
+
+def test_wordpress_types_personnalises():
+    session = _SessionWP(ROUTES)
+    collecte = _collecter(session)
+    assert SITE + "deliberations/2026-42/" in [e["url"] for e in collecte.entrees]
+    # posts, pages et media ne sont pas relus comme types personnalisés
+    assert [session.appels.count(r) for r in ("posts", "pages", "media")] == [1, 1, 1]
+    assert collecte.exhaustive
+
+
+def test_wordpress_sans_liste_des_types_non_exhaustive():
+    routes = {k: v for k, v in ROUTES.items() if k != "types"}
+    assert not _collecter(_SessionWP(routes)).exhaustive
+
+
+class _SessionDrupal:
+    def get(self, url, params=None, timeout=None):
+        return _Reponse({"data": [{"attributes": {"title": "Réseau de chaleur", "changed": "2026-09-01T08:00:00",
+                                                  "path": {"alias": "/actualites/reseau"}}}],
+                         "links": {}})
+
+
+def test_drupal_jamais_exhaustive():
+    collecte = collecter("drupal", _SessionDrupal(), SITE, BeautifulSoup("", "html.parser"), DEPUIS)
+    assert collecte.entrees and not collecte.exhaustive
@@ -0,0 +1,132 @@
+import pytest
+
+from crawler import concurrence
+from crawler.concurrence import ControleurAIMD
+
+
+@pytest.fixture(autouse=True)
+def sans_refroidissement(monkeypatch):
+    monkeypatch.setattr(concurrence, "REFROIDISSEMENT", 0.0)
+
+
+def _requete(ctrl, hote, issue, latence=0.1):
+    creneau = ctrl.acquerir(f"https://{hote}/")
+    ctrl.liberer(creneau, issue, latence)
+
+
+def _trafic_sain(ctrl, n=20):
+    for i in range(n):
+        _requete(ctrl, f"vivante{i % 5}.example", "ok")
+
+
+def test_communes_injoignables_ne_touchent_pas_la_limite_globale():
+    ctrl = ControleurAIMD(initiale=8, maximum=24)
+    _trafic_sain(ctrl)
+    # Pré-qualification de communes mortes : DNS, connexion refusée, timeouts de 2 s
+    for i in range(40):
+        _requete(ctrl, f"morte{i}.example", "erreur" if i % 2 else "timeout")
+    assert ctrl.globale.entier == 8
+    assert ctrl.stats()["erreur"] == 20 and ctrl.stats()["timeout"] == 20
+
+
+def test_site_injoignable_recule_sa_propre_limite():
+    ctrl = ControleurAIMD(initiale=8, par_hote=4)
+    _requete(ctrl, "morte.example", "erreur")
+    assert ctrl._hote("morte.example").entier == 2
+    assert ctrl.globale.entier == 8
+
+
+def test_429_en_rafale_fait_reculer_la_limite_globale():
+    ctrl = ControleurAIMD(initiale=8)
+    _trafic_sain(ctrl, 10)
+    for i in range(5):
+        _requete(ctrl, f"vivante{i}.example", "429")
+    assert ctrl.globale.entier < 8
+
+
+def test_timeout_d_un_site_qui_a_repondu_compte_comme_congestion():
+    ctrl = ControleurAIMD(initiale=8)
+    _trafic_sain(ctrl, 10)
+    for i in range(5):
+        _requete(ctrl, f"vivante{i}.example", "timeout")
+    assert ctrl.globale.entier < 8
+
+
+def _acquerir_dans_un_thread(ctrl, url):
+    # Une place par thread : un thread qui en tient une passe sans nouvelle place
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(ctrl.acquerir, url).result(timeout=5)
+
+
+def test_hausse_globale_quand_la_limite_est_atteinte():
+    ctrl = ControleurAIMD(initiale=2, maximum=24, reserves={})
+    for tour in range(6):
+        creneaux = [_acquerir_dans_un_thread(ctrl, f"https://site{tour}-{i}.example/")
+                    for i in range(ctrl.globale.entier)]
+        for creneau in creneaux:
+            ctrl.liberer(creneau, "ok", 0.1)
+    assert ctrl.globale.entier > 2
+
+
+def _serveur(handler):
+    from http.server import ThreadingHTTPServer
+    import threading
+
+    serveur = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return serveur
+
+
+def test_requete_imbriquee_passe_sur_la_place_tenue():
+    ctrl = ControleurAIMD(initiale=1, maximum=1)
+    creneau = ctrl.acquerir("https://mairie-x.example/")
+    assert ctrl.acquerir("https://www.mairie-x.example/") is None
+    ctrl.liberer(creneau, "ok", 0.1)
+    assert ctrl._en_cours == 0
+
+
+def test_redirection_vers_un_autre_site_a_la_limite_1():
+    import threading
+    from http.server import BaseHTTPRequestHandler
+
+    from crawler.concurrence import SessionControlee
+
+    class Cible(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    cible = _serveur(Cible)
+
+    class Origine(Cible):
+        def do_GET(self):
+            # Autre hôte : localhost au lieu de 127.0.0.1, autre port
+            self.send_response(302)
+            self.send_header("Location", f"http://localhost:{cible.server_address[1]}/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    origine = _serveur(Origine)
+    ctrl = ControleurAIMD(initiale=1, maximum=1)
+    session = SessionControlee(ctrl)
+    resultat = {}
+    fil = threading.Thread(
+        target=lambda: resultat.update(r=session.get(f"http://127.0.0.1:{origine.server_address[1]}/", timeout=5)),
+        daemon=True,
+    )
+    fil.start()
+    fil.join(10)
+    try:
+        assert not fil.is_alive(), "requête bloquée dans acquerir"
+        assert resultat["r"].status_code == 200 and resultat["r"].history
+        assert ctrl._en_cours == 0
+    finally:
+        origine.shutdown()
+        cible.shutdown()
@@ -0,0 +1,116 @@
+import pytest
+import requests
+
+from ia import dispatcher
+from ia.dispatcher import LLMDispatcher, TokenBucket
+
+
+class _Horloge:
+    """time.monotonic / time.sleep simulés : sleep avance l'horloge."""
+
+    def __init__(self):
+        self.t = 1000.0
+        self.attentes = []
+
+    def monotonic(self):
+        return self.t
+
+    def sleep(self, s):
+        self.attentes.append(s)
+        self.t += s
+
+
+@pytest.fixture
+def horloge(monkeypatch):
+    h = _Horloge()
+    monkeypatch.setattr(dispatcher.time, "monotonic", h.monotonic)
+    monkeypatch.setattr(dispatcher.time, "sleep", h.sleep)
+    return h
+
+
+def _reponse(status, **entetes):
+    r = requests.Response()
+    r.status_code = status
+    r.headers.update(entetes)
+    return r
+
+
+class _Session:
+    def __init__(self, reponses):
+        self.reponses = list(reponses)
+        self.appels = 0
+
+    def post(self, *args, **kwargs):
+        self.appels += 1
+        reponse = self.reponses.pop(0)
+        if isinstance(reponse, Exception):
+            raise reponse
+        return reponse
+
+
+def test_seau_plein_sans_attente(horloge):
+    seau = TokenBucket(60)
+    assert seau.acquire(60) == 0.0
+    assert horloge.attentes == []
+
+
+def test_seau_vide_attend_la_recharge(horloge):
+    seau = TokenBucket(60)  # 1 jeton / s
+    seau.acquire(60)
+    assert seau.acquire(3) == pytest.approx(3.0)
+    assert sum(horloge.attentes) == pytest.approx(3.0)
+
+
+def test_requete_plus_grosse_que_le_seau_passe_seule(horloge):
+    seau = TokenBucket(10)
+    assert seau.acquire(1000) == 0.0
+
+
+def test_penalite_vide_le_seau(horloge):
+    seau = TokenBucket(60)
+    seau.penalize(5)
+    assert seau.acquire(1) == pytest.approx(6.0)
+
+
+def test_retry_after_respecte(horloge, monkeypatch):
+    monkeypatch.setattr(dispatcher.random, "uniform", lambda a, b: 0.0)
+    d = LLMDispatcher("test", max_retries=2)
+    d.session = _Session([_reponse(429, **{"Retry-After": "7"}), _reponse(200)])
+    assert d.post("http://llm.example/").status_code == 200
+    assert horloge.attentes == [7.0]
+    stats = d.snapshot()
+    assert stats["retries"] == 1 and stats["rate_limited"] == 1 and stats["erreurs"] == 0
+
+
+def test_retry_after_plafonne(horloge, monkeypatch):
+    monkeypatch.setattr(dispatcher.random, "uniform", lambda a, b: 0.0)
+    d = LLMDispatcher("test", max_retries=1, max_backoff=30)
+    d.session = _Session([_reponse(503, **{"Retry-After": "3600"}), _reponse(200)])
+    d.post("http://llm.example/")
+    assert horloge.attentes == [30.0]
+
+
+def test_429_penalise_le_seau_de_requetes(horloge, monkeypatch):
+    monkeypatch.setattr(dispatcher.random, "uniform", lambda a, b: 0.0)
+    d = LLMDispatcher("test", rpm=60, max_retries=1)
+    d.session = _Session([_reponse(429, **{"Retry-After": "4"}), _reponse(200)])
+    d.post("http://llm.example/")
+    # Seau vidé pour 4 s : après le Retry-After, il manque encore le jeton de la requête
+    assert horloge.attentes[0] == 4.0
+    assert sum(horloge.attentes[1:]) == pytest.approx(1.0)
+
+
+def test_echecs_reseau_epuises_levent(horloge):
+    d = LLMDispatcher("test", max_retries=2)
+    d.session = _Session([requests.exceptions.ConnectionError()] * 3)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        d.post("http://llm.example/")
+    assert d.session.appels == 3
+    assert d.snapshot()["erreurs"] == 1
+
+
+def test_statut_non_retente_rendu_tel_quel(horloge):
+    d = LLMDispatcher("test", max_retries=3)
+    d.session = _Session([_reponse(400)])
+    assert d.post("http://llm.example/").status_code == 400
+    assert d.session.appels == 1
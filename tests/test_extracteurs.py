@@ -0,0 +1,95 @@
+from ocr.extracteurs import _Pages, lecture_incrementale, qualite
+
+ACTE = (
+    "Article 1 – Le conseil municipal approuve le plan de financement : "
+    "État (DETR) 40 % + Région 20 % & autofinancement ! Coût total ? 1 250 000 € HT. "
+    "Vote : 19 voix « pour » — 2 abstentions."
+)
+
+
+def test_ponctuation_francaise_acceptee():
+    assert qualite(ACTE) is None
+
+
+def test_caracteres_non_imprimables_rejetes():
+    assert qualite("\x01\x02\x03\x04" * 40 + ACTE[:50]) == "caractères non imprimables"
+
+
+class _Document:
+    def __init__(self):
+        self.ferme = False
+
+    def close(self):
+        self.ferme = True
+
+
+def test_pages_fermees_sans_lecture():
+    doc = _Document()
+    pages = _Pages((t for t in ["p1", "p2"]), doc)
+    pages.close()
+    assert doc.ferme
+
+
+def test_pages_fermees_en_fin_de_lecture():
+    doc = _Document()
+    assert list(_Pages(iter(["p1", "p2"]), doc)) == ["p1", "p2"]
+    assert doc.ferme
+
+
+# ── Lecture incrémentale (ScraperCore._lire_pdf) ─────────────────────────────
+
+def _analyser(page):
+    """Page de test : « P:mot », « S:mot », « B:mot », « signal:cat » séparés par des espaces."""
+    details = {"prioritaires": [], "secondaires": [], "budget": []}
+    signaux = []
+    cles = {"P": "prioritaires", "S": "secondaires", "B": "budget"}
+    for jeton in page.split():
+        cle, _, mot = jeton.partition(":")
+        if cle == "signal":
+            signaux.append(mot)
+        elif cle in cles:
+            details[cles[cle]].append(mot)
+    return details, signaux
+
+
+def _lire(pages, **kw):
+    """flux_pages simulé : pages de test sur un document factice."""
+    doc = _Document()
+    textes, motif = lecture_incrementale(_Pages(iter(pages), doc), _analyser, 2, **kw)
+    assert doc.ferme
+    return len(textes), motif
+
+
+def test_arret_pertinent_des_la_premiere_page():
+    n, motif = _lire(["P:chaufferie signal:consultation"] + ["vide"] * 20)
+    assert n == 1
+    assert motif.startswith("pertinent")
+
+
+def test_mot_cle_tardif_avant_pages_pdf_non_manque():
+    n, motif = _lire(["vide"] * 7 + ["P:chaufferie signal:budgetaires"] + ["vide"] * 20)
+    assert n == 8
+    assert motif.startswith("pertinent")
+
+
+def test_arret_sans_mot_cle_a_pages_pdf():
+    n, motif = _lire(["vide"] * 30)
+    assert n == 10
+    assert motif == "5 page(s) sans mot-clé"
+
+
+def test_arret_mots_cles_peu_denses():
+    pages = ["S:isolation"] * 5 + ["vide"] * 4 + ["S:isolation"] + ["vide"] * 20
+    n, motif = _lire(pages)
+    assert n == 10
+    assert "peu denses" in motif
+
+
+def test_plafond_de_pages_si_mots_cles_denses():
+    n, motif = _lire(["S:isolation"] * 60, pages_max=40)
+    assert n == 40
+    assert motif == "plafond de 40 pages"
+
+
+def test_fin_du_document():
+    assert _lire(["S:isolation"] * 3) == (3, "fin du document")
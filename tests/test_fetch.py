@@ -0,0 +1,168 @@
+import os
+
+import pytest
+import requests
+
+from crawler import fetch
+from crawler.fetch import Telechargement, _recevoir
+
+
+class _Reponse:
+    """Réponse stream=True dont la connexion tombe après `blocs` blocs."""
+
+    status_code = 200
+    url = "https://mairie.example/doc.pdf"
+    encoding = None
+    headers = {"Content-Type": "application/pdf"}
+
+    def __init__(self, blocs):
+        self.blocs = blocs
+
+    def iter_content(self, taille):
+        for _ in range(self.blocs):
+            yield b"x" * taille
+        raise requests.exceptions.ChunkedEncodingError("connexion interrompue")
+
+
+def test_coupure_en_cours_supprime_le_fichier_temporaire(monkeypatch, tmp_path):
+    monkeypatch.setattr(fetch, "SEUIL_DISQUE", fetch.BLOC)
+    monkeypatch.setattr(fetch.tempfile, "tempdir", str(tmp_path))
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        _recevoir(_Reponse(blocs=4), Telechargement(_Reponse.url), max_octets=fetch.MAX_OCTETS)
+    assert os.listdir(tmp_path) == []
+
+
+class _Session:
+    """Session dont le GET renvoie une réponse préparée et garde les en-têtes envoyés."""
+
+    def __init__(self, reponse):
+        self.reponse = reponse
+        self.entetes = None
+
+    def get(self, url, headers=None, **kwargs):
+        self.entetes = headers or {}
+        return self.reponse
+
+
+class _Suite(_Reponse):
+    def __init__(self, status_code, corps, headers):
+        self.status_code = status_code
+        self.corps = corps
+        self.headers = headers
+
+    def iter_content(self, taille):
+        yield self.corps
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+def test_reprise_avec_if_range():
+    session = _Session(_Suite(206, b"suite", {"Content-Length": "5"}))
+    dl = fetch.telecharger(session, _Reponse.url, debut=b"%PDF-tete", validateur='"v1"')
+    assert session.entetes == {"Range": "bytes=9-", "If-Range": '"v1"', "Accept-Encoding": "identity"}
+    assert bytes(dl.corps.data) == b"%PDF-tetesuite" and dl.octets == 5
+
+
+def test_ressource_modifiee_document_entier():
+    session = _Session(_Suite(200, b"%PDF-nouveau", {"Content-Length": "12"}))
+    dl = fetch.telecharger(session, _Reponse.url, debut=b"%PDF-tete", validateur='"v1"')
+    assert bytes(dl.corps.data) == b"%PDF-nouveau"
+
+
+def test_reprise_sans_validateur_document_entier():
+    session = _Session(_Suite(200, b"%PDF-complet", {}))
+    fetch.telecharger(session, _Reponse.url, debut=b"%PDF-tete")
+    assert "Range" not in session.entetes
+
+
+def test_validateur_etag_faible_ecarte():
+    assert fetch.validateur({"ETag": 'W/"abc"', "Last-Modified": "Mon, 05 Oct 2026 10:00:00 GMT"}) \
+        == "Mon, 05 Oct 2026 10:00:00 GMT"
+    assert fetch.validateur({"ETag": '"abc"'}) == '"abc"'
+
+
+def test_validateur_ecarte_une_reponse_compressee():
+    assert fetch.validateur({"ETag": '"abc"', "Content-Encoding": "gzip"}) is None
+    assert fetch.validateur({"ETag": '"abc"', "Content-Encoding": "identity"}) == '"abc"'
+
+
+def test_plages_demandees_sans_compression():
+    session = _Session(_Suite(206, b"%PDF-1.7", {"Content-Range": "bytes 0-7/8"}))
+    fetch.telecharger_partiel(session, _Reponse.url)
+    assert session.entetes["Accept-Encoding"] == "identity"
+    assert session.entetes["Range"] == f"bytes=0-{fetch.TETE - 1}"
+    fetch._plage(session, _Reponse.url, "100-199", timeout=5)
+    assert session.entetes == {"Accept-Encoding": "identity", "Range": "bytes=100-199"}
+
+
+class _Page(_Suite):
+    def __init__(self, blocs):
+        super().__init__(200, b"", {"Content-Type": "text/html"})
+        self.blocs = blocs
+        self.lus = 0
+
+    def iter_content(self, taille):
+        for bloc in self.blocs:
+            self.lus += 1
+            yield bloc
+
+
+def test_lire_debut_jusqu_au_signal():
+    page = _Page([b"<style>" + b"x" * 100, b'<a href="/conseil-municipal">', b"y" * 100, b"z" * 100])
+    session = _Session(page)
+    accueil = fetch.lire_debut(session, "https://mairie.example/", 10 * fetch.BLOC,
+                               suffisant=lambda debut: b"/conseil" in debut)
+    assert page.lus == 2 and not accueil.complet
+    # Début gardé pour une reprise par Range : pas de compression
+    assert session.entetes["Accept-Encoding"] == "identity"
+    assert accueil.contenu.endswith(b"/conseil-municipal\">")
+
+
+def test_lire_debut_sans_signal_page_entiere():
+    page = _Page([b"a" * 10, b"b" * 10])
+    accueil = fetch.lire_debut(_Session(page), "https://mairie.example/", 10 * fetch.BLOC,
+                               suffisant=lambda debut: False)
+    assert accueil.complet and len(accueil.contenu) == 20
+
+
+# ── Filtrage des liens de documents ──────────────────────────────────────────
+
+@pytest.mark.parametrize("url, attendu", [
+    ("https://mairie.example/docs/PV-conseil.PDF", True),
+    ("https://mairie.example/cms_viewFile.php?idtf=12&path=BM-2026.pdf", True),
+    ("https://mairie.example/budget.docx", True),
+    ("https://mairie.example/actu.pdf-du-mois/", False),
+    ("https://mairie.example/actualites.pdf-du-mois/page-2", False),
+    ("https://mairie.example/telecharger?id=42", False),
+])
+def test_est_document(url, attendu):
+    assert fetch.est_document(url) is attendu
+
+
+def _entetes(status_code=200, content_type="application/pdf", taille=None, last_modified=None):
+    e = fetch.Entetes("https://mairie.example/doc.pdf")
+    e.status_code, e.content_type, e.taille, e.last_modified = status_code, content_type, taille, last_modified
+    return e
+
+
+def test_motif_rejet():
+    from datetime import datetime
+
+    assert _entetes().motif_rejet() is None
+    assert _entetes(404).motif_rejet() == "HTTP 404"
+    assert _entetes(410).motif_rejet() == "HTTP 410"
+    # HEAD refusé ou en erreur : le GET tranchera
+    assert _entetes(405, content_type="text/html").motif_rejet() is None
+    assert _entetes(0).motif_rejet() is None
+    assert _entetes(content_type="text/html").motif_rejet() == "pas un document (text/html)"
+    assert _entetes(content_type="").motif_rejet() is None
+    assert _entetes(content_type="application/octet-stream").motif_rejet() is None
+    assert _entetes(taille=50 * fetch.MO).motif_rejet(max_octets=40 * fetch.MO).startswith("trop volumineux")
+    assert _entetes(taille=50 * fetch.MO).motif_rejet(max_octets=None) is None
+    ancien = _entetes(last_modified=datetime(2019, 3, 1))
+    assert ancien.motif_rejet(depuis=datetime(2024, 1, 1)) == "modifié le 01/03/2019 (Last-Modified)"
+    assert ancien.motif_rejet() is None
@@ -0,0 +1,63 @@
+import sqlite3
+
+from ocr.cache import OCRCache, hash_document
+
+
+def test_hash_identique_octets_et_fichier(tmp_path):
+    contenu = b"%PDF-1.4 scan de deliberation"
+    chemin = tmp_path / "scan.pdf"
+    chemin.write_bytes(contenu)
+    assert hash_document(contenu) == hash_document(str(chemin))
+    assert hash_document(contenu) != hash_document(contenu + b" ")
+
+
+def test_aller_retour(tmp_path):
+    cache = OCRCache(str(tmp_path / "ocr.sqlite"))
+    cache.put("doc", 0, 300, "fra", "Page 1 : chaufferie bois", profil="p", statut="texte")
+    cache.put("doc", 2, 300, "fra", None, profil="p", statut="natif")
+    assert cache.get_pages("doc", 300, "fra", "p") == {
+        0: ("Page 1 : chaufferie bois", "texte"),
+        2: (None, "natif"),
+    }
+
+
+def test_cle_dpi_langue_profil(tmp_path):
+    cache = OCRCache(str(tmp_path / "ocr.sqlite"))
+    cache.put("doc", 0, 300, "fra", "texte", profil="p")
+    assert cache.get_pages("doc", 400, "fra", "p") == {}
+    assert cache.get_pages("doc", 300, "fra+eng", "p") == {}
+    assert cache.get_pages("doc", 300, "fra", "nettete=1") == {}
+    assert cache.get_pages("autre", 300, "fra", "p") == {}
+
+
+def test_pages_demandees_hits_et_misses(tmp_path):
+    cache = OCRCache(str(tmp_path / "ocr.sqlite"))
+    for page in (0, 1):
+        cache.put("doc", page, 300, "fra", f"page {page}")
+    assert set(cache.get_pages("doc", 300, "fra", pages=[1, 2, 3])) == {1}
+    assert cache.stats() == {"hits": 1, "misses": 2, "hit_rate": 0.333}
+
+
+def test_persistant_entre_instances(tmp_path):
+    chemin = str(tmp_path / "ocr.sqlite")
+    OCRCache(chemin).put("doc", 0, 300, "fra", "texte")
+    assert OCRCache(chemin).get_pages("doc", 300, "fra") == {0: ("texte", "")}
+
+
+def test_ancienne_base_sans_statut_migree(tmp_path):
+    chemin = str(tmp_path / "ocr.sqlite")
+    db = sqlite3.connect(chemin)
+    db.execute("CREATE TABLE pages (doc TEXT, page INTEGER, dpi INTEGER, lang TEXT, profil TEXT,"
+               " texte TEXT, cached_at TEXT, PRIMARY KEY (doc, page, dpi, lang, profil))")
+    db.execute("INSERT INTO pages VALUES ('doc', 0, 300, 'fra', '', 'ancien', '2025-01-01')")
+    db.commit()
+    db.close()
+    assert OCRCache(chemin).get_pages("doc", 300, "fra") == {0: ("ancien", "")}
+
+
+def test_base_inaccessible_ocr_sans_cache(tmp_path):
+    dossier = tmp_path / "dossier"
+    dossier.mkdir()
+    cache = OCRCache(str(dossier))  # un répertoire n'est pas une base SQLite
+    cache.put("doc", 0, 300, "fra", "texte")
+    assert cache.get_pages("doc", 300, "fra") == {}
@@ -0,0 +1,52 @@
+import pytest
+
+from ocr import engine
+
+
+class _Image:
+    """Image « L » minimale : histogram() et point(lut) sur une liste d'octets."""
+
+    def __init__(self, octets):
+        self.octets = list(octets)
+
+    def histogram(self):
+        histo = [0] * 256
+        for o in self.octets:
+            histo[o] += 1
+        return histo
+
+    def point(self, lut):
+        return _Image(lut[o] for o in self.octets)
+
+
+def test_contraste_etire_autour_de_la_moyenne():
+    image = engine._contraste(_Image([100, 100, 140, 140]))  # moyenne 120
+    assert image.octets == [80, 80, 160, 160]
+
+
+def test_contraste_borne_a_l_octet():
+    image = engine._contraste(_Image([0, 250, 255, 5]), facteur=3.0)
+    assert min(image.octets) == 0 and max(image.octets) == 255
+
+
+def test_contraste_image_uniforme_inchangee():
+    assert engine._contraste(_Image([42] * 10)).octets == [42] * 10
+
+
+def test_rendu_en_niveaux_de_gris(tmp_path):
+    fitz = pytest.importorskip("fitz")
+    pytest.importorskip("PIL")
+    chemin = str(tmp_path / "page.pdf")
+    doc = fitz.open()
+    page = doc.new_page(width=200, height=100)
+    page.insert_text((20, 50), "Chaufferie biomasse", color=(1, 0, 0))
+    doc.save(chemin)
+    doc.close()
+    try:
+        image = engine._rendre_page(chemin, 0, dpi=144)
+    finally:
+        engine._fermer()
+    assert image.mode == "L"
+    assert image.size == (400, 200)  # 144 dpi = 2 × 72
+    # Texte rouge rendu en gris foncé sur fond blanc, contrasté
+    assert image.getextrema()[0] < 128 and image.getextrema()[1] == 255
@@ -0,0 +1,131 @@
+import pytest
+
+from ia import ollama_session
+from ia.ollama_session import OllamaSession, format_appel, get_session
+
+
+class _Reponse:
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self.data = data or {}
+
+    def json(self):
+        return self.data
+
+
+class _Dispatcher:
+    """Dispatcher Ollama factice : garde les requêtes, renvoie une réponse préparée."""
+
+    def __init__(self, reponse):
+        self.reponse = reponse
+        self.requetes = []
+
+    def post(self, url, json=None, timeout=None, **kwargs):
+        self.requetes.append((url, json))
+        return self.reponse
+
+
+REPONSE = {
+    "message": {"role": "assistant", "content": '{"ia_pertinent": true}'},
+    "prompt_eval_count": 40, "prompt_eval_duration": 2 * 10 ** 8,
+    "eval_count": 12, "eval_duration": 6 * 10 ** 8,
+    "load_duration": 3 * 10 ** 9, "total_duration": 4 * 10 ** 9,
+}
+
+
+@pytest.fixture
+def dispatcher(monkeypatch):
+    d = _Dispatcher(_Reponse(200, REPONSE))
+    monkeypatch.setattr(ollama_session, "get_dispatcher", lambda backend: d)
+    monkeypatch.setenv("OLLAMA_HOST", "http://ollama.test:11434")
+    return d
+
+
+def test_payload_chat(dispatcher):
+    session = OllamaSession("mistral", "Tu es un analyste.", options={"temperature": 0.1},
+                            format="json", keep_alive="30m")
+    contenu, metriques = session.chat("Document", num_predict=200)
+    url, payload = dispatcher.requetes[0]
+    assert url == "http://ollama.test:11434/api/chat"
+    assert payload == {
+        "model": "mistral",
+        "messages": [{"role": "system", "content": "Tu es un analyste."},
+                     {"role": "user", "content": "Document"}],
+        "stream": False,
+        "keep_alive": "30m",
+        "options": {"temperature": 0.1, "num_predict": 200},
+        "format": "json",
+    }
+    assert contenu == '{"ia_pertinent": true}'
+    assert metriques["prompt_tokens"] == 40 and metriques["load_s"] == pytest.approx(3.0)
+    # num_predict d'un appel ne modifie pas les options de la session
+    assert session.options == {"temperature": 0.1}
+
+
+def test_prefixe_systeme_identique_d_un_document_a_l_autre(dispatcher):
+    session = OllamaSession("mistral", "Prompt système")
+    session.chat("doc 1")
+    session.chat("doc 2")
+    premiers = [payload["messages"][0] for _, payload in dispatcher.requetes]
+    assert premiers[0] == premiers[1] == {"role": "system", "content": "Prompt système"}
+
+
+def test_keep_alive_par_defaut(dispatcher):
+    OllamaSession("mistral", "s").chat("x")
+    assert dispatcher.requetes[0][1]["keep_alive"] == ollama_session.KEEP_ALIVE
+
+
+def test_warm_ne_compte_pas_l_appel(dispatcher):
+    session = OllamaSession("mistral", "s")
+    assert session.warm() is True
+    assert dispatcher.requetes[0][1]["options"]["num_predict"] == 1
+    assert session.warm_s == pytest.approx(4.0)
+    assert session.snapshot()["appels"] == 0
+
+
+def test_warm_en_echec(monkeypatch):
+    monkeypatch.setattr(ollama_session, "get_dispatcher", lambda backend: _Dispatcher(_Reponse(503)))
+    assert OllamaSession("mistral", "s").warm() is False
+
+
+def test_statut_http_en_erreur(monkeypatch):
+    monkeypatch.setattr(ollama_session, "get_dispatcher", lambda backend: _Dispatcher(_Reponse(500)))
+    with pytest.raises(RuntimeError):
+        OllamaSession("mistral", "s").chat("x")
+
+
+def test_release_keep_alive_zero(dispatcher):
+    OllamaSession("mistral", "s").release()
+    url, payload = dispatcher.requetes[0]
+    assert url.endswith("/api/generate") and payload == {"model": "mistral", "keep_alive": 0}
+
+
+def test_stats_cumulees(dispatcher):
+    session = OllamaSession("mistral", "s")
+    debut = session.snapshot()
+    session.chat("a")
+    session.chat("b")
+    assert session.snapshot()["appels"] == 2
+    assert session.snapshot()["eval_tokens"] == 24
+    assert session.format_stats(debut).startswith("Ollama mistral : 2 appel(s)")
+    assert "chargement 3.0s" in format_appel({**session.snapshot(), "load_s": 3.0})
+
+
+def test_session_partagee_par_modele_et_prompt():
+    a = get_session("modele-test", "prompt A")
+    assert get_session("modele-test", "prompt A") is a
+    assert get_session("modele-test", "prompt B") is not a
+    assert get_session("modele-test", "prompt A", format="json") is not a
+
+
+def test_prompt_du_dashboard_lu_une_fois_par_session(monkeypatch):
+    from dashboard import ia_analyzer
+
+    lectures = []
+    monkeypatch.setattr(ia_analyzer, "_load_system_prompt", lambda f=None: lectures.append(f) or "Prompt")
+    monkeypatch.setattr(ia_analyzer, "_sessions", {})
+    a = ia_analyzer.get_ollama_session("mistral-test")
+    for _ in range(5):
+        assert ia_analyzer.get_ollama_session("mistral-test") is a
+    assert lectures == [None]
+    assert a.system.startswith("Prompt")
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bs4 import BeautifulSoup
+
+from crawler.pagination import arret_pagination, liens_liste, page_suivante
+
+LISTE = "https://mairie.example/deliberations/"
+
+
+def _soup(html):
+    return BeautifulSoup(html, "html.parser")
+
+
+def test_rel_next():
+    soup = _soup('<head><link rel="next" href="/deliberations/?page=2"></head>')
+    assert page_suivante(soup, LISTE) == "https://mairie.example/deliberations/?page=2"
+
+
+def test_rel_next_hors_site_ignore():
+    soup = _soup('<a rel="next" href="https://autre.example/?page=2">Suivant</a>')
+    assert page_suivante(soup, LISTE) is None
+
+
+@pytest.mark.parametrize("url, liens, attendu", [
+    # Première page sans numéro, liens « 2 3 … 12 »
+    (LISTE, ["?page=2", "?page=3", "?page=12"], "https://mairie.example/deliberations/?page=2"),
+    ("https://mairie.example/deliberations/?page=2", ["?page=1", "?page=3", "?page=4"],
+     "https://mairie.example/deliberations/?page=3"),
+    # SPIP : décalage debut_articles
+    ("https://mairie.example/spip.php?rubrique=4",
+     ["spip.php?rubrique=4&debut_articles=10", "spip.php?rubrique=4&debut_articles=20"],
+     "https://mairie.example/spip.php?rubrique=4&debut_articles=10"),
+    # WordPress : /page/N/
+    ("https://mairie.example/actualites/page/2/", ["/actualites/", "/actualites/page/3/"],
+     "https://mairie.example/actualites/page/3/"),
+])
+def test_schemas_numerotes(url, liens, attendu):
+    soup = _soup("".join(f'<a href="{href}">{i}</a>' for i, href in enumerate(liens)))
+    assert page_suivante(soup, url) == attendu
+
+
+def test_derniere_page():
+    soup = _soup('<a href="?page=1">1</a><a href="?page=2">2</a>')
+    assert page_suivante(soup, "https://mairie.example/deliberations/?page=2") is None
+
+
+def test_liens_liste_hors_menus_et_pied():
+    soup = _soup(
+        '<header><a href="/docs/2015-03-01-statuts.pdf">Statuts</a></header>'
+        '<nav><a href="/plan-du-site">Plan</a></nav>'
+        '<main><ul><li><a href="/docs/2026-09-14-cm.pdf">CM</a></li></ul></main>'
+        '<footer><a href="/docs/2012-01-01-charte.pdf">Charte</a></footer>'
+    )
+    assert liens_liste(soup, LISTE) == ["https://mairie.example/docs/2026-09-14-cm.pdf"]
+
+
+DEPUIS = datetime(2026, 7, 1)
+RECENTES = [DEPUIS + timedelta(days=n) for n in (80, 60, 40, 20)]
+ANCIENNES = [DEPUIS - timedelta(days=n) for n in (10, 30, 50)]
+
+
+def test_page_recente_continue():
+    assert arret_pagination(RECENTES, 1, DEPUIS) is None
+
+
+def test_element_ancien_isole_ne_stoppe_pas():
+    # Document épinglé de 2015 au milieu d'éléments récents
+    assert arret_pagination(RECENTES + [datetime(2015, 3, 1)], 1, DEPUIS) is None
+
+
+def test_majorite_hors_fenetre_stoppe():
+    assert arret_pagination(RECENTES[:1] + ANCIENNES, 3, DEPUIS)
+
+
+def test_pages_sans_date():
+    assert arret_pagination([], 2, DEPUIS, pages_sans_date=3) is None
+    assert arret_pagination([], 3, DEPUIS, pages_sans_date=3)
+
+
+def test_plafond_de_pages():
+    assert arret_pagination(RECENTES, 20, DEPUIS, pages_max=20).startswith("plafond")
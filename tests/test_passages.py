@@ -0,0 +1,59 @@
+import random
+
+from ia import passages
+from ia.passages import SEPARATEUR, politique, select_passages, trouver_occurrences
+
+MOTS = {"prioritaires": ["chaufferie", "biomasse"], "secondaires": ["isolation"]}
+REMPLISSAGE = "le conseil municipal prend acte du compte rendu de la séance précédente".split()
+
+
+def _document(n_mots=3000, graine=1):
+    rnd = random.Random(graine)
+    mots = []
+    for _ in range(n_mots):
+        r = rnd.random()
+        mots.append("chaufferie" if r < 0.004 else "isolation" if r < 0.008 else rnd.choice(REMPLISSAGE))
+    return " ".join(mots)
+
+
+def test_texte_court_rendu_tel_quel():
+    assert select_passages("chaufferie bois", 1000, MOTS)[0] == "chaufferie bois"
+
+
+def test_sans_mot_cle_debut_du_document():
+    texte = "x " * 2000
+    extrait, _ = select_passages(texte, 500, MOTS)
+    assert extrait == texte[:500] + SEPARATEUR
+
+
+def test_mots_entiers_seulement():
+    assert trouver_occurrences("espace PAC", {"prioritaires": ["PAC"], "secondaires": []})[:1] == [(7, 3)]
+    assert trouver_occurrences("espace", {"prioritaires": ["PAC"], "secondaires": []}) == []
+
+
+def test_tete_et_occurrences_conservees():
+    texte = "Délibération du 12 mars. " + "rien " * 800 + "chaufferie biomasse " + "rien " * 800
+    extrait, _ = select_passages(texte, 1000, MOTS)
+    assert extrait.startswith("Délibération du 12 mars.")
+    assert "chaufferie biomasse" in extrait
+
+
+def test_budget_respecte_et_utilise():
+    for graine in range(5):
+        texte = _document(graine=graine)
+        for budget in (1000, 1500, 4000):
+            extrait, _ = select_passages(texte, budget, MOTS)
+            assert len(extrait) <= budget
+            assert len(extrait) >= 0.9 * budget, (graine, budget, len(extrait))
+
+
+def test_mots_cles_du_run_et_non_du_fichier(monkeypatch):
+    monkeypatch.setattr(passages, "get_mots_cles_courants", lambda: {"prioritaires": ["éolienne"], "secondaires": []})
+    texte = "rien " * 800 + "chaufferie " + "rien " * 800
+    assert "chaufferie" in select_passages(texte, 600, MOTS)[0]
+    assert "chaufferie" not in select_passages(texte, 600)[0]
+
+
+def test_politique_depend_des_mots_cles():
+    assert politique(1000, MOTS) != politique(1000, {"prioritaires": ["solaire"], "secondaires": []})
+    assert politique(1000, MOTS) == select_passages(_document(), 1000, MOTS)[1]
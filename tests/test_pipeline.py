@@ -0,0 +1,128 @@
+import threading
+import time
+
+from pipeline import Pipeline, Stage, format_metrics
+
+
+def _executer(pipeline, items, delai=10):
+    """Lance run() dans un thread : un pipeline bloqué fait échouer le test au lieu de le figer."""
+    resultat = {}
+    fil = threading.Thread(target=lambda: resultat.update(metriques=pipeline.run(items)), daemon=True)
+    fil.start()
+    fil.join(delai)
+    assert not fil.is_alive(), "pipeline bloqué"
+    return resultat["metriques"]
+
+
+def _collecte(sorties):
+    return lambda item, emit: sorties.append(item)
+
+
+def test_ordre_conserve_avec_un_worker_par_etape():
+    sorties = []
+    pipeline = Pipeline([
+        Stage("double", lambda x, emit: emit(x * 2)),
+        Stage("plus_un", lambda x, emit: emit(x + 1)),
+        Stage("collecte", _collecte(sorties)),
+    ])
+    metriques = _executer(pipeline, range(100))
+    assert sorties == [x * 2 + 1 for x in range(100)]
+    assert [m["entrees"] for m in metriques] == [100, 100, 100]
+    assert [m["sorties"] for m in metriques] == [100, 100, 0]
+
+
+def test_tous_les_items_traites_avec_plusieurs_workers():
+    sorties, verrou = [], threading.Lock()
+
+    def collecte(x, emit):
+        with verrou:
+            sorties.append(x)
+
+    pipeline = Pipeline([
+        Stage("lent", lambda x, emit: (time.sleep(0.001), emit(x)), workers=4, queue_size=3),
+        Stage("collecte", collecte, workers=3),
+    ])
+    _executer(pipeline, range(200))
+    assert sorted(sorties) == list(range(200))
+
+
+def test_emission_multiple_ou_nulle():
+    sorties = []
+    pipeline = Pipeline([
+        Stage("eclate", lambda x, emit: [emit(x) for _ in range(x % 3)]),
+        Stage("collecte", _collecte(sorties)),
+    ])
+    metriques = _executer(pipeline, range(9))
+    assert sorted(sorties) == [1, 2, 2, 4, 5, 5, 7, 8, 8]
+    assert metriques[0]["sorties"] == 9
+
+
+def test_flux_vide_termine():
+    metriques = _executer(Pipeline([Stage("a", lambda x, emit: emit(x)), Stage("b", lambda x, emit: None)]), [])
+    assert [m["entrees"] for m in metriques] == [0, 0]
+
+
+def test_etape_qui_leve_abandonne_l_item_et_continue():
+    sorties, erreurs = [], []
+
+    def fragile(x, emit):
+        if x % 5 == 0:
+            raise ValueError(f"item {x}")
+        emit(x)
+
+    pipeline = Pipeline(
+        [Stage("fragile", fragile, workers=2), Stage("collecte", _collecte(sorties))],
+        on_error=lambda etape, item, exc: erreurs.append((etape, item, str(exc))),
+    )
+    metriques = _executer(pipeline, range(20))
+    assert sorted(sorties) == [x for x in range(20) if x % 5]
+    assert sorted(erreurs) == [("fragile", x, f"item {x}") for x in (0, 5, 10, 15)]
+    assert metriques[0]["erreurs"] == 4
+
+
+def test_callback_on_error_qui_leve_ne_bloque_pas():
+    def callback(etape, item, exc):
+        raise RuntimeError("callback cassé")
+
+    pipeline = Pipeline(
+        [Stage("toujours_en_echec", lambda x, emit: 1 / 0, queue_size=2), Stage("fin", lambda x, emit: None)],
+        on_error=callback,
+    )
+    metriques = _executer(pipeline, range(50))
+    assert metriques[0]["erreurs"] == 50
+
+
+def test_back_pressure_borne_l_avance_de_l_amont():
+    taille = 2
+    produits, consommes = [0], [0]
+    avance_max = [0]
+    verrou = threading.Lock()
+
+    def source():
+        for i in range(40):
+            with verrou:
+                produits[0] += 1
+                avance_max[0] = max(avance_max[0], produits[0] - consommes[0])
+            yield i
+
+    def lent(x, emit):
+        time.sleep(0.005)
+        with verrou:
+            consommes[0] += 1
+
+    pipeline = Pipeline([
+        Stage("relais", lambda x, emit: emit(x), queue_size=taille),
+        Stage("lent", lent, queue_size=taille),
+    ])
+    metriques = _executer(pipeline, source())
+    assert consommes[0] == 40
+    assert all(m["file_max"] <= taille for m in metriques)
+    # Files des deux étapes + un item en cours par worker + celui qui attend sa place
+    assert avance_max[0] <= 2 * taille + 3
+
+
+def test_format_metrics():
+    pipeline = Pipeline([Stage("ia", lambda x, emit: emit(x)), Stage("persistance", lambda x, emit: None)])
+    lignes = format_metrics(_executer(pipeline, range(3)))
+    assert len(lignes) == 2
+    assert lignes[0].startswith("ia") and "3 → 3" in lignes[0]
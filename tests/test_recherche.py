@@ -0,0 +1,87 @@
+from bs4 import BeautifulSoup
+
+from crawler.recherche import Formulaire, detecter_formulaire, liens_resultats
+
+ACCUEIL = "https://www.mairie-x.fr/"
+
+
+def _soup(html):
+    return BeautifulSoup(html, "html.parser")
+
+
+def test_formulaire_wordpress():
+    soup = _soup("""
+        <form role="search" method="get" action="https://www.mairie-x.fr/">
+          <input type="search" name="s" value=""><button>OK</button>
+        </form>""")
+    formulaire = detecter_formulaire(soup, ACCUEIL)
+    assert formulaire.action == ACCUEIL and formulaire.champ == "s"
+    assert formulaire.url("chaufferie bois") == "https://www.mairie-x.fr/?s=chaufferie+bois"
+
+
+def test_champs_caches_conserves():
+    soup = _soup("""
+        <form action="spip.php" class="formulaire_recherche">
+          <input type="hidden" name="page" value="recherche">
+          <input type="text" name="recherche">
+        </form>""")
+    formulaire = detecter_formulaire(soup, ACCUEIL)
+    assert formulaire.url("pcaet") == "https://www.mairie-x.fr/spip.php?page=recherche&recherche=pcaet"
+
+
+def test_champ_texte_reconnu_par_la_zone():
+    soup = _soup("""
+        <form id="search-block" action="/rechercher">
+          <input type="text" name="champ_libre">
+        </form>""")
+    assert detecter_formulaire(soup, ACCUEIL).champ == "champ_libre"
+
+
+def test_formulaires_ignores():
+    soup = _soup("""
+        <form method="post" action="/recherche"><input type="search" name="q"></form>
+        <form action="https://moteur.example/"><input type="search" name="q"></form>
+        <form action="/newsletter"><input type="text" name="email"></form>""")
+    assert detecter_formulaire(soup, ACCUEIL) is None
+
+
+def test_repli_sur_l_url_du_cms():
+    formulaire = detecter_formulaire(_soup("<p>pas de formulaire</p>"), ACCUEIL, cms="drupal")
+    assert formulaire.url("réseau de chaleur") == "https://www.mairie-x.fr/search/node?keys=r%C3%A9seau+de+chaleur"
+    assert detecter_formulaire(_soup(""), ACCUEIL, cms="inconnu") is None
+
+
+RESULTATS = """
+<html><body>
+  <header><a href="/">Accueil</a><a href="/mairie">Mairie</a></header>
+  <form role="search" action="/"><input type="search" name="s"></form>
+  <div class="search-results">
+    <article><a href="/2026/03/chaufferie-bois">Chaufferie bois : lancement</a></article>
+    <article><a href="/wp-content/uploads/PV-conseil.pdf#page=2">PV du conseil</a></article>
+    <article><a href="https://www.mairie-x.fr/2026/03/chaufferie-bois">Doublon</a></article>
+    <a href="https://autre-site.example/page">Externe</a>
+    <a href="mailto:mairie@mairie-x.fr">Contact</a>
+    <a href="/mairie">Mairie</a>
+    <nav class="pagination"><a href="/?s=chaufferie&paged=2">2</a></nav>
+    <a href="/?s=chaufferie&orderby=date">Trier par date</a>
+  </div>
+  <footer><a href="/mentions-legales">Mentions</a></footer>
+</body></html>"""
+
+
+def test_liens_de_la_zone_de_resultats():
+    formulaire = Formulaire(ACCUEIL, "s")
+    liens = liens_resultats(_soup(RESULTATS), "https://www.mairie-x.fr/?s=chaufferie", formulaire,
+                            exclus={"https://www.mairie-x.fr/mairie"})
+    assert liens == [
+        "https://www.mairie-x.fr/2026/03/chaufferie-bois",
+        "https://www.mairie-x.fr/wp-content/uploads/PV-conseil.pdf",
+    ]
+
+
+def test_sans_zone_de_resultats_repli_sur_main():
+    html = """<body><nav><a href="/menu">Menu</a></nav>
+        <main><a href="/deliberations/2026-02">Délibérations</a></main></body>"""
+    liens = liens_resultats(_soup(html), "https://www.mairie-x.fr/recherche?q=pcaet",
+                            Formulaire("https://www.mairie-x.fr/recherche", "q"), exclus=set())
+    assert liens == ["https://www.mairie-x.fr/deliberations/2026-02"]
@@ -0,0 +1,50 @@
+import pytest
+
+from ocr.triage import IGNOREES, decider
+
+# Mesures de rendus 72 DPI typiques (couverture, écart-type, encre, demi-teintes)
+PAGES = {
+    # Page vide d'un scan : papier uniforme
+    "blanche": {"couverture": 1.0, "ecart_type": 2.1, "encre": 0.0, "demi_teintes": 0.0},
+    # Délibération scannée : une image pleine page, papier + encre
+    "scan_texte": {"couverture": 1.0, "ecart_type": 58.0, "encre": 0.09, "demi_teintes": 0.06},
+    # Scan jauni / tramé : demi-teintes élevées mais page de texte
+    "scan_jauni": {"couverture": 1.0, "ecart_type": 31.0, "encre": 0.05, "demi_teintes": 0.62},
+    # Photo pleine page d'un bulletin municipal
+    "photo": {"couverture": 0.95, "ecart_type": 47.0, "encre": 0.12, "demi_teintes": 0.71},
+    # Article de magazine : colonnes de texte et illustration
+    "magazine": {"couverture": 0.4, "ecart_type": 52.0, "encre": 0.07, "demi_teintes": 0.24},
+}
+
+TEXTE_SCAN = "Le conseil municipal approuve le projet de chaufferie collective au bois"
+
+
+def test_page_blanche_ignoree_sans_sonde():
+    appels = []
+    categorie, dpi = decider(PAGES["blanche"], 300, lambda d: appels.append(d) or "")
+    assert categorie in IGNOREES and dpi is None
+    assert appels == []
+
+
+@pytest.mark.parametrize("page", ["scan_texte", "magazine"])
+def test_pages_de_texte_ocrisees_au_dpi_demande(page):
+    categorie, dpi = decider(PAGES[page], 300)
+    assert categorie not in IGNOREES and dpi == 300
+
+
+def test_photo_sans_texte_ignoree_apres_sonde():
+    appels = []
+    categorie, dpi = decider(PAGES["photo"], 300, lambda d: appels.append(d) or "©  Mairie")
+    assert categorie == "photo" and dpi is None
+    assert appels == [100]
+
+
+def test_scan_jauni_pris_pour_photo_ocrise():
+    categorie, dpi = decider(PAGES["scan_jauni"], 300, lambda d: TEXTE_SCAN)
+    assert categorie == "mixte" and dpi == 300
+
+
+def test_photo_sans_sonde_ocrisee():
+    # Sans preuve d'absence de texte, la page part à l'OCR
+    categorie, dpi = decider(PAGES["photo"], 300)
+    assert dpi == 300